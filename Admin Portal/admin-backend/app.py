@@ -1,12 +1,17 @@
 import os
 import json
-from flask import Flask, jsonify, request
+from flask import Flask, jsonify, request, g
 from flask_cors import CORS
 from dotenv import load_dotenv
 import jwt
 from datetime import datetime, timedelta, timezone
 import mysql.connector
 import logging
+from db import DB_CONFIG, get_db_connection, release_connection, pool_stats
+import kpi_snapshot
+import table_versions
+from json_provider import FastJSONProvider
+from compression import init_compression
 from werkzeug.security import check_password_hash, generate_password_hash
 import re
 try:
@@ -20,53 +25,27 @@ logger = logging.getLogger("admin-backend")
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.getenv('JWT_SECRET', 'change-me')
+app.json = FastJSONProvider(app)
+app.config['COMPRESS_ENABLED'] = os.getenv('COMPRESS_ENABLED', 'true').lower() == 'true'
+app.config['COMPRESS_MIN_SIZE'] = int(os.getenv('COMPRESS_MIN_SIZE', '1024'))
+init_compression(app)
 
 allowed_origins = os.getenv('ALLOWED_ORIGINS', 'http://localhost:4300').split(',')
 allowed_origins = [o.strip() for o in allowed_origins if o.strip()]
 CORS(app, origins=allowed_origins, supports_credentials=True)
 
-DB_CONFIG = {
-    'host': os.getenv('DB_HOST', 'localhost'),
-    'user': os.getenv('DB_USER', 'root'),
-    'password': os.getenv('DB_PASSWORD', ''),
-    'database': os.getenv('DB_NAME', 'vms_db')
-}
-
-# Build fallback configurations similar to main backend
-_hosts = [
-    DB_CONFIG.get('host') or 'localhost',
-    'localhost',
-    '127.0.0.1',
-    'mysql',
-    'database'
-]
-_passwords = [DB_CONFIG.get('password') or '', 'root']
-DB_FALLBACK_CONFIGS = []
-for h in _hosts:
-    for p in _passwords:
-        cfg = dict(DB_CONFIG)
-        cfg['host'] = h
-        cfg['password'] = p
-        DB_FALLBACK_CONFIGS.append(cfg)
-
-# Simple DB helper
+# Per-request DB helper on top of the shared pool (see db.py)
 
 def get_db():
-    last_err = None
-    for cfg in DB_FALLBACK_CONFIGS:
-        try:
-            conn = mysql.connector.connect(**{k: v for k, v in cfg.items()})
-            if conn.is_connected():
-                if cfg is not DB_CONFIG:
-                    logger.info(f"DB connected using fallback host={cfg['host']} user={cfg['user']} pwd={'set' if cfg['password'] else 'empty'}")
-                return conn
-        except Exception as e:
-            last_err = e
-            continue
-    logger.error(f"All DB connection attempts failed. Tried hosts: {list(set([c['host'] for c in DB_FALLBACK_CONFIGS]))}")
-    if last_err:
-        raise last_err
-    raise Exception("Database connection failed")
+    conn = get_db_connection()
+    g.setdefault('db_connections', []).append(conn)
+    return conn
+
+@app.teardown_appcontext
+def release_db_connections(exc):
+    # Routes close their connection on success; return any left open by an error path
+    for conn in g.pop('db_connections', []):
+        release_connection(conn)
 
 # Ensure pricing plan features table exists (idempotent)
 def ensure_pricing_features_table(conn):
@@ -299,272 +278,32 @@ def health():
         cur.fetchone()
         cur.close()
         conn.close()
-        return jsonify({'ok': True, 'ts': datetime.now().isoformat()})
+        return jsonify({'ok': True, 'ts': datetime.now().isoformat(), 'db_pool': pool_stats()})
     except Exception as e:
         logger.error(f"Health check DB error: {e}")
         return jsonify({'ok': False, 'error': str(e), 'db': {
             'host': DB_CONFIG.get('host'),
             'user': DB_CONFIG.get('user'),
+            'pool': pool_stats(),
         }}), 500
 
-# Minimal admin endpoints using existing tables (no new tables)
+# Minimal admin endpoints using existing tables (the overview is served from KPI snapshots)
 
 @app.get('/api/admin/overview')
 @require_roles('admin')
 def admin_overview():
     user_company = request.current_user.get('company_name')
-    data = {
-        'company': user_company,
-        'totals': {
-            'visits': 0,
-            'uniqueVisitors': 0,
-            'hosts': 0,
-            # Dashboard KPIs
-            'customers': 0,
-            'activeUsers': 0,         # per request: companies with active subscription
-            'monthlyRevenue': 0.0,    # total paid amount in current month
-            'activeSubs': 0,          # Active Trials (companies in trial and not expired)
-            'openTickets': 0,
-            'pendingRenewals': 0
-        }
-    }
     try:
         conn = get_db()
-        cur = conn.cursor(dictionary=True)
-        # Visits count for company
-        cur.execute(
-            """
-            SELECT COUNT(*) AS c FROM visits v
-            JOIN users h ON v.host_id = h.id
-            WHERE h.company_name = %s
-            """, (user_company,)
-        )
-        data['totals']['visits'] = cur.fetchone()['c']
-        # Unique visitors by email
-        cur.execute(
-            """
-            SELECT COUNT(DISTINCT COALESCE(v.visitor_email, vis.email)) AS c
-            FROM visits v
-            JOIN users h ON v.host_id = h.id
-            LEFT JOIN visitors vis ON v.visitor_id = vis.id
-            WHERE h.company_name = %s
-            """, (user_company,)
-        )
-        data['totals']['uniqueVisitors'] = cur.fetchone()['c']
-        # Hosts
-        cur.execute("SELECT COUNT(*) AS c FROM users WHERE company_name = %s AND role='host'", (user_company,))
-        data['totals']['hosts'] = cur.fetchone()['c']
-        # Total customers
-        cur.execute("SELECT COUNT(*) AS c FROM companies")
-        data['totals']['customers'] = cur.fetchone()['c'] or 0
-
-        # Active companies (subscription_status = 'active')
-        cur.execute("SELECT COUNT(*) AS c FROM companies WHERE subscription_status = 'active'")
-        data['totals']['activeUsers'] = cur.fetchone()['c'] or 0
-
-        # Active Trials: companies in 'trial' and trial_end_date not passed
-        cur.execute("""
-            SELECT COUNT(*) AS c
-            FROM companies
-            WHERE subscription_status = 'trial'
-              AND (trial_end_date IS NULL OR trial_end_date >= CURDATE())
-        """)
-        data['totals']['activeSubs'] = cur.fetchone()['c'] or 0
-
-        # Monthly Revenue: sum of paid payments in current month
-        # Use payment_date if available, else created_at
-        cur.execute("""
-            SELECT COALESCE(SUM(amount), 0) AS amt
-            FROM payments
-            WHERE status = 'paid'
-              AND DATE(COALESCE(payment_date, created_at))
-                    BETWEEN DATE_FORMAT(CURDATE(), '%Y-%m-01') AND LAST_DAY(CURDATE())
-        """)
-        row = cur.fetchone()
-        data['totals']['monthlyRevenue'] = float(row['amt'] or 0)
-
-        # Open Tickets (support tickets)
-        try:
-            cur.execute("SELECT COUNT(*) AS c FROM tickets WHERE status = 'open'")
-            data['totals']['openTickets'] = cur.fetchone()['c'] or 0
-        except Exception:
-            # Fallback to contact_us table if tickets table not present
-            try:
-                cur.execute("SELECT COUNT(*) AS c FROM contact_us WHERE status = 'open'")
-                data['totals']['openTickets'] = cur.fetchone()['c'] or 0
-            except Exception:
-                data['totals']['openTickets'] = 0
-
-        # Pending Renewals:
-        # - companies on trial plan/status
-        # - OR companies whose plan is expired within last 2 months
-        # - OR companies whose subscription due date is within next 5 days
-        cur.execute("""
-            SELECT COUNT(*) AS c
-            FROM companies
-            WHERE subscription_status = 'trial'
-               OR (
-                    subscription_status = 'expired'
-                AND subscription_end_date IS NOT NULL
-                AND subscription_end_date >= DATE_SUB(CURDATE(), INTERVAL 2 MONTH)
-               )
-               OR (
-                    subscription_end_date IS NOT NULL
-                AND subscription_end_date <= DATE_ADD(CURDATE(), INTERVAL 5 DAY)
-               )
-        """)
-        data['totals']['pendingRenewals'] = cur.fetchone()['c'] or 0
-        # ---- Charts: last 6 months ----
-        try:
-            months = 6
-            # Build month labels and keys like '2025-08'
-            from datetime import date
-            today = date.today()
-            def month_add(d, delta):
-                y = d.year + ((d.month - 1 + delta) // 12)
-                m = (d.month - 1 + delta) % 12 + 1
-                return date(y, m, 1)
-            month_keys = []
-            labels = []
-            # earliest month start
-            start0 = month_add(date(today.year, today.month, 1), -(months-1))
-            for i in range(months):
-                d = month_add(start0, i)
-                month_keys.append(d.strftime('%Y-%m'))
-                labels.append(d.strftime('%b %Y'))
-
-            # Customer Growth: new companies per month
-            cur.execute(
-                """
-                SELECT DATE_FORMAT(created_at, '%Y-%m') AS ym, COUNT(*) AS c
-                FROM companies
-                WHERE created_at >= %s
-                GROUP BY ym
-                """, (start0.strftime('%Y-%m-%d'),)
-            )
-            cust_map = {row['ym']: int(row['c'] or 0) for row in cur.fetchall() if row['ym']}
-
-            # Active started this month (approx): companies with active status and subscription_start_date in that month
-            try:
-                cur.execute(
-                    """
-                    SELECT DATE_FORMAT(subscription_start_date, '%Y-%m') AS ym, COUNT(*) AS c
-                    FROM companies
-                    WHERE subscription_status = 'active'
-                      AND subscription_start_date IS NOT NULL
-                      AND subscription_start_date >= %s
-                    GROUP BY ym
-                    """, (start0.strftime('%Y-%m-%d'),)
-                )
-                active_map = {row['ym']: int(row['c'] or 0) for row in cur.fetchall() if row['ym']}
-            except Exception:
-                active_map = {}
-
-            trends = {
-                'labels': labels,
-                'customers': [cust_map.get(k, 0) for k in month_keys],
-                'active': [active_map.get(k, 0) for k in month_keys]
-            }
-
-            # Revenue: total and by plan (using payments joined to subscriptions for plan)
-            cur.execute(
-                """
-                SELECT DATE_FORMAT(COALESCE(p.payment_date, p.created_at), '%Y-%m') AS ym,
-                       COALESCE(SUM(p.amount),0) AS amt
-                FROM payments p
-                WHERE p.status = 'paid'
-                  AND COALESCE(p.payment_date, p.created_at) >= %s
-                GROUP BY ym
-                """, (start0.strftime('%Y-%m-%d'),)
-            )
-            rev_map = {row['ym']: float(row['amt'] or 0) for row in cur.fetchall() if row['ym']}
-
-            # by plan
-            by_plan = {}
-            cur.execute(
-                """
-                SELECT DATE_FORMAT(COALESCE(p.payment_date, p.created_at), '%Y-%m') AS ym,
-                       s.plan AS plan,
-                       COALESCE(SUM(p.amount),0) AS amt
-                FROM payments p
-                JOIN subscriptions s ON p.subscription_id = s.id
-                WHERE p.status = 'paid'
-                  AND COALESCE(p.payment_date, p.created_at) >= %s
-                GROUP BY ym, plan
-                """, (start0.strftime('%Y-%m-%d'),)
-            )
-            tmp = cur.fetchall()
-            plan_keys = set([r['plan'] for r in tmp if r.get('plan')])
-            for pk in plan_keys:
-                by_plan[pk] = {k: 0.0 for k in month_keys}
-            for r in tmp:
-                ym = r.get('ym'); pk = r.get('plan'); amt = float(r.get('amt') or 0)
-                if ym in month_keys and pk:
-                    if pk not in by_plan:
-                        by_plan[pk] = {k: 0.0 for k in month_keys}
-                    by_plan[pk][ym] += amt
-
-            revenue = {
-                'labels': labels,
-                'amounts': [rev_map.get(k, 0.0) for k in month_keys],
-                'byPlan': { pk: [by_plan.get(pk, {}).get(k, 0.0) for k in month_keys] for pk in sorted(by_plan.keys()) }
-            }
-
-            data['trends'] = trends
-            data['revenue'] = revenue
-            # Additional aggregates for charts
-            # Status distribution
-            cur.execute("SELECT subscription_status AS s, COUNT(*) AS c FROM companies GROUP BY subscription_status")
-            status_rows = cur.fetchall()
-            data['statusDist'] = { (r['s'] or 'unknown'): int(r['c'] or 0) for r in status_rows }
-            # Plan mix
-            cur.execute("SELECT subscription_plan AS p, COUNT(*) AS c FROM companies GROUP BY subscription_plan")
-            plan_rows = cur.fetchall()
-            data['planMix'] = { (r['p'] or 'unknown'): int(r['c'] or 0) for r in plan_rows }
-            # Renewals breakdown
-            # trial total and trial due soon
-            cur.execute("SELECT COUNT(*) AS c FROM companies WHERE subscription_status = 'trial'")
-            trial_total = int((cur.fetchone() or {}).get('c') or 0)
-            cur.execute(
-                """
-                SELECT COUNT(*) AS c FROM companies
-                WHERE subscription_status = 'trial'
-                  AND trial_end_date IS NOT NULL
-                  AND trial_end_date <= DATE_ADD(CURDATE(), INTERVAL 5 DAY)
-                """
-            )
-            trial_due = int((cur.fetchone() or {}).get('c') or 0)
-            # expired (only those expired within last 2 months)
-            cur.execute(
-                """
-                SELECT COUNT(*) AS c FROM companies
-                WHERE subscription_status = 'expired'
-                  AND subscription_end_date IS NOT NULL
-                  AND subscription_end_date >= DATE_SUB(CURDATE(), INTERVAL 2 MONTH)
-                """
-            )
-            expired_c = int((cur.fetchone() or {}).get('c') or 0)
-            # due soon (non-expired)
-            cur.execute(
-                """
-                SELECT COUNT(*) AS c FROM companies
-                WHERE subscription_status <> 'expired'
-                  AND subscription_end_date IS NOT NULL
-                  AND subscription_end_date <= DATE_ADD(CURDATE(), INTERVAL 5 DAY)
-                """
-            )
-            due_soon = int((cur.fetchone() or {}).get('c') or 0)
-            data['renewals'] = {
-                'trialTotal': trial_total,
-                'trialDueSoon': trial_due,
-                'expired': expired_c,
-                'dueSoon': due_soon
-            }
-        except Exception as e2:
-            logger.warning(f"overview charts error: {e2}")
-        cur.close(); conn.close()
+        if request.args.get('refresh') == 'true':
+            kpi_snapshot.ensure_kpi_snapshot_table(conn)
+            kpi_snapshot.refresh_snapshot(conn, kpi_snapshot.PLATFORM_KEY)
+            kpi_snapshot.refresh_snapshot(conn, kpi_snapshot.company_key(user_company))
+        data = kpi_snapshot.load_overview(conn, user_company)
+        conn.close()
     except Exception as e:
         return jsonify({'message': 'Failed', 'error': str(e)}), 500
+    kpi_snapshot.start_refresher(get_db_connection)
     return jsonify(data)
 
 @app.get('/api/admin/users')
@@ -819,7 +558,11 @@ def admin_support_update(ticket_id: int):
             params_t.append(ticket_id)
             try:
                 cur.execute(f"UPDATE tickets SET {', '.join(sets_t)} WHERE id = %s", tuple(params_t))
-                conn.commit(); updated = cur.rowcount > 0
+                updated = cur.rowcount > 0
+                if status:
+                    # openTickets on the dashboard
+                    kpi_snapshot.mark_dirty(conn)
+                conn.commit()
             except Exception:
                 updated = False
         # Fallback to contact_us (single assigned_to_user_id field) if tickets update did not apply
@@ -838,6 +581,8 @@ def admin_support_update(ticket_id: int):
                 return jsonify({'message': 'No valid fields to update'}), 400
             params_c.append(ticket_id)
             cur.execute(f"UPDATE contact_us SET {', '.join(sets_c)} WHERE id = %s", tuple(params_c))
+            if status:
+                kpi_snapshot.mark_dirty(conn)
             conn.commit()
         cur.close(); conn.close()
         return jsonify({'success': True})
@@ -1043,6 +788,7 @@ def update_system_settings():
     try:
         conn = get_db(); cur = conn.cursor()
         cur.execute(f"UPDATE system_settings SET {', '.join(sets)} ORDER BY id ASC LIMIT 1", tuple(params))
+        table_versions.bump(conn, 'system_settings')
         conn.commit(); cur.close(); conn.close(); return jsonify({'success': True})
     except Exception as e:
         return jsonify({'message':'Failed', 'error': str(e)}), 500
@@ -1111,6 +857,7 @@ def create_pricing_plan():
             """,
             (plan_name, billing_cycle, price, currency, description)
         )
+        table_versions.bump(conn, 'pricing_plans')
         conn.commit(); cur.close(); conn.close()
         return jsonify({'success': True})
     except mysql.connector.IntegrityError as ie:
@@ -1134,6 +881,7 @@ def update_pricing_plan(plan_id: int):
         conn = get_db(); ensure_pricing_cycle_enum(conn); cur = conn.cursor()
         params.append(plan_id)
         cur.execute(f"UPDATE pricing_plans SET {', '.join(fields)} WHERE id = %s", tuple(params))
+        table_versions.bump(conn, 'pricing_plans')
         conn.commit(); cur.close(); conn.close()
         return jsonify({'success': True})
     except mysql.connector.IntegrityError:
@@ -1151,6 +899,7 @@ def delete_pricing_plan(plan_id: int):
         ensure_pricing_features_table(conn)
         cur.execute("DELETE FROM pricing_plans WHERE id = %s", (plan_id,))
         deleted = cur.rowcount
+        table_versions.bump(conn, 'pricing_plans', 'pricing_plan_features')
         conn.commit(); cur.close(); conn.close()
         if deleted == 0:
             return jsonify({'message': 'Not found'}), 404
@@ -1197,6 +946,7 @@ def create_pricing_feature():
             """,
             (plan_id, feature_name, 1 if is_included else 0, display_order)
         )
+        table_versions.bump(conn, 'pricing_plan_features')
         conn.commit(); cur.close(); conn.close(); return jsonify({'success': True})
     except Exception as e:
         return jsonify({'message':'Failed', 'error': str(e)}), 500
@@ -1221,6 +971,7 @@ def update_pricing_feature(feature_id: int):
         conn = get_db(); ensure_pricing_features_table(conn); cur = conn.cursor()
         params.append(feature_id)
         cur.execute(f"UPDATE pricing_plan_features SET {', '.join(fields)} WHERE id = %s", tuple(params))
+        table_versions.bump(conn, 'pricing_plan_features')
         conn.commit(); cur.close(); conn.close(); return jsonify({'success': True})
     except Exception as e:
         return jsonify({'message':'Failed', 'error': str(e)}), 500
@@ -1232,6 +983,7 @@ def delete_pricing_feature(feature_id: int):
         conn = get_db(); ensure_pricing_features_table(conn); cur = conn.cursor()
         cur.execute("DELETE FROM pricing_plan_features WHERE id = %s", (feature_id,))
         deleted = cur.rowcount
+        table_versions.bump(conn, 'pricing_plan_features')
         conn.commit(); cur.close(); conn.close()
         if deleted == 0:
             return jsonify({'message': 'Not found'}), 404
@@ -1285,4 +1037,6 @@ def audit_logs():
         return jsonify({'message':'Failed', 'error': str(e)}), 500
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=4200, debug=True)
+    # Development server; production runs gunicorn --config gunicorn.conf.py app:app
+    app.run(host='0.0.0.0', port=int(os.getenv('ADMIN_PORT', 4200)),
+            debug=os.getenv('ADMIN_DEBUG', 'False').lower() == 'true')
@@ -0,0 +1,36 @@
+"""
+Gunicorn Configuration - Admin Portal Backend
+Production server: gunicorn --config gunicorn.conf.py app:app
+
+Every setting can be overridden from the environment (GUNICORN_WORKERS,
+GUNICORN_THREADS, ...). Send SIGHUP to the master for a graceful reload:
+workers finish in-flight requests and are replaced one by one. Because the
+app is preloaded, picking up new code needs a full restart (or USR2 + QUIT).
+"""
+
+import multiprocessing
+import os
+
+# Low-traffic, I/O-bound dashboard API: a few workers with threads is plenty
+cores = multiprocessing.cpu_count()
+
+bind = os.getenv('GUNICORN_BIND', f"0.0.0.0:{os.getenv('ADMIN_PORT', '4200')}")
+workers = int(os.getenv('GUNICORN_WORKERS', min(cores * 2 + 1, 5)))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+
+# Import the app once in the master; workers share its pages copy-on-write
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 200))
+
+# Empty GUNICORN_ACCESS_LOG turns access logging off
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-') or None
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+worker_tmp_dir = os.getenv('GUNICORN_WORKER_TMP_DIR', '/dev/shm' if os.path.isdir('/dev/shm') else None)
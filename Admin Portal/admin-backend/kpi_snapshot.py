@@ -0,0 +1,397 @@
+"""
+SaaS KPI snapshots for the admin dashboard
+The overview KPIs are computed in the background and stored in
+kpi_snapshots; /api/admin/overview reads them back in a single query
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from datetime import date, datetime
+
+logger = logging.getLogger("admin-backend")
+
+# Recompute snapshots older than this even without writes (month boundaries, expiring trials)
+REFRESH_INTERVAL = int(os.getenv('KPI_SNAPSHOT_INTERVAL', 300))
+# How often the refresher looks for snapshots marked dirty by payment/subscription writes
+POLL_INTERVAL = int(os.getenv('KPI_SNAPSHOT_POLL_SECONDS', 10))
+REFRESHER_ENABLED = os.getenv('KPI_SNAPSHOT_REFRESHER', 'true').lower() == 'true'
+
+PLATFORM_KEY = 'platform'
+REFRESH_LOCK = 'kpi_snapshot_refresh'
+
+SNAPSHOT_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS kpi_snapshots (
+        snapshot_key VARCHAR(191) PRIMARY KEY,
+        payload LONGTEXT NOT NULL,
+        computed_at DATETIME NOT NULL,
+        compute_ms INT NOT NULL DEFAULT 0,
+        dirty_since DATETIME NULL,
+        INDEX idx_computed_at (computed_at)
+    )
+"""
+
+_table_ready = False
+_refresher_pid = None
+_refresher_lock = threading.Lock()
+
+def company_key(company):
+    return f"company:{company}"
+
+def ensure_kpi_snapshot_table(conn):
+    """Create kpi_snapshots once per process (idempotent)"""
+    global _table_ready
+    if _table_ready:
+        return
+    cur = conn.cursor()
+    cur.execute(SNAPSHOT_TABLE_SQL)
+    conn.commit()
+    cur.close()
+    _table_ready = True
+
+def month_add(d, delta):
+    y = d.year + ((d.month - 1 + delta) // 12)
+    m = (d.month - 1 + delta) % 12 + 1
+    return date(y, m, 1)
+
+def compute_company_kpis(cur, company):
+    """Visit, visitor and host totals for one tenant company"""
+    totals = {}
+    cur.execute(
+        """
+        SELECT COUNT(*) AS c FROM visits v
+        JOIN users h ON v.host_id = h.id
+        WHERE h.company_name = %s
+        """, (company,)
+    )
+    totals['visits'] = cur.fetchone()['c']
+    # Unique visitors by email
+    cur.execute(
+        """
+        SELECT COUNT(DISTINCT COALESCE(v.visitor_email, vis.email)) AS c
+        FROM visits v
+        JOIN users h ON v.host_id = h.id
+        LEFT JOIN visitors vis ON v.visitor_id = vis.id
+        WHERE h.company_name = %s
+        """, (company,)
+    )
+    totals['uniqueVisitors'] = cur.fetchone()['c']
+    cur.execute("SELECT COUNT(*) AS c FROM users WHERE company_name = %s AND role='host'", (company,))
+    totals['hosts'] = cur.fetchone()['c']
+    return {'totals': totals}
+
+def compute_platform_kpis(cur):
+    """Platform-wide customer, revenue and renewal KPIs plus the six-month charts"""
+    totals = {}
+    data = {'totals': totals}
+    cur.execute("SELECT COUNT(*) AS c FROM companies")
+    totals['customers'] = cur.fetchone()['c'] or 0
+
+    # Active companies (subscription_status = 'active')
+    cur.execute("SELECT COUNT(*) AS c FROM companies WHERE subscription_status = 'active'")
+    totals['activeUsers'] = cur.fetchone()['c'] or 0
+
+    # Active Trials: companies in 'trial' and trial_end_date not passed
+    cur.execute("""
+        SELECT COUNT(*) AS c
+        FROM companies
+        WHERE subscription_status = 'trial'
+          AND (trial_end_date IS NULL OR trial_end_date >= CURDATE())
+    """)
+    totals['activeSubs'] = cur.fetchone()['c'] or 0
+
+    # Monthly Revenue: sum of paid payments in current month
+    # Use payment_date if available, else created_at
+    cur.execute("""
+        SELECT COALESCE(SUM(amount), 0) AS amt
+        FROM payments
+        WHERE status = 'paid'
+          AND DATE(COALESCE(payment_date, created_at))
+                BETWEEN DATE_FORMAT(CURDATE(), '%Y-%m-01') AND LAST_DAY(CURDATE())
+    """)
+    row = cur.fetchone()
+    totals['monthlyRevenue'] = float(row['amt'] or 0)
+
+    # Open Tickets (support tickets)
+    try:
+        cur.execute("SELECT COUNT(*) AS c FROM tickets WHERE status = 'open'")
+        totals['openTickets'] = cur.fetchone()['c'] or 0
+    except Exception:
+        # Fallback to contact_us table if tickets table not present
+        try:
+            cur.execute("SELECT COUNT(*) AS c FROM contact_us WHERE status = 'open'")
+            totals['openTickets'] = cur.fetchone()['c'] or 0
+        except Exception:
+            totals['openTickets'] = 0
+
+    # Pending Renewals:
+    # - companies on trial plan/status
+    # - OR companies whose plan is expired within last 2 months
+    # - OR companies whose subscription due date is within next 5 days
+    cur.execute("""
+        SELECT COUNT(*) AS c
+        FROM companies
+        WHERE subscription_status = 'trial'
+           OR (
+                subscription_status = 'expired'
+            AND subscription_end_date IS NOT NULL
+            AND subscription_end_date >= DATE_SUB(CURDATE(), INTERVAL 2 MONTH)
+           )
+           OR (
+                subscription_end_date IS NOT NULL
+            AND subscription_end_date <= DATE_ADD(CURDATE(), INTERVAL 5 DAY)
+           )
+    """)
+    totals['pendingRenewals'] = cur.fetchone()['c'] or 0
+
+    # ---- Charts: last 6 months ----
+    try:
+        months = 6
+        today = date.today()
+        month_keys = []
+        labels = []
+        # earliest month start
+        start0 = month_add(date(today.year, today.month, 1), -(months-1))
+        for i in range(months):
+            d = month_add(start0, i)
+            month_keys.append(d.strftime('%Y-%m'))
+            labels.append(d.strftime('%b %Y'))
+
+        # Customer Growth: new companies per month
+        cur.execute(
+            """
+            SELECT DATE_FORMAT(created_at, '%Y-%m') AS ym, COUNT(*) AS c
+            FROM companies
+            WHERE created_at >= %s
+            GROUP BY ym
+            """, (start0.strftime('%Y-%m-%d'),)
+        )
+        cust_map = {row['ym']: int(row['c'] or 0) for row in cur.fetchall() if row['ym']}
+
+        # Active started this month (approx): companies with active status and subscription_start_date in that month
+        try:
+            cur.execute(
+                """
+                SELECT DATE_FORMAT(subscription_start_date, '%Y-%m') AS ym, COUNT(*) AS c
+                FROM companies
+                WHERE subscription_status = 'active'
+                  AND subscription_start_date IS NOT NULL
+                  AND subscription_start_date >= %s
+                GROUP BY ym
+                """, (start0.strftime('%Y-%m-%d'),)
+            )
+            active_map = {row['ym']: int(row['c'] or 0) for row in cur.fetchall() if row['ym']}
+        except Exception:
+            active_map = {}
+
+        data['trends'] = {
+            'labels': labels,
+            'customers': [cust_map.get(k, 0) for k in month_keys],
+            'active': [active_map.get(k, 0) for k in month_keys]
+        }
+
+        # Revenue: total and by plan in one pass (payments left-joined to subscriptions for plan)
+        cur.execute(
+            """
+            SELECT DATE_FORMAT(COALESCE(p.payment_date, p.created_at), '%Y-%m') AS ym,
+                   s.plan AS plan,
+                   COALESCE(SUM(p.amount),0) AS amt
+            FROM payments p
+            LEFT JOIN subscriptions s ON p.subscription_id = s.id
+            WHERE p.status = 'paid'
+              AND COALESCE(p.payment_date, p.created_at) >= %s
+            GROUP BY ym, plan
+            """, (start0.strftime('%Y-%m-%d'),)
+        )
+        rev_map = {}
+        by_plan = {}
+        for r in cur.fetchall():
+            ym = r.get('ym'); pk = r.get('plan'); amt = float(r.get('amt') or 0)
+            if not ym:
+                continue
+            rev_map[ym] = rev_map.get(ym, 0.0) + amt
+            if ym in month_keys and pk:
+                if pk not in by_plan:
+                    by_plan[pk] = {k: 0.0 for k in month_keys}
+                by_plan[pk][ym] += amt
+
+        data['revenue'] = {
+            'labels': labels,
+            'amounts': [rev_map.get(k, 0.0) for k in month_keys],
+            'byPlan': { pk: [by_plan[pk][k] for k in month_keys] for pk in sorted(by_plan.keys()) }
+        }
+
+        # Status distribution
+        cur.execute("SELECT subscription_status AS s, COUNT(*) AS c FROM companies GROUP BY subscription_status")
+        data['statusDist'] = { (r['s'] or 'unknown'): int(r['c'] or 0) for r in cur.fetchall() }
+        # Plan mix
+        cur.execute("SELECT subscription_plan AS p, COUNT(*) AS c FROM companies GROUP BY subscription_plan")
+        data['planMix'] = { (r['p'] or 'unknown'): int(r['c'] or 0) for r in cur.fetchall() }
+
+        # Renewals breakdown in one scan: trial total, trial due soon,
+        # expired within last 2 months, due soon (non-expired)
+        cur.execute(
+            """
+            SELECT
+              SUM(subscription_status = 'trial') AS trial_total,
+              SUM(subscription_status = 'trial'
+                  AND trial_end_date IS NOT NULL
+                  AND trial_end_date <= DATE_ADD(CURDATE(), INTERVAL 5 DAY)) AS trial_due,
+              SUM(subscription_status = 'expired'
+                  AND subscription_end_date IS NOT NULL
+                  AND subscription_end_date >= DATE_SUB(CURDATE(), INTERVAL 2 MONTH)) AS expired_c,
+              SUM(subscription_status <> 'expired'
+                  AND subscription_end_date IS NOT NULL
+                  AND subscription_end_date <= DATE_ADD(CURDATE(), INTERVAL 5 DAY)) AS due_soon
+            FROM companies
+            """
+        )
+        row = cur.fetchone() or {}
+        data['renewals'] = {
+            'trialTotal': int(row.get('trial_total') or 0),
+            'trialDueSoon': int(row.get('trial_due') or 0),
+            'expired': int(row.get('expired_c') or 0),
+            'dueSoon': int(row.get('due_soon') or 0)
+        }
+    except Exception as e2:
+        logger.warning(f"overview charts error: {e2}")
+    return data
+
+def compute_snapshot(cur, key):
+    if key == PLATFORM_KEY:
+        return compute_platform_kpis(cur)
+    return compute_company_kpis(cur, key[len('company:'):])
+
+def refresh_snapshot(conn, key):
+    """Recompute one snapshot and store it; returns the payload"""
+    cur = conn.cursor(dictionary=True)
+    try:
+        cur.execute("SELECT NOW() AS started_at")
+        started_at = cur.fetchone()['started_at']
+        started = time.perf_counter()
+        payload = compute_snapshot(cur, key)
+        compute_ms = int((time.perf_counter() - started) * 1000)
+        # A write that marked the snapshot dirty while we were computing keeps it dirty
+        cur.execute(
+            """
+            INSERT INTO kpi_snapshots (snapshot_key, payload, computed_at, compute_ms, dirty_since)
+            VALUES (%s, %s, NOW(), %s, NULL)
+            ON DUPLICATE KEY UPDATE
+              payload = VALUES(payload),
+              computed_at = VALUES(computed_at),
+              compute_ms = VALUES(compute_ms),
+              dirty_since = IF(dirty_since >= %s, dirty_since, NULL)
+            """, (key, json.dumps(payload), compute_ms, started_at)
+        )
+        conn.commit()
+        logger.info(f"📊 KPI snapshot '{key}' refreshed in {compute_ms} ms")
+        return payload
+    finally:
+        cur.close()
+
+def refresh_due_snapshots(conn):
+    """Refresh snapshots that are dirty or older than REFRESH_INTERVAL; one worker at a time"""
+    ensure_kpi_snapshot_table(conn)
+    cur = conn.cursor(dictionary=True)
+    cur.execute("SELECT GET_LOCK(%s, 0) AS acquired", (REFRESH_LOCK,))
+    if not cur.fetchone()['acquired']:
+        cur.close()
+        return []
+    try:
+        cur.execute(
+            """
+            SELECT snapshot_key FROM kpi_snapshots
+            WHERE dirty_since IS NOT NULL OR computed_at < NOW() - INTERVAL %s SECOND
+            """, (REFRESH_INTERVAL,)
+        )
+        keys = [row['snapshot_key'] for row in cur.fetchall()]
+        cur.execute("SELECT 1 FROM kpi_snapshots WHERE snapshot_key = %s", (PLATFORM_KEY,))
+        if cur.fetchone() is None:
+            keys.append(PLATFORM_KEY)
+        for key in keys:
+            refresh_snapshot(conn, key)
+        return keys
+    finally:
+        cur.execute("SELECT RELEASE_LOCK(%s) AS released", (REFRESH_LOCK,))
+        cur.fetchone()
+        cur.close()
+
+def mark_dirty(conn, key=PLATFORM_KEY):
+    """Flag a snapshot for recomputation after a write that changes its KPIs (commit is the caller's)"""
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            "UPDATE kpi_snapshots SET dirty_since = COALESCE(dirty_since, NOW()) WHERE snapshot_key = %s", (key,)
+        )
+        cur.close()
+    except Exception as e:
+        # Missing table on older schemas: the next refresh creates it
+        logger.debug(f"mark_dirty({key}) skipped: {e}")
+
+def load_overview(conn, company):
+    """Dashboard payload for `company` from the stored snapshots, with freshness info"""
+    ensure_kpi_snapshot_table(conn)
+    keys = [PLATFORM_KEY, company_key(company)]
+    cur = conn.cursor(dictionary=True)
+    cur.execute(
+        """
+        SELECT snapshot_key, payload, computed_at, dirty_since,
+               TIMESTAMPDIFF(SECOND, computed_at, NOW()) AS age_seconds
+        FROM kpi_snapshots WHERE snapshot_key IN (%s, %s)
+        """, tuple(keys)
+    )
+    rows = {row['snapshot_key']: row for row in cur.fetchall()}
+    cur.close()
+
+    parts = {}
+    for key in keys:
+        if key in rows:
+            parts[key] = json.loads(rows[key]['payload'])
+        else:
+            # First load for this snapshot: compute it now, the refresher keeps it current
+            parts[key] = refresh_snapshot(conn, key)
+
+    platform, tenant = parts[PLATFORM_KEY], parts[company_key(company)]
+    data = {'company': company, 'totals': {**tenant['totals'], **platform['totals']}}
+    data.update({k: v for k, v in platform.items() if k != 'totals'})
+
+    row = rows.get(PLATFORM_KEY)
+    if row is None:
+        data['snapshot'] = {'computedAt': datetime.now().isoformat(), 'ageSeconds': 0, 'stale': False}
+    else:
+        age = int(row['age_seconds'] or 0)
+        data['snapshot'] = {
+            'computedAt': row['computed_at'].isoformat(),
+            'ageSeconds': age,
+            'stale': row['dirty_since'] is not None or age > REFRESH_INTERVAL,
+        }
+    return data
+
+def _refresh_loop(connect):
+    while True:
+        time.sleep(POLL_INTERVAL)
+        conn = None
+        try:
+            conn = connect()
+            refresh_due_snapshots(conn)
+        except Exception as e:
+            logger.warning(f"⚠️ KPI snapshot refresh failed: {e}")
+        finally:
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+
+def start_refresher(connect):
+    """Start the background refresher once per process (gunicorn workers fork after import)"""
+    global _refresher_pid
+    if not REFRESHER_ENABLED:
+        return
+    with _refresher_lock:
+        if _refresher_pid == os.getpid():
+            return
+        _refresher_pid = os.getpid()
+    threading.Thread(target=_refresh_loop, args=(connect,), name='kpi-snapshot-refresher', daemon=True).start()
@@ -0,0 +1,27 @@
+"""
+Table Version Counters
+Writes to tables behind the main backend's cached GET endpoints (pricing,
+system settings) bump table_versions so those endpoints' ETags change
+"""
+
+import logging
+
+logger = logging.getLogger("admin-backend")
+
+def bump(conn, *tables):
+    """Advance the version of `tables` (commit is the caller's); never fails the write"""
+    try:
+        cur = conn.cursor()
+        for table in tables:
+            cur.execute(
+                """
+                INSERT INTO table_versions (table_name, version, updated_at)
+                VALUES (%s, 1, UTC_TIMESTAMP())
+                ON DUPLICATE KEY UPDATE version = version + 1, updated_at = UTC_TIMESTAMP()
+                """,
+                (table,)
+            )
+        cur.close()
+    except Exception as e:
+        # Created by the main backend on its first conditional GET
+        logger.debug(f"table_versions bump {tables} skipped: {e}")
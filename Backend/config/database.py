@@ -6,7 +6,9 @@ Extracted from monolithic app.py for better organization
 import mysql.connector
 from mysql.connector import pooling
 import os
+import time
 import logging
+import threading
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -24,35 +26,145 @@ DB_CONFIG = {
     'pool_name': 'mypool',
     'pool_size': 10,
     'pool_reset_session': True,
-    'autocommit': True
+    'autocommit': True,
+    # Fail over to the next host quickly instead of waiting on a dead one
+    'connection_timeout': int(os.getenv('DB_CONNECT_TIMEOUT', 3))
 }
 
-# Global connection pool
+# Hosts tried after DB_HOST: local/production deployments, then Docker service names
+DB_FALLBACK_HOSTS = ['localhost', '127.0.0.1', 'mysql', 'database']
+
+POOL_ONLY_KEYS = ('pool_name', 'pool_size', 'pool_reset_session')
+
+class PoolMetrics:
+    """Counters for pool checkouts, overflow and connection failures"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.checkouts = 0
+        self.overflow_connections = 0
+        self.failures = 0
+        self.pool_rebuilds = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+
+    def record_checkout(self, wait_ms, overflow=False):
+        with self._lock:
+            self.checkouts += 1
+            self.overflow_connections += int(overflow)
+            self.wait_ms_total += wait_ms
+            self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+
+    def record_rebuild(self):
+        with self._lock:
+            self.pool_rebuilds += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'checkouts': self.checkouts,
+                'overflow_connections': self.overflow_connections,
+                'failures': self.failures,
+                'pool_rebuilds': self.pool_rebuilds,
+                'avg_wait_ms': round(self.wait_ms_total / self.checkouts, 2) if self.checkouts else 0.0,
+                'max_wait_ms': round(self.wait_ms_max, 2),
+            }
+
+# Global connection pool, created on first use rather than at import time
 connection_pool = None
+_active_config = None
+_pool_lock = threading.Lock()
+metrics = PoolMetrics()
 
-def initialize_db_pool():
+def direct_config(config):
+    """Connection arguments for a plain (non-pooled) connection"""
+    return {k: v for k, v in config.items() if k not in POOL_ONLY_KEYS}
+
+def fallback_configs():
+    """DB_CONFIG followed by the same settings for each fallback host"""
+    hosts = [DB_CONFIG['host']] + [host for host in DB_FALLBACK_HOSTS if host != DB_CONFIG['host']]
+    return [{**DB_CONFIG, 'host': host} for host in hosts]
+
+def initialize_db_pool(config=None):
     """Initialize database connection pool"""
-    global connection_pool
+    global connection_pool, _active_config
+    config = config or DB_CONFIG
     try:
-        connection_pool = mysql.connector.pooling.MySQLConnectionPool(**DB_CONFIG)
-        logger.info("✅ Database connection pool created successfully")
+        connection_pool = mysql.connector.pooling.MySQLConnectionPool(**config)
+        _active_config = config
+        logger.info(f"✅ Database connection pool created successfully with host: {config['host']}")
         return True
     except mysql.connector.Error as err:
         logger.error(f"❌ Database connection failed: {err}")
         return False
 
+def _initialize_with_fallback():
+    """Create the pool against the remembered host, else the first that accepts connections"""
+    with _pool_lock:
+        if connection_pool is not None:
+            return connection_pool
+        candidates = fallback_configs()
+        if _active_config is not None:
+            candidates = [_active_config] + [c for c in candidates if c['host'] != _active_config['host']]
+        for config in candidates:
+            if initialize_db_pool(config):
+                return connection_pool
+        logger.error("❌ All database connection attempts failed")
+        return None
+
+def reset_pool(pool=None):
+    """Drop the pool (only if it is still `pool`) so the next checkout re-runs host discovery"""
+    global connection_pool
+    with _pool_lock:
+        if connection_pool is not None and pool in (None, connection_pool):
+            metrics.record_rebuild()
+            connection_pool = None
+
 def get_db_connection():
     """Get database connection from pool"""
-    global connection_pool
-    if connection_pool is None:
-        if not initialize_db_pool():
-            raise Exception("Database connection pool not initialized")
-    
+    started = time.perf_counter()
+    pool = connection_pool or _initialize_with_fallback()
+    if pool is None:
+        metrics.record_failure()
+        raise mysql.connector.Error("All database connection attempts failed")
+
     try:
-        return connection_pool.get_connection()
+        conn = pool.get_connection()
+        overflow = False
+    except mysql.connector.errors.PoolError as err:
+        # Pool exhausted: serve this request with a direct connection to the same host
+        logger.warning(f"⚠️ Connection pool exhausted, opening direct connection: {err}")
+        conn = mysql.connector.connect(**direct_config(_active_config or DB_CONFIG))
+        overflow = True
     except mysql.connector.Error as err:
+        # The remembered host went away; rediscover on the next request
         logger.error(f"Error getting database connection: {err}")
+        metrics.record_failure()
+        reset_pool(pool)
         raise
+    metrics.record_checkout((time.perf_counter() - started) * 1000, overflow)
+    return conn
+
+def pool_stats():
+    """Pool configuration and counters for health checks"""
+    pool = connection_pool
+    config = _active_config or DB_CONFIG
+    stats = {
+        'initialized': pool is not None,
+        'host': config['host'],
+        'pool_size': config['pool_size'],
+        'connect_timeout_s': config['connection_timeout'],
+        'available': pool._cnx_queue.qsize() if pool is not None else None,
+    }
+    stats.update(metrics.snapshot())
+    return stats
 
 def test_db_connection():
     """Test database connection for health checks"""
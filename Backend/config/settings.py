@@ -9,6 +9,20 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+def expand_origins(origins):
+    """Strip the configured origins and add an https variant for each http one"""
+    expanded = []
+    for origin in (origin.strip() for origin in origins.split(',')):
+        if not origin:
+            continue
+        if origin not in expanded:
+            expanded.append(origin)
+        if origin.startswith('http://'):
+            https_version = origin.replace('http://', 'https://', 1)
+            if https_version not in expanded:
+                expanded.append(https_version)
+    return expanded
+
 class Config:
     """Base configuration class"""
     SECRET_KEY = os.getenv('JWT_SECRET', 'your-super-secret-jwt-key-change-this-in-production')
@@ -16,9 +30,10 @@ class Config:
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     
     # CORS settings
-    CORS_ORIGINS = os.environ.get('ALLOWED_ORIGINS', 'http://localhost:3000,http://visitors.pranathiss.com:3000').split(',')
+    CORS_ORIGINS = expand_origins(os.environ.get('ALLOWED_ORIGINS', 'https://visitors.pranathiss.com:3000,http://localhost:3000'))
     CORS_METHODS = ['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS']
-    CORS_ALLOW_HEADERS = ['Content-Type', 'Authorization']
+    CORS_ALLOW_HEADERS = ['Content-Type', 'Authorization', 'X-Requested-With', 'X-API-Key']
+    CORS_EXPOSE_HEADERS = ['Content-Type', 'Authorization', 'ETag', 'Last-Modified', 'Retry-After']
     CORS_SUPPORTS_CREDENTIALS = True
     
     # JWT settings
@@ -31,6 +46,47 @@ class Config:
     EMAIL_ADDRESS = os.getenv('EMAIL_ADDRESS')
     EMAIL_PASSWORD = os.getenv('EMAIL_PASSWORD')
     
+    # Report exports: EXPORT_WORKER_PROCESS runs PDF/Excel generation in a
+    # separate process so web workers never import openpyxl or WeasyPrint
+    EXPORT_WORKER_PROCESS = os.getenv('EXPORT_WORKER_PROCESS', 'false').lower() == 'true'
+    EXPORT_WORKERS = int(os.getenv('EXPORT_WORKERS', '1'))
+    EXPORT_TIMEOUT_SECONDS = int(os.getenv('EXPORT_TIMEOUT_SECONDS', '120'))
+    
+    # HTTP caching: mixed into every ETag; set per release so clients drop
+    # validators for responses whose shape changed
+    ETAG_SALT = os.getenv('ETAG_SALT', '')
+    
+    # Response compression (src/utils/compression.py): br when the brotli
+    # package is installed, else gzip; bodies under COMPRESS_MIN_SIZE bytes are sent as-is
+    COMPRESS_ENABLED = os.getenv('COMPRESS_ENABLED', 'true').lower() == 'true'
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', '1024'))
+    COMPRESS_GZIP_LEVEL = int(os.getenv('COMPRESS_GZIP_LEVEL', '6'))
+    COMPRESS_BR_LEVEL = int(os.getenv('COMPRESS_BR_LEVEL', '4'))
+    
+    # Bulk pre-registration/check-in imports: rows per request and per transaction
+    BULK_IMPORT_MAX_ROWS = int(os.getenv('BULK_IMPORT_MAX_ROWS', '2000'))
+    BULK_IMPORT_CHUNK_SIZE = int(os.getenv('BULK_IMPORT_CHUNK_SIZE', '200'))
+    
+    # Recurring pre-registrations are expanded into dated occurrences by a
+    # background thread per worker (src/utils/recurrence.py; window and interval
+    # via RECURRENCE_HORIZON_DAYS / RECURRENCE_INTERVAL_SECONDS)
+    RECURRENCE_SCHEDULER = os.getenv('RECURRENCE_SCHEDULER', 'true').lower() == 'true'
+    
+    # Rate limiting (src/utils/rate_limit.py): token buckets as (requests per
+    # minute, burst) per company/API key (login: per client address). Shared by
+    # all workers when RATE_LIMIT_STORAGE_URL names a Redis server, else per process.
+    # RATE_LIMIT_API_KEYS lists the SHA-256 hex digests of issued API keys;
+    # only those get a bucket of their own. Bulk check-in and pre-registration
+    # imports take one check_in token per valid row, so the burst also caps
+    # how many rows one import may write
+    RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+    RATE_LIMIT_STORAGE_URL = os.getenv('RATE_LIMIT_STORAGE_URL', '')
+    RATE_LIMIT_API_KEYS = {h.strip().lower() for h in os.getenv('RATE_LIMIT_API_KEYS', '').split(',') if h.strip()}
+    RATE_LIMITS = {
+        'check_in': (int(os.getenv('RATE_LIMIT_CHECK_IN_PER_MINUTE', '120')), int(os.getenv('RATE_LIMIT_CHECK_IN_BURST', '30'))),
+        'login': (int(os.getenv('RATE_LIMIT_LOGIN_PER_MINUTE', '10')), int(os.getenv('RATE_LIMIT_LOGIN_BURST', '10'))),
+    }
+    
     # File upload settings
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'pdf'}
     
@@ -54,6 +110,7 @@ class TestingConfig(Config):
     """Testing configuration"""
     TESTING = True
     DEBUG = True
+    RATE_LIMIT_ENABLED = False
     
 # Configuration dictionary
 config = {
@@ -17,17 +17,21 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+from src import create_app
+
+# WSGI entry point (gunicorn run:app). Built by the application factory, which
+# defers database connections and report exporters until they are first used.
+app = create_app()
+
 def main():
-    """Main application entry point"""
+    """Development server entry point; production runs gunicorn --config gunicorn.conf.py run:app"""
     try:
-        # Import the working Flask application
-        from app import app
-        logger.info("✅ Successfully imported Flask application")
+        logger.info("✅ Successfully created Flask application")
         
         # Get configuration from environment variables
         host = os.getenv('FLASK_HOST', '0.0.0.0')
         port = int(os.getenv('FLASK_PORT', 4000))  # Backend runs on port 4000
-        debug = os.getenv('FLASK_DEBUG', 'True').lower() == 'true'
+        debug = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
         
         # Display startup information
         print("=" * 60)
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Visitor Search Builder
+Creates the visitor_search table and the n-gram FULLTEXT indexes on visits
+used by the visit list filters, then fills visitor_search from visit history:
+one row per (company, visitor) with its visit count and latest visit. Rows
+are written with absolute counts, so the script can be re-run at any time.
+Building the visits indexes rebuilds the table; run it off-peak.
+
+Usage (from the Backend directory):
+    python scripts/build_visitor_search.py [--skip-indexes] [--batch-size 1000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.database import get_db_connection
+from src.utils import visitor_search
+
+# Unlike check-ins, a rebuild sets the counts rather than adding to them
+BACKFILL_SQL = visitor_search.UPSERT_SQL.replace(
+    'visit_count = visit_count + VALUES(visit_count)', 'visit_count = VALUES(visit_count)'
+)
+
+HISTORY_SQL = """
+    SELECT u.company_name, v.visitor_id, v.visitor_name, v.visitor_email, v.visitor_phone,
+           v.visitor_company, v.check_in_time
+    FROM visits v
+    JOIN users u ON u.id = v.host_id
+    WHERE u.company_name IS NOT NULL
+    ORDER BY v.id
+"""
+
+def create_indexes(conn):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SET SESSION innodb_ft_enable_stopword = OFF")
+        for index, column in visitor_search.VISIT_NGRAM_INDEXES.items():
+            cursor.execute("SHOW INDEX FROM visits WHERE Key_name = %s", (index,))
+            if cursor.fetchall():
+                print(f"{index}: present")
+                continue
+            started = time.perf_counter()
+            cursor.execute(f"ALTER TABLE visits ADD FULLTEXT INDEX {index} ({column}) WITH PARSER ngram")
+            print(f"{index}: created in {time.perf_counter() - started:.1f}s")
+    finally:
+        cursor.close()
+
+def collect_visitors(conn):
+    """(company, visitor_key) -> latest details, visit count and last visit, streamed from visits"""
+    visitors = {}
+    cursor = conn.cursor(buffered=False)
+    try:
+        cursor.execute(HISTORY_SQL)
+        for company_name, visitor_id, name, email, phone, company, check_in_time in cursor:
+            row = visitor_search.search_row(company_name, visitor_id, name, email, phone, company, check_in_time)
+            key = row[:2]
+            previous = visitors.get(key)
+            if previous is None:
+                visitors[key] = row
+                continue
+            # Rows arrive oldest first: newer details win, empty ones keep the older value
+            merged = [new if new is not None else old for old, new in zip(previous, row)]
+            merged[8] = previous[8] + 1
+            merged[9] = max(filter(None, (previous[9], row[9])), default=None)
+            visitors[key] = tuple(merged)
+    finally:
+        cursor.close()
+    return visitors
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--skip-indexes', action='store_true', help='Do not create the n-gram indexes on visits')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Rows per upsert batch')
+    args = parser.parse_args()
+
+    conn = get_db_connection()
+    try:
+        visitor_search.ensure_search_table(conn)
+        if not args.skip_indexes:
+            create_indexes(conn)
+
+        started = time.perf_counter()
+        visitors = list(collect_visitors(conn).values())
+        print(f"Collected {len(visitors)} visitors in {time.perf_counter() - started:.1f}s")
+
+        cursor = conn.cursor()
+        try:
+            for i in range(0, len(visitors), args.batch_size):
+                cursor.executemany(BACKFILL_SQL, visitors[i:i + args.batch_size])
+                conn.commit()
+        finally:
+            cursor.close()
+        print(f"visitor_search filled in {time.perf_counter() - started:.1f}s")
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Response Compression Benchmark
+Compares identity, gzip and brotli (when installed) on representative payloads:
+a visit/pre-registration list as JSON and the comprehensive HTML report. For
+each it reports the encoded size, compression time and the estimated time to
+deliver the body (compression + transfer) at a few link speeds.
+
+Usage (from the Backend directory):
+    python scripts/compression_benchmark.py [--rows 2000] [--runs 7] [--json results.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from src.utils import compression
+from src.utils.compression import compress_bytes
+from src.utils.json_provider import FastJSONProvider
+from src.exports.html_report import generate_comprehensive_html_report
+from scripts.serialization_benchmark import sample_rows
+
+# Link speeds in megabits per second
+LINKS = {'3g (2 Mbps)': 2, 'dsl (10 Mbps)': 10, 'lan (100 Mbps)': 100}
+
+def json_payload(rows):
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    with app.app_context():
+        return app.json.response(sample_rows(rows)).get_data()
+
+def html_payload(rows):
+    """Report HTML for `rows` recent visits"""
+    start = date(2024, 5, 1)
+    report_data = {
+        'overview': {'total_visits': rows, 'unique_visitors': rows // 2, 'active_visits': 12, 'avg_duration_minutes': 47.5},
+        'recent_activity': [{
+            'visitor_name': f'Visitor {i}',
+            'visitor_email': f'visitor{i}@example.com',
+            'visitor_company': 'Acme Industries',
+            'host_name': f'Host {i % 25}',
+            'check_in_time': f'2024-05-01T09:{i % 60:02d}:00',
+            'purpose': 'Quarterly review meeting',
+            'status': 'Completed',
+        } for i in range(rows)],
+        'purpose_analysis': [{'purpose': f'Purpose {i}', 'visit_count': 40 - i, 'unique_visitors': 20 - i} for i in range(10)],
+        'daily_analysis': [{
+            'visit_date': (start + timedelta(days=i)).isoformat(), 'daily_visits': 60 + i,
+            'unique_daily_visitors': 40 + i, 'morning_visits': 30, 'afternoon_visits': 20, 'evening_visits': 10 + i,
+        } for i in range(30)],
+        'host_performance': [{'host_name': f'Host {i}', 'total_visits': 80 - i, 'unique_visitors': 50 - i,
+                              'avg_visit_duration': 45.0} for i in range(25)],
+    }
+    user = {'company_name': 'Pranathi Software Services', 'name': 'Admin'}
+    return generate_comprehensive_html_report(report_data, '2024-05-01', '2024-05-31', user).encode('utf-8')
+
+def time_encoding(data, encoding, runs):
+    """Median compression seconds and encoded size"""
+    if encoding == 'identity':
+        return 0.0, len(data)
+    timings = []
+    size = 0
+    for _ in range(runs):
+        started = time.perf_counter()
+        size = len(compress_bytes(data, encoding))
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), size
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=2000, help='Rows per payload')
+    parser.add_argument('--runs', type=int, default=7, help='Timed runs per encoding (median reported)')
+    parser.add_argument('--json', help='Also write results to this JSON file')
+    args = parser.parse_args()
+
+    encodings = ['identity', 'gzip']
+    if compression.brotli is not None:
+        encodings.append('br')
+    else:
+        print("⚠️ brotli is not installed; only gzip is measured")
+
+    payloads = [('visits JSON', json_payload(args.rows)), ('HTML report', html_payload(args.rows))]
+    results = []
+    for name, data in payloads:
+        for encoding in encodings:
+            seconds, size = time_encoding(data, encoding, args.runs)
+            delivery = {link: seconds * 1000 + size * 8 / (mbps * 1000) for link, mbps in LINKS.items()}
+            results.append({'payload': name, 'encoding': encoding, 'bytes': size,
+                            'ratio': len(data) / size, 'compress_ms': seconds * 1000, 'delivery_ms': delivery})
+
+    print(f"\n{args.rows} rows, median of {args.runs} runs; delivery = compression + transfer")
+    header = f"{'payload':<12} {'encoding':<9} {'size (KB)':>10} {'ratio':>6} {'cpu (ms)':>9}"
+    print(header + ''.join(f" {link:>15}" for link in LINKS))
+    for r in results:
+        line = f"{r['payload']:<12} {r['encoding']:<9} {r['bytes'] / 1024:>10.1f} {r['ratio']:>5.1f}x {r['compress_ms']:>9.2f}"
+        print(line + ''.join(f" {r['delivery_ms'][link]:>12.1f} ms" for link in LINKS))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'rows': args.rows, 'runs': args.runs, 'results': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Duplicate Visitor Merge
+Check-ins used to insert a new visitors row (photo and ID image included) on
+every visit. This folds those rows into one per person and company, using the
+matching rules of src/utils/visitor_identity.py:
+
+1. Each visit gets a copy of the photo, ID card and address of the row it
+   was checked in with, so it keeps its own evidence.
+2. Rows get the company of the hosts whose visits point at them; a row
+   visited at several companies is copied once per extra company and those
+   visits are repointed to the copy.
+3. Within each company the newest row of a group is kept, empty fields on it
+   are filled from the older rows, a blacklisting on any of them carries
+   over, and visits (and visitor_search) are repointed. The older rows are
+   kept, images included, with merged_into set and no identity keys.
+
+It then fills the normalized identity columns and makes
+(company_name, email_normalized) unique, which check-ins rely on from then on.
+
+Work is done in batches, each in its own transaction, so the script can be
+stopped and re-run. Take a backup first.
+
+Usage (from the Backend directory):
+    python scripts/merge_duplicate_visitors.py [--dry-run] [--batch-size 1000]
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.database import get_db_connection
+from src.utils import visitor_identity
+from src.utils.visitor_identity import DETAIL_COLUMNS, SNAPSHOT_COLUMNS, group_duplicates, identity_keys
+
+MAP_TABLE_SQL = """
+    CREATE TEMPORARY TABLE IF NOT EXISTS visitor_merge_map (
+        old_id INT PRIMARY KEY,
+        new_id INT NOT NULL,
+        batch INT NOT NULL,
+        INDEX idx_batch (batch)
+    )
+"""
+
+# Only rows without a company predate per-company identity, so a re-run
+# never overwrites what a later check-in captured
+SNAPSHOT_SQL = f"""
+    UPDATE visits v JOIN visitors vis ON vis.id = v.visitor_id
+    SET {', '.join(f"v.{column} = vis.{detail}" for column, (detail, _) in SNAPSHOT_COLUMNS.items())}
+    WHERE vis.company_name IS NULL AND v.id BETWEEN %s AND %s
+"""
+
+TENANTS_SQL = """
+    SELECT DISTINCT v.visitor_id, u.company_name
+    FROM visits v JOIN users u ON u.id = v.host_id
+    WHERE v.visitor_id IS NOT NULL AND u.company_name IS NOT NULL
+"""
+
+_COPIED_COLUMNS = DETAIL_COLUMNS + ['email', 'is_blacklisted', 'reason_for_blacklist']
+
+COPY_SQL = f"""
+    INSERT INTO visitors (company_name, {', '.join(_COPIED_COLUMNS)})
+    SELECT %s, {', '.join(_COPIED_COLUMNS)} FROM visitors WHERE id = %s
+"""
+
+MOVE_VISITS_SQL = """
+    UPDATE visits v JOIN users u ON u.id = v.host_id
+    SET v.visitor_id = %s
+    WHERE v.visitor_id = %s AND u.company_name = %s
+"""
+
+# A survivor with several duplicates takes each empty field from one of them
+FILL_SQL = f"""
+    UPDATE visitors s
+    JOIN visitor_merge_map m ON m.new_id = s.id
+    JOIN visitors d ON d.id = m.old_id
+    SET {', '.join(f"s.{c} = COALESCE(NULLIF(s.{c}, ''), d.{c})" for c in DETAIL_COLUMNS + ['email'])}
+    WHERE m.batch = %s
+"""
+
+REPOINT_SQL = """
+    UPDATE {table} t JOIN visitor_merge_map m ON t.visitor_id = m.old_id
+    SET t.visitor_id = m.new_id
+    WHERE m.batch = %s
+"""
+
+# Duplicates stay, images and all, but no longer match a check-in
+RETIRE_SQL = """
+    UPDATE visitors d JOIN visitor_merge_map m ON d.id = m.old_id
+    SET d.merged_into = m.new_id, d.email_normalized = NULL, d.phone_normalized = NULL,
+        d.id_number_normalized = NULL
+    WHERE m.batch = %s
+"""
+
+def column_exists(conn, table, column):
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"SHOW COLUMNS FROM {table} LIKE %s", (column,))
+        return cursor.fetchone() is not None
+    finally:
+        cursor.close()
+
+def table_exists(conn, table):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SHOW TABLES LIKE %s", (table,))
+        return cursor.fetchone() is not None
+    finally:
+        cursor.close()
+
+def read_visitors(conn):
+    """(id, company_name, email, phone, idCardNumber, is_blacklisted, reason_for_blacklist) for every
+    visitor not yet merged, oldest first; company_name is None before the column exists"""
+    scoped = column_exists(conn, 'visitors', 'company_name')
+    cursor = conn.cursor(buffered=False)
+    try:
+        cursor.execute(f"""
+            SELECT id, {'company_name' if scoped else 'NULL'}, email, phone, idCardNumber,
+                   is_blacklisted, reason_for_blacklist
+            FROM visitors {'WHERE merged_into IS NULL' if scoped else ''} ORDER BY id
+        """)
+        return list(cursor)
+    finally:
+        cursor.close()
+
+def read_tenants(conn):
+    """visitor id -> companies whose hosts' visits point at it"""
+    tenants = defaultdict(set)
+    cursor = conn.cursor(buffered=False)
+    try:
+        cursor.execute(TENANTS_SQL)
+        for visitor_id, company_name in cursor:
+            tenants[visitor_id].add(company_name)
+    finally:
+        cursor.close()
+    return tenants
+
+def plan_companies(visitors, tenants):
+    """([(company, id)] to assign, [(id, company)] to copy) for rows without a company
+
+    A row keeps the first of its companies by name and is copied for the
+    others; rows no visit points at are left alone.
+    """
+    assign, copies = [], []
+    for row in visitors:
+        visitor_id, company_name = row[0], row[1]
+        companies = sorted(tenants.get(visitor_id, ()))
+        if company_name is None and companies:
+            assign.append((companies[0], visitor_id))
+            copies.extend((visitor_id, other) for other in companies[1:])
+    return assign, copies
+
+def group_by_company(visitors):
+    """{company: {newest id: [older ids]}} from (id, company_name, email, phone, id_number, ...) rows"""
+    records = defaultdict(list)
+    for row in visitors:
+        if row[1] is not None:
+            records[row[1]].append((row[0],) + tuple(row[2:5]))
+    groups = {}
+    for company_name, company_records in records.items():
+        company_groups = group_duplicates(company_records)
+        if company_groups:
+            groups[company_name] = company_groups
+    return groups
+
+def snapshot_visits(conn, batch_size):
+    """Copy each visit's photo, ID card and address from the row it was checked in with"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT MIN(id), MAX(id) FROM visits")
+        first, last = cursor.fetchone()
+        if first is None:
+            return
+        for start in range(first, last + 1, batch_size):
+            cursor.execute(SNAPSHOT_SQL, (start, start + batch_size - 1))
+            conn.commit()
+    finally:
+        cursor.close()
+
+def assign_companies(conn, assign, copies, batch_size):
+    """Give rows their company, copying rows shared by several companies"""
+    repoint_search = table_exists(conn, 'visitor_search')
+    cursor = conn.cursor()
+    try:
+        for i in range(0, len(assign), batch_size):
+            cursor.executemany("UPDATE visitors SET company_name = %s WHERE id = %s", assign[i:i + batch_size])
+            conn.commit()
+        for visitor_id, company_name in copies:
+            conn.start_transaction()
+            cursor.execute(COPY_SQL, (company_name, visitor_id))
+            copy_id = cursor.lastrowid
+            cursor.execute(MOVE_VISITS_SQL, (copy_id, visitor_id, company_name))
+            if repoint_search:
+                cursor.execute("UPDATE visitor_search SET visitor_id = %s WHERE visitor_id = %s AND company_name = %s",
+                               (copy_id, visitor_id, company_name))
+            conn.commit()
+    finally:
+        cursor.close()
+
+def merge(conn, groups, blacklisted, batch_size):
+    """Fold the duplicates in `groups` into their survivors, a batch per transaction"""
+    mapping = [(old_id, new_id) for new_id, old_ids in groups.items() for old_id in old_ids]
+    tables = ['visits'] + (['visitor_search'] if table_exists(conn, 'visitor_search') else [])
+    cursor = conn.cursor()
+    try:
+        cursor.execute(MAP_TABLE_SQL)
+        cursor.execute("TRUNCATE TABLE visitor_merge_map")
+        cursor.executemany("INSERT INTO visitor_merge_map (old_id, new_id, batch) VALUES (%s, %s, %s)",
+                           [(old_id, new_id, i // batch_size) for i, (old_id, new_id) in enumerate(mapping)])
+        # Any blacklisted row in a group blacklists the person
+        carried = []
+        for new_id, old_ids in groups.items():
+            reasons = [blacklisted[i] for i in [new_id] + old_ids if i in blacklisted]
+            if reasons:
+                carried.append((next((reason for reason in reasons if reason), None), new_id))
+        if carried:
+            cursor.executemany("""
+                UPDATE visitors SET is_blacklisted = TRUE, reason_for_blacklist = COALESCE(reason_for_blacklist, %s)
+                WHERE id = %s
+            """, carried)
+        batches = (len(mapping) + batch_size - 1) // batch_size
+        for batch in range(batches):
+            conn.start_transaction()
+            cursor.execute(FILL_SQL, (batch,))
+            for table in tables:
+                cursor.execute(REPOINT_SQL.format(table=table), (batch,))
+            cursor.execute(RETIRE_SQL, (batch,))
+            conn.commit()
+            print(f"  batch {batch + 1}/{batches}")
+        cursor.execute("DROP TEMPORARY TABLE visitor_merge_map")
+    finally:
+        cursor.close()
+
+def fill_identity_columns(conn, batch_size):
+    """Normalized keys for every visitor not merged away, then the unique per-company email index"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT id, email, phone, idCardNumber FROM visitors WHERE merged_into IS NULL")
+        rows = [identity_keys({'email': email, 'phone': phone, 'idCardNumber': id_number}) + (visitor_id,)
+                for visitor_id, email, phone, id_number in cursor.fetchall()]
+        for i in range(0, len(rows), batch_size):
+            cursor.executemany("""
+                UPDATE visitors SET email_normalized = %s, id_number_normalized = %s, phone_normalized = %s
+                WHERE id = %s
+            """, rows[i:i + batch_size])
+            conn.commit()
+        cursor.execute("SHOW INDEX FROM visitors WHERE Key_name = 'uq_company_email_normalized'")
+        if not cursor.fetchall():
+            cursor.execute("SHOW INDEX FROM visitors WHERE Key_name = 'idx_company_email_normalized'")
+            drop = "DROP INDEX idx_company_email_normalized, " if cursor.fetchall() else ""
+            cursor.execute(f"ALTER TABLE visitors {drop}ADD UNIQUE INDEX uq_company_email_normalized "
+                           "(company_name, email_normalized)")
+            print("uq_company_email_normalized created")
+    finally:
+        cursor.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dry-run', action='store_true', help='Report what would be merged without writing')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Duplicates (or rows) per transaction')
+    args = parser.parse_args()
+
+    conn = get_db_connection()
+    try:
+        started = time.perf_counter()
+        visitors = read_visitors(conn)
+        assign, copies = plan_companies(visitors, read_tenants(conn))
+        print(f"{len(visitors)} visitor rows: {len(assign)} to assign a company, "
+              f"{len(copies)} copies for rows visited at several companies")
+        if args.dry_run:
+            companies = dict((visitor_id, company_name) for company_name, visitor_id in assign)
+            planned = [(row[0], companies.get(row[0], row[1])) + tuple(row[2:]) for row in visitors]
+            groups = group_by_company(planned)
+            duplicates = sum(len(old_ids) for company_groups in groups.values() for old_ids in company_groups.values())
+            print(f"About {duplicates} duplicates across {len(groups)} companies "
+                  f"({time.perf_counter() - started:.1f}s)")
+            return
+
+        visitor_identity.ensure_identity_columns(conn)
+        snapshot_visits(conn, args.batch_size)
+        print(f"Visits have their own photo and ID card ({time.perf_counter() - started:.1f}s)")
+        assign_companies(conn, assign, copies, args.batch_size)
+
+        visitors = read_visitors(conn)
+        blacklisted = {row[0]: row[6] for row in visitors if row[5]}
+        for company_name, groups in group_by_company(visitors).items():
+            duplicates = sum(len(old_ids) for old_ids in groups.values())
+            print(f"{company_name}: {duplicates} duplicates in {len(groups)} groups")
+            merge(conn, groups, blacklisted, args.batch_size)
+        fill_identity_columns(conn, args.batch_size)
+        print(f"Done in {time.perf_counter() - started:.1f}s")
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    main()
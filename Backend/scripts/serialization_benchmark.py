@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Response Serialization Benchmark
+Times jsonify() of list-endpoint payloads: the old per-row normalization loop
+plus Flask's default provider, versus FastJSONProvider with orjson and with its
+plain json fallback.
+
+Usage (from the Backend directory):
+    python scripts/serialization_benchmark.py [--rows 10000] [--runs 7] [--json results.json]
+
+Rows are synthetic pre-registration rows as the MySQL cursor returns them:
+DATETIME, DATE, TIME (timedelta), DECIMAL and a small BLOB column.
+"""
+
+import argparse
+import decimal
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from src.utils import json_provider
+from src.utils.json_provider import FastJSONProvider
+
+def sample_rows(count):
+    """Rows shaped like `SELECT pr.* FROM pre_registrations pr`"""
+    now = datetime(2024, 5, 1, 9, 30)
+    return [{
+        'id': i,
+        'visitor_name': f'Visitor {i}',
+        'visitor_email': f'visitor{i}@example.com',
+        'visitor_phone': f'98765{i:05d}',
+        'visitor_company': 'Acme Industries',
+        'host_name': f'Host {i % 25}',
+        'company_to_visit': 'Pranathi Software Services',
+        'visit_date': (now + timedelta(days=i % 30)).date(),
+        'visit_time': timedelta(hours=9 + i % 8, minutes=(i * 7) % 60),
+        'purpose': 'Quarterly review meeting',
+        'status': 'approved' if i % 3 else 'pending',
+        'qr_code': f'VMS-{i:08d}',
+        'special_requirements': None,
+        'number_of_visitors': 1 + i % 3,
+        'deposit_amount': decimal.Decimal('150.00'),
+        'signature': f'sig-{i}'.encode('utf-8') * 8,
+        'created_at': now - timedelta(minutes=i),
+        'updated_at': now,
+    } for i in range(count)]
+
+def legacy_normalize(rows):
+    """The per-row, per-key loop the list routes used before FastJSONProvider"""
+    processed = []
+    for row in rows:
+        item = {}
+        for key, value in row.items():
+            if value is None:
+                item[key] = None
+            elif hasattr(value, 'isoformat'):
+                item[key] = value.isoformat()
+            elif isinstance(value, (bytes, bytearray)):
+                try:
+                    item[key] = value.decode('utf-8')
+                except UnicodeDecodeError:
+                    import base64
+                    item[key] = base64.b64encode(value).decode('utf-8')
+            elif hasattr(value, 'total_seconds'):
+                item[key] = str(value)
+            else:
+                item[key] = value
+        processed.append(item)
+    return processed
+
+def make_app(provider_class):
+    app = Flask(__name__)
+    app.json = provider_class(app)
+    return app
+
+def time_scenario(encode, runs):
+    """Median seconds of `encode()` and the size of its output"""
+    timings = []
+    size = 0
+    for _ in range(runs):
+        started = time.perf_counter()
+        size = len(encode())
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), size
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10000, help='Rows per payload')
+    parser.add_argument('--runs', type=int, default=7, help='Timed runs per scenario (median reported)')
+    parser.add_argument('--json', help='Also write results to this JSON file')
+    args = parser.parse_args()
+
+    rows = sample_rows(args.rows)
+    default_app = make_app(DefaultJSONProvider)
+    fast_app = make_app(FastJSONProvider)
+
+    def legacy():
+        with default_app.app_context():
+            return default_app.json.response(legacy_normalize(rows)).get_data()
+
+    def fast():
+        with fast_app.app_context():
+            return fast_app.json.response(rows).get_data()
+
+    def fallback():
+        with mock.patch.object(json_provider, 'orjson', None), fast_app.app_context():
+            return fast_app.json.response(rows).get_data()
+
+    scenarios = [('legacy', 'row loop + default provider', legacy)]
+    if json_provider.orjson is not None:
+        scenarios.append(('orjson', 'FastJSONProvider (orjson)', fast))
+    else:
+        print("⚠️ orjson is not installed; only the json fallback is measured")
+    scenarios.append(('fallback', 'FastJSONProvider (json fallback)', fallback))
+
+    results = []
+    for name, label, encode in scenarios:
+        encode()  # warm-up, untimed
+        seconds, size = time_scenario(encode, args.runs)
+        results.append({'scenario': name, 'label': label, 'median_ms': seconds * 1000, 'bytes': size})
+
+    baseline = results[0]['median_ms']
+    print(f"\n{args.rows} rows, median of {args.runs} runs")
+    print(f"{'scenario':<34} {'time (ms)':>10} {'speedup':>8} {'size (KB)':>10}")
+    for r in results:
+        print(f"{r['label']:<34} {r['median_ms']:>10.1f} {baseline / r['median_ms']:>7.1f}x {r['bytes'] / 1024:>10.1f}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'rows': args.rows, 'runs': args.runs, 'results': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
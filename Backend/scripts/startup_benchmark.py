@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Backend Startup Benchmark
+Measures cold start time and per-worker memory of the application factory,
+with report exporters loaded lazily versus eagerly, and after a first export.
+
+Usage (from the Backend directory):
+    python scripts/startup_benchmark.py [--runs 5] [--workers 4] [--json results.json]
+
+Each scenario runs in a fresh interpreter; RSS is that process's peak
+resident set size. No database is needed: exports use synthetic report data.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIO = """
+import resource, sys, time
+started = time.perf_counter()
+from src import create_app
+app = create_app('production')
+startup = time.perf_counter() - started
+scenario = {scenario!r}
+
+if scenario == 'eager':
+    # What every worker paid when app.py imported the exporters at top level
+    import pandas, openpyxl, openpyxl.chart
+    try:
+        import weasyprint
+    except (ImportError, OSError):
+        pass
+    startup = time.perf_counter() - started
+elif scenario.startswith('export-'):
+    from src.exports import run_export
+    from scripts.startup_benchmark import sample_report_data, SAMPLE_USER
+    report = sample_report_data()
+    export_started = time.perf_counter()
+    run_export(scenario.split('-', 1)[1], report, None, None, SAMPLE_USER, worker_process={worker_process!r})
+    startup = time.perf_counter() - export_started
+
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+peak_mb = peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+print('RESULT', startup, peak_mb)
+"""
+
+SAMPLE_USER = {'company_name': 'Benchmark Co', 'name': 'Admin', 'email': 'admin@example.com'}
+
+def sample_report_data(visits=200):
+    """Synthetic data shaped like get_comprehensive_report_data() output"""
+    now = datetime.now()
+    return {
+        'overview': {'total_visits': visits, 'unique_visitors': visits // 2, 'active_visits': 3,
+                     'completed_visits': visits - 3, 'avg_duration_minutes': 42.5},
+        'recent_activity': [{
+            'visitor_name': f'Visitor {i}', 'visitor_email': f'visitor{i}@example.com',
+            'visitor_company': 'Acme', 'host_name': f'Host {i % 7}', 'purpose': 'Meeting',
+            'status': 'checked_out', 'check_in_time': now - timedelta(hours=i),
+            'check_out_time': now - timedelta(hours=i) + timedelta(minutes=30), 'duration_minutes': 30,
+        } for i in range(visits)],
+        'purpose_analysis': [{'purpose': purpose, 'visit_count': visits // 4, 'unique_visitors': visits // 8,
+                              'avg_duration': 35.0} for purpose in ('Meeting', 'Interview', 'Delivery', 'Audit')],
+        'daily_analysis': [{'visit_date': (now - timedelta(days=day)).date(), 'daily_visits': 10,
+                            'unique_daily_visitors': 8, 'morning_visits': 4, 'afternoon_visits': 5,
+                            'evening_visits': 1} for day in range(30)],
+        'hourly_analysis': [{'hour': hour, 'visit_count': 5} for hour in range(8, 19)],
+        'host_performance': [{'host_name': f'Host {i}', 'host_email': f'host{i}@example.com', 'total_visits': 20,
+                              'unique_visitors': 15, 'avg_visit_duration': 40.0} for i in range(7)],
+        'company_analysis': [],
+        'report_period': {'start_date': None, 'end_date': None, 'generated_at': now},
+    }
+
+SCENARIOS = (
+    ('lazy', 'factory only (current)', False),
+    ('eager', 'factory + exporters at import (before)', False),
+    ('export-excel', 'first Excel export, in-process', False),
+    ('export-pdf', 'first PDF export, in-process', False),
+    ('export-excel', 'first Excel export, worker process', True),
+)
+
+def run_scenario(scenario, worker_process):
+    env = dict(os.environ, DB_HOST=os.getenv('DB_HOST', 'db.invalid'))
+    code = SCENARIO.format(scenario=scenario, worker_process=worker_process)
+    proc = subprocess.run([sys.executable, '-c', code], cwd=BACKEND_DIR, env=env,
+                          capture_output=True, text=True, timeout=300)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr[-2000:])
+    line = next(line for line in proc.stdout.splitlines() if line.startswith('RESULT'))
+    _, seconds, rss_mb = line.split()
+    return float(seconds), float(rss_mb)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters per scenario')
+    parser.add_argument('--workers', type=int, default=4, help='Web workers per container, for the fleet estimate')
+    parser.add_argument('--json', help='Also write results to this JSON file')
+    args = parser.parse_args()
+
+    results = []
+    for scenario, label, worker_process in SCENARIOS:
+        try:
+            runs = [run_scenario(scenario, worker_process) for _ in range(args.runs)]
+        except RuntimeError as e:
+            print(f"⚠️ {label}: failed\n{e}")
+            continue
+        results.append({
+            'scenario': scenario,
+            'label': label,
+            'worker_process': worker_process,
+            'median_seconds': statistics.median(seconds for seconds, _ in runs),
+            'peak_rss_mb': max(rss for _, rss in runs),
+        })
+        print(f"✅ {label}")
+
+    print(f"\n{'scenario':<42} {'time (s)':>9} {'worker RSS MB':>14} {f'x{args.workers} workers':>13}")
+    for r in results:
+        print(f"{r['label']:<42} {r['median_seconds']:>9.3f} {r['peak_rss_mb']:>14.1f} "
+              f"{r['peak_rss_mb'] * args.workers:>13.1f}")
+    print("\nStartup rows time import + create_app(); export rows time the first export call.")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'workers': args.workers, 'results': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Visitor Search Benchmark
+Loads synthetic visitors into scratch tables shaped like visitor_search and
+visits (with its n-gram index) and times the lookups a receptionist makes:
+the old LIKE '%term%' filter, the same filter through the n-gram index, and
+the typeahead's FULLTEXT, short-prefix and phone paths. Reports p50/p95 per
+query over a set of terms, within one tenant of --companies.
+
+Needs a MySQL 8 server (DB_* settings as for the app). The scratch tables are
+dropped afterwards unless --keep is given; with --keep a later run reuses them.
+
+Usage (from the Backend directory):
+    python scripts/visitor_search_benchmark.py [--rows 1000000] [--companies 20] [--runs 20] [--keep] [--json results.json]
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.database import get_db_connection
+from src.utils import visitor_search
+
+SEARCH_TABLE = 'bench_visitor_search'
+VISITS_TABLE = 'bench_visits'
+
+VISITS_TABLE_SQL = f"""
+    CREATE TABLE IF NOT EXISTS {VISITS_TABLE} (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        company_name VARCHAR(200) NOT NULL,
+        visitor_name VARCHAR(100) NOT NULL,
+        visitor_email VARCHAR(100) NULL,
+        check_in_time DATETIME NULL,
+        INDEX idx_company_check_in (company_name, check_in_time),
+        FULLTEXT INDEX ft_visitor_name (visitor_name) WITH PARSER ngram
+    )
+"""
+
+FIRST_NAMES = ['aarav', 'ananya', 'arjun', 'diya', 'ishaan', 'kavya', 'rohan', 'saanvi', 'vihaan', 'priya',
+               'james', 'mary', 'john', 'patricia', 'robert', 'jennifer', 'michael', 'linda', 'david', 'susan',
+               'mohammed', 'fatima', 'wei', 'mei', 'carlos', 'lucia', 'olga', 'ivan', 'yuki', 'kenji']
+LAST_NAMES = ['sharma', 'reddy', 'iyer', 'patel', 'gupta', 'nair', 'rao', 'khan', 'singh', 'das',
+              'smith', 'johnson', 'williams', 'brown', 'jones', 'garcia', 'miller', 'davis', 'wilson', 'moore',
+              'de souza', 'van dijk', 'kim', 'chen', 'tanaka', 'rossi', 'muller', 'dubois', 'silva', 'ivanova']
+COMPANIES = ['Acme Industries', 'Globex', 'Initech', 'Umbrella Labs', 'Stark Solutions', 'Wayne Services',
+             'Tyrell Technologies', 'Cyberdyne Systems', 'Soylent Foods', 'Hooli']
+
+# Terms per query type; the timings cycle through them
+TERMS = {
+    'like_scan': ['smi', 'reddy', 'an', 'son', 'kav'],
+    'ngram_filter': ['smi', 'reddy', 'an', 'son', 'kav'],
+    'typeahead_fulltext': ['john smi', 'priya', 'gupta', 'kav nai', 'globex'],
+    'typeahead_prefix': ['jo', 'pr', 'k', 'ar', 'm'],
+    'typeahead_phone': ['98765', '9123', '+91 70', '8000', '63'],
+}
+
+def synthetic_visitors(rows, companies, seed=7):
+    """(company_name, name, email, phone, company, last_visit, visit_count) per visitor"""
+    rng = random.Random(seed)
+    start = datetime(2023, 1, 1)
+    for i in range(rows):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        name = f"{first.title()} {last.title()}"
+        email = f"{first}.{last.replace(' ', '')}{i}@example.com"
+        phone = f"+91 {rng.randint(6000000000, 9999999999)}"
+        yield (f"Tenant {i % companies}", name, email, phone, rng.choice(COMPANIES),
+               start + timedelta(minutes=rng.randint(0, 60 * 24 * 600)), rng.randint(1, 40))
+
+def load(conn, rows, companies, batch_size=5000):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SET SESSION innodb_ft_enable_stopword = OFF")
+        cursor.execute(visitor_search.SEARCH_TABLE_SQL.format(table=SEARCH_TABLE))
+        cursor.execute(VISITS_TABLE_SQL)
+        cursor.execute(f"SELECT COUNT(*) FROM {SEARCH_TABLE}")
+        if cursor.fetchone()[0] >= rows:
+            print(f"Reusing {SEARCH_TABLE} and {VISITS_TABLE}")
+            return
+        cursor.execute(f"TRUNCATE TABLE {SEARCH_TABLE}")
+        cursor.execute(f"TRUNCATE TABLE {VISITS_TABLE}")
+
+        started = time.perf_counter()
+        batch = []
+        for visitor in synthetic_visitors(rows, companies):
+            batch.append(visitor)
+            if len(batch) == batch_size:
+                _insert(cursor, batch)
+                conn.commit()
+                batch = []
+        if batch:
+            _insert(cursor, batch)
+            conn.commit()
+        print(f"Loaded {rows} visitors in {time.perf_counter() - started:.1f}s")
+    finally:
+        cursor.close()
+
+def _insert(cursor, batch):
+    cursor.executemany(f"""
+        INSERT INTO {SEARCH_TABLE} (company_name, visitor_key, name, email, phone, phone_digits, company,
+                                    visit_count, last_visit_at, tenant_token)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """, [(tenant, visitor_search.visitor_key(email, phone, name), name, email, phone,
+           visitor_search.digits(phone), company, visit_count, last_visit, visitor_search.tenant_token(tenant))
+          for tenant, name, email, phone, company, last_visit, visit_count in batch])
+    cursor.executemany(f"""
+        INSERT INTO {VISITS_TABLE} (company_name, visitor_name, visitor_email, check_in_time)
+        VALUES (%s, %s, %s, %s)
+    """, [(tenant, name, email, last_visit) for tenant, name, email, _, _, last_visit, _ in batch])
+
+def query_for(kind, tenant, term):
+    """SQL and parameters for one timed lookup"""
+    if kind.startswith('typeahead'):
+        return visitor_search.build_query(tenant, term, 10, table=SEARCH_TABLE)
+    base = f"SELECT id, visitor_name, check_in_time FROM {VISITS_TABLE} WHERE company_name = %s"
+    if kind == 'like_scan':
+        return f"{base} AND visitor_name LIKE %s ORDER BY check_in_time DESC LIMIT 100", [tenant, f'%{term}%']
+    condition, params = visitor_search.substring_filter('visitor_name', term)
+    return f"{base} AND {condition} ORDER BY check_in_time DESC LIMIT 100", [tenant] + params
+
+def time_queries(conn, tenant, runs):
+    """kind -> (p50 ms, p95 ms, max ms, rows of the last run)"""
+    results = {}
+    cursor = conn.cursor()
+    try:
+        for kind, terms in TERMS.items():
+            timings, found = [], 0
+            for i in range(runs):
+                sql, params = query_for(kind, tenant, terms[i % len(terms)])
+                started = time.perf_counter()
+                cursor.execute(sql, params)
+                found = len(cursor.fetchall())
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            results[kind] = (statistics.median(timings), timings[int(0.95 * (len(timings) - 1))], timings[-1], found)
+    finally:
+        cursor.close()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000, help='Synthetic visitors (and visits) to load')
+    parser.add_argument('--companies', type=int, default=20, help='Tenants the rows are spread over')
+    parser.add_argument('--runs', type=int, default=20, help='Timed runs per query type')
+    parser.add_argument('--keep', action='store_true', help='Keep the scratch tables for another run')
+    parser.add_argument('--json', help='Also write results to this JSON file')
+    args = parser.parse_args()
+
+    conn = get_db_connection()
+    try:
+        load(conn, args.rows, args.companies)
+        results = time_queries(conn, 'Tenant 0', args.runs)
+
+        print(f"\n{args.rows} visitors over {args.companies} tenants, {args.runs} runs per query")
+        print(f"{'query':<20} {'p50 (ms)':>9} {'p95 (ms)':>9} {'max (ms)':>9} {'rows':>6}")
+        for kind, (p50, p95, worst, found) in results.items():
+            print(f"{kind:<20} {p50:>9.2f} {p95:>9.2f} {worst:>9.2f} {found:>6}")
+        if args.json:
+            with open(args.json, 'w') as f:
+                json.dump({'rows': args.rows, 'companies': args.companies, 'runs': args.runs,
+                           'results': {k: dict(zip(('p50_ms', 'p95_ms', 'max_ms', 'rows'), v))
+                                       for k, v in results.items()}}, f, indent=2)
+    finally:
+        if not args.keep:
+            cursor = conn.cursor()
+            cursor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}, {VISITS_TABLE}")
+            cursor.close()
+        conn.close()
+
+if __name__ == '__main__':
+    main()
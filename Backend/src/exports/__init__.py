@@ -0,0 +1,59 @@
+"""
+Report Export Plugins
+Each export format lives in its own module and is imported on first use, so
+workers that never export a report do not load openpyxl or WeasyPrint. With
+EXPORT_WORKER_PROCESS enabled the exports run in a separate process instead,
+keeping those libraries out of the web workers entirely.
+"""
+
+import importlib
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# format -> module exposing export(report_data, start_date, end_date, user)
+EXPORTERS = {
+    'pdf': 'src.exports.pdf',
+    'excel': 'src.exports.excel',
+}
+
+_worker_pool = None
+_worker_lock = threading.Lock()
+
+def get_exporter(format_type):
+    """Import and return the export function for a format"""
+    if format_type not in EXPORTERS:
+        raise ValueError(f"Unsupported export format: {format_type}")
+    return importlib.import_module(EXPORTERS[format_type]).export
+
+def _run_exporter(format_type, report_data, start_date, end_date, user):
+    return get_exporter(format_type)(report_data, start_date, end_date, user)
+
+def _get_worker_pool(max_workers):
+    global _worker_pool
+    with _worker_lock:
+        if _worker_pool is None:
+            # spawn, so the export process starts clean instead of copying a web worker
+            _worker_pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'))
+            logger.info(f"✅ Started {max_workers} report export worker process(es)")
+        return _worker_pool
+
+def run_export(format_type, report_data, start_date, end_date, user, worker_process=False, workers=1, timeout=None):
+    """Build an export as {'data', 'mimetype', 'filename'}, optionally in the export worker process"""
+    if format_type not in EXPORTERS:
+        raise ValueError(f"Unsupported export format: {format_type}")
+    if not worker_process:
+        return _run_exporter(format_type, report_data, start_date, end_date, user)
+    future = _get_worker_pool(workers).submit(_run_exporter, format_type, report_data, start_date, end_date, user)
+    return future.result(timeout=timeout)
+
+def shutdown_export_workers():
+    """Stop the export worker process, if one was started"""
+    global _worker_pool
+    with _worker_lock:
+        if _worker_pool is not None:
+            _worker_pool.shutdown(wait=True)
+            _worker_pool = None
@@ -0,0 +1,152 @@
+"""
+Excel Report Exporter
+Multi-sheet workbook built with openpyxl, loaded only when an Excel export is requested
+"""
+
+import io
+from datetime import datetime
+from openpyxl import Workbook
+from openpyxl.styles import Font, PatternFill, Border, Side
+
+MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+def export(report_data, start_date, end_date, user):
+    """Build the Excel report with multiple sheets"""
+    # Create workbook
+    wb = Workbook()
+    
+    # Remove default sheet
+    wb.remove(wb.active)
+    
+    # Define styles
+    header_font = Font(bold=True, color="FFFFFF")
+    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+    title_font = Font(bold=True, size=14)
+    border = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+    
+    # 1. Overview Sheet
+    overview_ws = wb.create_sheet("Overview")
+    overview_data = [
+        ["Visitor Management System Report"],
+        [""],
+        ["Company", user['company_name']],
+        ["Report Period", f"{start_date or 'All time'} to {end_date or 'Present'}"],
+        ["Generated", datetime.now().strftime('%Y-%m-%d %H:%M:%S')],
+        [""],
+        ["Metric", "Value"],
+        ["Total Visits", report_data['overview']['total_visits'] or 0],
+        ["Unique Visitors", report_data['overview']['unique_visitors'] or 0],
+        ["Active Visits", report_data['overview']['active_visits'] or 0],
+        ["Completed Visits", report_data['overview']['completed_visits'] or 0],
+        ["Average Duration (minutes)", round(report_data['overview']['avg_duration_minutes'] or 0, 2)]
+    ]
+    
+    for row_idx, row_data in enumerate(overview_data, 1):
+        for col_idx, value in enumerate(row_data, 1):
+            cell = overview_ws.cell(row=row_idx, column=col_idx, value=value)
+            if row_idx == 1:
+                cell.font = title_font
+            elif row_idx == 7:
+                cell.font = header_font
+                cell.fill = header_fill
+    
+    # 2. Recent Activity Sheet
+    activity_ws = wb.create_sheet("Recent Activity")
+    activity_headers = ["Visitor Name", "Email", "Company", "Host", "Check In", "Check Out", "Purpose", "Status", "Duration (min)"]
+    
+    # Add headers
+    for col_idx, header in enumerate(activity_headers, 1):
+        cell = activity_ws.cell(row=1, column=col_idx, value=header)
+        cell.font = header_font
+        cell.fill = header_fill
+        cell.border = border
+    
+    # Add data
+    for row_idx, activity in enumerate(report_data['recent_activity'], 2):
+        activity_ws.cell(row=row_idx, column=1, value=activity.get('visitor_name', ''))
+        activity_ws.cell(row=row_idx, column=2, value=activity.get('visitor_email', ''))
+        activity_ws.cell(row=row_idx, column=3, value=activity.get('visitor_company', ''))
+        activity_ws.cell(row=row_idx, column=4, value=activity.get('host_name', ''))
+        activity_ws.cell(row=row_idx, column=5, value=activity.get('check_in_time', ''))
+        activity_ws.cell(row=row_idx, column=6, value=activity.get('check_out_time', ''))
+        activity_ws.cell(row=row_idx, column=7, value=activity.get('purpose', ''))
+        activity_ws.cell(row=row_idx, column=8, value=activity.get('status', ''))
+        activity_ws.cell(row=row_idx, column=9, value=activity.get('duration_minutes', ''))
+    
+    # 3. Purpose Analysis Sheet
+    purpose_ws = wb.create_sheet("Purpose Analysis")
+    purpose_headers = ["Purpose", "Visit Count", "Unique Visitors", "Avg Duration (min)"]
+    
+    for col_idx, header in enumerate(purpose_headers, 1):
+        cell = purpose_ws.cell(row=1, column=col_idx, value=header)
+        cell.font = header_font
+        cell.fill = header_fill
+        cell.border = border
+    
+    for row_idx, purpose in enumerate(report_data['purpose_analysis'], 2):
+        purpose_ws.cell(row=row_idx, column=1, value=purpose.get('purpose', ''))
+        purpose_ws.cell(row=row_idx, column=2, value=purpose.get('visit_count', 0))
+        purpose_ws.cell(row=row_idx, column=3, value=purpose.get('unique_visitors', 0))
+        purpose_ws.cell(row=row_idx, column=4, value=purpose.get('avg_duration', 0))
+    
+    # 4. Daily Analysis Sheet
+    daily_ws = wb.create_sheet("Daily Analysis")
+    daily_headers = ["Date", "Total Visits", "Unique Visitors", "Morning", "Afternoon", "Evening"]
+    
+    for col_idx, header in enumerate(daily_headers, 1):
+        cell = daily_ws.cell(row=1, column=col_idx, value=header)
+        cell.font = header_font
+        cell.fill = header_fill
+        cell.border = border
+    
+    for row_idx, daily in enumerate(report_data['daily_analysis'], 2):
+        daily_ws.cell(row=row_idx, column=1, value=daily.get('visit_date', ''))
+        daily_ws.cell(row=row_idx, column=2, value=daily.get('daily_visits', 0))
+        daily_ws.cell(row=row_idx, column=3, value=daily.get('unique_daily_visitors', 0))
+        daily_ws.cell(row=row_idx, column=4, value=daily.get('morning_visits', 0))
+        daily_ws.cell(row=row_idx, column=5, value=daily.get('afternoon_visits', 0))
+        daily_ws.cell(row=row_idx, column=6, value=daily.get('evening_visits', 0))
+    
+    # 5. Host Performance Sheet
+    host_ws = wb.create_sheet("Host Performance")
+    host_headers = ["Host Name", "Email", "Total Visits", "Unique Visitors", "Avg Duration (min)"]
+    
+    for col_idx, header in enumerate(host_headers, 1):
+        cell = host_ws.cell(row=1, column=col_idx, value=header)
+        cell.font = header_font
+        cell.fill = header_fill
+        cell.border = border
+    
+    for row_idx, host in enumerate(report_data['host_performance'], 2):
+        host_ws.cell(row=row_idx, column=1, value=host.get('host_name', ''))
+        host_ws.cell(row=row_idx, column=2, value=host.get('host_email', ''))
+        host_ws.cell(row=row_idx, column=3, value=host.get('total_visits', 0))
+        host_ws.cell(row=row_idx, column=4, value=host.get('unique_visitors', 0))
+        host_ws.cell(row=row_idx, column=5, value=host.get('avg_visit_duration', 0))
+    
+    # Auto-size columns for all sheets
+    for ws in wb.worksheets:
+        for column in ws.columns:
+            max_length = 0
+            column_letter = column[0].column_letter
+            for cell in column:
+                try:
+                    if len(str(cell.value)) > max_length:
+                        max_length = len(str(cell.value))
+                except:
+                    pass
+            adjusted_width = min(max_length + 2, 50)
+            ws.column_dimensions[column_letter].width = adjusted_width
+    
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return {
+        'data': buffer.getvalue(),
+        'mimetype': MIMETYPE,
+        'filename': f'visitor-report-{datetime.now().strftime("%Y%m%d")}.xlsx'
+    }
@@ -0,0 +1,522 @@
+"""
+HTML Report Rendering
+Builds the report HTML shared by the HTML and PDF exports; standard library only
+"""
+
+from datetime import datetime
+
+def generate_comprehensive_html_report(report_data, start_date, end_date, user):
+    """Generate comprehensive HTML report with all analytics"""
+    overview = report_data['overview']
+    recent_activity = report_data['recent_activity']
+    purpose_analysis = report_data['purpose_analysis']
+    daily_analysis = report_data['daily_analysis']
+    host_performance = report_data['host_performance']
+    
+    # Generate recent activity table
+    recent_activity_rows = ""
+    for activity in recent_activity[:20]:  # Show top 20 for PDF
+        recent_activity_rows += f"""
+        <tr>
+            <td>{activity.get('visitor_name', 'N/A')}</td>
+            <td>{activity.get('visitor_email', 'N/A')}</td>
+            <td>{activity.get('visitor_company', 'N/A')}</td>
+            <td>{activity.get('host_name', 'N/A')}</td>
+            <td>{activity.get('check_in_time', 'N/A')}</td>
+            <td>{activity.get('purpose', 'N/A')}</td>
+            <td><span class="status {activity.get('status', '').lower()}">{activity.get('status', 'N/A')}</span></td>
+        </tr>
+        """
+    
+    # Generate purpose analysis chart data
+    purpose_chart_data = ""
+    for purpose in purpose_analysis[:10]:  # Top 10 purposes
+        percentage = (purpose.get('visit_count', 0) / max(overview.get('total_visits', 1), 1)) * 100
+        purpose_chart_data += f"""
+        <tr>
+            <td>{purpose.get('purpose', 'N/A')}</td>
+            <td>{purpose.get('visit_count', 0)}</td>
+            <td>{purpose.get('unique_visitors', 0)}</td>
+            <td>{round(percentage, 1)}%</td>
+        </tr>
+        """
+    
+    # Generate daily analysis chart
+    daily_chart_data = ""
+    for daily in daily_analysis[:14]:  # Last 14 days
+        daily_chart_data += f"""
+        <tr>
+            <td>{daily.get('visit_date', 'N/A')}</td>
+            <td>{daily.get('daily_visits', 0)}</td>
+            <td>{daily.get('unique_daily_visitors', 0)}</td>
+            <td>{daily.get('morning_visits', 0)}</td>
+            <td>{daily.get('afternoon_visits', 0)}</td>
+            <td>{daily.get('evening_visits', 0)}</td>
+        </tr>
+        """
+    
+    # Generate host performance data
+    host_performance_data = ""
+    for host in host_performance[:10]:  # Top 10 hosts
+        host_performance_data += f"""
+        <tr>
+            <td>{host.get('host_name', 'N/A')}</td>
+            <td>{host.get('total_visits', 0)}</td>
+            <td>{host.get('unique_visitors', 0)}</td>
+            <td>{round(host.get('avg_visit_duration', 0) or 0, 1)} min</td>
+        </tr>
+        """
+    
+    return f"""
+<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Visitor Management System - Comprehensive Report</title>
+    <style>
+        body {{
+            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+            margin: 0;
+            padding: 20px;
+            color: #333;
+            line-height: 1.6;
+            background-color: #f8f9fa;
+        }}
+        .container {{
+            max-width: 1200px;
+            margin: 0 auto;
+            background: white;
+            padding: 30px;
+            border-radius: 10px;
+            box-shadow: 0 0 20px rgba(0,0,0,0.1);
+        }}
+        .header {{
+            text-align: center;
+            border-bottom: 3px solid #007bff;
+            padding-bottom: 20px;
+            margin-bottom: 30px;
+        }}
+        .header h1 {{
+            color: #007bff;
+            margin: 0;
+            font-size: 32px;
+            font-weight: 700;
+        }}
+        .header h2 {{
+            color: #666;
+            margin: 10px 0 0 0;
+            font-size: 18px;
+            font-weight: 400;
+        }}
+        .meta-info {{
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            color: white;
+            padding: 20px;
+            border-radius: 8px;
+            margin-bottom: 30px;
+            display: flex;
+            justify-content: space-between;
+            align-items: center;
+        }}
+        .meta-info .company {{
+            font-size: 20px;
+            font-weight: bold;
+        }}
+        .meta-info .period {{
+            text-align: right;
+        }}
+        .stats-grid {{
+            display: grid;
+            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
+            gap: 20px;
+            margin-bottom: 30px;
+        }}
+        .stat-card {{
+            background: #f8f9fa;
+            padding: 20px;
+            border-radius: 8px;
+            text-align: center;
+            border-left: 4px solid #007bff;
+        }}
+        .stat-card h3 {{
+            margin: 0 0 10px 0;
+            color: #666;
+            font-size: 14px;
+            text-transform: uppercase;
+            letter-spacing: 1px;
+        }}
+        .stat-card .value {{
+            font-size: 28px;
+            font-weight: bold;
+            color: #007bff;
+        }}
+        .section {{
+            margin-bottom: 40px;
+        }}
+        .section-title {{
+            font-size: 24px;
+            font-weight: bold;
+            color: #333;
+            margin-bottom: 20px;
+            padding-bottom: 10px;
+            border-bottom: 2px solid #e9ecef;
+        }}
+        table {{
+            width: 100%;
+            border-collapse: collapse;
+            margin-top: 10px;
+            background: white;
+            border-radius: 8px;
+            overflow: hidden;
+            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+        }}
+        th {{
+            background: #007bff;
+            color: white;
+            padding: 15px 10px;
+            text-align: left;
+            font-weight: 600;
+            font-size: 14px;
+        }}
+        td {{
+            padding: 12px 10px;
+            border-bottom: 1px solid #e9ecef;
+            font-size: 13px;
+        }}
+        tr:nth-child(even) {{
+            background-color: #f8f9fa;
+        }}
+        tr:hover {{
+            background-color: #e3f2fd;
+        }}
+        .status {{
+            padding: 4px 12px;
+            border-radius: 20px;
+            font-size: 11px;
+            font-weight: bold;
+            text-transform: uppercase;
+        }}
+        .status.checked_in {{
+            background: #d4edda;
+            color: #155724;
+        }}
+        .status.checked_out {{
+            background: #cce5ff;
+            color: #004085;
+        }}
+        .status.pending {{
+            background: #fff3cd;
+            color: #856404;
+        }}
+        .footer {{
+            margin-top: 40px;
+            padding-top: 20px;
+            border-top: 1px solid #e9ecef;
+            text-align: center;
+            color: #666;
+            font-size: 12px;
+        }}
+        .page-break {{
+            page-break-before: always;
+        }}
+        @media print {{
+            body {{ margin: 0; background: white; }}
+            .container {{ box-shadow: none; padding: 20px; }}
+        }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>VISITOR MANAGEMENT SYSTEM</h1>
+            <h2>Comprehensive Analytics Report</h2>
+        </div>
+        
+        <div class="meta-info">
+            <div>
+                <div class="company">{user['company_name']}</div>
+                <div>Generated by: {user['name']}</div>
+            </div>
+            <div class="period">
+                <div><strong>Report Period:</strong></div>
+                <div>{start_date or 'All time'} to {end_date or 'Present'}</div>
+                <div><strong>Generated:</strong> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</div>
+            </div>
+        </div>
+        
+        <div class="stats-grid">
+            <div class="stat-card">
+                <h3>Total Visits</h3>
+                <div class="value">{overview.get('total_visits', 0):,}</div>
+            </div>
+            <div class="stat-card">
+                <h3>Unique Visitors</h3>
+                <div class="value">{overview.get('unique_visitors', 0):,}</div>
+            </div>
+            <div class="stat-card">
+                <h3>Active Visits</h3>
+                <div class="value">{overview.get('active_visits', 0):,}</div>
+            </div>
+            <div class="stat-card">
+                <h3>Avg Duration</h3>
+                <div class="value">{round(overview.get('avg_duration_minutes', 0) or 0, 1)}</div>
+                <small>minutes</small>
+            </div>
+        </div>
+        
+        <div class="section">
+            <h2 class="section-title">📈 Recent Visitor Activity</h2>
+            <table>
+                <thead>
+                    <tr>
+                        <th>Visitor Name</th>
+                        <th>Email</th>
+                        <th>Company</th>
+                        <th>Host</th>
+                        <th>Check In Time</th>
+                        <th>Purpose</th>
+                        <th>Status</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    {recent_activity_rows}
+                </tbody>
+            </table>
+        </div>
+        
+        <div class="page-break"></div>
+        
+        <div class="section">
+            <h2 class="section-title">🎯 Visit Purpose Analysis</h2>
+            <table>
+                <thead>
+                    <tr>
+                        <th>Purpose</th>
+                        <th>Visit Count</th>
+                        <th>Unique Visitors</th>
+                        <th>Percentage</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    {purpose_chart_data}
+                </tbody>
+            </table>
+        </div>
+        
+        <div class="section">
+            <h2 class="section-title">📊 Time-based Visitor Analysis</h2>
+            <table>
+                <thead>
+                    <tr>
+                        <th>Date</th>
+                        <th>Total Visits</th>
+                        <th>Unique Visitors</th>
+                        <th>Morning (9-12)</th>
+                        <th>Afternoon (13-17)</th>
+                        <th>Evening (18-21)</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    {daily_chart_data}
+                </tbody>
+            </table>
+        </div>
+        
+        <div class="section">
+            <h2 class="section-title">👥 Host Performance Analysis</h2>
+            <table>
+                <thead>
+                    <tr>
+                        <th>Host Name</th>
+                        <th>Total Visits</th>
+                        <th>Unique Visitors</th>
+                        <th>Avg Duration</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    {host_performance_data}
+                </tbody>
+            </table>
+        </div>
+        
+        <div class="footer">
+            <p>This report was generated by the Visitor Management System on {datetime.now().strftime('%B %d, %Y at %I:%M %p')}</p>
+            <p>© 2025 Visitor Management System. All rights reserved.</p>
+        </div>
+    </div>
+</body>
+</html>
+    """
+
+def generate_html_report_content(data, start_date, end_date):
+    """Generate simple HTML content for basic export"""
+    # For backward compatibility, if data is the new comprehensive format, extract overview
+    if isinstance(data, dict) and 'overview' in data:
+        overview = data['overview']
+        total_visits = overview.get('total_visits', 0)
+        unique_visitors = overview.get('unique_visitors', 0)
+    else:
+        total_visits = 0
+        unique_visitors = 0
+    
+    return f"""
+<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Visitor Management System Report</title>
+    <style>
+        body {{
+            font-family: Arial, sans-serif;
+            margin: 20px;
+            color: #333;
+            line-height: 1.6;
+        }}
+        .header {{
+            text-align: center;
+            border-bottom: 2px solid #007bff;
+            padding-bottom: 20px;
+            margin-bottom: 30px;
+        }}
+        .header h1 {{
+            color: #007bff;
+            margin: 0;
+            font-size: 28px;
+        }}
+        .meta-info {{
+            background-color: #f8f9fa;
+            padding: 15px;
+            border-radius: 5px;
+            margin-bottom: 30px;
+        }}
+        .stats {{
+            display: grid;
+            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
+            gap: 20px;
+            margin: 20px 0;
+        }}
+        .stat-card {{
+            background: #f8f9fa;
+            padding: 20px;
+            border-radius: 8px;
+            text-align: center;
+            border-left: 4px solid #007bff;
+        }}
+        .stat-card h3 {{
+            margin: 0 0 10px 0;
+            color: #666;
+            font-size: 14px;
+        }}
+        .stat-card .value {{
+            font-size: 24px;
+            font-weight: bold;
+            color: #007bff;
+        }}
+    </style>
+</head>
+<body>
+    <div class="header">
+        <h1>VISITOR MANAGEMENT SYSTEM</h1>
+        <h2>Analytics Report</h2>
+    </div>
+    <div class="meta-info">
+        <strong>Generated:</strong> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}<br>
+        <strong>Report Period:</strong> {start_date or 'All time'} to {end_date or 'Present'}
+    </div>
+    <div class="stats">
+        <div class="stat-card">
+            <h3>Total Visits</h3>
+            <div class="value">{total_visits:,}</div>
+        </div>
+        <div class="stat-card">
+            <h3>Unique Visitors</h3>
+            <div class="value">{unique_visitors:,}</div>
+        </div>
+    </div>
+    <p><em>For comprehensive analytics including Recent Visitor Activity, Visit Purpose Analysis, and Time-based Analysis, please use PDF or Excel export formats.</em></p>
+</body>
+</html>
+    """
+
+def add_print_styles_to_html(html_content):
+    """Add print-optimized styles to HTML for browser PDF printing"""
+    # Add additional CSS for better PDF printing
+    print_styles = """
+    <style>
+        @media print {
+            body { 
+                margin: 0; 
+                background: white !important; 
+                -webkit-print-color-adjust: exact;
+                color-adjust: exact;
+            }
+            .container { 
+                box-shadow: none !important; 
+                padding: 15px !important; 
+                margin: 0 !important;
+            }
+            .page-break { 
+                page-break-before: always !important; 
+            }
+            .no-print { 
+                display: none !important; 
+            }
+            table { 
+                page-break-inside: avoid; 
+            }
+            tr { 
+                page-break-inside: avoid; 
+                page-break-after: auto; 
+            }
+            .section {
+                break-inside: avoid;
+            }
+        }
+        .print-instructions {
+            background: #e3f2fd;
+            border: 1px solid #2196f3;
+            padding: 15px;
+            margin: 20px 0;
+            border-radius: 5px;
+            text-align: center;
+        }
+        .print-instructions h3 {
+            color: #1976d2;
+            margin: 0 0 10px 0;
+        }
+        @media print {
+            .print-instructions {
+                display: none !important;
+            }
+        }
+    </style>
+    """
+    
+    # Add print instructions
+    print_instructions = """
+    <div class="print-instructions no-print">
+        <h3>📄 PDF Export Instructions</h3>
+        <p><strong>To save this report as PDF:</strong></p>
+        <ol style="text-align: left; display: inline-block;">
+            <li>Press <kbd>Ctrl+P</kbd> (Windows) or <kbd>Cmd+P</kbd> (Mac)</li>
+            <li>Select "Save as PDF" as the destination</li>
+            <li>Choose "More settings" and enable "Background graphics"</li>
+            <li>Click "Save" to download your PDF report</li>
+        </ol>
+    </div>
+    """
+    
+    # Insert the styles after the existing <style> tag
+    style_end = html_content.find('</style>')
+    if style_end != -1:
+        html_content = html_content[:style_end] + print_styles + html_content[style_end:]
+    
+    # Insert instructions after the header
+    header_end = html_content.find('</div>', html_content.find('class="meta-info"'))
+    if header_end != -1:
+        insertion_point = header_end + 6  # After </div>
+        html_content = html_content[:insertion_point] + print_instructions + html_content[insertion_point:]
+    
+    return html_content
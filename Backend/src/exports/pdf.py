@@ -0,0 +1,37 @@
+"""
+PDF Report Exporter
+Renders the HTML report with WeasyPrint, or returns print-ready HTML when
+WeasyPrint (or its system libraries) is not installed
+"""
+
+import logging
+from datetime import datetime
+from src.exports.html_report import generate_comprehensive_html_report, add_print_styles_to_html
+
+logger = logging.getLogger(__name__)
+
+try:
+    import weasyprint
+    WEASYPRINT_AVAILABLE = True
+except (ImportError, OSError) as e:
+    weasyprint = None
+    WEASYPRINT_AVAILABLE = False
+    logger.warning(f"⚠ WeasyPrint not available: {e}; PDF export will use HTML fallback")
+
+def export(report_data, start_date, end_date, user):
+    """Build the PDF report, or an HTML document that can be printed as PDF from the browser"""
+    html_content = generate_comprehensive_html_report(report_data, start_date, end_date, user)
+    stamp = datetime.now().strftime("%Y%m%d")
+
+    if WEASYPRINT_AVAILABLE:
+        return {
+            'data': weasyprint.HTML(string=html_content).write_pdf(),
+            'mimetype': 'application/pdf',
+            'filename': f'visitor-report-{stamp}.pdf'
+        }
+
+    return {
+        'data': add_print_styles_to_html(html_content).encode('utf-8'),
+        'mimetype': 'text/html',
+        'filename': f'visitor-report-{stamp}.html'
+    }
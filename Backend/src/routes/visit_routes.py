@@ -1,214 +1,982 @@
 """
 Visit Routes
-Handles visit creation, retrieval, check-in/check-out
+Handles visit creation, retrieval and check-out
 """
 
-from flask import Blueprint, request, jsonify
-from app.models import Visit
-from app.utils import authenticate_token, generate_qr_code, send_email, format_datetime
+from flask import Blueprint, request, jsonify, current_app
 from datetime import datetime
 import logging
+from config.database import get_db_connection
+from src.utils.auth import authenticate_token, get_company_id_from_companies_table
+from src.utils.mailer import send_email, enqueue_email
+from src.utils.fields import FieldSet, FieldSelectionError
+from src.utils.rate_limit import rate_limit, charge
+from src.utils import bulk_import, recurrence, qr_cache, visitor_search, visitor_identity
+from src.utils.bulk_import import BulkImportError, RowErrors
 
 logger = logging.getLogger(__name__)
 
 visits_bp = Blueprint('visits', __name__)
 
+# Selectable fields for the visit lists (?fields=...). Default projections
+# leave out the photo/ID-card images, address and website.
+VISIT_LIST_FIELDS = FieldSet({
+    'id': 'v.id',
+    'reason': "COALESCE(NULLIF(v.purpose_of_visit, ''), 'General Visit')",
+    'itemsCarried': 'v.itemsCarried',
+    'check_in_time': 'v.check_in_time',
+    'check_out_time': 'v.check_out_time',
+    'visitor_name': 'v.visitor_name',
+    'visitor_email': 'v.visitor_email',
+    'visitor_phone': 'v.visitor_phone',
+    'visitor_id': 'vis.id',
+    'designation': 'vis.designation',
+    'visitor_company': 'vis.company',
+    'visitorPhoto': 'v.visitor_photo',
+    'idCardPhoto': 'v.visitor_id_card_photo',
+    'idCardNumber': 'v.visitor_id_card_number',
+    'companyTel': 'vis.companyTel',
+    'website': 'vis.website',
+    'address': 'v.visitor_address',
+    'type_of_card': 'vis.type_of_card',
+    'host_id': 'h.id',
+    'hostName': 'h.name',
+}, default=[
+    'id', 'reason', 'itemsCarried', 'check_in_time', 'check_out_time',
+    'visitor_name', 'visitor_email', 'visitor_phone', 'visitor_id', 'designation',
+    'visitor_company', 'idCardNumber', 'companyTel', 'type_of_card', 'host_id', 'hostName',
+])
+
+HOST_VISIT_FIELDS = FieldSet({
+    'id': 'v.id',
+    'reason': "COALESCE(NULLIF(v.purpose_of_visit, ''), 'General Visit')",
+    'itemsCarried': 'v.itemsCarried',
+    'check_in_time': 'v.check_in_time',
+    'check_out_time': 'v.check_out_time',
+    'status': 'v.status',
+    'visitor_id': 'COALESCE(vis.id, v.visitor_id)',
+    'visitorName': 'COALESCE(vis.name, v.visitor_name)',
+    'visitorEmail': 'COALESCE(vis.email, v.visitor_email)',
+    'visitorPhone': 'COALESCE(vis.phone, v.visitor_phone)',
+    'designation': "COALESCE(vis.designation, '')",
+    'company': "COALESCE(vis.company, '')",
+    'visitorPhoto': "COALESCE(v.visitor_photo, '')",
+    'idCardPhoto': "COALESCE(v.visitor_id_card_photo, '')",
+    'idCardNumber': "COALESCE(v.visitor_id_card_number, '')",
+    'companyTel': "COALESCE(vis.companyTel, '')",
+    'website': "COALESCE(vis.website, '')",
+    'address': "COALESCE(v.visitor_address, '')",
+    'type_of_card': "COALESCE(vis.type_of_card, '')",
+    'host_id': 'h.id',
+    'hostName': 'h.name',
+}, default=[
+    'id', 'reason', 'itemsCarried', 'check_in_time', 'check_out_time', 'status',
+    'visitor_id', 'visitorName', 'visitorEmail', 'visitorPhone', 'designation', 'company',
+    'idCardNumber', 'companyTel', 'type_of_card', 'host_id', 'hostName',
+])
+
+# ============== VISITS MANAGEMENT ENDPOINTS ==============
+
 @visits_bp.route('/visits', methods=['POST'])
 @authenticate_token
+@rate_limit('check_in')
 def create_visit():
-    """Create a new visit"""
+    """Create a new visit (Check-In)"""
     try:
         data = request.get_json()
         
-        # Validate required fields
-        required_fields = ['visitor_name', 'visitor_email', 'visitor_phone', 
-                          'purpose_of_visit', 'host_name', 'host_email']
-        for field in required_fields:
-            if not data.get(field):
-                return jsonify({'error': f'{field} is required'}), 400
-        
-        # Generate QR code
-        qr_code = generate_qr_code()
-        
-        # Prepare visit data
-        visit_data = {
-            'visitor_name': data['visitor_name'].strip(),
-            'visitor_email': data['visitor_email'].lower().strip(),
-            'visitor_phone': data['visitor_phone'].strip(),
-            'visitor_company': data.get('visitor_company', '').strip(),
-            'purpose_of_visit': data['purpose_of_visit'].strip(),
-            'host_name': data['host_name'].strip(),
-            'host_email': data['host_email'].lower().strip(),
-            'host_department': data.get('host_department', '').strip(),
-            'visit_date': data.get('visit_date', datetime.now().date()),
-            'check_in_time': data.get('check_in_time', datetime.now().time()),
-            'qr_code': qr_code,
-            'status': 'checked-in'
+        # Validate JSON data
+        if not data:
+            logger.error("No JSON data received")
+            return jsonify({'message': 'No data provided'}), 400
+        
+        user = request.current_user
+        
+        # Validate user object
+        if not user or not user.get('id'):
+            logger.error("Invalid user object from authentication")
+            return jsonify({'message': 'Authentication error'}), 401
+        
+        # Get company_id from companies table using user_id (needed for host lookup)
+        try:
+            company_id = get_company_id_from_companies_table(user['id'])
+            logger.info(f"Retrieved company_id: {company_id} for user_id: {user['id']}")
+        except Exception as e:
+            logger.error(f"Error getting company_id: {e}")
+            # Provide more specific error message based on the type of error
+            if "Database connection failed" in str(e):
+                return jsonify({'message': 'Database connection error - please try again later'}), 500
+            elif "mysql.connector" in str(e).lower():
+                return jsonify({'message': 'Database service unavailable'}), 500
+            else:
+                return jsonify({'message': f'Company information error: {str(e)}'}), 500
+        
+        # Debug: log the received data
+        logger.info(f"Create visit endpoint received data: {data}")
+        
+        # Map frontend field names to backend expected names
+        visitor_name = data.get('name') or data.get('visitorName')
+        visitor_email = data.get('email') or data.get('visitorEmail')
+        visitor_phone = data.get('phone') or data.get('visitorPhone', '')
+        visitor_designation = data.get('designation') or data.get('visitorDesignation', '')
+        visitor_company = data.get('company') or data.get('visitorCompany', '')
+        visitor_photo = data.get('photo') or data.get('visitorPhoto', '')
+        id_card_photo = data.get('idCardPhoto', '')
+        id_card_number = data.get('idCardNumber', '')
+        # Extract the missing fields
+        company_tel = data.get('companyTel', '')
+        website = data.get('website', '')
+        address = data.get('address', '')
+        id_card_type = data.get('idCardType', '')
+        reason = data.get('reason') or data.get('purpose')
+        items_carried = data.get('itemsCarried', '')
+        pre_registration_id = data.get('pre_registration_id')
+        
+        # Validate and handle oversized image data
+        MAX_IMAGE_LENGTH = 16777215  # MEDIUMTEXT limit (16MB)
+        
+        if visitor_photo and len(visitor_photo) > MAX_IMAGE_LENGTH:
+            logger.warning(f"Visitor photo too long ({len(visitor_photo)} chars), skipping photo storage")
+            visitor_photo = ''  # Skip storing oversized photo
+        
+        if id_card_photo and len(id_card_photo) > MAX_IMAGE_LENGTH:
+            logger.warning(f"ID card photo too long ({len(id_card_photo)} chars), skipping photo storage")
+            id_card_photo = ''  # Skip storing oversized photo
+        
+        # Validate and truncate other string fields to match database constraints
+        field_limits = {
+            'visitor_name': 100,
+            'visitor_email': 100,
+            'visitor_phone': 20,
+            'visitor_designation': 100,
+            'visitor_company': 200,
+            'company_tel': 20,
+            'website': 200,
+            'id_card_number': 50,
+            'id_card_type': 50
         }
         
-        # Create visit
-        visit_id = Visit.create_visit(visit_data)
+        # Apply length limits
+        if visitor_name and len(visitor_name) > field_limits['visitor_name']:
+            logger.warning(f"Visitor name too long, truncating from {len(visitor_name)} to {field_limits['visitor_name']}")
+            visitor_name = visitor_name[:field_limits['visitor_name']]
         
-        # Send notification email to host
-        host_email_subject = "New Visitor Check-in Notification"
-        host_email_body = f"""
-        <h2>New Visitor Check-in</h2>
-        <p>A visitor has checked in to see you:</p>
-        <ul>
-            <li><strong>Visitor:</strong> {visit_data['visitor_name']}</li>
-            <li><strong>Company:</strong> {visit_data['visitor_company']}</li>
-            <li><strong>Purpose:</strong> {visit_data['purpose_of_visit']}</li>
-            <li><strong>Check-in Time:</strong> {visit_data['check_in_time']}</li>
-        </ul>
-        <p>QR Code: {qr_code}</p>
-        """
+        if visitor_email and len(visitor_email) > field_limits['visitor_email']:
+            logger.warning(f"Visitor email too long, truncating from {len(visitor_email)} to {field_limits['visitor_email']}")
+            visitor_email = visitor_email[:field_limits['visitor_email']]
         
-        send_email(visit_data['host_email'], host_email_subject, host_email_body)
-        
-        # Send confirmation email to visitor
-        visitor_email_subject = "Visit Confirmation - Visitor Management System"
-        visitor_email_body = f"""
-        <h2>Visit Confirmation</h2>
-        <p>Your visit has been registered successfully:</p>
-        <ul>
-            <li><strong>Host:</strong> {visit_data['host_name']}</li>
-            <li><strong>Purpose:</strong> {visit_data['purpose_of_visit']}</li>
-            <li><strong>Date:</strong> {visit_data['visit_date']}</li>
-            <li><strong>Check-in Time:</strong> {visit_data['check_in_time']}</li>
-        </ul>
-        <p>Your QR Code: {qr_code}</p>
-        """
+        if visitor_phone and len(visitor_phone) > field_limits['visitor_phone']:
+            logger.warning(f"Visitor phone too long, truncating from {len(visitor_phone)} to {field_limits['visitor_phone']}")
+            visitor_phone = visitor_phone[:field_limits['visitor_phone']]
+        
+        if visitor_designation and len(visitor_designation) > field_limits['visitor_designation']:
+            logger.warning(f"Visitor designation too long, truncating from {len(visitor_designation)} to {field_limits['visitor_designation']}")
+            visitor_designation = visitor_designation[:field_limits['visitor_designation']]
+        
+        if visitor_company and len(visitor_company) > field_limits['visitor_company']:
+            logger.warning(f"Visitor company too long, truncating from {len(visitor_company)} to {field_limits['visitor_company']}")
+            visitor_company = visitor_company[:field_limits['visitor_company']]
+        
+        if company_tel and len(company_tel) > field_limits['company_tel']:
+            logger.warning(f"Company tel too long, truncating from {len(company_tel)} to {field_limits['company_tel']}")
+            company_tel = company_tel[:field_limits['company_tel']]
+        
+        if website and len(website) > field_limits['website']:
+            logger.warning(f"Website too long, truncating from {len(website)} to {field_limits['website']}")
+            website = website[:field_limits['website']]
         
-        send_email(visit_data['visitor_email'], visitor_email_subject, visitor_email_body)
+        if id_card_number and len(id_card_number) > field_limits['id_card_number']:
+            logger.warning(f"ID card number too long, truncating from {len(id_card_number)} to {field_limits['id_card_number']}")
+            id_card_number = id_card_number[:field_limits['id_card_number']]
+        
+        if id_card_type and len(id_card_type) > field_limits['id_card_type']:
+            logger.warning(f"ID card type too long, truncating from {len(id_card_type)} to {field_limits['id_card_type']}")
+            id_card_type = id_card_type[:field_limits['id_card_type']]
+        
+        logger.info(f"Mapped data - visitor_name: {visitor_name}, visitor_email: {visitor_email}, reason: {reason}")
+        
+        # Handle hostId vs hostName
+        host_id = data.get('hostId')
+        host_name = data.get('hostName')
+        
+        # If hostName is provided instead of hostId, look up the host ID
+        if not host_id and host_name:
+            host_conn = get_db_connection()
+            host_cursor = host_conn.cursor(dictionary=True, buffered=True)
+            try:
+                host_cursor.execute("SELECT id FROM users WHERE name = %s", (host_name,))
+                host_result = host_cursor.fetchall()
+                
+                if host_result:
+                    host_id = host_result[0]['id']
+                else:
+                    # If hostName lookup fails, try to find any host for this company
+                    logger.warning(f"Host not found with name: {host_name}, looking for any host in company")
+                    host_cursor.execute("""
+                        SELECT id, name FROM users 
+                        WHERE role IN ('host', 'admin') AND company_id = %s 
+                        LIMIT 1
+                    """, (company_id,))
+                    fallback_host = host_cursor.fetchall()
+                    
+                    if fallback_host:
+                        host_id = fallback_host[0]['id']
+                        host_name = fallback_host[0]['name']  # Update to actual host name
+                        logger.info(f"Using fallback host: {host_name} (ID: {host_id})")
+                    else:
+                        logger.error(f"No hosts found for company_id {company_id}")
+                        return jsonify({'message': f'No hosts available for your company. Please contact your administrator.'}), 400
+            finally:
+                host_cursor.close()
+                host_conn.close()
+        
+        # Required fields validation
+        if not visitor_name:
+            logger.error(f"Missing visitor name. Available fields: {list(data.keys()) if data else 'No data'}")
+            return jsonify({'message': 'Visitor name is required'}), 400
+        if not visitor_email:
+            logger.error(f"Missing visitor email. Available fields: {list(data.keys()) if data else 'No data'}")
+            return jsonify({'message': 'Visitor email is required'}), 400
+        if not host_id:
+            logger.error(f"Missing host ID/name. Available fields: {list(data.keys()) if data else 'No data'}")
+            return jsonify({'message': 'Host is required'}), 400
+        
+        # Ensure visitor_name is not empty string for database NOT NULL constraint
+        if not visitor_name.strip():
+            logger.error("Visitor name is empty string")
+            return jsonify({'message': 'Visitor name cannot be empty'}), 400
+        if not reason:
+            logger.error(f"Missing reason/purpose. Available fields: {list(data.keys()) if data else 'No data'}")
+            return jsonify({'message': 'Visit reason is required'}), 400
+        
+        # Ensure reason is not empty string for database NOT NULL constraint
+        if not reason.strip():
+            reason = "General visit"  # Default fallback
+            logger.warning(f"Empty reason provided, using default: {reason}")
+        
+        # Check if visitor is blacklisted using a separate connection
+        blacklist_conn = get_db_connection()
+        blacklist_cursor = blacklist_conn.cursor(dictionary=True, buffered=True)
+        try:
+            blacklist_cursor.execute("""
+                SELECT id FROM visitors WHERE email = %s AND is_blacklisted = TRUE LIMIT 1
+            """, (visitor_email,))
+            blacklisted = blacklist_cursor.fetchall()
+            
+            if blacklisted:
+                return jsonify({'message': 'This visitor has been blacklisted and cannot check in.'}), 403
+        finally:
+            blacklist_cursor.close()
+            blacklist_conn.close()
+        
+        # Check for duplicate check-in for the same company today
+        if visitor_email:
+            duplicate_conn = get_db_connection()
+            duplicate_cursor = duplicate_conn.cursor(dictionary=True, buffered=True)
+            try:
+                # Check for existing check-in for the same visitor email and host company today
+                duplicate_cursor.execute("""
+                    SELECT v.*, vis.name as existing_visitor_name, u.company_name as host_company_name
+                    FROM visits v
+                    JOIN visitors vis ON v.visitor_id = vis.id
+                    JOIN users u ON v.host_id = u.id
+                    WHERE vis.email = %s 
+                    AND u.company_name = (SELECT company_name FROM users WHERE id = %s)
+                    AND DATE(v.visit_date) = CURDATE()
+                    AND v.status = 'checked-in'
+                    LIMIT 1
+                """, (visitor_email, host_id))
+                existing_visit = duplicate_cursor.fetchone()
+                
+                if existing_visit:
+                    check_in_time = existing_visit.get('check_in_time', 'Unknown')
+                    host_company_name = existing_visit.get('host_company_name', 'this company')
+                    return jsonify({
+                        'message': f'You are already checked in for {host_company_name} today at {check_in_time}. Please check out first before checking in again.',
+                        'error': 'DUPLICATE_CHECKIN',
+                        'existing_visit_id': existing_visit.get('id'),
+                        'existing_checkin_time': str(check_in_time)
+                    }), 409  # 409 Conflict status code
+            finally:
+                duplicate_cursor.close()
+                duplicate_conn.close()
+        
+        # Get host details using a separate connection BEFORE creating the visit
+        host_details_conn = get_db_connection()
+        host_details_cursor = host_details_conn.cursor(dictionary=True)
+        try:
+            host_details_cursor.execute("SELECT name, email FROM users WHERE id = %s", (host_id,))
+            host = host_details_cursor.fetchone()
+            if not host:
+                return jsonify({'message': f'Host not found with ID: {host_id}'}), 400
+            host_name_value = host['name'] or f"Host_{host_id}"  # Fallback if name is NULL
+            host_email_value = host['email'] or f"host{host_id}@company.com"  # Fallback if email is NULL
+            logger.info(f"Host details retrieved: name={host_name_value}, email={host_email_value}")
+        finally:
+            host_details_cursor.close()
+            host_details_conn.close()
+        
+        # Perform the main database operations
+        main_conn = get_db_connection()
+        main_cursor = main_conn.cursor(dictionary=True, buffered=True)
+        
+        logger.info(f"About to start database operations with visitor_name: {visitor_name}, visitor_email: {visitor_email}, host_id: {host_id}, reason: {reason}")
+        
+        try:
+            # DDL commits implicitly, so make sure the occurrences table exists before the transaction
+            recurrence.ensure_occurrences_table(main_conn)
+            visitor_search.ensure_search_table(main_conn)
+            visitor_identity.ensure_identity_columns(main_conn)
+            
+            # Start transaction
+            main_conn.start_transaction()
+            
+            # Reuse the visitor's record when they have been here before (by email,
+            # ID number or phone), refreshing it with the details given now
+            visitor_details = {
+                'name': visitor_name, 'email': visitor_email, 'phone': visitor_phone,
+                'designation': visitor_designation, 'company': visitor_company, 'photo': visitor_photo,
+                'idCardPhoto': id_card_photo, 'idCardNumber': id_card_number, 'companyTel': company_tel,
+                'website': website, 'address': address, 'type_of_card': id_card_type,
+            }
+            visitor_id = visitor_identity.resolve_visitor(main_cursor, user['company_name'], visitor_details)
+            logger.info(f"Resolved visitor ID: {visitor_id}")
+            
+            # Create visit record - use purpose_of_visit (NOT NULL) instead of reason
+            logger.info(f"Creating visit with reason: '{reason}' (type: {type(reason)}, length: {len(reason) if reason else 0})")
+            # The photo, ID card and address taken today stay with this visit
+            main_cursor.execute(f"""
+                INSERT INTO visits (visitor_id, host_id, purpose_of_visit, itemsCarried, check_in_time, 
+                                  status, company_id, pre_registration_id, visitor_name, visitor_company,
+                                  visitor_email, visitor_phone, visit_date, host_name, host_email,
+                                  {', '.join(visitor_identity.SNAPSHOT_COLUMNS)})
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,%s, %s, %s, %s, %s, %s, %s, %s)
+            """, (visitor_id, host_id, reason, items_carried, datetime.now(), 
+                  'checked-in', company_id, pre_registration_id, visitor_name,visitor_company, 
+                  visitor_email, visitor_phone, datetime.now().date(), host_name_value, host_email_value)
+                + visitor_identity.snapshot(visitor_details))
+            
+            visit_id = main_cursor.lastrowid
+            logger.info(f"Created visit with ID: {visit_id}, purpose_of_visit set to: '{reason}'")
+            
+            visitor_search.record_visits(main_cursor, user['company_name'], [
+                (visitor_id, visitor_name, visitor_email, visitor_phone, visitor_company, datetime.now())
+            ])
+            
+            # Update pre-registration status if applicable; a recurring series stays
+            # open and only today's occurrence is marked
+            if pre_registration_id:
+                main_cursor.execute(recurrence.CLOSE_PRE_REGISTRATION_SQL, ('checked-in', pre_registration_id))
+                main_cursor.execute(
+                    recurrence.CHECK_IN_OCCURRENCE_SQL, (visit_id, pre_registration_id)
+                )
+            
+            main_conn.commit()
+            if pre_registration_id:
+                qr_cache.forget(user['company_name'], pre_registration_id)
+            
+        except Exception as e:
+            main_conn.rollback()
+            raise e
+        finally:
+            main_cursor.close()
+            main_conn.close()
+        
+        # Send notification email to host
+        if host_email_value:
+            subject = f"New Visitor Check-in: {visitor_name}"
+            body = f"""
+            <h3>New Visitor Check-in Notification</h3>
+            <p>Dear {host_name_value},</p>
+            <p>You have a new visitor:</p>
+            <ul>
+                <li><strong>Name:</strong> {visitor_name}</li>
+                <li><strong>Company:</strong> {visitor_company}</li>
+                <li><strong>Purpose:</strong> {reason}</li>
+                <li><strong>Check-in Time:</strong> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</li>
+            </ul>
+            <p>Best regards,<br>Visitor Management System</p>
+            """
+            send_email(host_email_value, subject, body)
         
         return jsonify({
-            'message': 'Visit created successfully',
-            'visit_id': visit_id,
-            'qr_code': qr_code
+            'message': 'Visitor checked in successfully',
+            'visitId': visit_id,
+            'visitorId': visitor_id,
+            'checkInTime': datetime.now().isoformat(),
+            'hostId': host_id,
+            'visitorName': visitor_name,
+            'visitorEmail': visitor_email
         }), 201
+            
+    except Exception as e:
+        logger.error(f"Visit creation error: {e}")
+        logger.error(f"Error type: {type(e)}")
+        logger.error(f"Error args: {e.args}")
+        import traceback
+        logger.error(f"Full traceback: {traceback.format_exc()}")
+        
+        # Provide more specific error messages based on error type
+        error_message = str(e)
+        if "Database connection failed" in error_message:
+            user_message = "Database connection error - please try again"
+        elif "mysql.connector" in error_message.lower():
+            user_message = "Database service is currently unavailable"
+        elif "Connection" in error_message:
+            user_message = "Network connection error - please check your connection"
+        elif "Authentication" in error_message:
+            user_message = "Authentication error - please log in again"
+        else:
+            user_message = f"Visit creation failed: {error_message}"
+        
+        return jsonify({
+            'message': user_message, 
+            'error': str(e),
+            'debug_info': 'Check server logs for detailed error information'
+        }), 500
+
+# Group check-in columns: canonical name -> extra header aliases
+CHECKIN_IMPORT_COLUMNS = {
+    'name': ('visitorName',),
+    'email': ('visitorEmail',),
+    'phone': ('visitorPhone',),
+    'designation': ('visitorDesignation',),
+    'company': ('visitorCompany',),
+    'reason': ('purpose',),
+    'itemsCarried': (),
+    'hostId': (),
+    'hostName': ('host',),
+    'preRegistrationId': ('pre_registration_id',),
+}
+
+CHECKIN_LIMITS = {'name': 100, 'email': 100, 'phone': 20, 'designation': 100, 'company': 200}
+
+def _in_clause(values):
+    return ', '.join(['%s'] * len(values))
+
+@visits_bp.route('/visits/bulk', methods=['POST'])
+@authenticate_token
+def bulk_create_visits():
+    """Check in a group of visitors from a CSV/XLSX upload or a JSON array"""
+    try:
+        user = request.current_user
+        
+        try:
+            df = bulk_import.load_rows(request, CHECKIN_IMPORT_COLUMNS, current_app.config['BULK_IMPORT_MAX_ROWS'])
+        except BulkImportError as e:
+            return jsonify({'message': str(e)}), 400
+        
+        # Column-wide checks first; each failing check adds a message to its rows
+        errors = RowErrors(df.index)
+        errors.require(df, 'name', 'email', 'reason')
+        errors.check_email(df, 'email')
+        errors.check_max_length(df, CHECKIN_LIMITS)
+        errors.add((df['hostId'] == '') & (df['hostName'] == ''), 'hostId or hostName is required')
+        errors.add(~df['hostId'].str.fullmatch(r'\d*'), 'hostId must be a number')
+        errors.add(~df['preRegistrationId'].str.fullmatch(r'\d*'), 'preRegistrationId must be a number')
+        errors.add(df['email'].str.lower().duplicated(keep='first') & (df['email'] != ''),
+                   'Duplicate of an earlier row (same email)')
+        
+        company_id = get_company_id_from_companies_table(user['id'])
+        emails = sorted(set(df['email'].str.lower()) - {''})
+        
+        conn = get_db_connection()
+        try:
+            cursor = conn.cursor(dictionary=True)
+            # Hosts, blacklist and today's check-ins: one query each for the whole batch
+            cursor.execute("SELECT id, name, email FROM users WHERE company_name = %s", (user['company_name'],))
+            hosts = cursor.fetchall()
+            blacklisted, checked_in = set(), set()
+            if emails:
+                cursor.execute(
+                    f"SELECT DISTINCT LOWER(email) AS email FROM visitors WHERE is_blacklisted = TRUE AND email IN ({_in_clause(emails)})",
+                    emails
+                )
+                blacklisted = {r['email'] for r in cursor.fetchall()}
+                cursor.execute(f"""
+                    SELECT DISTINCT LOWER(vis.email) AS email
+                    FROM visits v
+                    JOIN visitors vis ON v.visitor_id = vis.id
+                    JOIN users u ON v.host_id = u.id
+                    WHERE vis.email IN ({_in_clause(emails)})
+                    AND u.company_name = %s
+                    AND DATE(v.visit_date) = CURDATE()
+                    AND v.status = 'checked-in'
+                """, emails + [user['company_name']])
+                checked_in = {r['email'] for r in cursor.fetchall()}
+            cursor.close()
+            
+            hosts_by_id = {str(h['id']): h for h in hosts}
+            hosts_by_name = {h['name']: h for h in hosts if h['name']}
+            host_by_id = df['hostId'].map(hosts_by_id)
+            row_hosts = host_by_id.where(host_by_id.notna(), df['hostName'].map(hosts_by_name))
+            errors.add(row_hosts.isna() & ((df['hostId'] != '') | (df['hostName'] != '')), 'Host not found in your company')
+            errors.add(df['email'].str.lower().isin(blacklisted), 'This visitor has been blacklisted and cannot check in.')
+            errors.add(df['email'].str.lower().isin(checked_in), 'Already checked in today. Please check out first.')
+            
+            valid_rows = errors.valid()
+            # Every row is a check-in, so a bulk upload draws on the same bucket
+            limited = charge('check_in', len(valid_rows)) if valid_rows else None
+            if limited:
+                return limited
+            now = datetime.now()
+            items = [(row, row_hosts.at[row]) for row in valid_rows]
+            
+            def insert_visits(cursor, chunk):
+                visitor_ids = visitor_identity.resolve_visitors(cursor, user['company_name'], [
+                    {column: df.at[row, column] for column in ('name', 'email', 'phone', 'designation', 'company')}
+                    for row, _ in chunk
+                ])
+                cursor.executemany("""
+                    INSERT INTO visits (visitor_id, host_id, purpose_of_visit, itemsCarried, check_in_time,
+                                      status, company_id, pre_registration_id, visitor_name, visitor_company,
+                                      visitor_email, visitor_phone, visit_date, host_name, host_email)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                """, [(visitor_id, host['id'], df.at[row, 'reason'], df.at[row, 'itemsCarried'], now,
+                       'checked-in', company_id, df.at[row, 'preRegistrationId'] or None, df.at[row, 'name'],
+                       df.at[row, 'company'], df.at[row, 'email'], df.at[row, 'phone'], now.date(),
+                       host['name'] or f"Host_{host['id']}", host['email'] or f"host{host['id']}@company.com")
+                      for visitor_id, (row, host) in zip(visitor_ids, chunk)])
+                first_visit_id = cursor.lastrowid
+                visitor_search.record_visits(cursor, user['company_name'], [
+                    (visitor_id, df.at[row, 'name'], df.at[row, 'email'], df.at[row, 'phone'], df.at[row, 'company'], now)
+                    for visitor_id, (row, _) in zip(visitor_ids, chunk)
+                ])
+                pre_registration_ids = [('checked-in', df.at[row, 'preRegistrationId'])
+                                        for row, _ in chunk if df.at[row, 'preRegistrationId']]
+                if pre_registration_ids:
+                    cursor.executemany(recurrence.CLOSE_PRE_REGISTRATION_SQL, pre_registration_ids)
+                    cursor.executemany(recurrence.CHECK_IN_OCCURRENCE_SQL, [
+                        (first_visit_id + i, df.at[row, 'preRegistrationId'])
+                        for i, (row, _) in enumerate(chunk) if df.at[row, 'preRegistrationId']
+                    ])
+                return [{'visitId': first_visit_id + i, 'visitorId': visitor_id} for i, visitor_id in enumerate(visitor_ids)]
+            
+            recurrence.ensure_occurrences_table(conn)
+            visitor_search.ensure_search_table(conn)
+            visitor_identity.ensure_identity_columns(conn)
+            results, failures = bulk_import.write_in_chunks(
+                conn, items, current_app.config['BULK_IMPORT_CHUNK_SIZE'], insert_visits
+            )
+        finally:
+            conn.close()
+        for i, (row, _) in enumerate(items):
+            if i in results and df.at[row, 'preRegistrationId']:
+                qr_cache.forget(user['company_name'], df.at[row, 'preRegistrationId'])
+        
+        # One queued notification per host listing their new visitors
+        arrivals = {}
+        for i, (row, host) in enumerate(items):
+            if i in results and host['email']:
+                arrivals.setdefault(host['email'], (host, []))[1].append(row)
+        for host_email, (host, rows) in arrivals.items():
+            visitor_list = ''.join(
+                f"<li><strong>{df.at[row, 'name']}</strong> ({df.at[row, 'company'] or 'N/A'}): {df.at[row, 'reason']}</li>"
+                for row in rows
+            )
+            enqueue_email(host_email, f"New Visitor Check-in: {len(rows)} visitor(s)", f"""
+            <h3>New Visitor Check-in Notification</h3>
+            <p>Dear {host['name']},</p>
+            <p>The following visitors checked in at {now.strftime('%Y-%m-%d %H:%M:%S')}:</p>
+            <ul>{visitor_list}</ul>
+            <p>Best regards,<br>Visitor Management System</p>
+            """)
+        
+        summary = bulk_import.summarize(valid_rows, results, failures, errors, lambda created: created)
+        logger.info(f"✅ Bulk check-in: {summary['created']} created, {summary['failed']} failed (user {user['id']})")
+        return jsonify(summary), 200
+        
+    except Exception as e:
+        logger.error(f"Bulk check-in error: {e}")
+        return jsonify({
+            'message': 'Failed to import check-ins',
+            'error': str(e) if current_app.debug else None
+        }), 500
+
+# Debug endpoint for visit creation
+@visits_bp.route('/debug-visit', methods=['POST'])
+@authenticate_token
+def debug_visit():
+    """Debug visit creation process step by step"""
+    debug_info = []
+    try:
+        debug_info.append("Step 1: Starting debug visit creation")
+        
+        data = request.get_json()
+        user = request.current_user
+        debug_info.append(f"Step 2: User authenticated: {user['email']}, Role: {user['role']}")
+        debug_info.append(f"Step 3: Received data keys: {list(data.keys()) if data else 'No data'}")
+        
+        if not data:
+            return jsonify({'debug': debug_info, 'error': 'No JSON data received'}), 400
+        
+        # Test company_id retrieval
+        debug_info.append("Step 4: Testing company_id retrieval")
+        company_id = get_company_id_from_companies_table(user['id'])
+        debug_info.append(f"Step 5: Company ID: {company_id}")
+        
+        # Test host lookup
+        host_id = data.get('hostId')
+        host_name = data.get('hostName')
+        debug_info.append(f"Step 6: Host ID: {host_id}, Host Name: {host_name}")
+        
+        if not host_id and host_name:
+            debug_info.append("Step 7: Looking up host by name")
+            host_conn = get_db_connection()
+            host_cursor = host_conn.cursor(dictionary=True, buffered=True)
+            try:
+                host_cursor.execute("SELECT id, name, email FROM users WHERE name = %s", (host_name,))
+                host_result = host_cursor.fetchall()
+                debug_info.append(f"Step 8: Host lookup result: {len(host_result)} found")
+                if host_result:
+                    host_id = host_result[0]['id']
+                    debug_info.append(f"Step 9: Using host ID: {host_id}")
+            finally:
+                host_cursor.close()
+                host_conn.close()
+        
+        # Test database schema check
+        debug_info.append("Step 10: Testing database schema")
+        schema_conn = get_db_connection()
+        schema_cursor = schema_conn.cursor()
+        try:
+            # Check visitors table columns
+            schema_cursor.execute("DESCRIBE visitors")
+            visitors_columns = [row[0] for row in schema_cursor.fetchall()]
+            debug_info.append(f"Step 11: Visitors table columns: {visitors_columns}")
+            
+            # Check visits table columns
+            schema_cursor.execute("DESCRIBE visits")
+            visits_columns = [row[0] for row in schema_cursor.fetchall()]
+            debug_info.append(f"Step 12: Visits table columns: {visits_columns}")
+            
+        finally:
+            schema_cursor.close()
+            schema_conn.close()
+        
+        # Test actual visit creation process
+        debug_info.append("Step 13: Testing actual visit creation process")
+        
+        # Extract the missing fields
+        visitor_name = data.get('name') or data.get('visitorName')
+        visitor_email = data.get('email') or data.get('visitorEmail')
+        visitor_phone = data.get('phone') or data.get('visitorPhone', '')
+        reason = data.get('reason') or data.get('purpose')
+        
+        debug_info.append(f"Step 14: Visitor data - Name: {visitor_name}, Email: {visitor_email}")
+        debug_info.append(f"Step 15: Visit reason: {reason}")
+        
+        if host_id:
+            # Test host details retrieval
+            debug_info.append("Step 16: Testing host details retrieval")
+            try:
+                host_details_conn = get_db_connection()
+                host_details_cursor = host_details_conn.cursor(dictionary=True)
+                host_details_cursor.execute("SELECT name, email FROM users WHERE id = %s", (host_id,))
+                host = host_details_cursor.fetchone()
+                debug_info.append(f"Step 17: Host details: {host}")
+                host_details_cursor.close()
+                host_details_conn.close()
+            except Exception as e:
+                debug_info.append(f"Step 17 ERROR: Host details retrieval failed: {e}")
+        
+        # Test visitor creation
+        debug_info.append("Step 18: Testing visitor creation")
+        try:
+            test_conn = get_db_connection()
+            test_cursor = test_conn.cursor()
+            test_cursor.execute("""
+                INSERT INTO visitors (name, email, phone)
+                VALUES (%s, %s, %s)
+            """, (visitor_name, visitor_email, visitor_phone))
+            test_visitor_id = test_cursor.lastrowid
+            debug_info.append(f"Step 19: Test visitor created with ID: {test_visitor_id}")
+            
+            # Rollback the test insertion
+            test_conn.rollback()
+            test_cursor.close()
+            test_conn.close()
+        except Exception as e:
+            debug_info.append(f"Step 19 ERROR: Visitor creation failed: {e}")
+        
+        return jsonify({
+            'success': True,
+            'debug': debug_info,
+            'message': 'Debug visit creation completed successfully'
+        })
         
     except Exception as e:
-        logger.error(f"Create visit error: {str(e)}")
-        return jsonify({'error': 'Failed to create visit'}), 500
+        debug_info.append(f"ERROR at step: {e}")
+        import traceback
+        debug_info.append(f"Traceback: {traceback.format_exc()}")
+        return jsonify({
+            'success': False,
+            'debug': debug_info,
+            'error': str(e)
+        }), 500
 
 @visits_bp.route('/visits', methods=['GET'])
 @authenticate_token
 def get_visits():
-    """Get all visits with optional filters"""
+    """Get all visits with filtering (admin only)"""
     try:
-        # Extract query parameters for filtering
-        filters = {}
-        
-        if request.args.get('status'):
-            filters['status'] = request.args.get('status')
-        if request.args.get('date_from'):
-            filters['date_from'] = request.args.get('date_from')
-        if request.args.get('date_to'):
-            filters['date_to'] = request.args.get('date_to')
-        if request.args.get('host_email'):
-            filters['host_email'] = request.args.get('host_email')
-        
-        # Get visits from database
-        visits = Visit.get_all_visits(filters)
-        
-        # Format datetime fields for response
-        for visit in visits:
-            if visit.get('check_in_time'):
-                visit['check_in_time'] = format_datetime(visit['check_in_time'])
-            if visit.get('check_out_time'):
-                visit['check_out_time'] = format_datetime(visit['check_out_time'])
+        user = request.current_user
         
-        return jsonify({
-            'visits': visits,
-            'total': len(visits)
-        }), 200
+        if user['role'] != 'admin':
+            return jsonify({'message': 'Admin access required'}), 403
+        
+        # Get query parameters
+        host_id = request.args.get('hostId')
+        start_date = request.args.get('startDate')
+        end_date = request.args.get('endDate')
+        host_name = request.args.get('hostName')
+        visitor_name = request.args.get('visitorName')
+        
+        try:
+            select_list = VISIT_LIST_FIELDS.select_list(request.args.get('fields'))
+        except FieldSelectionError as e:
+            return jsonify({'message': str(e)}), 400
+        
+        # Build query with the requested projection only
+        query = f"""
+            SELECT {select_list}
+            FROM visits v
+            LEFT JOIN visitors vis ON v.visitor_id = vis.id
+            LEFT JOIN users h ON v.host_id = h.id
+            WHERE h.company_name = %s
+        """
+        
+        params = [user['company_name']]
+        
+        # Add filters
+        if host_id:
+            query += " AND v.host_id = %s"
+            params.append(host_id)
+        
+        if start_date:
+            query += " AND DATE(v.check_in_time) >= %s"
+            params.append(start_date)
+        
+        if end_date:
+            query += " AND DATE(v.check_in_time) <= %s"
+            params.append(end_date)
+        
+        if host_name:
+            query += " AND h.name LIKE %s"
+            params.append(f"%{host_name}%")
+        
+        conn = get_db_connection()
+        
+        if visitor_name:
+            # visits.visitor_name is written with the visitor row, so the n-gram
+            # index on it answers the filter when present
+            if visitor_search.ngram_ready(conn, 'ft_visitor_name'):
+                condition, condition_params = visitor_search.substring_filter('v.visitor_name', visitor_name)
+                query += f" AND {condition}"
+                params.extend(condition_params)
+            else:
+                query += " AND (v.visitor_name LIKE %s OR vis.name LIKE %s)"
+                params.append(f"%{visitor_name}%")
+                params.append(f"%{visitor_name}%")
+        
+        query += " ORDER BY v.check_in_time DESC"
+        
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(query, params)
+        visits = cursor.fetchall()
+        cursor.close()
+        conn.close()
+        
+        return jsonify(visits), 200
         
     except Exception as e:
-        logger.error(f"Get visits error: {str(e)}")
-        return jsonify({'error': 'Failed to retrieve visits'}), 500
+        logger.error(f"Get visits error: {e}")
+        return jsonify({'message': 'Failed to fetch visits'}), 500
 
 @visits_bp.route('/host-visits', methods=['GET'])
 @authenticate_token
 def get_host_visits():
-    """Get visits for the authenticated host"""
+    """Get visits for the authenticated host with pagination support"""
     try:
-        # Get host email from authenticated user
-        host_email = request.user.get('email')
+        user = request.current_user
         
-        if not host_email:
-            return jsonify({'error': 'Host email not found'}), 400
+        logger.info(f"Host visits request - User: {user['id']}, Role: {user['role']}, Email: {user['email']}")
         
-        # Get visits for this host
-        visits = Visit.get_host_visits(host_email)
+        if user['role'] != 'host':
+            logger.warning(f"Non-host user {user['id']} attempted to access host visits")
+            return jsonify({'message': 'Host access required'}), 403
         
-        # Format datetime fields
-        for visit in visits:
-            if visit.get('check_in_time'):
-                visit['check_in_time'] = format_datetime(visit['check_in_time'])
-            if visit.get('check_out_time'):
-                visit['check_out_time'] = format_datetime(visit['check_out_time'])
+        host_id = user['id']
         
-        return jsonify({
+        # Get pagination parameters
+        page = request.args.get('page', 1, type=int)
+        limit = request.args.get('limit', 10, type=int)
+        
+        # Ensure reasonable limits
+        page = max(1, page)
+        limit = max(1, min(100, limit))  # Cap at 100 items per page
+        
+        offset = (page - 1) * limit
+        
+        try:
+            select_list = HOST_VISIT_FIELDS.select_list(request.args.get('fields'))
+        except FieldSelectionError as e:
+            return jsonify({'message': str(e)}), 400
+        
+        # First, get the total count
+        count_query = """
+            SELECT COUNT(*) as total
+            FROM visits v
+            WHERE v.host_id = %s
+        """
+        
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(count_query, (host_id,))
+        total_result = cursor.fetchone()
+        total_visits = total_result['total'] if total_result else 0
+        
+        # Calculate total pages
+        total_pages = (total_visits + limit - 1) // limit if total_visits > 0 else 1
+        
+        # Use LEFT JOIN to ensure we get visits even if visitor record has issues
+        # Use the visitor data stored directly in visits table as backup
+        query = f"""
+            SELECT {select_list}
+            FROM visits v
+            LEFT JOIN visitors vis ON v.visitor_id = vis.id
+            LEFT JOIN users h ON v.host_id = h.id
+            WHERE v.host_id = %s
+            ORDER BY v.check_in_time DESC
+            LIMIT %s OFFSET %s
+        """
+        
+        logger.info(f"Executing query for host_id={host_id}, limit={limit}, offset={offset}")
+        cursor.execute(query, (host_id, limit, offset))
+        visits = cursor.fetchall()
+        cursor.close()
+        conn.close()
+        
+        logger.info(f"Host {host_id} visits query returned {len(visits)} results (page {page} of {total_pages}, total: {total_visits})")
+        
+        # Log a sample of the data for debugging
+        if visits:
+            sample_visit = visits[0]
+            logger.info(f"Sample visit data: ID={sample_visit.get('id')}, reason={sample_visit.get('reason')}, purpose_of_visit={sample_visit.get('purpose_of_visit')}")
+            logger.info(f"Sample visit keys: {list(sample_visit.keys())}")
+            
+            # Additional debug: Check if reason field actually has data
+            for i, visit in enumerate(visits[:3]):  # Check first 3 visits
+                logger.info(f"Visit {i+1}: ID={visit.get('id')}, reason='{visit.get('reason')}', visitorName='{visit.get('visitorName')}'")
+        else:
+            logger.warning(f"No visits found for host {host_id} on page {page}")
+        
+        # Return paginated response
+        response_data = {
             'visits': visits,
-            'total': len(visits)
-        }), 200
+            'currentPage': page,
+            'totalPages': total_pages,
+            'totalVisits': total_visits,
+            'limit': limit
+        }
+        
+        return jsonify(response_data), 200
         
     except Exception as e:
-        logger.error(f"Get host visits error: {str(e)}")
-        return jsonify({'error': 'Failed to retrieve host visits'}), 500
+        logger.error(f"Get host visits error: {e}")
+        return jsonify({'message': 'Failed to fetch host visits'}), 500
 
 @visits_bp.route('/visits/<int:visit_id>/checkout', methods=['PUT'])
 @authenticate_token
 def checkout_visitor(visit_id):
     """Check out a visitor"""
     try:
-        # Get the visit
-        visit = Visit.get_visit_by_id(visit_id)
-        if not visit:
-            return jsonify({'error': 'Visit not found'}), 404
-        
-        # Check if already checked out
-        if visit['status'] == 'checked-out':
-            return jsonify({'error': 'Visitor already checked out'}), 400
-        
-        # Update visit status
-        checkout_time = datetime.now()
-        success = Visit.update_visit_status(visit_id, 'checked-out', checkout_time)
-        
-        if success:
-            # Send checkout notification emails
-            checkout_email_subject = "Visitor Check-out Notification"
-            checkout_email_body = f"""
-            <h2>Visitor Check-out</h2>
-            <p>Visitor {visit['visitor_name']} has checked out:</p>
-            <ul>
-                <li><strong>Check-out Time:</strong> {checkout_time.strftime('%Y-%m-%d %H:%M:%S')}</li>
-                <li><strong>Visit Duration:</strong> Calculated based on check-in time</li>
-            </ul>
-            """
+        user = request.current_user
+        logger.info(f"Checkout attempt for visit {visit_id} by user {user['id']} ({user['role']})")
+        
+        if user['role'] == 'host':
+            # Verify this visit belongs to the host
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            cursor.execute("SELECT host_id FROM visits WHERE id = %s", (visit_id,))
+            visit = cursor.fetchone()
+            cursor.close()
+            conn.close()
             
-            # Notify host
-            send_email(visit['host_email'], checkout_email_subject, checkout_email_body)
+            if not visit:
+                logger.warning(f"Visit {visit_id} not found")
+                return jsonify({'message': 'Visit not found'}), 404
+            
+            if visit[0] != user['id']:
+                logger.warning(f"Access denied: visit {visit_id} belongs to host {visit[0]}, not {user['id']}")
+                return jsonify({'message': 'Visit not found or access denied'}), 404
+        
+        check_out_time = datetime.now()
+        logger.info(f"Proceeding with checkout for visit {visit_id} at {check_out_time}")
+        
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        
+        try:
+            conn.start_transaction()
+            logger.info(f"Transaction started for visit {visit_id}")
+            
+            # Get visit details first to check current status
+            cursor.execute("""
+                SELECT pre_registration_id, status, check_out_time FROM visits WHERE id = %s
+            """, (visit_id,))
+            visit_details = cursor.fetchone()
+            logger.info(f"Visit details: {visit_details}")
+            
+            if not visit_details:
+                logger.warning(f"Visit {visit_id} not found in database")
+                conn.rollback()
+                return jsonify({'message': 'Visit not found'}), 404
+            
+            # Check if already checked out
+            if visit_details['status'] == 'checked-out' or visit_details['check_out_time'] is not None:
+                logger.warning(f"Visit {visit_id} already checked out. Status: {visit_details['status']}, Check-out time: {visit_details['check_out_time']}")
+                conn.rollback()
+                return jsonify({'message': 'Visitor already checked out'}), 400
+            
+            # Update visit with checkout time
+            logger.info(f"Updating visit {visit_id} with checkout time {check_out_time}")
+            cursor.execute("""
+                UPDATE visits SET check_out_time = %s, status = 'checked-out' 
+                WHERE id = %s
+            """, (check_out_time, visit_id))
+            
+            logger.info(f"Update affected {cursor.rowcount} rows")
+            if cursor.rowcount == 0:
+                logger.warning(f"No rows affected when updating visit {visit_id}")
+                conn.rollback()
+                return jsonify({'message': 'Visit not found or already checked out'}), 404
+            
+            # Update pre-registration if applicable; a recurring series must stay
+            # verifiable for its later occurrences
+            if visit_details and visit_details['pre_registration_id']:
+                logger.info(f"Updating pre-registration {visit_details['pre_registration_id']} to checked_out")
+                cursor.execute(recurrence.CLOSE_PRE_REGISTRATION_SQL,
+                               ('checked_out', visit_details['pre_registration_id']))
+                logger.info(f"Pre-registration update affected {cursor.rowcount} rows")
+            
+            conn.commit()
+            logger.info(f"Transaction committed successfully for visit {visit_id}")
             
             return jsonify({
                 'message': 'Visitor checked out successfully',
-                'checkout_time': checkout_time.strftime('%Y-%m-%d %H:%M:%S')
+                'checkOutTime': check_out_time.isoformat()
             }), 200
-        else:
-            return jsonify({'error': 'Failed to checkout visitor'}), 500
-        
-    except Exception as e:
-        logger.error(f"Checkout visitor error: {str(e)}")
-        return jsonify({'error': 'Failed to checkout visitor'}), 500
-
-@visits_bp.route('/visits/counts', methods=['GET'])
-@authenticate_token
-def get_visit_counts():
-    """Get visit counts for dashboard"""
-    try:
-        counts = Visit.get_visit_counts()
-        return jsonify(counts), 200
-        
+            
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            cursor.close()
+            conn.close()
+            
     except Exception as e:
-        logger.error(f"Get visit counts error: {str(e)}")
-        return jsonify({'error': 'Failed to retrieve visit counts'}), 500
+        logger.error(f"Checkout error: {e}")
+        logger.error(f"Error type: {type(e).__name__}")
+        logger.error(f"Error details: {str(e)}")
+        return jsonify({'message': f'Failed to check out visitor: {str(e)}'}), 500
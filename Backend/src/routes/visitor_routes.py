@@ -1,147 +1,1804 @@
 """
 Visitor Routes
-Handles visitor-specific operations
+Handles visitor listings, blacklisting, pre-registration, QR check-in and badges
 """
 
-from flask import Blueprint, request, jsonify
-from app.models import Visit
-from app.utils import authenticate_token, generate_qr_code
+from flask import Blueprint, request, jsonify, current_app
+from datetime import datetime, time, timedelta
 import logging
+import mysql.connector
+from config.database import get_db_connection
+from src.utils.auth import authenticate_token, get_company_id_from_companies_table
+from src.utils.helpers import generate_qr_code, generate_qr_codes
+from src.utils.fields import FieldSet, FieldSelectionError
+from src.utils.mailer import enqueue_email
+from src.utils import bulk_import, recurrence, qr_cache, visitor_search
+from src.utils.bulk_import import BulkImportError, RowErrors
+from src.utils.rate_limit import charge
 
 logger = logging.getLogger(__name__)
 
 visitors_bp = Blueprint('visitors', __name__)
 
+# Selectable fields for the visitor history list (?fields=...). Replaces the old
+# `v.*`; the default leaves out notes, feedback and other free-text columns.
+VISITOR_HISTORY_FIELDS = FieldSet({
+    'id': 'v.id',
+    'visitor_id': 'v.visitor_id',
+    'host_id': 'v.host_id',
+    'visitor_name': 'vis.name',
+    'visitor_email': 'vis.email',
+    'visitor_phone': 'v.visitor_phone',
+    'visitor_company': 'vis.company',
+    'is_blacklisted': 'vis.is_blacklisted',
+    'host_name': 'u.name',
+    'host_company': 'u.company_name',
+    'purpose_of_visit': 'v.purpose_of_visit',
+    'reason': 'v.reason',
+    'itemsCarried': 'v.itemsCarried',
+    'check_in_time': 'v.check_in_time',
+    'check_out_time': 'v.check_out_time',
+    'visit_date': 'v.visit_date',
+    'scheduled_time': 'v.scheduled_time',
+    'expected_duration': 'v.expected_duration',
+    'actual_duration': 'v.actual_duration',
+    'status': """CASE
+                     WHEN v.check_out_time IS NOT NULL THEN 'completed'
+                     WHEN v.check_in_time IS NOT NULL THEN 'active'
+                     ELSE 'pending'
+                   END""",
+    'qr_code': 'v.qr_code',
+    'badge_number': 'v.badge_number',
+    'vehicle_number': 'v.vehicle_number',
+    'emergency_contact': 'v.emergency_contact',
+    'emergency_phone': 'v.emergency_phone',
+    'number_of_visitors': 'v.number_of_visitors',
+    'notes': 'v.notes',
+    'admin_notes': 'v.admin_notes',
+    'rating': 'v.rating',
+    'feedback': 'v.feedback',
+    'pre_registration_id': 'v.pre_registration_id',
+    'created_at': 'v.created_at',
+    'updated_at': 'v.updated_at',
+}, default=[
+    'id', 'visitor_id', 'host_id', 'visitor_name', 'visitor_email', 'visitor_phone',
+    'visitor_company', 'is_blacklisted', 'host_name', 'host_company', 'purpose_of_visit',
+    'reason', 'itemsCarried', 'check_in_time', 'check_out_time', 'visit_date', 'status',
+    'qr_code', 'number_of_visitors', 'created_at',
+])
+
+# ============== VISITOR MANAGEMENT ENDPOINTS ==============
+
+@visitors_bp.route('/test-blacklisted', methods=['GET'])
+@authenticate_token
+def test_blacklisted():
+    """Test endpoint to debug blacklisted visitors functionality"""
+    try:
+        user = request.current_user
+        admin_company_name = user['company_name']
+        
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        
+        # Test data structure
+        test_results = {
+            'admin_company': admin_company_name,
+            'tables_exist': {},
+            'columns_exist': {},
+            'sample_data': {},
+            'table_structures': {}
+        }
+        
+        # Check if tables exist
+        cursor.execute("SHOW TABLES LIKE 'visitors'")
+        test_results['tables_exist']['visitors'] = cursor.fetchone() is not None
+        
+        cursor.execute("SHOW TABLES LIKE 'visits'")
+        test_results['tables_exist']['visits'] = cursor.fetchone() is not None
+        
+        cursor.execute("SHOW TABLES LIKE 'users'")
+        test_results['tables_exist']['users'] = cursor.fetchone() is not None
+        
+        # Get visitors table structure
+        cursor.execute("SHOW COLUMNS FROM visitors")
+        visitors_columns = cursor.fetchall()
+        test_results['table_structures']['visitors'] = [col['Field'] for col in visitors_columns]
+        
+        # Check if is_blacklisted column exists
+        cursor.execute("SHOW COLUMNS FROM visitors LIKE 'is_blacklisted'")
+        test_results['columns_exist']['is_blacklisted'] = cursor.fetchone() is not None
+        
+        # Check if reason_for_blacklist column exists
+        cursor.execute("SHOW COLUMNS FROM visitors LIKE 'reason_for_blacklist'")
+        test_results['columns_exist']['reason_for_blacklist'] = cursor.fetchone() is not None
+        
+        # Get sample blacklisted visitors
+        if test_results['columns_exist']['is_blacklisted']:
+            cursor.execute("SELECT COUNT(*) as count FROM visitors WHERE is_blacklisted = TRUE")
+            test_results['sample_data']['total_blacklisted'] = cursor.fetchone()['count']
+            
+            # Get sample of blacklisted visitors with their details
+            cursor.execute("""
+                SELECT id, name, email, is_blacklisted, reason_for_blacklist
+                FROM visitors 
+                WHERE is_blacklisted = TRUE 
+                LIMIT 5
+            """)
+            test_results['sample_data']['blacklisted_sample'] = cursor.fetchall()
+            
+            # Test the simplified query
+            cursor.execute("""
+                SELECT COUNT(*) as count 
+                FROM visitors v
+                WHERE v.is_blacklisted = TRUE 
+                AND EXISTS (
+                    SELECT 1 
+                    FROM visits vt 
+                    INNER JOIN users hosts ON vt.host_id = hosts.id
+                    WHERE vt.visitor_id = v.id
+                    AND hosts.company_name = %s
+                )
+            """, (admin_company_name,))
+            test_results['sample_data']['company_filtered_blacklisted'] = cursor.fetchone()['count']
+        
+        # Get hosts for this company
+        cursor.execute("""
+            SELECT id, name, email, company_name 
+            FROM users 
+            WHERE company_name = %s AND role = 'host'
+            LIMIT 5
+        """, (admin_company_name,))
+        test_results['sample_data']['company_hosts'] = cursor.fetchall()
+        
+        cursor.close()
+        conn.close()
+        
+        return jsonify(test_results), 200
+        
+    except Exception as e:
+        logger.error(f"Test blacklisted error: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @visitors_bp.route('/visitors/pending', methods=['GET'])
 @authenticate_token
 def get_pending_visitors():
-    """Get pending visitors"""
+    """Get all pending visitors (pre-registrations)"""
     try:
-        filters = {'status': 'pending'}
-        visits = Visit.get_all_visits(filters)
+        user = request.current_user
+        limit = request.args.get('limit', 100)
         
-        return jsonify({
-            'pending_visitors': visits,
-            'total': len(visits)
-        }), 200
+        logger.info(f"Fetching pending visitors for user: {user.get('email', 'unknown')}, role: {user.get('role', 'unknown')}")
+        
+        # Get company filter based on user role
+        if user['role'] == 'admin':
+            company_filter = user['company_name']
+        else:
+            company_filter = user['company_name']
+        
+        if not company_filter:
+            logger.error("No company name found for user")
+            return jsonify({'message': 'Company information not found'}), 400
+        
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        
+        try:
+            # Check if pre_registrations table exists
+            cursor.execute("SHOW TABLES LIKE 'pre_registrations'")
+            table_exists = cursor.fetchone()
+            
+            if not table_exists:
+                logger.warning("pre_registrations table does not exist")
+                cursor.close()
+                conn.close()
+                return jsonify([]), 200
+            
+            # Check available columns first
+            cursor.execute("SHOW COLUMNS FROM pre_registrations")
+            columns_info = cursor.fetchall()
+            available_columns = [col['Field'] for col in columns_info]
+            logger.info(f"Available columns in pre_registrations: {available_columns}")
+            
+            # Build query with only available columns
+            base_columns = ['id', 'visitor_name', 'visitor_email', 'visitor_phone', 
+                           'visitor_company', 'host_name', 'visit_date', 'visit_time',
+                           'purpose', 'status', 'created_at']
+            
+            optional_columns = ['qr_code', 'special_requirements', 'number_of_visitors']
+            
+            # Add available columns
+            select_columns = []
+            for col in base_columns:
+                if col in available_columns:
+                    select_columns.append(f'pr.{col}')
+            
+            for col in optional_columns:
+                if col in available_columns:
+                    select_columns.append(f'pr.{col}')
+            
+            if not select_columns:
+                logger.error("No valid columns found in pre_registrations table")
+                cursor.close()
+                conn.close()
+                return jsonify({'message': 'Database schema error'}), 500
+            
+            # Get pending pre-registrations
+            query = f"""
+                SELECT {', '.join(select_columns)}
+                FROM pre_registrations pr
+                WHERE pr.company_to_visit = %s 
+                AND pr.status IN ('pending', 'approved')
+                ORDER BY pr.created_at DESC
+                LIMIT %s
+            """
+            
+            logger.info(f"Executing query: {query}")
+            cursor.execute(query, (company_filter, int(limit)))
+            
+            pending_visitors = cursor.fetchall()
+            logger.info(f"Found {len(pending_visitors)} pending visitors")
+            
+            cursor.close()
+            conn.close()
+            
+            return jsonify(pending_visitors), 200
+            
+        except mysql.connector.Error as db_error:
+            logger.error(f"Database error in pending visitors: {db_error}")
+            cursor.close()
+            conn.close()
+            return jsonify({'message': f'Database error: {str(db_error)}'}), 500
         
     except Exception as e:
-        logger.error(f"Get pending visitors error: {str(e)}")
-        return jsonify({'error': 'Failed to retrieve pending visitors'}), 500
+        logger.error(f"Get pending visitors error: {e}")
+        return jsonify({'message': f'Failed to fetch pending visitors: {str(e)}'}), 500
 
 @visitors_bp.route('/visitors/blacklisted', methods=['GET'])
 @authenticate_token
 def get_blacklisted_visitors():
-    """Get blacklisted visitors"""
+    """Get all blacklisted visitors who visited hosts from the same company as the admin"""
     try:
-        # Return empty list for now
-        # In a full implementation, you'd have a blacklist table
-        blacklisted = []
+        user = request.current_user
+        limit = request.args.get('limit', 100)
+        admin_company_name = user['company_name']
         
-        return jsonify({
-            'blacklisted_visitors': blacklisted,
-            'total': len(blacklisted)
-        }), 200
+        logger.info(f"Fetching blacklisted visitors for company: {admin_company_name}")
+        
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        
+        try:
+            # Check if visitors table exists
+            cursor.execute("SHOW TABLES LIKE 'visitors'")
+            table_exists = cursor.fetchone()
+            
+            if not table_exists:
+                logger.warning("visitors table does not exist")
+                cursor.close()
+                conn.close()
+                return jsonify([]), 200
+            
+            # Check if is_blacklisted column exists
+            cursor.execute("SHOW COLUMNS FROM visitors LIKE 'is_blacklisted'")
+            column_exists = cursor.fetchone()
+            
+            if not column_exists:
+                logger.info("is_blacklisted column doesn't exist, returning empty list")
+                cursor.close()
+                conn.close()
+                return jsonify([]), 200
+            
+            # Check if reason_for_blacklist column exists
+            cursor.execute("SHOW COLUMNS FROM visitors LIKE 'reason_for_blacklist'")
+            has_blacklist_reason = cursor.fetchone() is not None
+            
+            # Query to get blacklisted visitors with comprehensive information
+            # Include: Visit Date, Picture, Person Name, Person to Meet, Visitor ID, Visit Reason, Reason to Blacklist, Check-In, Check-Out
+            if has_blacklist_reason:
+                blacklist_reason_field = "v.reason_for_blacklist as reason_to_blacklist"
+            else:
+                blacklist_reason_field = "'Not specified' as reason_to_blacklist"
+            
+            # Simplified query to avoid "Out of sort memory" error
+            # Get blacklisted visitors with their latest visit information
+            query = f"""
+                SELECT 
+                    v.id as visitor_id,
+                    v.name as person_name,
+                    v.email,
+                    v.phone,
+                    v.company,
+                    v.designation,
+                    v.photo as picture,
+                    v.is_blacklisted,
+                    {blacklist_reason_field}
+                FROM visitors v
+                WHERE v.is_blacklisted = TRUE 
+                AND EXISTS (
+                    SELECT 1 
+                    FROM visits vt 
+                    INNER JOIN users hosts ON vt.host_id = hosts.id
+                    WHERE vt.visitor_id = v.id
+                    AND hosts.company_name = %s
+                )
+                ORDER BY v.id DESC
+                LIMIT %s
+            """
+            
+            cursor.execute(query, (admin_company_name, int(limit)))
+            blacklisted_visitors = cursor.fetchall() or []
+            
+            # Get visit details for each blacklisted visitor separately
+            processed_visitors = []
+            for visitor in blacklisted_visitors:
+                # Get latest visit details for this visitor
+                visit_query = """
+                    SELECT 
+                        visits.check_in_time,
+                        visits.check_out_time,
+                        DATE(visits.check_in_time) as visit_date,
+                        visits.reason as visit_reason,
+                        hosts.name as person_to_meet
+                    FROM visits 
+                    INNER JOIN users hosts ON visits.host_id = hosts.id
+                    WHERE (visits.visitor_id = %s OR visits.visitor_email = %s)
+                    AND hosts.company_name = %s
+                    ORDER BY visits.check_in_time DESC
+                    LIMIT 1
+                """
+                
+                cursor.execute(visit_query, (visitor['visitor_id'], visitor['email'], admin_company_name))
+                visit_info = cursor.fetchone() or {}
+                
+                # Combine visitor and visit information
+                processed_visitor = {**visitor, **visit_info}
+                
+                # Add/format specific fields for frontend display
+                processed_visitor['visit_date'] = processed_visitor.get('visit_date', '')
+                processed_visitor['picture'] = processed_visitor.get('picture', '')
+                processed_visitor['person_name'] = processed_visitor.get('person_name', '')
+                processed_visitor['person_to_meet'] = processed_visitor.get('person_to_meet', '')
+                processed_visitor['visitor_id'] = processed_visitor.get('visitor_id', '')
+                processed_visitor['visit_reason'] = processed_visitor.get('visit_reason', '')
+                processed_visitor['reason_to_blacklist'] = processed_visitor.get('reason_to_blacklist', 'Not specified')
+                processed_visitor['check_in'] = processed_visitor.get('check_in_time', '')
+                processed_visitor['check_out'] = processed_visitor.get('check_out_time', '')
+                
+                # Add blacklist status info
+                processed_visitor['blacklist_status'] = 'Active'
+                processed_visitor['company_match'] = admin_company_name
+                
+                # Add created_at and updated_at as current timestamp if not present
+                if 'created_at' not in processed_visitor:
+                    processed_visitor['created_at'] = datetime.now().isoformat()
+                if 'updated_at' not in processed_visitor:
+                    processed_visitor['updated_at'] = processed_visitor.get('check_in_time') or datetime.now().isoformat()
+                
+                processed_visitors.append(processed_visitor)
+            
+            cursor.close()
+            conn.close()
+            
+            logger.info(f"Found {len(processed_visitors)} blacklisted visitors for company {admin_company_name}")
+            return jsonify(processed_visitors), 200
+            
+        except mysql.connector.Error as db_error:
+            logger.error(f"Database error in blacklisted visitors: {db_error}")
+            cursor.close()
+            conn.close()
+            return jsonify([]), 200  # Return empty array on DB error
         
     except Exception as e:
-        logger.error(f"Get blacklisted visitors error: {str(e)}")
-        return jsonify({'error': 'Failed to retrieve blacklisted visitors'}), 500
+        logger.error(f"Get blacklisted visitors error: {e}")
+        return jsonify({'message': f'Failed to fetch blacklisted visitors: {str(e)}'}), 500
 
 @visitors_bp.route('/visitors/counts', methods=['GET'])
 @authenticate_token
 def get_visitor_counts():
     """Get visitor counts for dashboard"""
     try:
-        counts = Visit.get_visit_counts()
-        return jsonify(counts), 200
+        user = request.current_user
+        company_filter = user['company_name']
+        
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        
+        # Get pending visitors count
+        cursor.execute("""
+            SELECT COUNT(*) as count FROM pre_registrations 
+            WHERE company_to_visit = %s AND status IN ('pending', 'approved')
+        """, (company_filter,))
+        pending_count = cursor.fetchone()['count']
+        
+        # Get blacklisted visitors count (only those who visited hosts from the same company)
+        try:
+            cursor.execute("SHOW COLUMNS FROM visitors LIKE 'is_blacklisted'")
+            column_exists = cursor.fetchone()
+            
+            if column_exists:
+                # Count blacklisted visitors who visited hosts from the same company
+                cursor.execute("""
+                    SELECT COUNT(DISTINCT v.id) as count 
+                    FROM visitors v
+                    INNER JOIN visits ON v.id = visits.visitor_id
+                    INNER JOIN users hosts ON visits.host_id = hosts.id
+                    WHERE v.is_blacklisted = TRUE 
+                    AND hosts.company_name = %s
+                """, (company_filter,))
+                blacklisted_count = cursor.fetchone()['count']
+            else:
+                blacklisted_count = 0
+        except Exception as bl_error:
+            logger.warning(f"Error checking blacklisted visitors: {bl_error}")
+            blacklisted_count = 0
+        
+        # Get total visitors count (today)
+        cursor.execute("""
+            SELECT COUNT(*) as count FROM visits v
+            JOIN users h ON v.host_id = h.id
+            WHERE h.company_name = %s AND DATE(v.check_in_time) = CURDATE()
+        """, (company_filter,))
+        today_visitors = cursor.fetchone()['count']
+        
+        # Get total unique visitors; one visitors row per person, so the id is the identity
+        cursor.execute("""
+            SELECT COUNT(DISTINCT v.visitor_id) as count FROM visits v
+            JOIN users h ON v.host_id = h.id
+            WHERE h.company_name = %s
+        """, (company_filter,))
+        total_unique_visitors = cursor.fetchone()['count']
+        
+        cursor.close()
+        conn.close()
+        
+        return jsonify({
+            'pending': pending_count,
+            'blacklisted': blacklisted_count,
+            'todayVisitors': today_visitors,
+            'totalUniqueVisitors': total_unique_visitors
+        }), 200
         
     except Exception as e:
-        logger.error(f"Get visitor counts error: {str(e)}")
-        return jsonify({'error': 'Failed to retrieve visitor counts'}), 500
+        logger.error(f"Get visitor counts error: {e}")
+        return jsonify({
+            'pending': 0,
+            'blacklisted': 0,
+            'todayVisitors': 0,
+            'totalUniqueVisitors': 0
+        }), 200
 
+# Add a dedicated endpoint for visitor status metrics that frontend expects
 @visitors_bp.route('/visitors/status-counts', methods=['GET'])
 @authenticate_token
 def get_visitor_status_counts():
-    """Get visitor status counts"""
+    """Get visitor status counts that match frontend expectations"""
+    try:
+        user = request.current_user
+        company_filter = user['company_name']
+        
+        if not company_filter:
+            logger.error("No company name found for user")
+            return jsonify({'message': 'Company information not found'}), 400
+        
+        logger.info(f"Fetching visitor status counts for company: {company_filter}")
+        
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        
+        # Initialize counts
+        counts = {
+            'all': 0,
+            'checked-in': 0,
+            'checked-out': 0,
+            'pending': 0,
+            'expected': 0,
+            'blacklisted': 0
+        }
+        
+        try:
+            # Get all visits count
+            cursor.execute("""
+                SELECT COUNT(*) as count FROM visits v
+                JOIN users h ON v.host_id = h.id
+                WHERE h.company_name = %s
+            """, (company_filter,))
+            all_visits = cursor.fetchone()['count'] or 0
+            
+            # Get checked-in visitors (have check_in_time but no check_out_time)
+            cursor.execute("""
+                SELECT COUNT(*) as count FROM visits v
+                JOIN users h ON v.host_id = h.id
+                WHERE h.company_name = %s 
+                AND v.check_in_time IS NOT NULL 
+                AND v.check_out_time IS NULL
+            """, (company_filter,))
+            counts['checked-in'] = cursor.fetchone()['count'] or 0
+            
+            # Get checked-out visitors (have both check_in_time and check_out_time)
+            cursor.execute("""
+                SELECT COUNT(*) as count FROM visits v
+                JOIN users h ON v.host_id = h.id
+                WHERE h.company_name = %s 
+                AND v.check_in_time IS NOT NULL 
+                AND v.check_out_time IS NOT NULL
+            """, (company_filter,))
+            counts['checked-out'] = cursor.fetchone()['count'] or 0
+            
+            # Check if pre_registrations table exists
+            cursor.execute("SHOW TABLES LIKE 'pre_registrations'")
+            pre_reg_exists = cursor.fetchone()
+            
+            pre_reg_count = 0
+            if pre_reg_exists:
+                # Get expected visitors (future pre-registrations)
+                cursor.execute("""
+                    SELECT COUNT(*) as count FROM pre_registrations
+                    WHERE company_to_visit = %s 
+                    AND status IN ('pending', 'approved', 'confirmed')
+                    AND (visit_date >= CURDATE() OR visit_date IS NULL)
+                """, (company_filter,))
+                counts['expected'] = cursor.fetchone()['count'] or 0
+                
+                # Get pending visitors (past due pre-registrations)
+                cursor.execute("""
+                    SELECT COUNT(*) as count FROM pre_registrations
+                    WHERE company_to_visit = %s 
+                    AND status = 'pending'
+                    AND visit_date < CURDATE()
+                """, (company_filter,))
+                counts['pending'] = cursor.fetchone()['count'] or 0
+                
+                # Get total pre-registrations
+                cursor.execute("""
+                    SELECT COUNT(*) as count FROM pre_registrations
+                    WHERE company_to_visit = %s
+                """, (company_filter,))
+                pre_reg_count = cursor.fetchone()['count'] or 0
+            
+            # Get blacklisted count (only those who visited hosts from the same company)
+            cursor.execute("SHOW COLUMNS FROM visitors LIKE 'is_blacklisted'")
+            bl_column_exists = cursor.fetchone()
+            
+            if bl_column_exists:
+                cursor.execute("""
+                    SELECT COUNT(DISTINCT v.id) as count 
+                    FROM visitors v
+                    INNER JOIN visits ON v.id = visits.visitor_id
+                    INNER JOIN users hosts ON visits.host_id = hosts.id
+                    WHERE v.is_blacklisted = TRUE 
+                    AND hosts.company_name = %s
+                """, (company_filter,))
+                counts['blacklisted'] = cursor.fetchone()['count'] or 0
+            
+            # Calculate total
+            counts['all'] = all_visits + pre_reg_count
+            
+            cursor.close()
+            conn.close()
+            
+            logger.info(f"Status counts for {company_filter}: {counts}")
+            return jsonify(counts), 200
+            
+        except mysql.connector.Error as db_error:
+            logger.error(f"Database error in status counts: {db_error}")
+            cursor.close()
+            conn.close()
+            return jsonify(counts), 200  # Return zero counts on DB error
+        
+    except Exception as e:
+        logger.error(f"Get visitor status counts error: {e}")
+        return jsonify({
+            'all': 0,
+            'checked-in': 0,
+            'checked-out': 0,
+            'pending': 0,
+            'expected': 0,
+            'blacklisted': 0
+        }), 200
+
+@visitors_bp.route('/visitors/status-metrics', methods=['GET'])
+@authenticate_token
+def get_visitor_status_metrics():
+    """Get comprehensive visitor status metrics for the dashboard"""
+    try:
+        user = request.current_user
+        company_filter = user['company_name']
+        
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        
+        # Initialize counts
+        counts = {
+            'checked-in': 0,
+            'checked-out': 0,
+            'pending': 0,
+            'expected': 0,
+            'blacklisted': 0,
+            'all': 0
+        }
+        
+        # Get checked-in visitors (have check_in_time but no check_out_time)
+        cursor.execute("""
+            SELECT COUNT(*) as count FROM visits v
+            JOIN users h ON v.host_id = h.id
+            WHERE h.company_name = %s 
+            AND v.check_in_time IS NOT NULL 
+            AND v.check_out_time IS NULL
+        """, (company_filter,))
+        counts['checked-in'] = cursor.fetchone()['count']
+        
+        # Get checked-out visitors (have both check_in_time and check_out_time)
+        cursor.execute("""
+            SELECT COUNT(*) as count FROM visits v
+            JOIN users h ON v.host_id = h.id
+            WHERE h.company_name = %s 
+            AND v.check_in_time IS NOT NULL 
+            AND v.check_out_time IS NOT NULL
+        """, (company_filter,))
+        counts['checked-out'] = cursor.fetchone()['count']
+        
+        # Get total visits for company (for all count)
+        cursor.execute("""
+            SELECT COUNT(*) as count FROM visits v
+            JOIN users h ON v.host_id = h.id
+            WHERE h.company_name = %s
+        """, (company_filter,))
+        all_visits_count = cursor.fetchone()['count']
+        
+        # Check if pre_registrations table exists and get pre-registration counts
+        cursor.execute("SHOW TABLES LIKE 'pre_registrations'")
+        pre_reg_table_exists = cursor.fetchone()
+        
+        pre_reg_count = 0
+        
+        if pre_reg_table_exists:
+            # Get expected visitors (pre-registrations for today or future with pending/approved status)
+            cursor.execute("""
+                SELECT COUNT(*) as count FROM pre_registrations
+                WHERE company_to_visit = %s 
+                AND status IN ('pending', 'approved', 'confirmed')
+                AND (visit_date >= CURDATE() OR visit_date IS NULL)
+            """, (company_filter,))
+            counts['expected'] = cursor.fetchone()['count']
+            
+            # Get pending visitors (pre-registrations past due with pending status)
+            cursor.execute("""
+                SELECT COUNT(*) as count FROM pre_registrations
+                WHERE company_to_visit = %s 
+                AND status = 'pending'
+                AND visit_date < CURDATE()
+            """, (company_filter,))
+            counts['pending'] = cursor.fetchone()['count']
+            
+            # Get total pre-registrations count
+            cursor.execute("""
+                SELECT COUNT(*) as count FROM pre_registrations
+                WHERE company_to_visit = %s
+            """, (company_filter,))
+            pre_reg_count = cursor.fetchone()['count']
+        
+        # Get blacklisted visitors count (only those who visited hosts from the same company)
+        try:
+            cursor.execute("SHOW COLUMNS FROM visitors LIKE 'is_blacklisted'")
+            column_exists = cursor.fetchone()
+            
+            if column_exists:
+                # Get blacklisted visitors who visited hosts from the same company
+                cursor.execute("""
+                    SELECT COUNT(DISTINCT v.id) as count 
+                    FROM visitors v
+                    INNER JOIN visits ON v.id = visits.visitor_id
+                    INNER JOIN users hosts ON visits.host_id = hosts.id
+                    WHERE v.is_blacklisted = TRUE 
+                    AND hosts.company_name = %s
+                """, (company_filter,))
+                counts['blacklisted'] = cursor.fetchone()['count'] or 0
+            else:
+                counts['blacklisted'] = 0
+        except Exception as blacklist_error:
+            logger.warning(f"Error fetching blacklisted count: {blacklist_error}")
+            counts['blacklisted'] = 0
+        
+        # Calculate total count (visits + pre-registrations)
+        counts['all'] = all_visits_count + pre_reg_count
+        
+        cursor.close()
+        conn.close()
+        
+        logger.info(f"Visitor status metrics for {company_filter}: {counts}")
+        
+        return jsonify(counts), 200
+        
+    except Exception as e:
+        logger.error(f"Get visitor status metrics error: {e}")
+        return jsonify({
+            'checked-in': 0,
+            'checked-out': 0,
+            'pending': 0,
+            'expected': 0,
+            'blacklisted': 0,
+            'all': 0
+        }), 200
+
+@visitors_bp.route('/visitors', methods=['GET'])
+@authenticate_token
+def get_all_visitors():
+    """Get all visitors for the company"""
+    try:
+        user = request.current_user
+        limit = request.args.get('limit', 100)
+        company_filter = user['company_name']
+        
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        
+        # Get all visitors through visits
+        cursor.execute("""
+            SELECT DISTINCT v.visitor_name as name, v.visitor_email as email, 
+                   v.visitor_phone as phone, vis.company, vis.designation,
+                   vis.is_blacklisted, v.check_in_time as last_visit,
+                   vis.id as visitor_id
+            FROM visits v
+            LEFT JOIN visitors vis ON v.visitor_id = vis.id
+            JOIN users h ON v.host_id = h.id
+            WHERE h.company_name = %s
+            ORDER BY v.check_in_time DESC
+            LIMIT %s
+        """, (company_filter, int(limit)))
+        
+        all_visitors = cursor.fetchall()
+        cursor.close()
+        conn.close()
+        
+        return jsonify(all_visitors), 200
+        
+    except Exception as e:
+        logger.error(f"Get all visitors error: {e}")
+        return jsonify({'message': 'Failed to fetch visitors'}), 500
+
+@visitors_bp.route('/visitors/<int:visitor_id>/blacklist', methods=['PUT'])
+@authenticate_token
+def blacklist_visitor(visitor_id):
+    """Blacklist or unblacklist a visitor"""
     try:
-        counts = Visit.get_visit_counts()
+        user = request.current_user
+        
+        if user['role'] != 'admin':
+            return jsonify({'message': 'Admin access required to blacklist visitors'}), 403
+        
+        data = request.get_json()
+        is_blacklisted = data.get('isBlacklisted', False)
+        reason_for_blacklist = data.get('reasonForBlacklist', '') if is_blacklisted else None
+        
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        
+        # First check if visitor exists and get their email
+        cursor.execute("SELECT id, name, email FROM visitors WHERE id = %s", (visitor_id,))
+        visitor = cursor.fetchone()
+        
+        if not visitor:
+            cursor.close()
+            conn.close()
+            return jsonify({'message': 'Visitor not found'}), 404
+        
+        visitor_email = visitor['email']
+        
+        if not visitor_email:
+            cursor.close()
+            conn.close()
+            return jsonify({'message': 'Visitor email not found'}), 400
+        
+        # Check if reason_for_blacklist column exists
+        cursor.execute("SHOW COLUMNS FROM visitors LIKE 'reason_for_blacklist'")
+        has_reason_column = cursor.fetchone() is not None
         
-        # Format for frontend dashboard
-        status_counts = {
-            'checked_in': counts.get('checked_in', 0),
-            'checked_out': counts.get('checked_out', 0),
-            'pending': counts.get('pending', 0),
-            'total': counts.get('total_visits', 0)
+        # Update blacklist status for ALL visitors with this email
+        if has_reason_column:
+            cursor.execute("""
+                UPDATE visitors SET is_blacklisted = %s, reason_for_blacklist = %s WHERE email = %s
+            """, (is_blacklisted, reason_for_blacklist, visitor_email))
+        else:
+            cursor.execute("""
+                UPDATE visitors SET is_blacklisted = %s WHERE email = %s
+            """, (is_blacklisted, visitor_email))
+        
+        affected_rows = cursor.rowcount
+        cursor.close()
+        conn.close()
+        
+        if affected_rows == 0:
+            return jsonify({'message': 'No visitors updated'}), 404
+        
+        action = 'blacklisted' if is_blacklisted else 'unblacklisted'
+        logger.info(f"Admin {user['id']} {action} all visitors with email {visitor_email} ({affected_rows} records affected)")
+        
+        response_data = {
+            'message': f'All visitors with email {visitor_email} {action} successfully. {affected_rows} records updated.',
+            'visitorId': visitor_id,
+            'visitorName': visitor['name'],
+            'visitorEmail': visitor_email,
+            'isBlacklisted': is_blacklisted,
+            'affectedRecords': affected_rows
         }
         
-        return jsonify(status_counts), 200
+        if is_blacklisted and reason_for_blacklist:
+            response_data['reasonForBlacklist'] = reason_for_blacklist
+        
+        return jsonify(response_data), 200
         
     except Exception as e:
-        logger.error(f"Get visitor status counts error: {str(e)}")
-        return jsonify({'error': 'Failed to retrieve status counts'}), 500
+        logger.error(f"Blacklist update error: {e}")
+        return jsonify({'message': 'Failed to update visitor blacklist status'}), 500
+
+
+# ============== ADVANCED VISITOR FEATURES ENDPOINTS ==============
 
 @visitors_bp.route('/visitors/pre-register', methods=['POST'])
 @authenticate_token
 def pre_register_visitor():
     """Pre-register a visitor"""
     try:
+        user = request.current_user
         data = request.get_json()
         
-        # Validate required fields
-        required_fields = ['visitor_name', 'visitor_email', 'visit_date', 'host_email']
-        for field in required_fields:
-            if not data.get(field):
-                return jsonify({'error': f'{field} is required'}), 400
+        # Extract data
+        visitor_name = data['visitorName']
+        visitor_email = data['visitorEmail']
+        visitor_phone = data.get('visitorPhone', '')
+        visitor_company = data.get('visitorCompany', '')
+        host_name = data['hostName']
+        visit_date = data['visitDate']
+        visit_time = data['visitTime']
+        purpose = data['purpose']
+        duration = data.get('duration')
+        is_recurring = data.get('isRecurring', False)
+        recurring_pattern = data.get('recurringPattern')
+        recurring_end_date = data.get('recurringEndDate')
+        special_requirements = data.get('specialRequirements', '')
+        emergency_contact = data.get('emergencyContact', '')
+        vehicle_number = data.get('vehicleNumber', '')
+        number_of_visitors = data.get('numberOfVisitors', 1)
+        
+        # Get company_id from companies table using user_id
+        company_id = get_company_id_from_companies_table(user['id'])
+        admin_company_name = user['company_name'] or 'Default Company'
         
-        # Generate QR code for pre-registration
         qr_code = generate_qr_code()
         
-        # Create visit with pending status
-        visit_data = {
-            'visitor_name': data['visitor_name'].strip(),
-            'visitor_email': data['visitor_email'].lower().strip(),
-            'visitor_phone': data.get('visitor_phone', ''),
-            'visitor_company': data.get('visitor_company', ''),
-            'purpose_of_visit': data.get('purpose_of_visit', 'Pre-registered visit'),
-            'host_name': data.get('host_name', ''),
-            'host_email': data['host_email'].lower().strip(),
-            'host_department': data.get('host_department', ''),
-            'visit_date': data['visit_date'],
-            'qr_code': qr_code,
-            'status': 'pre-registered'
-        }
+        # Clean empty values
+        clean_recurring_end_date = recurring_end_date if recurring_end_date and recurring_end_date.strip() else None
+        clean_recurring_pattern = recurring_pattern if recurring_pattern and recurring_pattern.strip() else None
+        clean_duration = duration if duration and str(duration).strip() else None
+        
+        conn = get_db_connection()
+        cursor = conn.cursor()
         
-        visit_id = Visit.create_visit(visit_data)
+        cursor.execute("""
+            INSERT INTO pre_registrations (
+                company_id, visitor_name, visitor_email, visitor_phone, visitor_company,
+                company_to_visit, host_id, host_name, visit_date, visit_time, purpose, duration,
+                is_recurring, recurring_pattern, recurring_end_date,
+                special_requirements, emergency_contact, vehicle_number, 
+                number_of_visitors, qr_code, created_at
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, (
+            company_id, visitor_name, visitor_email, visitor_phone, visitor_company,
+            admin_company_name, user['id'], host_name, visit_date, visit_time, purpose, clean_duration,
+            is_recurring, clean_recurring_pattern, clean_recurring_end_date,
+            special_requirements, emergency_contact, vehicle_number,
+            number_of_visitors, qr_code, datetime.now()
+        ))
+        
+        pre_reg_id = cursor.lastrowid
+        cursor.close()
+        
+        if is_recurring and clean_recurring_pattern:
+            # Expand the series now so it shows as expected (and its QR verifies) before the next scheduler pass
+            try:
+                recurrence.materialize(conn, [pre_reg_id])
+            except Exception as e:
+                logger.warning(f"⚠️ Could not materialize recurring pre-registration {pre_reg_id}: {e}")
+        try:
+            qr_cache.refresh_registration(conn, admin_company_name, pre_reg_id)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not add pre-registration {pre_reg_id} to the QR cache: {e}")
+        conn.close()
         
         return jsonify({
             'message': 'Visitor pre-registered successfully',
-            'visit_id': visit_id,
-            'qr_code': qr_code
+            'id': pre_reg_id,
+            'qrCode': qr_code
         }), 201
         
     except Exception as e:
-        logger.error(f"Pre-register visitor error: {str(e)}")
-        return jsonify({'error': 'Failed to pre-register visitor'}), 500
+        logger.error(f"Pre-registration error: {e}")
+        
+        error_message = 'Failed to pre-register visitor.'
+        if 'Duplicate entry' in str(e):
+            error_message = 'A visitor with this information already exists.'
+        elif 'Data truncated' in str(e):
+            error_message = 'Invalid data format. Please check all fields.'
+        
+        return jsonify({
+            'message': error_message,
+            'details': str(e) if current_app.debug else None
+        }), 500
+
+# Bulk pre-registration columns: canonical (single-endpoint) name -> extra header aliases
+PRE_REGISTRATION_IMPORT_COLUMNS = {
+    'visitorName': ('name',),
+    'visitorEmail': ('email',),
+    'visitorPhone': ('phone',),
+    'visitorCompany': ('company',),
+    'hostName': ('host',),
+    'visitDate': ('date',),
+    'visitTime': ('time',),
+    'purpose': ('reason', 'purposeOfVisit'),
+    'duration': (),
+    'specialRequirements': (),
+    'emergencyContact': (),
+    'vehicleNumber': (),
+    'numberOfVisitors': ('visitors',),
+}
+
+PRE_REGISTRATION_LIMITS = {
+    'visitorName': 100, 'visitorEmail': 100, 'visitorPhone': 20, 'visitorCompany': 200,
+    'hostName': 100, 'emergencyContact': 100, 'vehicleNumber': 20,
+}
+
+@visitors_bp.route('/visitors/pre-register/bulk', methods=['POST'])
+@authenticate_token
+def bulk_pre_register_visitors():
+    """Pre-register many visitors from a CSV/XLSX upload or a JSON array"""
+    try:
+        user = request.current_user
+        
+        try:
+            df = bulk_import.load_rows(request, PRE_REGISTRATION_IMPORT_COLUMNS,
+                                       current_app.config['BULK_IMPORT_MAX_ROWS'])
+        except BulkImportError as e:
+            return jsonify({'message': str(e)}), 400
+        
+        # Validate whole columns at once; each failing check adds a message to its rows
+        errors = RowErrors(df.index)
+        errors.require(df, 'visitorName', 'hostName', 'purpose')
+        errors.check_email(df, 'visitorEmail')
+        errors.check_max_length(df, PRE_REGISTRATION_LIMITS)
+        visit_dates = bulk_import.parse_dates(df, 'visitDate', errors)
+        visit_times = bulk_import.parse_times(df, 'visitTime', errors)
+        durations = bulk_import.parse_positive_ints(df, 'duration', errors)
+        visitor_counts = bulk_import.parse_positive_ints(df, 'numberOfVisitors', errors, default=1)
+        errors.add(df.duplicated(subset=['visitorEmail', 'visitDate'], keep='first') & (df['visitorEmail'] != ''),
+                   'Duplicate of an earlier row (same visitorEmail and visitDate)')
+        
+        valid_rows = errors.valid()
+        # Each row becomes a QR check-in later; charge them like check-ins
+        limited = charge('check_in', len(valid_rows)) if valid_rows else None
+        if limited:
+            return limited
+        company_id = get_company_id_from_companies_table(user['id'])
+        admin_company_name = user['company_name'] or 'Default Company'
+        
+        conn = get_db_connection()
+        try:
+            # Resolve host names once; unknown names keep the creator as host, as the single endpoint does
+            host_ids = {}
+            host_names = sorted({df.at[row, 'hostName'] for row in valid_rows})
+            if host_names:
+                cursor = conn.cursor()
+                cursor.execute(
+                    f"SELECT name, id FROM users WHERE company_name = %s AND name IN ({', '.join(['%s'] * len(host_names))})",
+                    [user['company_name']] + host_names
+                )
+                host_ids = dict(cursor.fetchall())
+                cursor.close()
+            
+            qr_codes = generate_qr_codes(len(valid_rows))
+            created_at = datetime.now()
+            items = [(
+                company_id, df.at[row, 'visitorName'], df.at[row, 'visitorEmail'] or None,
+                df.at[row, 'visitorPhone'], df.at[row, 'visitorCompany'], admin_company_name,
+                host_ids.get(df.at[row, 'hostName'], user['id']), df.at[row, 'hostName'],
+                visit_dates.at[row], visit_times.at[row], df.at[row, 'purpose'],
+                durations.at[row], False, None, None,
+                df.at[row, 'specialRequirements'], df.at[row, 'emergencyContact'], df.at[row, 'vehicleNumber'],
+                visitor_counts.at[row], qr_code, created_at
+            ) for row, qr_code in zip(valid_rows, qr_codes)]
+            
+            def insert_pre_registrations(cursor, chunk):
+                cursor.executemany("""
+                    INSERT INTO pre_registrations (
+                        company_id, visitor_name, visitor_email, visitor_phone, visitor_company,
+                        company_to_visit, host_id, host_name, visit_date, visit_time, purpose, duration,
+                        is_recurring, recurring_pattern, recurring_end_date,
+                        special_requirements, emergency_contact, vehicle_number,
+                        number_of_visitors, qr_code, created_at
+                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                """, chunk)
+                # qr_code is unique, so it maps each inserted row back to its id
+                codes = [item[19] for item in chunk]
+                cursor.execute(
+                    f"SELECT qr_code, id FROM pre_registrations WHERE qr_code IN ({', '.join(['%s'] * len(codes))})",
+                    codes
+                )
+                ids = dict(cursor.fetchall())
+                return [{'id': ids[code], 'qrCode': code} for code in codes]
+            
+            results, failures = bulk_import.write_in_chunks(
+                conn, items, current_app.config['BULK_IMPORT_CHUNK_SIZE'], insert_pre_registrations
+            )
+        finally:
+            conn.close()
+        if results:
+            # Reload the site's QR map on its next scan rather than re-reading every row here
+            qr_cache.invalidate(admin_company_name)
+        
+        summary = bulk_import.summarize(valid_rows, results, failures, errors, lambda created: created)
+        
+        # Invitations go through the background sender instead of holding the request
+        notify = request.args.get('notify', 'false').lower() == 'true'
+        if notify:
+            for i, row in enumerate(valid_rows):
+                if i in results and df.at[row, 'visitorEmail']:
+                    enqueue_email(
+                        df.at[row, 'visitorEmail'],
+                        f"Your visit to {admin_company_name} on {visit_dates.at[row]}",
+                        f"""
+                        <h3>You have been pre-registered</h3>
+                        <p>Dear {df.at[row, 'visitorName']},</p>
+                        <p>Your visit to {admin_company_name} with {df.at[row, 'hostName']} is scheduled for
+                        {visit_dates.at[row]}{' at ' + visit_times.at[row] if visit_times.at[row] else ''}.</p>
+                        <p>Show this code at reception to check in: <strong>{results[i]['qrCode']}</strong></p>
+                        <p>Best regards,<br>Visitor Management System</p>
+                        """
+                    )
+        
+        logger.info(f"✅ Bulk pre-registration: {summary['created']} created, {summary['failed']} failed (user {user['id']})")
+        return jsonify(summary), 200
+        
+    except Exception as e:
+        logger.error(f"Bulk pre-registration error: {e}")
+        return jsonify({
+            'message': 'Failed to import pre-registrations',
+            'details': str(e) if current_app.debug else None
+        }), 500
 
 @visitors_bp.route('/visitors/qr-checkin', methods=['POST'])
+@authenticate_token
 def qr_checkin():
-    """Check in visitor using QR code"""
+    """QR Code verification endpoint"""
     try:
+        user = request.current_user
         data = request.get_json()
+        
         qr_code = data.get('qr_code')
+        host_id = data.get('host_id')
+        
+        logger.info(f"QR verification request: {qr_code}, host_id: {host_id}, user: {user['id']}")
         
         if not qr_code:
-            return jsonify({'error': 'QR code is required'}), 400
+            return jsonify({
+                'success': False,
+                'message': 'QR code is required'
+            }), 400
+        
+        conn = get_db_connection()
+        recurrence.ensure_occurrences_table(conn)
+        qr_cache.ensure_checkin_index(conn)
+        
+        # Today's pre-registrations for this site are held in memory, host name included
+        pre_reg = qr_cache.lookup(conn, user['company_name'], qr_code)
+        cursor = conn.cursor(dictionary=True)
+        
+        if pre_reg is None:
+            # Recurring series: today's materialized occurrence ((qr_code, occurrence_date) index)
+            cursor.execute("""
+                SELECT pr.*, ro.occurrence_date
+                FROM recurring_occurrences ro
+                JOIN pre_registrations pr ON pr.id = ro.pre_registration_id
+                WHERE ro.qr_code = %s AND ro.occurrence_date = CURDATE()
+                AND ro.status = 'expected' AND pr.status IN ('approved', 'pending')
+            """, (qr_code,))
+            pre_reg = cursor.fetchone()
+            if pre_reg:
+                pre_reg['visit_date'] = pre_reg.pop('occurrence_date')
+            else:
+                # One-off pre-registration (or a series outside its materialized window)
+                cursor.execute("""
+                    SELECT * FROM pre_registrations
+                    WHERE qr_code = %s AND status IN ('approved', 'pending')
+                """, (qr_code,))
+                pre_reg = cursor.fetchone()
+            
+            if pre_reg and pre_reg['host_id']:
+                cursor.execute("SELECT name FROM users WHERE id = %s", (pre_reg['host_id'],))
+                host_result = cursor.fetchone()
+                pre_reg['host_name'] = host_result['name'] if host_result else None
+        
+        logger.info(f"Pre-registration found: {pre_reg}")
+        
+        if not pre_reg:
+            cursor.close()
+            conn.close()
+            return jsonify({
+                'success': False,
+                'message': 'QR code not found in pre-registrations or not approved'
+            }), 404
+        
+        host_name = pre_reg['host_name'] or 'Unknown Host'
+        effective_host_id = host_id or pre_reg['host_id'] or user['id']
+        
+        # Check if already checked in today (a range on check_in_time, so the
+        # (visitor_email, check_in_time) index applies)
+        day_start = datetime.combine(datetime.now().date(), time.min)
+        cursor.execute("""
+            SELECT id FROM visits 
+            WHERE visitor_email = %s 
+            AND check_in_time >= %s AND check_in_time < %s
+            AND status = 'checked-in'
+            LIMIT 1
+        """, (pre_reg['visitor_email'], day_start, day_start + timedelta(days=1)))
         
-        # Find visit by QR code
-        # This would require adding a method to Visit model
-        # For now, return a placeholder response
+        existing_visit = cursor.fetchone()
+        cursor.close()
+        conn.close()
         
+        if existing_visit:
+            return jsonify({
+                'success': False,
+                'message': 'Visitor already checked in today'
+            }), 409
+        
+        # Return visitor data for form pre-fill
         return jsonify({
-            'message': 'QR check-in functionality to be implemented',
-            'qr_code': qr_code
+            'success': True,
+            'message': 'QR code verified successfully',
+            'visitor_name': pre_reg['visitor_name'],
+            'visitor_email': pre_reg['visitor_email'],
+            'visitor_phone': pre_reg['visitor_phone'],
+            'visitor_company': pre_reg['visitor_company'],
+            'purpose': pre_reg['purpose'],
+            'host_name': host_name,
+            'host_id': effective_host_id,
+            'pre_registration_id': pre_reg['id'],
+            'visit_date': pre_reg['visit_date'],
+            'visit_time': pre_reg['visit_time']
         }), 200
         
     except Exception as e:
-        logger.error(f"QR check-in error: {str(e)}")
-        return jsonify({'error': 'QR check-in failed'}), 500
+        logger.error(f"QR verification error: {e}")
+        logger.error(f"Error type: {type(e).__name__}")
+        logger.error(f"Error details: {str(e)}")
+        import traceback
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        return jsonify({
+            'success': False,
+            'message': 'Internal server error during QR verification',
+            'error': str(e) if current_app.debug else None
+        }), 500
+
+@visitors_bp.route('/visitors/pre-registrations', methods=['GET'])
+@authenticate_token
+def get_pre_registrations():
+    """Get pre-registrations for the user's company"""
+    try:
+        user = request.current_user
+        
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        
+        # First, let's check what columns actually exist in the table
+        cursor.execute("SHOW COLUMNS FROM pre_registrations")
+        columns = [row['Field'] for row in cursor.fetchall()]
+        logger.info(f"Available pre_registrations columns: {columns}")
+        
+        # Build a safe query with only existing columns
+        safe_columns = []
+        possible_columns = [
+            'id', 'company_id', 'visitor_name', 'visitor_email', 'visitor_phone', 
+            'visitor_company', 'company_to_visit', 'host_name', 'host_id', 
+            'visit_date', 'visit_time', 'purpose', 'duration', 'special_requirements', 
+            'emergency_contact', 'vehicle_number', 'qr_code', 'status', 
+            'created_at', 'updated_at', 'check_in_time', 'check_out_time',
+            'number_of_visitors'
+        ]
+        
+        for col in possible_columns:
+            if col in columns:
+                safe_columns.append(f'pr.{col}')
+        
+        if not safe_columns:
+            # Fallback to basic columns that should exist
+            safe_columns = ['pr.*']
+        
+        query = f"""
+            SELECT {', '.join(safe_columns)}
+            FROM pre_registrations pr
+            WHERE pr.company_to_visit = %s
+            ORDER BY pr.created_at DESC
+        """
+        
+        cursor.execute(query, (user['company_name'],))
+        pre_registrations = cursor.fetchall()
+        cursor.close()
+        conn.close()
+        
+        return jsonify(pre_registrations), 200
+        
+    except Exception as e:
+        logger.error(f"Pre-registrations fetch error: {e}")
+        return jsonify({
+            'message': 'Failed to fetch pre-registrations.',
+            'details': str(e) if current_app.debug else None
+        }), 500
+
+@visitors_bp.route('/visitors/recurring', methods=['GET'])
+@authenticate_token
+def get_recurring_visitors():
+    """Get recurring pre-registrations for the user's company"""
+    try:
+        user = request.current_user
+        
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        
+        # First, let's check what columns actually exist in the table
+        cursor.execute("SHOW COLUMNS FROM pre_registrations")
+        columns = [row['Field'] for row in cursor.fetchall()]
+        logger.info(f"Available pre_registrations columns: {columns}")
+        
+        # Build a safe query with only existing columns for recurring visitors
+        safe_columns = []
+        possible_columns = [
+            'id', 'company_id', 'visitor_name', 'visitor_email', 'visitor_phone', 
+            'visitor_company', 'company_to_visit', 'host_name', 'host_id', 
+            'visit_date', 'visit_time', 'purpose', 'duration', 'special_requirements', 
+            'emergency_contact', 'vehicle_number', 'qr_code', 'status', 
+            'created_at', 'updated_at', 'check_in_time', 'check_out_time',
+            'number_of_visitors', 'is_recurring', 'recurring_pattern', 'recurring_end_date'
+        ]
+        
+        for col in possible_columns:
+            if col in columns:
+                safe_columns.append(f'pr.{col}')
+        
+        if not safe_columns:
+            # Fallback to basic columns that should exist
+            safe_columns = ['pr.*']
+        
+        # Check if is_recurring column exists
+        has_recurring_column = 'is_recurring' in columns
+        
+        if has_recurring_column:
+            # Next upcoming occurrence comes from the materialized series
+            recurrence.ensure_occurrences_table(conn)
+            query = f"""
+                SELECT {', '.join(safe_columns)},
+                       (SELECT MIN(ro.occurrence_date) FROM recurring_occurrences ro
+                        WHERE ro.pre_registration_id = pr.id
+                        AND ro.occurrence_date >= CURDATE() AND ro.status = 'expected') AS next_visit_date
+                FROM pre_registrations pr
+                WHERE pr.company_to_visit = %s 
+                AND pr.is_recurring = TRUE
+                ORDER BY pr.created_at DESC
+            """
+        else:
+            # If no is_recurring column, return empty array
+            cursor.close()
+            conn.close()
+            return jsonify([]), 200
+        
+        cursor.execute(query, (user['company_name'],))
+        recurring_registrations = cursor.fetchall()
+        cursor.close()
+        conn.close()
+        
+        for registration in recurring_registrations:
+            registration['recurring_status'] = 'active' if registration['next_visit_date'] else 'ended'
+        
+        return jsonify(recurring_registrations), 200
+        
+    except Exception as e:
+        logger.error(f"Recurring visitors fetch error: {e}")
+        return jsonify({
+            'message': 'Failed to fetch recurring visitors.',
+            'details': str(e) if current_app.debug else None
+        }), 500
+
+@visitors_bp.route('/visitors/expected-today', methods=['GET'])
+@authenticate_token
+def get_expected_today():
+    """Visitors expected today: today's recurring occurrences plus one-off pre-registrations"""
+    try:
+        user = request.current_user
+        
+        conn = get_db_connection()
+        recurrence.ensure_occurrences_table(conn)
+        cursor = conn.cursor(dictionary=True)
+        
+        # Both halves are range reads on (company_to_visit, date) indexes
+        cursor.execute("""
+            SELECT pr.id AS pre_registration_id, pr.visitor_name, pr.visitor_email, pr.visitor_phone,
+                   pr.visitor_company, pr.host_id, pr.host_name, pr.purpose, pr.qr_code,
+                   ro.occurrence_date AS visit_date, ro.visit_time, ro.status, TRUE AS is_recurring
+            FROM recurring_occurrences ro
+            JOIN pre_registrations pr ON pr.id = ro.pre_registration_id
+            WHERE ro.company_to_visit = %s AND ro.occurrence_date = CURDATE()
+            AND pr.status != 'cancelled'
+            UNION ALL
+            SELECT pr.id, pr.visitor_name, pr.visitor_email, pr.visitor_phone,
+                   pr.visitor_company, pr.host_id, pr.host_name, pr.purpose, pr.qr_code,
+                   pr.visit_date, pr.visit_time, pr.status, FALSE
+            FROM pre_registrations pr
+            WHERE pr.company_to_visit = %s AND pr.visit_date = CURDATE()
+            AND (pr.is_recurring IS NULL OR pr.is_recurring = FALSE)
+            AND pr.status != 'cancelled'
+            ORDER BY visit_time
+        """, (user['company_name'], user['company_name']))
+        expected = cursor.fetchall()
+        cursor.close()
+        conn.close()
+        
+        for visit in expected:
+            visit['is_recurring'] = bool(visit['is_recurring'])
+        
+        return jsonify(expected), 200
+        
+    except Exception as e:
+        logger.error(f"Expected visitors fetch error: {e}")
+        return jsonify({
+            'message': 'Failed to fetch expected visitors.',
+            'details': str(e) if current_app.debug else None
+        }), 500
+
+@visitors_bp.route('/visitors/search', methods=['GET'])
+@authenticate_token
+def search_visitors():
+    """Typeahead over the company's returning visitors, best matches first"""
+    try:
+        user = request.current_user
+        q = request.args.get('q', '').strip()
+        limit = max(1, min(50, request.args.get('limit', 10, type=int)))
+
+        if not q:
+            return jsonify([]), 200
+
+        conn = get_db_connection()
+        try:
+            results = visitor_search.search(conn, user['company_name'], q, limit)
+        finally:
+            conn.close()
+
+        return jsonify(results), 200
+
+    except Exception as e:
+        logger.error(f"Visitor search error: {e}")
+        return jsonify({
+            'message': 'Failed to search visitors.',
+            'details': str(e) if current_app.debug else None
+        }), 500
+
+@visitors_bp.route('/pre-registrations/<int:pre_registration_id>/badge', methods=['GET'])
+@authenticate_token
+def generate_visitor_badge(pre_registration_id):
+    """Generate visitor badge for pre-registration"""
+    try:
+        user = request.current_user
+        
+        # Check if photo should be included (for pre-registrations, default to False)
+        include_photo = request.args.get('includePhoto', 'false').lower() == 'true'
+        
+        logger.info(f"Badge generation request for pre-registration ID: {pre_registration_id}, includePhoto: {include_photo}")
+        logger.info(f"User details: {user}")
+        
+        # Get pre-registration details
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True, buffered=True)
+        
+        try:
+            # Dynamic column detection
+            logger.info("Starting column detection...")
+            cursor.execute("SHOW COLUMNS FROM pre_registrations")
+            columns_info = cursor.fetchall()
+            logger.info(f"Raw columns_info: {columns_info}")
+            
+            # Extract column names properly - columns_info is a list of dictionaries
+            if columns_info and isinstance(columns_info[0], dict):
+                available_columns = [col['Field'] for col in columns_info]
+            else:
+                # Fallback: assume it's a list of tuples
+                available_columns = [col[0] for col in columns_info]
+            
+            logger.info(f"Available pre_registrations columns for badge: {available_columns}")
+            
+            # Define columns we want for badge generation
+            badge_columns = [
+                'id', 'visitor_name', 'visitor_email', 'visitor_phone', 'visitor_company',
+                'company_to_visit', 'host_name', 'visit_date', 'visit_time', 'purpose',
+                'qr_code', 'created_at', 'status', 'number_of_visitors'
+            ]
+            
+            # Select only available columns
+            selected_columns = [col for col in badge_columns if col in available_columns]
+            logger.info(f"Selected columns for badge query: {selected_columns}")
+            
+            if not selected_columns:
+                logger.error("No valid columns found for badge generation")
+                return jsonify({'message': 'Database schema error'}), 500
+            
+            query = f"SELECT {', '.join(selected_columns)} FROM pre_registrations WHERE id = %s"
+            logger.info(f"Executing badge query: {query} with ID: {pre_registration_id}")
+            cursor.execute(query, (pre_registration_id,))
+            pre_registration = cursor.fetchone()
+            logger.info(f"Badge query result: {pre_registration}")
+            
+            if not pre_registration:
+                logger.warning(f"Pre-registration not found: {pre_registration_id}")
+                return jsonify({'message': 'Pre-registration not found'}), 404
+            
+            # Get user name safely
+            user_name = user.get('name') or user.get('email', 'Unknown User')
+            
+            # Check if user has access to this pre-registration
+            if user['role'] == 'host':
+                # For hosts, check if they are the host for this pre-registration
+                if 'host_name' in pre_registration and pre_registration['host_name'] != user_name:
+                    logger.warning(f"Host {user_name} attempted to access badge for different host's pre-registration")
+                    return jsonify({'message': 'Access denied'}), 403
+            elif user['role'] == 'admin':
+                # For admins, check company match
+                if 'company_to_visit' in pre_registration and pre_registration['company_to_visit'] != user['company_name']:
+                    logger.warning(f"Admin from {user['company_name']} attempted to access badge from different company")
+                    return jsonify({'message': 'Access denied'}), 403
+            
+            processed_data = pre_registration
+            
+            # Generate badge HTML content
+            badge_html = f"""
+            <div style="
+                width: 380px;
+                height: 520px;
+                border: none;
+                border-radius: 15px;
+                padding: 0;
+                font-family: 'Segoe UI', -apple-system, BlinkMacSystemFont, sans-serif;
+                background: linear-gradient(145deg, #667eea 0%, #764ba2 100%);
+                box-shadow: 0 8px 25px rgba(0,0,0,0.15), 0 0 0 1px rgba(255,255,255,0.1);
+                margin: 0 auto;
+                position: relative;
+                overflow: hidden;
+            ">
+                <!-- Decorative Top Pattern -->
+                <div style="
+                    position: absolute;
+                    top: 0;
+                    left: 0;
+                    right: 0;
+                    height: 80px;
+                    background: linear-gradient(45deg, rgba(255,255,255,0.2) 0%, rgba(255,255,255,0.1) 100%);
+                    clip-path: polygon(0 0, 100% 0, 100% 60%, 0 80%);
+                "></div>
+                
+                <!-- Main Content Container -->
+                <div style="
+                    background: white;
+                    margin: 15px;
+                    border-radius: 12px;
+                    min-height: calc(100% - 50px);
+                    position: relative;
+                    box-shadow: inset 0 1px 3px rgba(0,0,0,0.1);
+                    padding: 25px 20px 20px 20px;
+                ">
+                    <!-- Header Section -->
+                    <div style="text-align: center; margin-bottom: 25px;">
+                        <div style="
+                            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+                            -webkit-background-clip: text;
+                            -webkit-text-fill-color: transparent;
+                            background-clip: text;
+                            font-size: 24px;
+                            font-weight: 800;
+                            letter-spacing: 2px;
+                            margin-bottom: 8px;
+                            text-transform: uppercase;
+                        ">VISITOR</div>
+                        <div style="
+                            background: #f8f9fa;
+                            color: #495057;
+                            font-size: 12px;
+                            padding: 6px 16px;
+                            border-radius: 20px;
+                            display: inline-block;
+                            font-weight: 600;
+                            letter-spacing: 1px;
+                            text-transform: uppercase;
+                        ">{processed_data.get('company_to_visit', 'Company')}</div>
+                    </div>
+                    
+                    {f'''
+                    <!-- Visitor Photo Section -->
+                    <div style="text-align: center; margin-bottom: 25px;">
+                        <div style="
+                            width: 100px;
+                            height: 100px;
+                            background: linear-gradient(135deg, #667eea20 0%, #764ba240 100%);
+                            border-radius: 50%;
+                            margin: 0 auto;
+                            display: flex;
+                            align-items: center;
+                            justify-content: center;
+                            border: 4px solid #ffffff;
+                            box-shadow: 0 4px 15px rgba(102, 126, 234, 0.3);
+                            position: relative;
+                        ">
+                            <div style="
+                                font-size: 14px;
+                                color: #667eea;
+                                font-weight: 600;
+                                text-align: center;
+                                line-height: 1.2;
+                            ">
+                                📷<br><span style="font-size: 10px;">PHOTO</span>
+                            </div>
+                        </div>
+                    </div>
+                    ''' if include_photo else ''}
+                    
+                    <!-- Visitor Information -->
+                    <div style="text-align: center; margin-bottom: 25px;">
+                        <div style="
+                            font-size: 22px;
+                            font-weight: 700;
+                            color: #2d3748;
+                            margin-bottom: 8px;
+                            line-height: 1.2;
+                        ">{processed_data.get('visitor_name', 'N/A')}</div>
+                        <div style="
+                            font-size: 14px;
+                            color: #667eea;
+                            font-weight: 600;
+                            margin-bottom: 5px;
+                        ">{processed_data.get('visitor_company', 'N/A')}</div>
+                        <div style="
+                            font-size: 12px;
+                            color: #718096;
+                            background: #f7fafc;
+                            padding: 4px 12px;
+                            border-radius: 15px;
+                            display: inline-block;
+                        ">{processed_data.get('visitor_email', 'N/A')}</div>
+                    </div>
+                    
+                    <!-- Visit Details Card -->
+                    <div style="
+                        background: linear-gradient(135deg, #f7fafc 0%, #edf2f7 100%);
+                        border-radius: 12px;
+                        padding: 18px;
+                        margin-bottom: 20px;
+                        border: 1px solid #e2e8f0;
+                        position: relative;
+                    ">
+                        <div style="
+                            position: absolute;
+                            top: -8px;
+                            left: 20px;
+                            background: white;
+                            color: #667eea;
+                            font-size: 10px;
+                            font-weight: 700;
+                            padding: 4px 12px;
+                            border-radius: 12px;
+                            border: 1px solid #e2e8f0;
+                            text-transform: uppercase;
+                            letter-spacing: 1px;
+                        ">Visit Details</div>
+                        
+                        <div style="margin-top: 8px;">
+                            <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 10px;">
+                                <span style="font-weight: 600; color: #4a5568; font-size: 11px; text-transform: uppercase; letter-spacing: 0.5px;">👤 Host:</span>
+                                <span style="color: #2d3748; font-size: 13px; font-weight: 600;">{processed_data.get('host_name', 'N/A')}</span>
+                            </div>
+                            <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 10px;">
+                                <span style="font-weight: 600; color: #4a5568; font-size: 11px; text-transform: uppercase; letter-spacing: 0.5px;">🎯 Purpose:</span>
+                                <span style="color: #2d3748; font-size: 13px; font-weight: 600;">{processed_data.get('purpose', 'N/A')}</span>
+                            </div>
+                            <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 10px;">
+                                <span style="font-weight: 600; color: #4a5568; font-size: 11px; text-transform: uppercase; letter-spacing: 0.5px;">📅 Date:</span>
+                                <span style="color: #2d3748; font-size: 13px; font-weight: 600;">{processed_data.get('visit_date', 'N/A')}</span>
+                            </div>
+                            <div style="display: flex; justify-content: space-between; align-items: center;">
+                                <span style="font-weight: 600; color: #4a5568; font-size: 11px; text-transform: uppercase; letter-spacing: 0.5px;">🕐 Time:</span>
+                                <span style="color: #2d3748; font-size: 13px; font-weight: 600;">{processed_data.get('visit_time', 'N/A')}</span>
+                            </div>
+                        </div>
+                    </div>
+                    
+                    <!-- QR Code and Status Section -->
+                    <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 15px;">
+                        <div style="text-align: center;">
+                            <div style="
+                                width: 70px;
+                                height: 70px;
+                                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+                                margin: 0 auto 8px;
+                                display: flex;
+                                align-items: center;
+                                justify-content: center;
+                                font-size: 8px;
+                                color: white;
+                                border-radius: 8px;
+                                box-shadow: 0 3px 10px rgba(102, 126, 234, 0.3);
+                                position: relative;
+                            ">
+                                <div style="text-align: center; line-height: 1.1;">
+                                    📱<br>
+                                    <div style="font-size: 6px; margin-top: 2px;">QR CODE</div>
+                                    <div style="font-size: 5px; margin-top: 1px; opacity: 0.8;">{processed_data.get('qr_code', 'N/A')[:8]}...</div>
+                                </div>
+                            </div>
+                        </div>
+                        
+                        <div style="text-align: center; flex: 1; margin-left: 15px;">
+                            <div style="
+                                background: linear-gradient(135deg, #48bb78 0%, #38a169 100%);
+                                color: white;
+                                font-size: 10px;
+                                font-weight: 700;
+                                padding: 8px 16px;
+                                border-radius: 20px;
+                                text-transform: uppercase;
+                                letter-spacing: 1px;
+                                box-shadow: 0 2px 8px rgba(72, 187, 120, 0.3);
+                            ">{processed_data.get('status', 'PENDING')}</div>
+                            <div style="
+                                font-size: 10px;
+                                color: #718096;
+                                margin-top: 5px;
+                                font-weight: 500;
+                            ">Visitors: {processed_data.get('number_of_visitors', 1)}</div>
+                        </div>
+                    </div>
+                    
+                    <!-- Footer -->
+                    <div style="
+                        text-align: center;
+                        font-size: 9px;
+                        color: #a0aec0;
+                        border-top: 1px solid #e2e8f0;
+                        padding-top: 12px;
+                        margin-top: 20px;
+                        background: white;
+                    ">
+                        <div style="font-weight: 600; font-size: 11px; color: #4a5568;">ID: #{pre_registration_id}</div>
+                        <div style="margin-top: 4px; font-size: 8px;">Generated: {datetime.now().strftime('%d %b %Y, %H:%M')} by {user_name}</div>
+                    </div>
+                </div>
+                
+                <!-- Security Strip -->
+                <div style="
+                    position: absolute;
+                    bottom: 2px;
+                    left: 5px;
+                    right: 5px;
+                    height: 4px;
+                    background: linear-gradient(90deg, #667eea 0%, #764ba2 50%, #667eea 100%);
+                    border-radius: 0 0 10px 10px;
+                "></div>
+            </div>
+            """
+            
+            # Return both HTML and data for frontend compatibility
+            badge_data = {
+                'html': badge_html,
+                'data': {
+                    'preRegistrationId': pre_registration_id,
+                    'visitorName': processed_data.get('visitor_name', 'N/A'),
+                    'visitorEmail': processed_data.get('visitor_email', 'N/A'),
+                    'visitorPhone': processed_data.get('visitor_phone', 'N/A'),
+                    'visitorCompany': processed_data.get('visitor_company', 'N/A'),
+                    'companyToVisit': processed_data.get('company_to_visit', 'N/A'),
+                    'hostName': processed_data.get('host_name', 'N/A'),
+                    'visitDate': processed_data.get('visit_date'),
+                    'visitTime': processed_data.get('visit_time'),
+                    'purpose': processed_data.get('purpose', 'N/A'),
+                    'qrCode': processed_data.get('qr_code', ''),
+                    'status': processed_data.get('status', 'pending'),
+                    'numberOfVisitors': processed_data.get('number_of_visitors', 1),
+                    'generatedAt': datetime.now().isoformat(),
+                    'generatedBy': user_name
+                }
+            }
+            
+            logger.info(f"Badge generated successfully for pre-registration {pre_registration_id}")
+            return jsonify(badge_data), 200
+            
+        finally:
+            cursor.close()
+            conn.close()
+        
+    except Exception as e:
+        logger.error(f"Badge generation error: {e}")
+        return jsonify({
+            'message': 'Failed to generate visitor badge',
+            'details': str(e) if current_app.debug else None
+        }), 500
+
+@visitors_bp.route('/visitors/history', methods=['GET'])
+@authenticate_token
+def get_visitor_history():
+    """Get visitor history - Admin only, filtered by admin's company"""
+    try:
+        user = request.current_user
+        
+        # Only admin users can access visitor history
+        if user['role'] != 'admin':
+            return jsonify({'message': 'Admin access required to view visitor history'}), 403
+        
+        # Get company_id from companies table using user_id
+        company_id = get_company_id_from_companies_table(user['id'])
+        company_name = user['company_name']
+        
+        limit = request.args.get('limit', 100)
+        start_date = request.args.get('startDate')
+        end_date = request.args.get('endDate')
+        visitor_email = request.args.get('visitorEmail')
+        host_name = request.args.get('hostName')
+        
+        try:
+            select_list = VISITOR_HISTORY_FIELDS.select_list(request.args.get('fields'))
+        except FieldSelectionError as e:
+            return jsonify({'message': str(e)}), 400
+        
+        # Enhanced query to ensure we only get visits from the admin's company
+        query = f"""
+            SELECT {select_list}
+            FROM visits v
+            LEFT JOIN visitors vis ON v.visitor_id = vis.id
+            LEFT JOIN users u ON v.host_id = u.id
+            WHERE u.company_name = %s
+        """
+        
+        params = [company_name]
+        
+        if start_date:
+            query += " AND DATE(v.check_in_time) >= %s"
+            params.append(start_date)
+        
+        if end_date:
+            query += " AND DATE(v.check_in_time) <= %s"
+            params.append(end_date)
+        
+        conn = get_db_connection()
+        
+        if visitor_email:
+            # visits.visitor_email is written with the visitor row, so the n-gram
+            # index on it answers the filter when present
+            if visitor_search.ngram_ready(conn, 'ft_visitor_email'):
+                condition, condition_params = visitor_search.substring_filter('v.visitor_email', visitor_email)
+                query += f" AND {condition}"
+                params.extend(condition_params)
+            else:
+                query += " AND (vis.email LIKE %s OR v.visitor_email LIKE %s)"
+                params.append(f"%{visitor_email}%")
+                params.append(f"%{visitor_email}%")
+        
+        if host_name:
+            query += " AND (u.name LIKE %s OR v.host_name LIKE %s)"
+            params.append(f"%{host_name}%")
+            params.append(f"%{host_name}%")
+        
+        query += " ORDER BY v.check_in_time DESC LIMIT %s"
+        params.append(int(limit))
+        
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(query, params)
+        history = cursor.fetchall()
+        cursor.close()
+        conn.close()
+        
+        return jsonify(history), 200
+        
+    except Exception as e:
+        logger.error(f"Visitor history error: {e}")
+        return jsonify({'message': 'Failed to fetch visitor history'}), 500
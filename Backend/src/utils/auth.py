@@ -0,0 +1,105 @@
+"""
+Authentication Helpers
+JWT decorator and company lookup shared by the blueprints and the legacy routes
+"""
+
+import jwt
+import logging
+import mysql.connector
+from functools import wraps
+from flask import request, jsonify, current_app
+from config.database import get_db_connection, DB_CONFIG
+
+logger = logging.getLogger(__name__)
+
+def authenticate_token(f):
+    """JWT authentication decorator; sets request.current_user to the users row"""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        token = None
+        auth_header = request.headers.get('Authorization')
+        
+        if auth_header:
+            try:
+                token = auth_header.split(' ')[1]
+            except IndexError:
+                return jsonify({'message': 'Invalid token format'}), 401
+        
+        if not token:
+            return jsonify({'message': 'Token is missing'}), 401
+        
+        try:
+            data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
+            
+            # Get user from database
+            conn = get_db_connection()
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute("SELECT * FROM users WHERE id = %s", (data['id'],))
+            current_user = cursor.fetchone()
+            cursor.close()
+            conn.close()
+            
+            if not current_user:
+                return jsonify({'message': 'User not found'}), 401
+                
+            request.current_user = current_user
+            
+        except jwt.ExpiredSignatureError:
+            return jsonify({'message': 'Token has expired'}), 401
+        except jwt.InvalidTokenError:
+            return jsonify({'message': 'Token is invalid'}), 401
+        except Exception as e:
+            logger.error(f"Authentication error: {e}")
+            return jsonify({'message': 'Authentication failed'}), 401
+        
+        return f(*args, **kwargs)
+    
+    return decorated
+
+def _company_id_from_users_table(user_id):
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT company_id FROM users WHERE id = %s", (user_id,))
+    user_data = cursor.fetchone()
+    cursor.close()
+    conn.close()
+    return user_data[0] if user_data else None
+
+def get_company_id_from_companies_table(user_id):
+    """Get company_id from companies table using admin_company_id (user_id)"""
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        
+        # Look for company where admin_company_id matches the user_id
+        cursor.execute("""
+            SELECT id as company_id FROM companies 
+            WHERE admin_company_id = %s 
+            LIMIT 1
+        """, (user_id,))
+        
+        company = cursor.fetchone()
+        cursor.close()
+        conn.close()
+        
+        if company:
+            return company['company_id']
+
+        # Fallback: users table, for backward compatibility
+        company_id = _company_id_from_users_table(user_id)
+        if company_id is None:
+            logger.warning(f"No company found for user_id {user_id}, defaulting to 1")
+            return 1
+        return company_id
+                
+    except mysql.connector.Error as db_err:
+        logger.error(f"Database error in get_company_id_from_companies_table: {db_err}")
+        logger.error(f"Database config: host={DB_CONFIG.get('host')}, user={DB_CONFIG.get('user')}, database={DB_CONFIG.get('database')}")
+        raise Exception(f"Database connection failed: {str(db_err)}")
+    except Exception as e:
+        logger.error(f"Error getting company_id from companies table: {e}")
+        try:
+            company_id = _company_id_from_users_table(user_id)
+            return company_id if company_id is not None else 1
+        except Exception:
+            return 1
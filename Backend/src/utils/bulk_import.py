@@ -0,0 +1,186 @@
+"""
+Bulk Imports
+Reads CSV/XLSX uploads or JSON arrays into a DataFrame, validates every row
+with column-wide checks and writes the valid rows in chunked multi-row
+transactions. pandas is imported on first use, so workers that never import
+a file do not load it
+"""
+
+import io
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+EMAIL_PATTERN = r'^[^@\s]+@[^@\s]+\.[^@\s]+$'
+EXCEL_EXTENSIONS = ('.xlsx', '.xlsm')
+
+class BulkImportError(ValueError):
+    """Raised when the request does not contain a readable table of rows"""
+
+def normalize_header(name):
+    """'Visitor Name', 'visitor_name' and 'visitorName' all become 'visitorname'"""
+    return re.sub(r'[^a-z0-9]', '', str(name).lower())
+
+def _frame_from_upload(upload):
+    import pandas as pd
+    content = upload.read()
+    if not content:
+        raise BulkImportError('Uploaded file is empty')
+    try:
+        if (upload.filename or '').lower().endswith(EXCEL_EXTENSIONS):
+            return pd.read_excel(io.BytesIO(content), dtype=str)
+        return pd.read_csv(io.BytesIO(content), dtype=str, keep_default_na=False, skipinitialspace=True)
+    except Exception as e:
+        raise BulkImportError(f'Could not read {upload.filename or "upload"}: {e}')
+
+def _frame_from_json(payload):
+    import pandas as pd
+    records = payload.get('rows') if isinstance(payload, dict) else payload
+    if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+        raise BulkImportError('Expected a JSON array of row objects (or {"rows": [...]})')
+    return pd.DataFrame.from_records(records)
+
+def load_rows(req, columns, max_rows):
+    """Rows of a bulk request as strings under the canonical `columns` names
+
+    Accepts a multipart `file` (CSV, or XLSX by extension) or a JSON array /
+    {"rows": [...], "defaults": {...}}. Defaults (JSON `defaults` or the other
+    form fields) fill blank cells. `columns` maps each canonical name to extra
+    header aliases; unknown headers are dropped. The index is the 1-based
+    source row number.
+    """
+    upload = req.files.get('file')
+    if upload is not None:
+        df = _frame_from_upload(upload)
+        defaults = {k: v for k, v in req.form.items()}
+    else:
+        payload = req.get_json(silent=True)
+        if payload is None:
+            raise BulkImportError('Send a CSV/XLSX file as "file" or a JSON array of rows')
+        df = _frame_from_json(payload)
+        defaults = (payload.get('defaults') or {}) if isinstance(payload, dict) else {}
+
+    if df.empty:
+        raise BulkImportError('No rows to import')
+    if len(df) > max_rows:
+        raise BulkImportError(f'Too many rows ({len(df)}); the limit is {max_rows} per request')
+
+    lookup = {}
+    for name, aliases in columns.items():
+        for alias in (name,) + tuple(aliases):
+            lookup[normalize_header(alias)] = name
+    df = df.rename(columns=lambda header: lookup.get(normalize_header(header), None))
+    df = df.loc[:, [c for c in df.columns if c is not None]]
+    df = df.loc[:, ~df.columns.duplicated()]
+    for name in columns:
+        if name not in df.columns:
+            df[name] = ''
+    df = df[list(columns)].astype(object).where(df[list(columns)].notna(), '').astype(str)
+    df = df.apply(lambda column: column.str.strip())
+
+    for key, value in defaults.items():
+        name = lookup.get(normalize_header(key))
+        if name and value not in (None, ''):
+            df.loc[df[name] == '', name] = str(value).strip()
+
+    df.index = range(1, len(df) + 1)
+    return df
+
+class RowErrors:
+    """Validation messages per row, filled from boolean masks"""
+
+    def __init__(self, index):
+        self.messages = {row: [] for row in index}
+
+    def add(self, mask, message):
+        for row in mask[mask].index:
+            self.messages[row].append(message)
+
+    def require(self, df, *columns):
+        for column in columns:
+            self.add(df[column] == '', f'{column} is required')
+
+    def check_email(self, df, column):
+        self.add((df[column] != '') & ~df[column].str.match(EMAIL_PATTERN), f'{column} is not a valid email')
+
+    def check_max_length(self, df, limits):
+        for column, limit in limits.items():
+            self.add(df[column].str.len() > limit, f'{column} is longer than {limit} characters')
+
+    def valid(self):
+        """Index of the rows without errors"""
+        return [row for row, messages in self.messages.items() if not messages]
+
+def parse_dates(df, column, errors, required=True):
+    """Column as 'YYYY-MM-DD' strings (None when blank); unparseable values are row errors"""
+    import pandas as pd
+    parsed = pd.to_datetime(df[column], errors='coerce', format='mixed')
+    errors.add((df[column] != '') & parsed.isna(), f'{column} is not a valid date')
+    if required:
+        errors.require(df, column)
+    return parsed.dt.strftime('%Y-%m-%d').where(parsed.notna(), None)
+
+def parse_times(df, column, errors):
+    """Column as 'HH:MM:SS' strings (None when blank); unparseable values are row errors"""
+    import pandas as pd
+    parsed = pd.to_datetime(df[column], errors='coerce', format='mixed')
+    errors.add((df[column] != '') & parsed.isna(), f'{column} is not a valid time')
+    return parsed.dt.strftime('%H:%M:%S').where(parsed.notna(), None)
+
+def parse_positive_ints(df, column, errors, default=None):
+    """Column as ints (`default` when blank); non-numeric or < 1 values are row errors"""
+    import pandas as pd
+    parsed = pd.to_numeric(df[column], errors='coerce')
+    errors.add((df[column] != '') & ~(parsed >= 1), f'{column} must be a positive number')
+    return pd.Series([int(value) if value >= 1 else default for value in parsed.fillna(0)],
+                     index=df.index, dtype=object)
+
+def write_in_chunks(conn, items, chunk_size, write_chunk):
+    """Write `items` through `write_chunk(cursor, items) -> results`, one transaction per chunk
+
+    A chunk that fails is rolled back and retried row by row, so one bad row
+    only fails itself. Returns (results, errors): dicts keyed by item position.
+    """
+    results, errors = {}, {}
+    cursor = conn.cursor()
+    try:
+        for start in range(0, len(items), chunk_size):
+            chunk = items[start:start + chunk_size]
+            try:
+                conn.start_transaction()
+                chunk_results = write_chunk(cursor, chunk)
+                conn.commit()
+                results.update(zip(range(start, start + len(chunk)), chunk_results))
+                continue
+            except Exception as e:
+                conn.rollback()
+                logger.warning(f"⚠️ Bulk chunk of {len(chunk)} rows failed, retrying row by row: {e}")
+            for position, item in enumerate(chunk, start):
+                try:
+                    conn.start_transaction()
+                    results[position] = write_chunk(cursor, [item])[0]
+                    conn.commit()
+                except Exception as e:
+                    conn.rollback()
+                    errors[position] = str(e)
+    finally:
+        cursor.close()
+    return results, errors
+
+def summarize(row_numbers, results, errors, row_errors, describe):
+    """Per-row response entries in source order plus totals"""
+    created = {row: results[i] for i, row in enumerate(row_numbers) if i in results}
+    failed = {row: [errors[i]] for i, row in enumerate(row_numbers) if i in errors}
+    entries = []
+    for row, messages in row_errors.messages.items():
+        if row in created:
+            entries.append({'row': row, 'status': 'created', **describe(created[row])})
+        else:
+            entries.append({'row': row, 'status': 'error', 'errors': messages or failed.get(row, ['Not imported'])})
+    return {
+        'total': len(entries),
+        'created': len(created),
+        'failed': len(entries) - len(created),
+        'results': entries,
+    }
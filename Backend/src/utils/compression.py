@@ -0,0 +1,126 @@
+"""
+Response Compression
+Brotli/gzip for JSON, HTML, CSV and other text responses, negotiated from
+Accept-Encoding. Responses under COMPRESS_MIN_SIZE go out as they are; streamed
+responses are compressed chunk by chunk. brotli is optional: without it only
+gzip is offered
+"""
+
+import zlib
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+COMPRESSIBLE_TYPES = {
+    'application/json', 'application/javascript', 'application/xml', 'application/sql',
+    'image/svg+xml', 'text/html', 'text/css', 'text/csv', 'text/plain', 'text/xml', 'text/javascript',
+}
+
+DEFAULTS = {
+    'COMPRESS_ENABLED': True,
+    'COMPRESS_MIN_SIZE': 1024,
+    'COMPRESS_GZIP_LEVEL': 6,
+    # Dynamic responses: quality 4-5 compresses better than gzip -6 at similar speed
+    'COMPRESS_BR_LEVEL': 4,
+}
+
+def choose_encoding(accept_encodings):
+    """Content-Encoding to use for a request's Accept-Encoding, or None"""
+    if brotli is not None and accept_encodings.quality('br') > 0:
+        return 'br'
+    if accept_encodings.quality('gzip') > 0:
+        return 'gzip'
+    return None
+
+class StreamCompressor:
+    """Incremental gzip/brotli compressor with per-chunk flushing"""
+
+    def __init__(self, encoding, gzip_level=6, br_level=4):
+        self.encoding = encoding
+        if encoding == 'br':
+            self._compressor = brotli.Compressor(quality=br_level)
+        else:
+            # wbits 16 + 15: gzip container
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data, flush=False):
+        if self.encoding == 'br':
+            out = self._compressor.process(data)
+            return out + self._compressor.flush() if flush else out
+        out = self._compressor.compress(data)
+        return out + self._compressor.flush(zlib.Z_SYNC_FLUSH) if flush else out
+
+    def finish(self):
+        if self.encoding == 'br':
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+def compress_bytes(data, encoding, gzip_level=6, br_level=4):
+    """Compress a complete body"""
+    compressor = StreamCompressor(encoding, gzip_level, br_level)
+    return compressor.compress(data) + compressor.finish()
+
+def _compress_stream(chunks, compressor):
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            if chunk:
+                # Flush so a streamed client sees each chunk as it is produced
+                yield compressor.compress(chunk, flush=True)
+        yield compressor.finish()
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+def _should_compress(response, config):
+    if not config['COMPRESS_ENABLED'] or request.method == 'HEAD':
+        return False
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return False
+    if 'Content-Encoding' in response.headers or 'no-transform' in response.headers.get('Cache-Control', ''):
+        return False
+    return response.mimetype in COMPRESSIBLE_TYPES
+
+def compress_response(response, config):
+    """Compress `response` in place when the client accepts it and it is worth it"""
+    if not _should_compress(response, config):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = choose_encoding(request.accept_encodings)
+    if encoding is None:
+        return response
+
+    length = response.content_length
+    if length is not None and length < config['COMPRESS_MIN_SIZE']:
+        return response
+
+    compressor = StreamCompressor(encoding, config['COMPRESS_GZIP_LEVEL'], config['COMPRESS_BR_LEVEL'])
+    if response.is_streamed or response.direct_passthrough:
+        response.response = _compress_stream(response.response, compressor)
+        response.direct_passthrough = False
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < config['COMPRESS_MIN_SIZE']:
+            return response
+        response.set_data(compressor.compress(data) + compressor.finish())
+
+    response.headers['Content-Encoding'] = encoding
+    # The encoded body differs byte-wise, so only a weak validator still holds
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+def init_compression(app):
+    """Compress eligible responses of `app` (settings: COMPRESS_*)"""
+    for key, value in DEFAULTS.items():
+        app.config.setdefault(key, value)
+
+    @app.after_request
+    def compress(response):
+        return compress_response(response, app.config)
@@ -0,0 +1,44 @@
+"""
+Sparse Fieldsets
+List endpoints accept `?fields=a,b,c` (or `fields=all`) and build their SELECT
+list from a per-endpoint whitelist, so columns nobody asked for are never read
+"""
+
+class FieldSelectionError(ValueError):
+    """Raised for a `fields` parameter naming fields outside the whitelist"""
+
+class FieldSet:
+    """Whitelist of selectable fields for one endpoint
+
+    `columns` maps each response field to the SQL expression that produces it,
+    in response order. `default` is the projection used when `fields` is not
+    given; heavy columns (images, free text) are left out of it.
+    """
+
+    def __init__(self, columns, default, required=('id',)):
+        self.columns = dict(columns)
+        self.default = list(default)
+        self.required = list(required)
+        unknown = [name for name in self.default + self.required if name not in self.columns]
+        if unknown:
+            raise ValueError(f"Default/required fields not in whitelist: {unknown}")
+
+    def resolve(self, fields=None):
+        """Field names for a `fields` query parameter value"""
+        if not fields:
+            names = self.default
+        elif fields.strip() == 'all':
+            names = list(self.columns)
+        else:
+            names = [name.strip() for name in fields.split(',') if name.strip()]
+            unknown = [name for name in names if name not in self.columns]
+            if unknown:
+                raise FieldSelectionError(
+                    f"Unknown field(s): {', '.join(unknown)}. Allowed: {', '.join(self.columns)}"
+                )
+        # Required fields first, then the requested ones without duplicates
+        return list(dict.fromkeys(self.required + names))
+
+    def select_list(self, fields=None):
+        """SELECT list for a `fields` query parameter value"""
+        return ',\n                   '.join(f"{self.columns[name]} AS `{name}`" for name in self.resolve(fields))
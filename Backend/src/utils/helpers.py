@@ -23,6 +23,13 @@ def generate_qr_code():
     random_str = ''.join(random.choices(string.ascii_letters + string.digits, k=9))
     return f"VMS-{timestamp}-{random_str}"
 
+def generate_qr_codes(count):
+    """`count` distinct QR codes in the generate_qr_code format"""
+    codes = set()
+    while len(codes) < count:
+        codes.add(generate_qr_code())
+    return list(codes)
+
 def send_email(to_email, subject, html_content):
     """Send email notification using Gmail SMTP"""
     try:
@@ -0,0 +1,133 @@
+"""
+HTTP Caching
+ETag/Last-Modified for read-mostly endpoints, derived from per-table version
+counters (table_versions) that writes bump. A conditional GET whose validator
+still matches is answered 304 without running the endpoint's queries
+"""
+
+import hashlib
+import logging
+import threading
+from datetime import timezone
+from functools import wraps
+from flask import current_app, make_response, request
+from config.database import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+VERSIONS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS table_versions (
+        table_name VARCHAR(64) PRIMARY KEY,
+        version BIGINT UNSIGNED NOT NULL DEFAULT 0,
+        updated_at DATETIME NOT NULL
+    )
+"""
+
+_table_ready = False
+_table_lock = threading.Lock()
+
+def bump_table_version(cursor, *tables):
+    """Advance the version of `tables` in the caller's transaction; never fails the write"""
+    for table in tables:
+        try:
+            cursor.execute(
+                """
+                INSERT INTO table_versions (table_name, version, updated_at)
+                VALUES (%s, 1, UTC_TIMESTAMP())
+                ON DUPLICATE KEY UPDATE version = version + 1, updated_at = UTC_TIMESTAMP()
+                """,
+                (table,)
+            )
+        except Exception as e:
+            # Created on the first conditional GET; nothing has been cached before that
+            logger.debug(f"Table version not bumped for {table}: {e}")
+
+def _ensure_versions_table(cursor):
+    """Create table_versions once per process (idempotent)"""
+    global _table_ready
+    if _table_ready:
+        return
+    with _table_lock:
+        if not _table_ready:
+            cursor.execute(VERSIONS_TABLE_SQL)
+            _table_ready = True
+
+def table_versions(tables):
+    """Current version of each table and the latest change time (UTC, None if never written)"""
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        _ensure_versions_table(cursor)
+        placeholders = ', '.join(['%s'] * len(tables))
+        cursor.execute(
+            f"SELECT table_name, version, updated_at FROM table_versions WHERE table_name IN ({placeholders})",
+            tuple(tables)
+        )
+        rows = cursor.fetchall()
+        cursor.close()
+    finally:
+        conn.close()
+    versions = {table: 0 for table in tables}
+    last_modified = None
+    for table_name, version, updated_at in rows:
+        versions[table_name] = version
+        if last_modified is None or updated_at > last_modified:
+            last_modified = updated_at
+    if last_modified is not None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    return versions, last_modified
+
+def compute_etag(versions, scope=()):
+    """Validator for one endpoint's response given the table versions it reads"""
+    parts = [current_app.config.get('ETAG_SALT', ''), request.endpoint or '', request.full_path]
+    parts += [f"{table}={version}" for table, version in sorted(versions.items())]
+    parts += [str(item) for item in scope]
+    return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()
+
+def _request_scope():
+    """Identity the response depends on for authenticated endpoints"""
+    user = getattr(request, 'current_user', None) or {}
+    return (user.get('id'), user.get('role'), user.get('company_name'), user.get('company_id'))
+
+def _is_not_modified(etag, last_modified):
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since and last_modified is not None:
+        return last_modified.replace(microsecond=0) <= request.if_modified_since
+    return False
+
+def conditional_get(*tables, public=False, max_age=60):
+    """Send ETag/Last-Modified/Cache-Control for a GET endpoint reading `tables`
+
+    Private endpoints (the default) are keyed on the authenticated user and sent
+    as `private, no-cache`, so browsers revalidate every time and get a 304 while
+    nothing changed. Public endpoints get `public, max-age=<max_age>`, which nginx
+    uses for micro-caching. Place below @authenticate_token.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            try:
+                versions, last_modified = table_versions(tables)
+            except Exception as e:
+                logger.warning(f"⚠️ Table versions unavailable, serving {request.path} uncached: {e}")
+                return f(*args, **kwargs)
+
+            etag = compute_etag(versions, () if public else _request_scope())
+            cache_control = f"public, max-age={max_age}" if public else 'private, no-cache'
+
+            if _is_not_modified(etag, last_modified):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag, weak=True)
+            if last_modified is not None:
+                response.last_modified = last_modified
+            response.headers['Cache-Control'] = cache_control
+            response.vary.add('Origin' if public else 'Authorization')
+            return response
+        return decorated
+    return decorator
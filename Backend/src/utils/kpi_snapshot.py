@@ -0,0 +1,22 @@
+"""
+KPI Snapshot Invalidation
+Payment, subscription and company writes flag the admin portal's precomputed
+dashboard KPIs (kpi_snapshots) so its refresher recomputes them within seconds
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+PLATFORM_SNAPSHOT_KEY = 'platform'
+
+def mark_kpi_snapshot_dirty(cursor, key=PLATFORM_SNAPSHOT_KEY):
+    """Flag a KPI snapshot as stale in the caller's transaction; never fails the write"""
+    try:
+        cursor.execute(
+            "UPDATE kpi_snapshots SET dirty_since = COALESCE(dirty_since, NOW()) WHERE snapshot_key = %s",
+            (key,)
+        )
+    except Exception as e:
+        # kpi_snapshots is created by the admin backend; nothing to invalidate before it exists
+        logger.debug(f"KPI snapshot not marked dirty: {e}")
@@ -0,0 +1,70 @@
+"""
+Email Notifications
+Gmail SMTP sender configured from EMAIL_USER / EMAIL_PASS, plus a background
+queue for notifications a request should not wait on
+"""
+
+import os
+import queue
+import smtplib
+import logging
+import threading
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
+
+logger = logging.getLogger(__name__)
+
+def send_email(to_email, subject, html_content):
+    """Send email notification using Gmail SMTP"""
+    try:
+        smtp_server = 'smtp.gmail.com'
+        smtp_port = 587
+        smtp_user = os.getenv('EMAIL_USER')
+        smtp_password = os.getenv('EMAIL_PASS')
+        
+        if not smtp_user or not smtp_password:
+            logger.warning("Email credentials not configured in .env file")
+            return False
+            
+        msg = MIMEMultipart()
+        msg['From'] = smtp_user
+        msg['To'] = to_email
+        msg['Subject'] = subject
+        
+        msg.attach(MIMEText(html_content, 'html'))
+        
+        server = smtplib.SMTP(smtp_server, smtp_port)
+        server.starttls()
+        server.login(smtp_user, smtp_password)
+        server.send_message(msg)
+        server.quit()
+        
+        logger.info(f"Verification email sent successfully to {to_email}")
+        return True
+    except Exception as e:
+        logger.error(f"Email sending failed: {e}")
+        return False
+
+_outbox = queue.Queue()
+_sender = None
+_sender_pid = None
+_sender_lock = threading.Lock()
+
+def _drain_outbox():
+    while True:
+        to_email, subject, html_content = _outbox.get()
+        try:
+            send_email(to_email, subject, html_content)
+        finally:
+            _outbox.task_done()
+
+def enqueue_email(to_email, subject, html_content):
+    """Queue an email for the background sender (one thread per worker process)"""
+    global _sender, _sender_pid
+    with _sender_lock:
+        # A forked worker inherits the flag but not the thread
+        if _sender is None or _sender_pid != os.getpid():
+            _sender = threading.Thread(target=_drain_outbox, name='email-outbox', daemon=True)
+            _sender.start()
+            _sender_pid = os.getpid()
+    _outbox.put((to_email, subject, html_content))
@@ -0,0 +1,138 @@
+"""
+QR Check-in Cache
+Today's and tomorrow's approved/pending pre-registrations (one-off visits and
+recurring occurrences) per site, held in memory keyed by QR code so a kiosk
+scan resolves without querying pre_registrations or users. A site is loaded
+with one query on its first scan and reloaded when the day changes or after
+TTL_SECONDS, which bounds how long another worker's writes go unseen. Writes
+in this worker update the map directly; a miss falls back to the database.
+"""
+
+import os
+import time
+import logging
+import threading
+from datetime import date, datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+TTL_SECONDS = int(os.getenv('QR_CACHE_TTL_SECONDS', 60))
+
+# Scan-time fields; host_name is resolved from users when host_id is set
+_ENTRY_COLUMNS = """
+    pr.id, pr.qr_code, pr.visitor_name, pr.visitor_email, pr.visitor_phone, pr.visitor_company,
+    pr.purpose, pr.host_id,
+    CASE WHEN pr.host_id IS NOT NULL THEN u.name ELSE pr.host_name END AS host_name
+"""
+
+DAY_ENTRIES_SQL = f"""
+    SELECT {_ENTRY_COLUMNS}, pr.visit_date AS day, pr.visit_time
+    FROM pre_registrations pr
+    LEFT JOIN users u ON u.id = pr.host_id
+    WHERE pr.company_to_visit = %s AND pr.visit_date BETWEEN %s AND %s
+    AND pr.status IN ('approved', 'pending')
+    AND (pr.is_recurring IS NULL OR pr.is_recurring = FALSE)
+    {{extra}}
+    UNION ALL
+    SELECT {_ENTRY_COLUMNS}, ro.occurrence_date, ro.visit_time
+    FROM recurring_occurrences ro
+    JOIN pre_registrations pr ON pr.id = ro.pre_registration_id
+    LEFT JOIN users u ON u.id = pr.host_id
+    WHERE ro.company_to_visit = %s AND ro.occurrence_date BETWEEN %s AND %s
+    AND ro.status = 'expected' AND pr.status IN ('approved', 'pending')
+    {{extra}}
+"""
+
+# site -> {'day': date, 'loaded_at': monotonic, 'entries': {qr_code: entry}}
+_sites = {}
+_lock = threading.Lock()
+_index_ready = False
+
+def ensure_checkin_index(conn):
+    """Index the duplicate check-in lookup (visitor_email, check_in_time) once per process"""
+    global _index_ready
+    if _index_ready:
+        return
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SHOW INDEX FROM visits WHERE Key_name = 'idx_visitor_email_check_in'")
+        if not cursor.fetchall():
+            cursor.execute("CREATE INDEX idx_visitor_email_check_in ON visits (visitor_email, check_in_time)")
+            logger.info("Added idx_visitor_email_check_in index to visits table")
+    finally:
+        cursor.close()
+    _index_ready = True
+
+def _merge(entries, rows):
+    for row in rows:
+        day, visit_time = row.pop('day'), row.pop('visit_time')
+        if isinstance(day, datetime):
+            day = day.date()
+        entry = entries.setdefault(row['qr_code'], {'pre_registration': row, 'days': {}})
+        entry['days'][day] = visit_time
+
+def _fetch(conn, site, today, pre_registration_id=None):
+    extra, params = '', [site, today, today + timedelta(days=1)]
+    if pre_registration_id is not None:
+        extra, params = 'AND pr.id = %s', params + [pre_registration_id]
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(DAY_ENTRIES_SQL.format(extra=extra), params + params)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+def _load(conn, site, today):
+    entries = {}
+    _merge(entries, _fetch(conn, site, today))
+    partition = {'day': today, 'loaded_at': time.monotonic(), 'entries': entries}
+    with _lock:
+        _sites[site] = partition
+    logger.info(f"✅ QR cache loaded {len(entries)} pre-registration(s) for {site}")
+    return partition
+
+def lookup(conn, site, qr_code, today=None):
+    """Pre-registration due today for `qr_code` at `site`, or None (caller falls back to the database)
+
+    Returns the pre-registration fields with visit_date/visit_time of today's visit.
+    """
+    today = today or date.today()
+    partition = _sites.get(site)
+    if partition is None or partition['day'] != today or time.monotonic() - partition['loaded_at'] > TTL_SECONDS:
+        partition = _load(conn, site, today)
+    entry = partition['entries'].get(qr_code)
+    if entry is None or today not in entry['days']:
+        return None
+    return {**entry['pre_registration'], 'visit_date': today, 'visit_time': entry['days'][today]}
+
+def refresh_registration(conn, site, pre_registration_id, today=None):
+    """Re-read one pre-registration into a loaded site (after it is created or changed here)"""
+    today = today or date.today()
+    partition = _sites.get(site)
+    if partition is None or partition['day'] != today:
+        return
+    rows = _fetch(conn, site, today, pre_registration_id)
+    with _lock:
+        for entry in partition['entries'].values():
+            if entry['pre_registration']['id'] == pre_registration_id:
+                entry['days'].clear()
+        _merge(partition['entries'], rows)
+
+def forget(site, pre_registration_id, day=None):
+    """Drop one day of a pre-registration, e.g. once it has been checked in (id as int or string)"""
+    day = day or date.today()
+    partition = _sites.get(site)
+    if partition is None:
+        return
+    with _lock:
+        for entry in partition['entries'].values():
+            if str(entry['pre_registration']['id']) == str(pre_registration_id):
+                entry['days'].pop(day, None)
+
+def invalidate(site=None):
+    """Reload `site` (every site when None) on its next scan"""
+    with _lock:
+        if site is None:
+            _sites.clear()
+        else:
+            _sites.pop(site, None)
@@ -0,0 +1,181 @@
+"""
+Rate Limiting
+Token buckets per company, issued API key or client address, so one tenant's
+burst (a badge-printing storm, a login script) cannot starve the others.
+Buckets live in this process by default; with RATE_LIMIT_STORAGE_URL pointing
+at a Redis-compatible server they are shared by every worker. Rejected
+requests get 429 with Retry-After.
+
+MemoryBackend, RedisBackend (and its script) are duplicated in
+ML/src/utils/rate_limit.py: the two services are deployed separately and
+share no package. Keep both copies identical; they may use the same Redis.
+"""
+
+import hashlib
+import logging
+import math
+import threading
+import time
+from functools import wraps
+from flask import request, jsonify, current_app
+
+try:
+    import redis
+except ImportError:  # optional: only needed for RATE_LIMIT_STORAGE_URL
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'vms:ratelimit:'
+
+class MemoryBackend:
+    """Buckets in a dict; limits apply per worker process"""
+
+    MAX_KEYS = 10000
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, burst, cost=1):
+        """Take `cost` tokens; seconds until they would be available (0 when taken)"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            wait = 0.0
+            if tokens >= cost:
+                tokens -= cost
+            else:
+                wait = (cost - tokens) / rate
+            if len(self._buckets) >= self.MAX_KEYS and key not in self._buckets:
+                self._prune(now)
+            self._buckets[key] = (tokens, now)
+        return wait
+
+    def _prune(self, now):
+        # Buckets idle long enough to be full again carry no state
+        stale = [k for k, (_, updated) in self._buckets.items() if now - updated > 3600]
+        for k in stale or list(self._buckets)[:self.MAX_KEYS // 10]:
+            del self._buckets[k]
+
+class RedisBackend:
+    """Buckets in a Redis-compatible server, updated atomically by a script"""
+
+    # tokens/ts per bucket; the server clock keeps every worker on one timeline
+    SCRIPT = """
+        local rate, burst, cost = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+        local clock = redis.call('TIME')
+        local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+        local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+        local tokens = tonumber(state[1]) or burst
+        local ts = tonumber(state[2]) or now
+        tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+        local wait = 0
+        if tokens >= cost then tokens = tokens - cost else wait = (cost - tokens) / rate end
+        redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+        redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+        return tostring(wait)
+    """
+
+    def __init__(self, client):
+        self._client = client
+        self._script = client.register_script(self.SCRIPT)
+
+    def take(self, key, rate, burst, cost=1):
+        return float(self._script(keys=[KEY_PREFIX + key], args=[rate, burst, cost]))
+
+_backend = None
+_backend_lock = threading.Lock()
+
+def get_backend(url=''):
+    """Process-wide backend: Redis when `url` is set and reachable, else in memory"""
+    global _backend
+    if _backend is not None:
+        return _backend
+    with _backend_lock:
+        if _backend is None:
+            backend = MemoryBackend()
+            if url:
+                if redis is None:
+                    logger.warning("⚠️ RATE_LIMIT_STORAGE_URL is set but the redis package is not installed; limiting per process")
+                else:
+                    try:
+                        client = redis.Redis.from_url(url, socket_timeout=0.5)
+                        client.ping()
+                        backend = RedisBackend(client)
+                        logger.info("✅ Rate limits shared through Redis")
+                    except Exception as e:
+                        logger.warning(f"⚠️ Rate limit store unavailable ({e}); limiting per process")
+            _backend = backend
+    return _backend
+
+def client_address():
+    """Caller's address; nginx passes it as X-Real-IP"""
+    return request.headers.get('X-Real-IP') or request.remote_addr or 'unknown'
+
+def client_identity(user=None):
+    """Bucket owner: an issued API key, else the user's company, else the client address
+
+    Only keys whose SHA-256 is listed in RATE_LIMIT_API_KEYS get a bucket of
+    their own; any other X-API-Key is ignored, so made-up keys cannot mint
+    fresh buckets.
+    """
+    api_key = request.headers.get('X-API-Key')
+    if api_key:
+        digest = hashlib.sha256(api_key.encode('utf-8')).hexdigest()
+        if digest in current_app.config.get('RATE_LIMIT_API_KEYS', ()):
+            return 'key:' + digest[:16]
+    if user:
+        company = user.get('company_id') or user.get('company_name')
+        if company:
+            return f'company:{company}'
+    return 'ip:' + client_address()
+
+def too_many_requests(retry_after, message='Too many requests. Please slow down and try again.'):
+    """429 response with Retry-After in whole seconds"""
+    seconds = max(1, math.ceil(retry_after))
+    response = jsonify({'message': message, 'retry_after': seconds})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(seconds)
+    return response
+
+def charge(name, cost=1, identity=None):
+    """Take `cost` tokens from the RATE_LIMITS[name] bucket, keyed by `identity()`
+    (client_identity by default); the error response when they cannot be taken, else None"""
+    config = current_app.config
+    if not config.get('RATE_LIMIT_ENABLED', True) or name not in config.get('RATE_LIMITS', {}):
+        return None
+    per_minute, burst = config['RATE_LIMITS'][name]
+    if cost > burst:
+        # The bucket never holds this many tokens, so waiting would not help
+        response = jsonify({'message': f'Too many at once: at most {burst} per request'})
+        response.status_code = 400
+        return response
+    owner = identity() if identity else client_identity(getattr(request, 'current_user', None))
+    try:
+        wait = get_backend(config.get('RATE_LIMIT_STORAGE_URL')).take(f'{name}:{owner}', per_minute / 60.0, burst, cost)
+    except Exception as e:
+        # A failing store must not take the endpoint down with it
+        logger.warning(f"⚠️ Rate limit check skipped: {e}")
+        wait = 0
+    if wait > 0:
+        logger.warning(f"⚠️ Rate limit '{name}' exceeded by {owner}")
+        return too_many_requests(wait)
+    return None
+
+def rate_limit(name, identity=None, cost=1):
+    """Charge each request `cost` tokens from the RATE_LIMITS[name] bucket (see charge)
+
+    Goes after authenticate_token so the caller's company is known. Routes
+    whose cost depends on the request body call charge() themselves.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            limited = charge(name, cost, identity)
+            if limited:
+                return limited
+            return f(*args, **kwargs)
+        return decorated
+    return decorator
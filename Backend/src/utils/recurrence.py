@@ -0,0 +1,214 @@
+"""
+Recurring Visit Occurrences
+Expands recurring pre-registrations (daily/weekly/monthly until
+recurring_end_date) into dated rows in recurring_occurrences, a rolling
+window ahead of today. Each series remembers how far it has been expanded
+(occurrences_through), so every pass only adds the days that entered the
+window. "Expected today" and QR verification then read occurrences by index.
+"""
+
+import os
+import time
+import logging
+import threading
+from calendar import monthrange
+from datetime import date, timedelta
+
+logger = logging.getLogger(__name__)
+
+# Days ahead of today kept materialized
+HORIZON_DAYS = int(os.getenv('RECURRENCE_HORIZON_DAYS', 30))
+# How often the scheduler extends the window (new series are expanded on creation)
+INTERVAL_SECONDS = int(os.getenv('RECURRENCE_INTERVAL_SECONDS', 3600))
+SCHEDULER_LOCK = 'recurrence_materialize'
+
+OCCURRENCES_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS recurring_occurrences (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        pre_registration_id INT NOT NULL,
+        company_id INT NULL,
+        company_to_visit VARCHAR(200) NULL,
+        occurrence_date DATE NOT NULL,
+        visit_time TIME NULL,
+        qr_code VARCHAR(200) NULL,
+        status ENUM('expected', 'checked-in', 'cancelled') NOT NULL DEFAULT 'expected',
+        visit_id INT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE KEY uq_series_date (pre_registration_id, occurrence_date),
+        INDEX idx_qr_date (qr_code, occurrence_date),
+        INDEX idx_company_date (company_to_visit, occurrence_date),
+        FOREIGN KEY (pre_registration_id) REFERENCES pre_registrations(id) ON DELETE CASCADE
+    )
+"""
+
+# Check-in and check-out close a one-off pre-registration; a series stays open
+# for its later occurrences: (status, pre_registration_id)
+CLOSE_PRE_REGISTRATION_SQL = """
+    UPDATE pre_registrations SET status = %s
+    WHERE id = %s AND (is_recurring IS NULL OR is_recurring = FALSE)
+"""
+
+# Check-in against a series marks only today's occurrence: (visit_id, pre_registration_id)
+CHECK_IN_OCCURRENCE_SQL = """
+    UPDATE recurring_occurrences SET status = 'checked-in', visit_id = %s
+    WHERE pre_registration_id = %s AND occurrence_date = CURDATE()
+"""
+
+_table_ready = False
+_scheduler_pid = None
+_scheduler_lock = threading.Lock()
+
+def ensure_occurrences_table(conn):
+    """Create recurring_occurrences, the expansion watermark and date index once per process (idempotent)"""
+    global _table_ready
+    if _table_ready:
+        return
+    cursor = conn.cursor()
+    try:
+        cursor.execute(OCCURRENCES_TABLE_SQL)
+        cursor.execute("SHOW COLUMNS FROM pre_registrations LIKE 'occurrences_through'")
+        if cursor.fetchone() is None:
+            cursor.execute("ALTER TABLE pre_registrations ADD COLUMN occurrences_through DATE NULL")
+            logger.info("Added occurrences_through column to pre_registrations table")
+        # One-off "expected today" reads are (company_to_visit, visit_date) lookups
+        cursor.execute("SHOW INDEX FROM pre_registrations WHERE Key_name = 'idx_company_visit_date'")
+        if not cursor.fetchall():
+            cursor.execute("CREATE INDEX idx_company_visit_date ON pre_registrations (company_to_visit, visit_date)")
+            logger.info("Added idx_company_visit_date index to pre_registrations table")
+    finally:
+        cursor.close()
+    _table_ready = True
+
+def _add_months(day, months, anchor_day):
+    """Same day of month `months` later, clamped to the month's last day (31st -> 30th)"""
+    month_index = day.month - 1 + months
+    year, month = day.year + month_index // 12, month_index % 12 + 1
+    return date(year, month, min(anchor_day, monthrange(year, month)[1]))
+
+def occurrence_dates(start, pattern, window_start, window_end):
+    """Dates of a series starting on `start` that fall within [window_start, window_end]"""
+    if window_start > window_end or start > window_end:
+        return []
+    if pattern == 'daily':
+        first = max(start, window_start)
+        return [first + timedelta(days=i) for i in range((window_end - first).days + 1)]
+    if pattern == 'weekly':
+        skip_weeks = max(0, -(-(window_start - start).days // 7))
+        first = start + timedelta(weeks=skip_weeks)
+        return [first + timedelta(weeks=i) for i in range((window_end - first).days // 7 + 1)] if first <= window_end else []
+    if pattern == 'monthly':
+        months = max(0, (window_start.year - start.year) * 12 + window_start.month - start.month - 1)
+        dates = []
+        current = _add_months(start, months, start.day)
+        while current <= window_end:
+            if current >= window_start:
+                dates.append(current)
+            months += 1
+            current = _add_months(start, months, start.day)
+        return dates
+    return []
+
+def materialize(conn, pre_registration_ids=None, today=None, horizon_days=HORIZON_DAYS):
+    """Expand recurring series up to today + horizon_days; only days not expanded before
+
+    Limited to `pre_registration_ids` when given (e.g. right after a series is
+    created). Returns the number of occurrence rows inserted.
+    """
+    ensure_occurrences_table(conn)
+    today = today or date.today()
+    horizon = today + timedelta(days=horizon_days)
+
+    cursor = conn.cursor(dictionary=True)
+    query = """
+        SELECT id, company_id, company_to_visit, visit_date, visit_time, qr_code,
+               recurring_pattern, recurring_end_date, occurrences_through
+        FROM pre_registrations
+        WHERE is_recurring = TRUE
+        AND recurring_pattern IS NOT NULL
+        AND status != 'cancelled'
+        AND (recurring_end_date IS NULL OR recurring_end_date >= %s)
+        AND (occurrences_through IS NULL OR occurrences_through < %s)
+    """
+    params = [today, horizon]
+    if pre_registration_ids:
+        query += f" AND id IN ({', '.join(['%s'] * len(pre_registration_ids))})"
+        params += list(pre_registration_ids)
+    cursor.execute(query, params)
+    series = cursor.fetchall()
+    cursor.close()
+
+    inserted = 0
+    cursor = conn.cursor()
+    try:
+        for s in series:
+            # Resume after the watermark; never backfill days that are already past
+            window_start = max(today, s['occurrences_through'] + timedelta(days=1)) if s['occurrences_through'] else today
+            window_end = min(horizon, s['recurring_end_date']) if s['recurring_end_date'] else horizon
+            rows = [
+                (s['id'], s['company_id'], s['company_to_visit'], day, s['visit_time'], s['qr_code'])
+                for day in occurrence_dates(s['visit_date'], s['recurring_pattern'], window_start, window_end)
+            ]
+            if rows:
+                # INSERT IGNORE: a concurrent pass or a retry may already have added some days
+                cursor.executemany("""
+                    INSERT IGNORE INTO recurring_occurrences
+                        (pre_registration_id, company_id, company_to_visit, occurrence_date, visit_time, qr_code)
+                    VALUES (%s, %s, %s, %s, %s, %s)
+                """, rows)
+                inserted += max(cursor.rowcount, 0)
+            cursor.execute("UPDATE pre_registrations SET occurrences_through = %s WHERE id = %s", (horizon, s['id']))
+            conn.commit()
+    finally:
+        cursor.close()
+    if inserted:
+        logger.info(f"✅ Materialized {inserted} recurring visit occurrence(s) from {len(series)} series")
+    return inserted
+
+def materialize_due(conn):
+    """Scheduler pass: extend every series to the current window; one worker at a time"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT GET_LOCK(%s, 0)", (SCHEDULER_LOCK,))
+    acquired = cursor.fetchone()[0]
+    if not acquired:
+        cursor.close()
+        return 0
+    try:
+        return materialize(conn)
+    finally:
+        cursor.execute("SELECT RELEASE_LOCK(%s)", (SCHEDULER_LOCK,))
+        cursor.fetchone()
+        cursor.close()
+
+def _scheduler_loop(connect):
+    while True:
+        conn = None
+        try:
+            conn = connect()
+            materialize_due(conn)
+        except Exception as e:
+            logger.warning(f"⚠️ Recurring occurrence materialization failed: {e}")
+        finally:
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+        time.sleep(INTERVAL_SECONDS)
+
+def start_scheduler(connect):
+    """Start the background scheduler once per process (gunicorn workers fork after import)"""
+    global _scheduler_pid
+    with _scheduler_lock:
+        if _scheduler_pid == os.getpid():
+            return
+        _scheduler_pid = os.getpid()
+    threading.Thread(target=_scheduler_loop, args=(connect,), name='recurrence-scheduler', daemon=True).start()
+
+def init_recurrence_scheduler(app, connect):
+    """Start the scheduler from the first request each worker serves (RECURRENCE_SCHEDULER)"""
+    @app.before_request
+    def ensure_scheduler():
+        # Checked per request: test clients switch TESTING on after the app is built
+        if _scheduler_pid == os.getpid() or app.testing or not app.config.get('RECURRENCE_SCHEDULER', True):
+            return
+        start_scheduler(connect)
@@ -0,0 +1,255 @@
+"""
+Visitor Identity
+Resolves a check-in to one visitors row per person and tenant instead of
+inserting a new row (photo and ID image included) on every visit. Visitors
+are matched within the checking-in company on a normalized email or ID card
+number; a phone number links records only when neither carries a different
+email or ID number, since desk and office phones are shared. A match gets the
+latest non-empty details; anything else is inserted. The photo, ID card and
+address captured at the desk are also kept on the visit itself, so a visit
+shows what was taken that day. scripts/merge_duplicate_visitors.py folds the
+rows created before this into one per visitor and company and then makes
+(company_name, email_normalized) unique.
+"""
+
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+MIN_PHONE_DIGITS = 6
+MIN_ID_NUMBER_LENGTH = 6
+# Numbers are compared on their last digits so "+91 98765 43210" and "098765 43210" agree
+PHONE_DIGITS_KEPT = 10
+
+IDENTITY_COLUMNS = {
+    # Tenant the record belongs to; a person visiting two companies has two rows
+    'company_name': 'VARCHAR(200) NULL',
+    'email_normalized': 'VARCHAR(100) NULL',
+    'phone_normalized': 'VARCHAR(20) NULL',
+    'id_number_normalized': 'VARCHAR(50) NULL',
+    # Set on duplicates folded by the merge script, which keeps their images
+    'merged_into': 'INT NULL',
+}
+
+# Identity lookups are per tenant; the email index becomes
+# uq_company_email_normalized once merge_duplicate_visitors.py has run
+IDENTITY_INDEXES = {
+    'idx_company_email_normalized': '(company_name, email_normalized)',
+    'idx_company_phone_normalized': '(company_name, phone_normalized)',
+    'idx_company_id_number_normalized': '(company_name, id_number_normalized)',
+}
+# Earlier tenant-wide indexes; a unique email across companies would merge tenants' visitors
+SUPERSEDED_INDEXES = ['uq_email_normalized', 'idx_email_normalized', 'idx_phone_normalized',
+                      'idx_id_number_normalized']
+
+# visits column -> check-in detail it keeps for that visit
+SNAPSHOT_COLUMNS = {
+    'visitor_photo': ('photo', 'MEDIUMTEXT NULL'),
+    'visitor_id_card_photo': ('idCardPhoto', 'MEDIUMTEXT NULL'),
+    'visitor_id_card_number': ('idCardNumber', 'VARCHAR(50) NULL'),
+    'visitor_address': ('address', 'TEXT NULL'),
+}
+
+# Copied from a check-in when not empty (phone and ID number keys follow);
+# the visitor's email is kept as first seen
+DETAIL_COLUMNS = ['name', 'phone', 'designation', 'company', 'photo', 'idCardPhoto', 'idCardNumber',
+                  'companyTel', 'website', 'address', 'type_of_card']
+
+# Identity columns in identity_keys() order
+_INSERT_COLUMNS = ['company_name'] + DETAIL_COLUMNS + ['email', 'email_normalized', 'id_number_normalized',
+                                                      'phone_normalized']
+
+_KEEP_IF_EMPTY = "{column} = COALESCE(NULLIF({value}, ''), {column})"
+
+# With uq_company_email_normalized in place a concurrent insert of the same
+# email at the same company becomes an update, and LAST_INSERT_ID(id) hands back the existing row's id
+INSERT_SQL = f"""
+    INSERT INTO visitors ({', '.join(_INSERT_COLUMNS)})
+    VALUES ({', '.join(['%s'] * len(_INSERT_COLUMNS))})
+    ON DUPLICATE KEY UPDATE id = LAST_INSERT_ID(id),
+        {', '.join(_KEEP_IF_EMPTY.format(column=c, value=f'VALUES({c})') for c in DETAIL_COLUMNS)},
+        phone_normalized = COALESCE(VALUES(phone_normalized), phone_normalized),
+        id_number_normalized = COALESCE(VALUES(id_number_normalized), id_number_normalized)
+"""
+
+UPDATE_SQL = f"""
+    UPDATE visitors SET
+        {', '.join(_KEEP_IF_EMPTY.format(column=c, value='%s') for c in DETAIL_COLUMNS)},
+        email = COALESCE(email, %s),
+        email_normalized = COALESCE(email_normalized, %s),
+        id_number_normalized = COALESCE(%s, id_number_normalized),
+        phone_normalized = COALESCE(%s, phone_normalized)
+    WHERE id = %s
+"""
+
+_columns_ready = False
+
+def ensure_identity_columns(conn):
+    """Add the identity columns and indexes to visitors, and the snapshot columns to visits, once per process"""
+    global _columns_ready
+    if _columns_ready:
+        return
+    cursor = conn.cursor()
+    try:
+        columns = [('visitors', column, definition) for column, definition in IDENTITY_COLUMNS.items()]
+        columns += [('visits', column, definition) for column, (_, definition) in SNAPSHOT_COLUMNS.items()]
+        for table, column, definition in columns:
+            cursor.execute(f"SHOW COLUMNS FROM {table} LIKE '{column}'")
+            if cursor.fetchone() is None:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+                logger.info(f"Added {column} column to {table} table")
+        cursor.execute("SHOW INDEX FROM visitors")
+        indexes = {row[2] for row in cursor.fetchall()}
+        for index in SUPERSEDED_INDEXES:
+            if index in indexes:
+                cursor.execute(f"DROP INDEX {index} ON visitors")
+                logger.info(f"Dropped {index} index from visitors table")
+        for index, columns in IDENTITY_INDEXES.items():
+            if index not in indexes and not (index == 'idx_company_email_normalized'
+                                             and 'uq_company_email_normalized' in indexes):
+                cursor.execute(f"CREATE INDEX {index} ON visitors {columns}")
+                logger.info(f"Added {index} index to visitors table")
+    finally:
+        cursor.close()
+    _columns_ready = True
+
+def normalize_email(email):
+    email = (email or '').strip().lower()
+    return email or None
+
+def normalize_phone(phone):
+    phone_digits = re.sub(r'\D', '', phone or '')
+    return phone_digits[-PHONE_DIGITS_KEPT:] if len(phone_digits) >= MIN_PHONE_DIGITS else None
+
+def normalize_id_number(id_number):
+    id_number = re.sub(r'[^0-9A-Za-z]', '', id_number or '').upper()
+    return id_number if len(id_number) >= MIN_ID_NUMBER_LENGTH else None
+
+def identity_keys(visitor):
+    """(email, id number, phone) of a visitor dict, normalized; None where absent"""
+    return (normalize_email(visitor.get('email')), normalize_id_number(visitor.get('idCardNumber')),
+            normalize_phone(visitor.get('phone')))
+
+def _compatible(stored, value):
+    return stored is None or value is None or stored == value
+
+def pick_match(keys, candidates):
+    """Id of the candidate row a visitor with `keys` is, or None
+
+    Candidates are dicts with id and the normalized columns, newest first.
+    """
+    email, id_number, phone = keys
+    for column, value in (('email_normalized', email), ('id_number_normalized', id_number)):
+        if value is not None:
+            for candidate in candidates:
+                if candidate[column] == value:
+                    return candidate['id']
+    if phone is not None:
+        for candidate in candidates:
+            if (candidate['phone_normalized'] == phone
+                    and _compatible(candidate['email_normalized'], email)
+                    and _compatible(candidate['id_number_normalized'], id_number)):
+                return candidate['id']
+    return None
+
+def _in(values):
+    return ', '.join(['%s'] * len(values))
+
+def snapshot(visitor):
+    """Values for the visits SNAPSHOT_COLUMNS from a check-in detail dict"""
+    return tuple(visitor.get(detail) or None for detail, _ in SNAPSHOT_COLUMNS.values())
+
+def _fetch_candidates(cursor, company_name, all_keys):
+    conditions, params = [], [company_name]
+    for position, column in enumerate(('email_normalized', 'id_number_normalized', 'phone_normalized')):
+        values = sorted({keys[position] for keys in all_keys} - {None})
+        if values:
+            conditions.append(f"{column} IN ({_in(values)})")
+            params.extend(values)
+    if not conditions:
+        return []
+    columns = ['id', 'email_normalized', 'id_number_normalized', 'phone_normalized']
+    cursor.execute(f"""
+        SELECT {', '.join(columns)} FROM visitors
+        WHERE company_name = %s AND ({' OR '.join(conditions)})
+        ORDER BY id DESC
+        FOR UPDATE
+    """, params)
+    return [row if isinstance(row, dict) else dict(zip(columns, row)) for row in cursor.fetchall()]
+
+def resolve_visitors(cursor, company_name, visitors):
+    """Visitor ids for a list of check-ins at `company_name`, reusing that company's rows
+
+    Runs on the caller's cursor, inside its transaction; matched rows are
+    locked until it commits. Keys are DETAIL_COLUMNS plus email; missing
+    ones count as empty.
+    """
+    all_keys = [identity_keys(visitor) for visitor in visitors]
+    candidates = _fetch_candidates(cursor, company_name, all_keys)
+    ids = [pick_match(keys, candidates) for keys in all_keys]
+
+    def details(visitor, keys):
+        return tuple(visitor.get(c) for c in DETAIL_COLUMNS) + (visitor.get('email') or None,) + keys
+
+    updates = [details(visitor, keys) + (visitor_id,)
+               for visitor, keys, visitor_id in zip(visitors, all_keys, ids) if visitor_id is not None]
+    if updates:
+        cursor.executemany(UPDATE_SQL, updates)
+
+    new = [position for position, visitor_id in enumerate(ids) if visitor_id is None]
+    with_email = [position for position in new if all_keys[position][0] is not None]
+    if with_email:
+        # One multi-row insert, then the ids by email (unique within a check-in batch)
+        cursor.executemany(INSERT_SQL, [(company_name,) + details(visitors[p], all_keys[p]) for p in with_email])
+        emails = [all_keys[p][0] for p in with_email]
+        cursor.execute(f"SELECT id, email_normalized FROM visitors WHERE company_name = %s "
+                       f"AND email_normalized IN ({_in(emails)}) ORDER BY id", [company_name] + emails)
+        inserted = {}
+        for row in cursor.fetchall():
+            row_id, email = (row['id'], row['email_normalized']) if isinstance(row, dict) else row
+            inserted[email] = row_id
+        for position in with_email:
+            ids[position] = inserted[all_keys[position][0]]
+    for position in new:
+        if ids[position] is None:
+            cursor.execute(INSERT_SQL, (company_name,) + details(visitors[position], all_keys[position]))
+            ids[position] = cursor.lastrowid
+    return ids
+
+def resolve_visitor(cursor, company_name, visitor):
+    """Visitor id for one check-in; see resolve_visitors"""
+    return resolve_visitors(cursor, company_name, [visitor])[0]
+
+def group_duplicates(records):
+    """Group (id, email, phone, id_number) records, oldest first, into people
+
+    Records should belong to one company. Same rules as resolve_visitors: a
+    record joins the group holding its email or ID number, else a group with
+    its phone and no different email or ID number. Returns
+    {newest id: [older ids]} for groups of two or more.
+    """
+    by_email, by_id_number, by_phone = {}, {}, {}
+    groups = []
+    for record_id, email, phone, id_number in records:
+        email, id_number, phone = identity_keys({'email': email, 'phone': phone, 'idCardNumber': id_number})
+        group = by_email.get(email) or by_id_number.get(id_number)
+        if group is None and phone is not None:
+            candidate = by_phone.get(phone)
+            if (candidate is not None
+                    and (email is None or not candidate['emails'] or email in candidate['emails'])
+                    and (id_number is None or not candidate['id_numbers'] or id_number in candidate['id_numbers'])):
+                group = candidate
+        if group is None:
+            group = {'ids': [], 'emails': set(), 'id_numbers': set()}
+            groups.append(group)
+        group['ids'].append(record_id)
+        if email is not None:
+            group['emails'].add(email)
+            by_email.setdefault(email, group)
+        if id_number is not None:
+            group['id_numbers'].add(id_number)
+            by_id_number.setdefault(id_number, group)
+        if phone is not None:
+            by_phone.setdefault(phone, group)
+    return {group['ids'][-1]: group['ids'][:-1] for group in groups if len(group['ids']) > 1}
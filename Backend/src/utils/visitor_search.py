@@ -0,0 +1,249 @@
+"""
+Visitor Search
+Typeahead over a tenant's returning visitors. visitor_search keeps one row per
+(company, visitor) with a FULLTEXT index over a tenant token, name, email,
+phone and company, so word-prefix queries ("jo smi") are ranked index lookups
+confined to one tenant instead of LIKE '%...%' scans of visits. Terms shorter
+than InnoDB's minimum token size and phone numbers use the tenant-scoped
+B-tree prefix indexes. Check-ins upsert the visitor's row in the same
+transaction as the visit.
+
+The visit list filters (visitorName, visitorEmail) read n-gram FULLTEXT
+indexes on visits when they exist; see scripts/build_visitor_search.py.
+"""
+
+import re
+import time
+import hashlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+SEARCH_TABLE = 'visitor_search'
+# innodb_ft_min_token_size and ngram_token_size defaults
+MIN_TOKEN_SIZE = 3
+NGRAM_TOKEN_SIZE = 2
+MAX_QUERY_TOKENS = 8
+# A missing n-gram index is looked for again after this long
+INDEX_RECHECK_SECONDS = 300
+
+# LIKE patterns are built from user input with these escaped
+LIKE_ESCAPE = " ESCAPE '\\\\'"
+
+# Stopwords are off when the index is built: the default list drops name
+# parts such as "de", "la" and "will"
+SEARCH_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        company_name VARCHAR(200) NOT NULL,
+        visitor_key VARCHAR(255) NOT NULL,
+        visitor_id INT NULL,
+        name VARCHAR(100) NOT NULL,
+        email VARCHAR(100) NULL,
+        phone VARCHAR(20) NULL,
+        phone_digits VARCHAR(20) NULL,
+        company VARCHAR(200) NULL,
+        visit_count INT NOT NULL DEFAULT 0,
+        last_visit_at DATETIME NULL,
+        tenant_token VARCHAR(20) NOT NULL,
+        UNIQUE KEY uq_company_visitor (company_name, visitor_key),
+        INDEX idx_company_name_prefix (company_name, name),
+        INDEX idx_company_email_prefix (company_name, email),
+        INDEX idx_company_phone_prefix (company_name, phone_digits),
+        FULLTEXT INDEX ft_visitor (tenant_token, name, email, phone, company)
+    )
+"""
+
+# Rows written before tenant_token existed get it from their company_name
+TENANT_TOKEN_SQL = "CONCAT('t', LEFT(SHA2(LOWER(company_name), 256), 16))"
+
+# visit_count is added, so a row can carry several visits (backfill, bulk check-in)
+UPSERT_SQL = """
+    INSERT INTO visitor_search (company_name, visitor_key, visitor_id, name, email, phone,
+                                phone_digits, company, visit_count, last_visit_at, tenant_token)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        visitor_id = COALESCE(VALUES(visitor_id), visitor_id),
+        name = VALUES(name),
+        email = COALESCE(VALUES(email), email),
+        phone = COALESCE(VALUES(phone), phone),
+        phone_digits = COALESCE(VALUES(phone_digits), phone_digits),
+        company = COALESCE(VALUES(company), company),
+        visit_count = visit_count + VALUES(visit_count),
+        last_visit_at = GREATEST(COALESCE(last_visit_at, VALUES(last_visit_at)), VALUES(last_visit_at))
+"""
+
+# n-gram indexes on visits used by the list filters: index name -> column
+VISIT_NGRAM_INDEXES = {
+    'ft_visitor_name': 'visitor_name',
+    'ft_visitor_email': 'visitor_email',
+}
+
+_RESULT_COLUMNS = "visitor_id, name, email, phone, company, visit_count, last_visit_at"
+_MATCH = "MATCH(tenant_token, name, email, phone, company)"
+
+_table_ready = False
+_index_state = {}
+
+def ensure_search_table(conn):
+    """Create visitor_search, or add its tenant token, once per process (idempotent)"""
+    global _table_ready
+    if _table_ready:
+        return
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SET SESSION innodb_ft_enable_stopword = OFF")
+        cursor.execute(SEARCH_TABLE_SQL.format(table=SEARCH_TABLE))
+        cursor.execute(f"SHOW COLUMNS FROM {SEARCH_TABLE} LIKE 'tenant_token'")
+        if cursor.fetchone() is None:
+            cursor.execute(f"ALTER TABLE {SEARCH_TABLE} ADD COLUMN tenant_token VARCHAR(20) NOT NULL DEFAULT ''")
+            cursor.execute(f"UPDATE {SEARCH_TABLE} SET tenant_token = {TENANT_TOKEN_SQL}")
+            cursor.execute(f"ALTER TABLE {SEARCH_TABLE} DROP INDEX ft_visitor, "
+                           "ADD FULLTEXT INDEX ft_visitor (tenant_token, name, email, phone, company)")
+            logger.info(f"Added tenant_token to the {SEARCH_TABLE} FULLTEXT index")
+    finally:
+        cursor.close()
+    _table_ready = True
+
+def digits(phone):
+    """Phone number reduced to its digits, None when it has none"""
+    return re.sub(r'\D', '', phone or '') or None
+
+def visitor_key(email, phone, name):
+    """Identity of a visitor within a tenant: email, else phone, else name"""
+    email = (email or '').strip().lower()
+    if email:
+        return 'e:' + email
+    phone_number = digits(phone)
+    if phone_number and len(phone_number) >= 6:
+        return 'p:' + phone_number
+    return 'n:' + ' '.join((name or '').lower().split())
+
+def tenant_token(company_name):
+    """FULLTEXT word standing for a tenant; matches TENANT_TOKEN_SQL"""
+    return 't' + hashlib.sha256((company_name or '').lower().encode('utf-8')).hexdigest()[:16]
+
+def escape_like(term):
+    """`term` with LIKE wildcards and the escape character taken literally"""
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+def search_row(company_name, visitor_id, name, email, phone, company, visited_at, visit_count=1):
+    """UPSERT_SQL parameters for one visitor; empty strings are stored as NULL"""
+    email, phone, company = email or None, phone or None, company or None
+    return (company_name, visitor_key(email, phone, name), visitor_id, name, email, phone,
+            digits(phone), company, visit_count, visited_at, tenant_token(company_name))
+
+def record_visits(cursor, company_name, visits):
+    """Upsert the visitors of new check-ins
+
+    `visits` holds (visitor_id, name, email, phone, company, check_in_time)
+    tuples. Runs on the caller's cursor, inside its transaction.
+    """
+    rows = [search_row(company_name, *visit) for visit in visits]
+    if rows:
+        cursor.executemany(UPSERT_SQL, rows)
+
+def tokenize(q):
+    """Lowercased word tokens of a query, at most MAX_QUERY_TOKENS"""
+    return re.findall(r'\w+', (q or '').lower())[:MAX_QUERY_TOKENS]
+
+def build_query(company_name, q, limit=10, table=SEARCH_TABLE):
+    """SQL and parameters ranking a tenant's visitors for a typeahead query
+
+    Tokens of MIN_TOKEN_SIZE or more become required FULLTEXT prefix terms
+    (+tok*) next to the required tenant token, so the index only returns the
+    tenant's rows; shorter ones filter the matched rows. A query without such
+    tokens, or a phone number, is a prefix range on the B-tree indexes.
+    Returns (None, None) for an empty query.
+    """
+    tokens = tokenize(q)
+    if not tokens:
+        return None, None
+    phone_number = re.sub(r'[\s+()\-]', '', q)
+    words = [t for t in tokens if len(t) >= MIN_TOKEN_SIZE]
+    name_prefix = escape_like(' '.join(tokens)) + '%'
+
+    if phone_number.isdigit():
+        sql = f"""
+            SELECT {_RESULT_COLUMNS} FROM {table}
+            WHERE company_name = %s AND phone_digits LIKE %s{LIKE_ESCAPE}
+            ORDER BY visit_count DESC, last_visit_at DESC LIMIT %s
+        """
+        return sql, [company_name, phone_number + '%', limit]
+
+    short_filters = ''.join(f" AND (name LIKE %s{LIKE_ESCAPE} OR email LIKE %s{LIKE_ESCAPE}"
+                            f" OR company LIKE %s{LIKE_ESCAPE})"
+                            for t in tokens if len(t) < MIN_TOKEN_SIZE)
+    short_params = [f'%{escape_like(t)}%' for t in tokens if len(t) < MIN_TOKEN_SIZE for _ in range(3)]
+
+    if not words:
+        sql = f"""
+            SELECT {_RESULT_COLUMNS} FROM {table}
+            WHERE company_name = %s AND (name LIKE %s{LIKE_ESCAPE} OR email LIKE %s{LIKE_ESCAPE}){short_filters}
+            ORDER BY name LIKE %s{LIKE_ESCAPE} DESC, visit_count DESC, last_visit_at DESC LIMIT %s
+        """
+        prefix = escape_like(tokens[0]) + '%'
+        return sql, [company_name, prefix, prefix] + short_params + [name_prefix, limit]
+
+    against = ' '.join([f'+{tenant_token(company_name)}'] + [f'+{t}*' for t in words])
+    sql = f"""
+        SELECT {_RESULT_COLUMNS},
+               {_MATCH} AGAINST (%s IN BOOLEAN MODE) AS score
+        FROM {table}
+        WHERE {_MATCH} AGAINST (%s IN BOOLEAN MODE)
+        AND company_name = %s{short_filters}
+        ORDER BY name LIKE %s{LIKE_ESCAPE} DESC, score DESC, visit_count DESC, last_visit_at DESC LIMIT %s
+    """
+    return sql, [against, against, company_name] + short_params + [name_prefix, limit]
+
+def search(conn, company_name, q, limit=10):
+    """Best `limit` matches for `q` among the tenant's visitors"""
+    sql, params = build_query(company_name, q, limit)
+    if sql is None:
+        return []
+    ensure_search_table(conn)
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(sql, params)
+        results = cursor.fetchall()
+    finally:
+        cursor.close()
+    for row in results:
+        row.pop('score', None)
+    return results
+
+def ngram_ready(conn, index):
+    """Whether visits has the n-gram FULLTEXT index `index`
+
+    A present index is remembered for the life of the process; a missing one
+    is looked for again after INDEX_RECHECK_SECONDS.
+    """
+    ready, checked_at = _index_state.get(index, (False, None))
+    if ready or (checked_at is not None and time.monotonic() - checked_at < INDEX_RECHECK_SECONDS):
+        return ready
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SHOW INDEX FROM visits WHERE Key_name = %s", (index,))
+        ready = bool(cursor.fetchall())
+    except Exception as e:
+        logger.warning(f"⚠️ Could not check index {index}: {e}")
+        ready = False
+    finally:
+        cursor.close()
+    _index_state[index] = (ready, time.monotonic())
+    return ready
+
+def substring_filter(column, term):
+    """`column` contains `term` (the old LIKE '%term%'), read through its n-gram index
+
+    The boolean-mode phrase search finds candidate rows by index; the LIKE
+    then keeps exactly the rows the plain filter matched, with % and _ in
+    `term` taken literally. Terms with no piece of NGRAM_TOKEN_SIZE
+    characters fall back to the LIKE alone.
+    """
+    pattern = f'%{escape_like(term)}%'
+    pieces = [p for p in re.findall(r'\w+', term) if len(p) >= NGRAM_TOKEN_SIZE]
+    if not pieces:
+        return f"{column} LIKE %s{LIKE_ESCAPE}", [pattern]
+    against = ' '.join(f'+"{p}"' for p in pieces)
+    return f"(MATCH({column}) AGAINST (%s IN BOOLEAN MODE) AND {column} LIKE %s{LIKE_ESCAPE})", [against, pattern]
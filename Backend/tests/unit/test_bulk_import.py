@@ -0,0 +1,104 @@
+"""
+Tests for bulk import parsing, validation and chunked writes
+"""
+
+import io
+import json
+from unittest.mock import MagicMock
+import pytest
+from flask import Flask, request
+
+from src.utils import bulk_import
+from src.utils.bulk_import import BulkImportError, RowErrors
+
+COLUMNS = {
+    'visitorName': ('name',),
+    'visitorEmail': ('email',),
+    'visitDate': ('date',),
+    'numberOfVisitors': ('visitors',),
+}
+
+@pytest.fixture
+def app():
+    return Flask(__name__)
+
+def load(app, max_rows=100, **request_kwargs):
+    with app.test_request_context('/bulk', method='POST', **request_kwargs):
+        return bulk_import.load_rows(request, COLUMNS, max_rows)
+
+class TestLoadRows:
+    """CSV/JSON input to canonical columns"""
+
+    def test_csv_headers_are_normalized(self, app):
+        csv = b"Visitor Name,EMAIL,date,Unknown\nAsha Rao,asha@example.com,2024-05-02,x\n"
+        df = load(app, data={'file': (io.BytesIO(csv), 'visitors.csv')}, content_type='multipart/form-data')
+        assert list(df.columns) == list(COLUMNS)
+        assert df.at[1, 'visitorName'] == 'Asha Rao'
+        assert df.at[1, 'numberOfVisitors'] == ''
+
+    def test_json_rows_with_defaults(self, app):
+        payload = {'rows': [{'name': ' Asha ', 'visitDate': ''}, {'name': 'Ravi', 'visitDate': '2024-05-03'}],
+                   'defaults': {'visit_date': '2024-05-02'}}
+        df = load(app, data=json.dumps(payload), content_type='application/json')
+        assert df['visitorName'].tolist() == ['Asha', 'Ravi']
+        assert df['visitDate'].tolist() == ['2024-05-02', '2024-05-03']
+        assert df.index.tolist() == [1, 2]
+
+    def test_row_limit(self, app):
+        with pytest.raises(BulkImportError, match='Too many rows'):
+            load(app, max_rows=1, data=json.dumps([{'name': 'a'}, {'name': 'b'}]), content_type='application/json')
+
+    def test_no_rows(self, app):
+        with pytest.raises(BulkImportError):
+            load(app, data=json.dumps([]), content_type='application/json')
+
+class TestValidation:
+    """Column-wide checks collected per row"""
+
+    def test_errors_per_row(self, app):
+        rows = [
+            {'name': 'Asha', 'email': 'asha@example.com', 'date': '2024-05-02', 'visitors': '2'},
+            {'name': '', 'email': 'not-an-email', 'date': 'someday', 'visitors': '0'},
+        ]
+        df = load(app, data=json.dumps(rows), content_type='application/json')
+        errors = RowErrors(df.index)
+        errors.require(df, 'visitorName')
+        errors.check_email(df, 'visitorEmail')
+        dates = bulk_import.parse_dates(df, 'visitDate', errors)
+        counts = bulk_import.parse_positive_ints(df, 'numberOfVisitors', errors, default=1)
+
+        assert errors.valid() == [1]
+        assert dates.at[1] == '2024-05-02'
+        assert counts.at[1] == 2
+        assert errors.messages[2] == [
+            'visitorName is required',
+            'visitorEmail is not a valid email',
+            'visitDate is not a valid date',
+            'numberOfVisitors must be a positive number',
+        ]
+
+class TestWriteInChunks:
+    """Chunked transactions with row-by-row retry"""
+
+    def test_failed_chunk_retried_row_by_row(self):
+        conn = MagicMock()
+
+        def write(cursor, chunk):
+            if 'bad' in chunk:
+                raise ValueError('Duplicate entry')
+            return [f'id-{item}' for item in chunk]
+
+        results, errors = bulk_import.write_in_chunks(conn, ['a', 'b', 'bad', 'c'], 2, write)
+        assert results == {0: 'id-a', 1: 'id-b', 3: 'id-c'}
+        assert errors == {2: 'Duplicate entry'}
+        # first chunk committed; second rolled back, then 'bad' rolled back and 'c' committed
+        assert conn.commit.call_count == 2
+        assert conn.rollback.call_count == 2
+
+    def test_summarize_in_source_order(self):
+        errors = RowErrors([1, 2, 3])
+        errors.messages[2].append('visitorName is required')
+        summary = bulk_import.summarize([1, 3], {0: {'id': 7}}, {1: 'Duplicate entry'}, errors, lambda r: r)
+        assert summary['created'] == 1 and summary['failed'] == 2
+        assert [r['status'] for r in summary['results']] == ['created', 'error', 'error']
+        assert summary['results'][2]['errors'] == ['Duplicate entry']
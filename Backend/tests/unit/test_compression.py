@@ -0,0 +1,86 @@
+"""
+Tests for gzip/brotli response compression
+"""
+
+import gzip
+from unittest import mock
+import pytest
+from flask import Flask, Response, jsonify
+
+from src.utils import compression
+from src.utils.compression import init_compression
+
+ROWS = [{'id': i, 'visitor_name': f'Visitor {i}', 'status': 'approved'} for i in range(200)]
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    init_compression(app)
+
+    @app.route('/visits')
+    def visits():
+        return jsonify(ROWS)
+
+    @app.route('/small')
+    def small():
+        return jsonify({'ok': True})
+
+    @app.route('/export.csv')
+    def export_csv():
+        return Response((f"{row['id']},{row['visitor_name']}\n" for row in ROWS), mimetype='text/csv')
+
+    @app.route('/badge.png')
+    def badge():
+        return Response(b'\x89PNG' * 1000, mimetype='image/png')
+
+    return app
+
+def get(app, path, encoding='gzip'):
+    with mock.patch.object(compression, 'brotli', None):
+        return app.test_client().get(path, headers={'Accept-Encoding': encoding})
+
+class TestCompression:
+    """Negotiation, thresholds and streaming"""
+
+    def test_json_is_gzipped(self, app):
+        response = get(app, '/visits')
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.headers['Vary']
+        assert gzip.decompress(response.get_data()) == app.test_client().get('/visits').get_data()
+
+    def test_identity_when_not_accepted(self, app):
+        response = get(app, '/visits', encoding='identity')
+        assert 'Content-Encoding' not in response.headers
+        assert response.get_json() == ROWS
+
+    def test_small_responses_untouched(self, app):
+        assert 'Content-Encoding' not in get(app, '/small').headers
+
+    def test_non_text_types_untouched(self, app):
+        assert 'Content-Encoding' not in get(app, '/badge.png').headers
+
+    def test_streamed_response(self, app):
+        response = get(app, '/export.csv')
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Content-Length' not in response.headers
+        body = gzip.decompress(response.get_data()).decode('utf-8')
+        assert body.splitlines()[199] == '199,Visitor 199'
+
+    def test_strong_etag_weakened(self, app):
+        @app.route('/tagged')
+        def tagged():
+            response = jsonify(ROWS)
+            response.set_etag('abc')
+            return response
+
+        assert get(app, '/tagged').headers['ETag'] == 'W/"abc"'
+
+    def test_disabled(self, app):
+        app.config['COMPRESS_ENABLED'] = False
+        assert 'Content-Encoding' not in get(app, '/visits').headers
+
+@pytest.mark.skipif(compression.brotli is None, reason='brotli not installed')
+def test_brotli_preferred(app):
+    response = app.test_client().get('/visits', headers={'Accept-Encoding': 'gzip, br'})
+    assert response.headers['Content-Encoding'] == 'br'
+    assert compression.brotli.decompress(response.get_data()) == app.test_client().get('/visits').get_data()
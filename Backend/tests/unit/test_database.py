@@ -5,10 +5,12 @@ Comprehensive tests for Database Configuration Module
 import pytest
 from unittest.mock import patch, MagicMock
 import mysql.connector
+import config.database as database
 from config.database import (
     initialize_db_pool, 
     get_db_connection, 
     test_db_connection,
+    pool_stats,
     DB_CONFIG
 )
 
@@ -90,3 +92,54 @@ class TestDatabaseConfig:
         result = test_db_connection()
         
         assert result is False
+
+
+class TestConnectionPoolManager:
+    """Fallback discovery, overflow connections and pool metrics"""
+
+    @pytest.fixture(autouse=True)
+    def fresh_pool(self, monkeypatch):
+        monkeypatch.setattr(database, 'connection_pool', None)
+        monkeypatch.setattr(database, '_active_config', None)
+        monkeypatch.setattr(database, 'metrics', database.PoolMetrics())
+
+    @patch('config.database.mysql.connector.pooling.MySQLConnectionPool')
+    def test_remembers_working_host(self, mock_pool):
+        """Later rediscovery starts from the host that worked"""
+        def only_mysql_host(**config):
+            if config['host'] != 'mysql':
+                raise mysql.connector.Error("Connection refused")
+            return MagicMock()
+        mock_pool.side_effect = only_mysql_host
+
+        get_db_connection()
+        assert mock_pool.call_args.kwargs['host'] == 'mysql'
+        assert all(c.kwargs['connection_timeout'] == DB_CONFIG['connection_timeout'] for c in mock_pool.call_args_list)
+
+        database.reset_pool()
+        mock_pool.reset_mock()
+        get_db_connection()
+        assert mock_pool.call_count == 1
+        assert mock_pool.call_args.kwargs['host'] == 'mysql'
+
+    @patch('config.database.mysql.connector.connect')
+    @patch('config.database.connection_pool')
+    def test_exhausted_pool_opens_direct_connection(self, mock_pool, mock_connect):
+        """PoolError falls back to a plain connection and counts as overflow"""
+        mock_pool.get_connection.side_effect = mysql.connector.errors.PoolError("pool exhausted")
+
+        assert get_db_connection() is mock_connect.return_value
+        assert 'pool_name' not in mock_connect.call_args.kwargs
+        assert pool_stats()['overflow_connections'] == 1
+
+    @patch('config.database.connection_pool')
+    def test_connection_error_drops_pool(self, mock_pool):
+        """A dead host forces host discovery on the next checkout"""
+        mock_pool.get_connection.side_effect = mysql.connector.errors.InterfaceError("gone away")
+
+        with pytest.raises(mysql.connector.Error):
+            get_db_connection()
+
+        assert database.connection_pool is None
+        stats = pool_stats()
+        assert (stats['failures'], stats['pool_rebuilds']) == (1, 1)
@@ -0,0 +1,62 @@
+"""
+Tests for the report export plugins
+"""
+
+import io
+import os
+import subprocess
+import sys
+import pytest
+
+from src.exports import run_export, get_exporter, shutdown_export_workers
+from scripts.startup_benchmark import sample_report_data, SAMPLE_USER
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), '..', '..')
+
+class TestExports:
+    """Export plugin registry and formats"""
+
+    def test_unknown_format_is_rejected(self):
+        with pytest.raises(ValueError):
+            get_exporter('docx')
+
+    def test_registry_imports_exporters_on_first_use(self):
+        code = (
+            "import sys\n"
+            "import src.exports as exports\n"
+            "assert 'openpyxl' not in sys.modules\n"
+            "exports.get_exporter('excel')\n"
+            "assert 'openpyxl' in sys.modules\n"
+        )
+        proc = subprocess.run([sys.executable, '-c', code], cwd=BACKEND_DIR, capture_output=True, text=True)
+        assert proc.returncode == 0, proc.stderr
+
+    def test_excel_export_has_all_sheets(self):
+        openpyxl = pytest.importorskip('openpyxl')
+        export = run_export('excel', sample_report_data(20), '2024-01-01', '2024-01-31', SAMPLE_USER)
+
+        assert export['filename'].endswith('.xlsx')
+        workbook = openpyxl.load_workbook(io.BytesIO(export['data']))
+        assert workbook.sheetnames == ['Overview', 'Recent Activity', 'Purpose Analysis', 'Daily Analysis', 'Host Performance']
+        assert workbook['Recent Activity'].max_row == 21
+
+    def test_pdf_export_falls_back_to_printable_html(self, monkeypatch):
+        from src.exports import pdf
+        monkeypatch.setattr(pdf, 'WEASYPRINT_AVAILABLE', False)
+
+        export = run_export('pdf', sample_report_data(5), None, None, SAMPLE_USER)
+
+        assert export['mimetype'] == 'text/html'
+        assert export['filename'].endswith('.html')
+        assert b'@media print' in export['data']
+
+    def test_worker_process_returns_same_export(self):
+        pytest.importorskip('openpyxl')
+        report = sample_report_data(10)
+        try:
+            export = run_export('excel', report, None, None, SAMPLE_USER, worker_process=True, timeout=120)
+        finally:
+            shutdown_export_workers()
+
+        assert export['data'][:2] == b'PK'
+        assert export['mimetype'] == run_export('excel', report, None, None, SAMPLE_USER)['mimetype']
@@ -0,0 +1,51 @@
+"""
+Tests for sparse fieldset selection on list endpoints
+"""
+
+import pytest
+
+from src.utils.fields import FieldSet, FieldSelectionError
+from src.routes.visit_routes import VISIT_LIST_FIELDS, HOST_VISIT_FIELDS
+from src.routes.visitor_routes import VISITOR_HISTORY_FIELDS
+
+@pytest.fixture
+def field_set():
+    return FieldSet({
+        'id': 'v.id',
+        'name': 'vis.name',
+        'photo': 'vis.photo',
+    }, default=['id', 'name'])
+
+class TestFieldSet:
+    """Resolution of the `fields` query parameter"""
+
+    def test_default_projection(self, field_set):
+        assert field_set.resolve(None) == ['id', 'name']
+        assert field_set.resolve('') == ['id', 'name']
+
+    def test_all_fields(self, field_set):
+        assert field_set.resolve('all') == ['id', 'name', 'photo']
+
+    def test_requested_fields_keep_required_first(self, field_set):
+        assert field_set.resolve('photo, name,photo') == ['id', 'photo', 'name']
+
+    def test_unknown_field_rejected(self, field_set):
+        with pytest.raises(FieldSelectionError, match='password'):
+            field_set.resolve('name,password')
+
+    def test_select_list_aliases_expressions(self, field_set):
+        select_list = field_set.select_list('photo')
+        assert select_list.split(',\n') == ['v.id AS `id`', '                   vis.photo AS `photo`']
+
+    def test_default_must_be_whitelisted(self):
+        with pytest.raises(ValueError):
+            FieldSet({'id': 'v.id'}, default=['id', 'missing'])
+
+class TestEndpointFieldSets:
+    """Default projections of the visit list endpoints"""
+
+    @pytest.mark.parametrize('fields', [VISIT_LIST_FIELDS, HOST_VISIT_FIELDS, VISITOR_HISTORY_FIELDS])
+    def test_defaults_skip_heavy_columns(self, fields):
+        heavy = {'visitorPhoto', 'idCardPhoto', 'address', 'website', 'notes', 'admin_notes', 'feedback'}
+        assert not heavy & set(fields.resolve(None))
+        assert 'id' in fields.resolve(None)
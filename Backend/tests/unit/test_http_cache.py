@@ -0,0 +1,87 @@
+"""
+Tests for ETag/Last-Modified conditional GETs
+"""
+
+from datetime import datetime, timezone
+from unittest import mock
+import pytest
+from flask import Flask, jsonify
+
+from src.utils import http_cache
+from src.utils.http_cache import bump_table_version, conditional_get
+
+UPDATED_AT = datetime(2024, 5, 1, 9, 30, tzinfo=timezone.utc)
+
+@pytest.fixture
+def versions():
+    state = {'versions': {'pricing_plans': 3}, 'last_modified': UPDATED_AT}
+    with mock.patch.object(http_cache, 'table_versions',
+                           side_effect=lambda tables: (dict(state['versions']), state['last_modified'])):
+        yield state
+
+@pytest.fixture
+def app(versions):
+    app = Flask(__name__)
+    calls = {'plans': 0}
+    app.calls = calls
+
+    @app.route('/plans')
+    @conditional_get('pricing_plans', public=True, max_age=60)
+    def plans():
+        calls['plans'] += 1
+        return jsonify({'plans': []})
+
+    @app.route('/users')
+    @conditional_get('users')
+    def users():
+        return jsonify([])
+
+    return app
+
+class TestConditionalGet:
+    """Validators, 304s and Cache-Control"""
+
+    def test_headers_on_full_response(self, app):
+        response = app.test_client().get('/plans')
+        assert response.status_code == 200
+        assert response.headers['ETag'].startswith('W/"')
+        assert response.headers['Cache-Control'] == 'public, max-age=60'
+        assert response.last_modified == UPDATED_AT
+
+    def test_matching_etag_skips_the_endpoint(self, app):
+        client = app.test_client()
+        etag = client.get('/plans').headers['ETag']
+        response = client.get('/plans', headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.headers['ETag'] == etag
+        assert app.calls['plans'] == 1
+
+    def test_write_changes_etag(self, app, versions):
+        client = app.test_client()
+        etag = client.get('/plans').headers['ETag']
+        versions['versions']['pricing_plans'] = 4
+        response = client.get('/plans', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+
+    def test_if_modified_since(self, app):
+        client = app.test_client()
+        last_modified = client.get('/plans').headers['Last-Modified']
+        assert client.get('/plans', headers={'If-Modified-Since': last_modified}).status_code == 304
+
+    def test_private_endpoints_revalidate(self, app):
+        response = app.test_client().get('/users')
+        assert response.headers['Cache-Control'] == 'private, no-cache'
+        assert 'Authorization' in response.headers['Vary']
+
+    def test_versions_unavailable_serves_uncached(self, app):
+        with mock.patch.object(http_cache, 'table_versions', side_effect=RuntimeError('db down')):
+            response = app.test_client().get('/plans')
+        assert response.status_code == 200
+        assert 'ETag' not in response.headers
+
+def test_bump_table_version_never_raises():
+    cursor = mock.Mock()
+    cursor.execute.side_effect = RuntimeError("Table 'table_versions' doesn't exist")
+    bump_table_version(cursor, 'users', 'companies')
+    assert cursor.execute.call_count == 2
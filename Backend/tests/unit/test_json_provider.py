@@ -0,0 +1,69 @@
+"""
+Tests for the JSON response provider
+"""
+
+import decimal
+import json
+from datetime import date, datetime, time, timedelta
+from unittest import mock
+import pytest
+from flask import Flask
+
+from src.utils import json_provider
+from src.utils.json_provider import FastJSONProvider
+from scripts.serialization_benchmark import sample_rows, legacy_normalize
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    return app
+
+class TestFastJSONProvider:
+    """Encoding of database row values"""
+
+    def test_row_values(self, app):
+        row = {
+            'created_at': datetime(2024, 5, 1, 9, 30, 15),
+            'visit_date': date(2024, 5, 2),
+            'visit_time': timedelta(hours=14, minutes=5),
+            'opens_at': time(8, 0),
+            'amount': decimal.Decimal('499.00'),
+            'photo': b'data:image/png;base64,iVBOR',
+            'blob': b'\xff\xd8\xff',
+            'empty': b'',
+            2024: 'non-string key',
+        }
+        with app.app_context():
+            data = json.loads(app.json.response(row).get_data())
+
+        assert data['created_at'] == '2024-05-01T09:30:15'
+        assert data['visit_date'] == '2024-05-02'
+        assert data['visit_time'] == '14:05:00'
+        assert data['opens_at'] == '08:00:00'
+        assert data['amount'] == '499.00'
+        assert data['photo'] == 'data:image/png;base64,iVBOR'
+        assert data['blob'] == '/9j/'
+        assert data['empty'] is None
+        assert data['2024'] == 'non-string key'
+
+    @pytest.mark.parametrize('use_orjson', [True, False])
+    def test_matches_legacy_row_loop(self, app, use_orjson):
+        """Raw rows encode exactly like the old per-route normalization output"""
+        if use_orjson and json_provider.orjson is None:
+            pytest.skip('orjson not installed')
+        rows = sample_rows(50)
+        legacy_app = Flask(__name__)
+        with legacy_app.app_context():
+            expected = legacy_app.json.response(legacy_normalize(rows)).get_data()
+        with app.app_context():
+            if use_orjson:
+                body = app.json.response(rows).get_data()
+            else:
+                with mock.patch.object(json_provider, 'orjson', None):
+                    body = app.json.response(rows).get_data()
+        assert body == expected
+
+    def test_unknown_type_raises(self, app):
+        with app.app_context(), pytest.raises(TypeError):
+            app.json.dumps({'value': object()})
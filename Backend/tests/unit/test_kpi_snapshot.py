@@ -0,0 +1,25 @@
+"""
+Tests for KPI snapshot invalidation on billing writes
+"""
+
+from unittest.mock import MagicMock
+import mysql.connector
+from src.utils.kpi_snapshot import mark_kpi_snapshot_dirty
+
+class TestKpiSnapshotInvalidation:
+    """Dirty-marking of the admin dashboard snapshot"""
+
+    def test_marks_platform_snapshot(self):
+        cursor = MagicMock()
+
+        mark_kpi_snapshot_dirty(cursor)
+
+        sql, params = cursor.execute.call_args.args
+        assert 'dirty_since = COALESCE(dirty_since, NOW())' in sql
+        assert params == ('platform',)
+
+    def test_missing_table_does_not_fail_the_write(self):
+        cursor = MagicMock()
+        cursor.execute.side_effect = mysql.connector.errors.ProgrammingError("Table 'vms_db.kpi_snapshots' doesn't exist")
+
+        mark_kpi_snapshot_dirty(cursor)
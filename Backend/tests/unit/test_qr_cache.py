@@ -0,0 +1,84 @@
+"""
+Tests for the in-memory QR check-in cache
+"""
+
+from datetime import date, time
+from unittest.mock import MagicMock
+import pytest
+
+from src.utils import qr_cache
+
+TODAY = date(2024, 5, 10)
+TOMORROW = date(2024, 5, 11)
+
+def row(id, qr_code, day, visit_time=time(9, 30)):
+    return {'id': id, 'qr_code': qr_code, 'visitor_name': f'Visitor {id}', 'visitor_email': f'v{id}@example.com',
+            'visitor_phone': '', 'visitor_company': 'Acme', 'purpose': 'Meeting', 'host_id': 3,
+            'host_name': 'Host Three', 'day': day, 'visit_time': visit_time}
+
+def connection(*results):
+    """Connection whose successive cursors return `results` from fetchall"""
+    conn = MagicMock()
+    cursors = []
+    for rows in results:
+        cursor = MagicMock()
+        cursor.fetchall.return_value = rows
+        cursors.append(cursor)
+    conn.cursor.side_effect = cursors
+    return conn
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    qr_cache.invalidate()
+    yield
+    qr_cache.invalidate()
+
+class TestLookup:
+    """Site loads, day matching and reloads"""
+
+    def test_hit_without_further_queries(self):
+        conn = connection([row(1, 'QR1', TODAY), row(2, 'QR2', TOMORROW)])
+        hit = qr_cache.lookup(conn, 'Acme', 'QR1', today=TODAY)
+        assert hit['id'] == 1 and hit['host_name'] == 'Host Three'
+        assert hit['visit_date'] == TODAY and hit['visit_time'] == time(9, 30)
+        assert qr_cache.lookup(conn, 'Acme', 'QR1', today=TODAY)['id'] == 1
+        assert conn.cursor.call_count == 1
+
+    def test_tomorrow_only_is_a_miss(self):
+        conn = connection([row(2, 'QR2', TOMORROW)])
+        assert qr_cache.lookup(conn, 'Acme', 'QR2', today=TODAY) is None
+        assert qr_cache.lookup(conn, 'Acme', 'UNKNOWN', today=TODAY) is None
+
+    def test_recurring_series_days(self):
+        conn = connection([row(5, 'QR5', TODAY, time(8, 0)), row(5, 'QR5', TOMORROW, time(8, 0))], [])
+        assert qr_cache.lookup(conn, 'Acme', 'QR5', today=TODAY)['visit_date'] == TODAY
+        # the next day reloads the site
+        assert qr_cache.lookup(conn, 'Acme', 'QR5', today=TOMORROW) is None
+        assert conn.cursor.call_count == 2
+
+    def test_reload_after_ttl(self, monkeypatch):
+        conn = connection([row(1, 'QR1', TODAY)], [])
+        qr_cache.lookup(conn, 'Acme', 'QR1', today=TODAY)
+        monkeypatch.setattr(qr_cache, 'TTL_SECONDS', -1)
+        assert qr_cache.lookup(conn, 'Acme', 'QR1', today=TODAY) is None
+
+class TestWrites:
+    """Updates from this worker's writes"""
+
+    def test_refresh_adds_new_registration(self):
+        conn = connection([row(1, 'QR1', TODAY)], [row(9, 'QR9', TODAY)])
+        qr_cache.lookup(conn, 'Acme', 'QR1', today=TODAY)
+        qr_cache.refresh_registration(conn, 'Acme', 9, today=TODAY)
+        assert qr_cache.lookup(conn, 'Acme', 'QR9', today=TODAY)['id'] == 9
+        assert conn.cursor.call_count == 2
+
+    def test_refresh_skips_unloaded_site(self):
+        conn = connection()
+        qr_cache.refresh_registration(conn, 'Acme', 9, today=TODAY)
+        conn.cursor.assert_not_called()
+
+    def test_forget_after_check_in(self):
+        conn = connection([row(1, 'QR1', TODAY)])
+        qr_cache.lookup(conn, 'Acme', 'QR1', today=TODAY)
+        qr_cache.forget('Acme', '1', day=TODAY)
+        assert qr_cache.lookup(conn, 'Acme', 'QR1', today=TODAY) is None
@@ -0,0 +1,106 @@
+"""
+Tests for per-company token-bucket rate limiting
+"""
+
+import hashlib
+import pytest
+from flask import Flask, request
+
+from src.utils import rate_limit
+from src.utils.rate_limit import MemoryBackend, rate_limit as limit, charge, client_address
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setattr(rate_limit, '_backend', MemoryBackend())
+    app = Flask(__name__)
+    app.config['RATE_LIMITS'] = {'check_in': (6, 2), 'login': (60, 1)}
+
+    @app.route('/visits', methods=['POST'])
+    @limit('check_in')
+    def create_visit():
+        return {'ok': True}, 201
+
+    # Bulk endpoints charge one token per valid row
+    @app.route('/visits/bulk', methods=['POST'])
+    def bulk_create_visits():
+        limited = charge('check_in', len(request.get_json()))
+        return limited or ({'ok': True}, 200)
+
+    @app.route('/login', methods=['POST'])
+    @limit('login', identity=client_address)
+    def login():
+        return {'ok': True}, 200
+
+    # Stands in for authenticate_token, which sets the users row
+    @app.before_request
+    def current_user():
+        company = request.headers.get('X-Test-Company')
+        request.current_user = {'id': 1, 'company_id': int(company), 'company_name': 'Acme'} if company else None
+
+    return app
+
+def post(client, path='/visits', **headers):
+    return client.post(path, headers=headers)
+
+class TestRateLimit:
+    """Buckets per company, API key and address"""
+
+    def test_burst_then_429(self, app):
+        client = app.test_client()
+        assert [post(client, **{'X-Test-Company': '1'}).status_code for _ in range(2)] == [201, 201]
+        response = post(client, **{'X-Test-Company': '1'})
+        assert response.status_code == 429
+        assert response.headers['Retry-After'] == '10'
+        assert response.get_json()['retry_after'] == 10
+
+    def test_companies_do_not_share_buckets(self, app):
+        client = app.test_client()
+        for _ in range(3):
+            post(client, **{'X-Test-Company': '1'})
+        assert post(client, **{'X-Test-Company': '2'}).status_code == 201
+
+    def test_issued_api_key_has_its_own_bucket(self, app):
+        app.config['RATE_LIMIT_API_KEYS'] = {hashlib.sha256(b'kiosk-7').hexdigest()}
+        client = app.test_client()
+        for _ in range(3):
+            post(client, **{'X-Test-Company': '1'})
+        assert post(client, **{'X-Test-Company': '1', 'X-API-Key': 'kiosk-7'}).status_code == 201
+
+    def test_unknown_api_keys_do_not_bypass_the_limit(self, app):
+        app.config['RATE_LIMIT_API_KEYS'] = {hashlib.sha256(b'kiosk-7').hexdigest()}
+        client = app.test_client()
+        for _ in range(2):
+            post(client, **{'X-Test-Company': '1'})
+        assert post(client, **{'X-Test-Company': '1', 'X-API-Key': 'random-1'}).status_code == 429
+        for _ in range(2):
+            post(client, **{'X-Real-IP': '10.0.0.9', 'X-API-Key': 'random-2'})
+        assert post(client, **{'X-Real-IP': '10.0.0.9', 'X-API-Key': 'random-3'}).status_code == 429
+
+    def test_bulk_charged_per_row(self, app):
+        client = app.test_client()
+        headers = {'X-Test-Company': '1'}
+        # More rows than the bucket can ever hold is refused outright
+        assert client.post('/visits/bulk', json=[{}] * 3, headers=headers).status_code == 400
+        assert client.post('/visits/bulk', json=[{}] * 2, headers=headers).status_code == 200
+        # The rows came out of the same bucket as single check-ins
+        assert post(client, **headers).status_code == 429
+
+    def test_login_by_client_address(self, app):
+        client = app.test_client()
+        assert post(client, '/login', **{'X-Real-IP': '10.0.0.1'}).status_code == 200
+        assert post(client, '/login', **{'X-Real-IP': '10.0.0.1'}).status_code == 429
+        assert post(client, '/login', **{'X-Real-IP': '10.0.0.2'}).status_code == 200
+
+    def test_disabled(self, app):
+        app.config['RATE_LIMIT_ENABLED'] = False
+        client = app.test_client()
+        assert {post(client, **{'X-Test-Company': '1'}).status_code for _ in range(5)} == {201}
+
+    def test_store_failure_lets_requests_through(self, app, monkeypatch):
+        class BrokenBackend:
+            def take(self, *args, **kwargs):
+                raise ConnectionError('store down')
+
+        monkeypatch.setattr(rate_limit, '_backend', BrokenBackend())
+        client = app.test_client()
+        assert {post(client, **{'X-Test-Company': '1'}).status_code for _ in range(5)} == {201}
@@ -0,0 +1,168 @@
+"""
+Tests for recurring pre-registration materialization
+"""
+
+from datetime import date, timedelta
+from unittest.mock import MagicMock
+import pytest
+
+from src.utils import recurrence
+from src.utils.recurrence import occurrence_dates
+
+class TestOccurrenceDates:
+    """Series expansion within a window"""
+
+    def test_daily_clipped_to_window(self):
+        dates = occurrence_dates(date(2024, 5, 1), 'daily', date(2024, 5, 10), date(2024, 5, 12))
+        assert dates == [date(2024, 5, 10), date(2024, 5, 11), date(2024, 5, 12)]
+
+    def test_daily_starting_inside_window(self):
+        dates = occurrence_dates(date(2024, 5, 11), 'daily', date(2024, 5, 10), date(2024, 5, 12))
+        assert dates == [date(2024, 5, 11), date(2024, 5, 12)]
+
+    def test_weekly_keeps_weekday(self):
+        dates = occurrence_dates(date(2024, 5, 1), 'weekly', date(2024, 5, 9), date(2024, 5, 31))
+        assert dates == [date(2024, 5, 15), date(2024, 5, 22), date(2024, 5, 29)]
+        assert all(d.weekday() == date(2024, 5, 1).weekday() for d in dates)
+
+    def test_monthly_clamps_to_month_end(self):
+        dates = occurrence_dates(date(2024, 1, 31), 'monthly', date(2024, 1, 1), date(2024, 5, 31))
+        assert dates == [date(2024, 1, 31), date(2024, 2, 29), date(2024, 3, 31), date(2024, 4, 30), date(2024, 5, 31)]
+
+    def test_monthly_window_mid_series(self):
+        dates = occurrence_dates(date(2023, 11, 15), 'monthly', date(2024, 2, 16), date(2024, 4, 15))
+        assert dates == [date(2024, 3, 15), date(2024, 4, 15)]
+
+    @pytest.mark.parametrize('start, pattern, window', [
+        (date(2024, 6, 1), 'daily', (date(2024, 5, 1), date(2024, 5, 31))),
+        (date(2024, 5, 1), 'weekly', (date(2024, 5, 31), date(2024, 5, 1))),
+        (date(2024, 5, 1), 'yearly', (date(2024, 5, 1), date(2024, 5, 31))),
+    ])
+    def test_empty(self, start, pattern, window):
+        assert occurrence_dates(start, pattern, *window) == []
+
+class TestMaterialize:
+    """Incremental expansion from the watermark"""
+
+    @pytest.fixture(autouse=True)
+    def table_ready(self, monkeypatch):
+        monkeypatch.setattr(recurrence, '_table_ready', True)
+
+    def run(self, series, **kwargs):
+        conn = MagicMock()
+        reader, writer = MagicMock(), MagicMock()
+        reader.fetchall.return_value = series
+        writer.rowcount = 0
+        conn.cursor.side_effect = [reader, writer]
+        recurrence.materialize(conn, **kwargs)
+        return writer
+
+    def test_resumes_after_watermark(self):
+        writer = self.run([{
+            'id': 7, 'company_id': 1, 'company_to_visit': 'Acme', 'visit_date': date(2024, 4, 1),
+            'visit_time': None, 'qr_code': 'QR7', 'recurring_pattern': 'daily',
+            'recurring_end_date': date(2024, 5, 20), 'occurrences_through': date(2024, 5, 17),
+        }], today=date(2024, 5, 10), horizon_days=30)
+
+        rows = writer.executemany.call_args[0][1]
+        assert [row[3] for row in rows] == [date(2024, 5, 18), date(2024, 5, 19), date(2024, 5, 20)]
+        assert rows[0][:3] == (7, 1, 'Acme')
+        writer.execute.assert_called_once_with(
+            "UPDATE pre_registrations SET occurrences_through = %s WHERE id = %s", (date(2024, 6, 9), 7)
+        )
+
+    def test_ended_window_only_moves_watermark(self):
+        writer = self.run([{
+            'id': 8, 'company_id': 1, 'company_to_visit': 'Acme', 'visit_date': date(2024, 5, 1),
+            'visit_time': None, 'qr_code': 'QR8', 'recurring_pattern': 'weekly',
+            'recurring_end_date': None, 'occurrences_through': date(2024, 6, 5),
+        }], today=date(2024, 5, 10), horizon_days=30)
+
+        writer.executemany.assert_not_called()
+        writer.execute.assert_called_once()
+
+class FakeDatabase:
+    """Just enough of pre_registrations, recurring_occurrences and visits for check-in/check-out"""
+
+    def __init__(self, today):
+        self.series = {'id': 7, 'qr_code': 'QR7', 'status': 'approved', 'is_recurring': True}
+        self.occurrences = {today + timedelta(days=n): 'expected' for n in range(3)}
+        self.visit = {'pre_registration_id': 7, 'status': 'checked-in', 'check_out_time': None}
+        self.today = today
+
+    def connection(self):
+        conn = MagicMock()
+        conn.cursor.side_effect = lambda *args, **kwargs: FakeCursor(self)
+        return conn
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db, self.rows, self.rowcount = db, [], 0
+
+    def execute(self, sql, params=()):
+        db, self.rows, self.rowcount = self.db, [], 0
+        if 'FROM users' in sql:
+            self.rows = [{'id': 1, 'role': 'admin', 'company_name': 'Acme'}]
+        elif sql.strip().startswith('SELECT pre_registration_id'):
+            self.rows = [dict(db.visit)]
+        elif 'UPDATE visits' in sql:
+            db.visit.update(status='checked-out', check_out_time=params[0])
+            self.rowcount = 1
+        elif 'UPDATE pre_registrations' in sql:
+            if not (db.series['is_recurring'] and 'is_recurring = FALSE' in sql):
+                db.series['status'] = params[0]
+                self.rowcount = 1
+        elif 'UPDATE recurring_occurrences' in sql:
+            db.occurrences[db.today] = 'checked-in'
+        elif 'FROM recurring_occurrences ro' in sql:
+            first, last = params[1], params[2]
+            self.rows = [{'id': 7, 'qr_code': 'QR7', 'visitor_name': 'Asha', 'visitor_email': 'asha@example.com',
+                          'visitor_phone': '', 'visitor_company': '', 'purpose': 'Standup', 'host_id': None,
+                          'host_name': 'Host', 'day': day, 'visit_time': None}
+                         for day, status in db.occurrences.items()
+                         if first <= day <= last and status == 'expected'
+                         and db.series['status'] in ('approved', 'pending')]
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+class TestRecurringCheckOut:
+    """A series stays verifiable after one of its visits is checked out"""
+
+    def test_next_occurrence_verifies_after_check_out(self, monkeypatch):
+        from flask import Flask
+        import jwt
+        from src.routes import visit_routes
+        from src.utils import auth, qr_cache
+
+        today = date.today()
+        db = FakeDatabase(today)
+        monkeypatch.setattr(visit_routes, 'get_db_connection', db.connection)
+        monkeypatch.setattr(auth, 'get_db_connection', db.connection)
+        app = Flask(__name__)
+        app.config.update(SECRET_KEY='test-secret', RATE_LIMIT_ENABLED=False)
+        app.register_blueprint(visit_routes.visits_bp, url_prefix='/api')
+
+        # Check-in, as create_visit writes it
+        cursor = db.connection().cursor()
+        cursor.execute(recurrence.CLOSE_PRE_REGISTRATION_SQL, ('checked-in', 7))
+        cursor.execute(recurrence.CHECK_IN_OCCURRENCE_SQL, (100, 7))
+
+        token = jwt.encode({'id': 1}, 'test-secret', algorithm='HS256')
+        response = app.test_client().put('/api/visits/100/checkout', headers={'Authorization': f'Bearer {token}'})
+        assert response.status_code == 200
+        assert db.visit['status'] == 'checked-out'
+        assert db.series['status'] == 'approved'
+
+        qr_cache.invalidate()
+        try:
+            hit = qr_cache.lookup(db.connection(), 'Acme', 'QR7', today=today + timedelta(days=1))
+        finally:
+            qr_cache.invalidate()
+        assert hit is not None and hit['visit_date'] == today + timedelta(days=1)
@@ -0,0 +1,57 @@
+"""
+Import-time regression tests for the application factory
+Runs a cold `create_app()` in a fresh interpreter under -X importtime
+"""
+
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), '..', '..')
+
+# Only report exports and test helpers may pull these in
+HEAVY_MODULES = ('pandas', 'numpy', 'openpyxl', 'weasyprint')
+COLD_START_BUDGET_SECONDS = 1.0
+
+COLD_START = """
+import sys, time
+started = time.perf_counter()
+from src import create_app
+app = create_app('production')
+elapsed = time.perf_counter() - started
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print('RESULT', elapsed, ','.join(heavy), len(list(app.url_map.iter_rules())))
+"""
+
+def cold_start():
+    """Return (seconds, heavy modules loaded, route count, slowest imports)"""
+    env = dict(os.environ, DB_HOST='db.invalid')
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', COLD_START.format(heavy=HEAVY_MODULES)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=60,
+    )
+    assert proc.returncode == 0, proc.stderr[-2000:]
+
+    result = next(line for line in proc.stdout.splitlines() if line.startswith('RESULT'))
+    _, elapsed, heavy, routes = result.split(' ')
+    imports = []
+    for line in proc.stderr.splitlines():
+        if line.startswith('import time:') and '|' in line and 'cumulative' not in line:
+            _, cumulative, name = line[len('import time:'):].split('|')
+            imports.append((int(cumulative), name.strip()))
+    slowest = sorted(imports, reverse=True)[:10]
+    return float(elapsed), [name for name in heavy.split(',') if name], int(routes), slowest
+
+def test_cold_start_is_fast_and_skips_heavy_exporters():
+    elapsed, heavy, routes, slowest = cold_start()
+    profile = '\n'.join(f"{cumulative / 1000:8.1f} ms  {name}" for cumulative, name in slowest)
+
+    assert heavy == [], f"heavy modules imported at startup: {heavy}\n{profile}"
+    assert elapsed < COLD_START_BUDGET_SECONDS, f"cold start took {elapsed:.2f}s\n{profile}"
+    assert routes > 60
+
+def test_legacy_import_still_exposes_app():
+    import app as legacy
+
+    assert legacy.app.url_map.bind('localhost').match('/api/visits', method='GET')[0] == 'visits.get_visits'
+    assert legacy.create_app is not None
@@ -0,0 +1,106 @@
+"""
+Tests for the visitor identity resolver and duplicate grouping
+"""
+
+from unittest.mock import MagicMock
+
+from src.utils import visitor_identity
+from src.utils.visitor_identity import (
+    group_duplicates, identity_keys, normalize_id_number, normalize_phone, pick_match, resolve_visitors
+)
+
+def candidate(id, email=None, id_number=None, phone=None):
+    return {'id': id, 'email_normalized': email, 'id_number_normalized': id_number, 'phone_normalized': phone}
+
+class TestNormalize:
+    def test_keys(self):
+        keys = identity_keys({'email': ' Asha@Example.COM ', 'idCardNumber': 'abcde 1234f', 'phone': '+91 98765-43210'})
+        assert keys == ('asha@example.com', 'ABCDE1234F', '9876543210')
+
+    def test_phone_forms_agree(self):
+        assert normalize_phone('+91 98765 43210') == normalize_phone('098765 43210') == '9876543210'
+
+    def test_too_short_to_identify(self):
+        assert normalize_phone('12-34') is None
+        assert normalize_id_number('A1') is None
+        assert identity_keys({}) == (None, None, None)
+
+class TestPickMatch:
+    """Email and ID number decide; a phone only links compatible records"""
+
+    def test_email_first(self):
+        candidates = [candidate(9, 'b@x.com', 'ID0001'), candidate(4, 'a@x.com')]
+        assert pick_match(('a@x.com', 'ID0001', None), candidates) == 4
+
+    def test_id_number_with_new_email(self):
+        assert pick_match(('new@x.com', 'ID0001', None), [candidate(4, 'a@x.com', 'ID0001')]) == 4
+
+    def test_shared_phone_is_not_a_match(self):
+        assert pick_match(('b@x.com', None, '9876543210'), [candidate(4, 'a@x.com', None, '9876543210')]) is None
+
+    def test_phone_without_conflicting_keys(self):
+        assert pick_match((None, None, '9876543210'), [candidate(4, 'a@x.com', None, '9876543210')]) == 4
+        assert pick_match(('b@x.com', None, '9876543210'), [candidate(5, None, None, '9876543210')]) == 5
+
+def cursor_with(*fetches):
+    cursor = MagicMock()
+    cursor.fetchall.side_effect = list(fetches)
+    return cursor
+
+class TestResolveVisitors:
+    def test_returning_visitor_is_updated_not_inserted(self):
+        cursor = cursor_with([(4, 'a@x.com', None, None)])
+        assert resolve_visitors(cursor, 'Acme', [{'name': 'Asha', 'email': 'A@x.com', 'photo': 'data:...'}]) == [4]
+        sql, rows = cursor.executemany.call_args[0]
+        assert sql == visitor_identity.UPDATE_SQL
+        assert rows[0][-5:] == ('A@x.com', 'a@x.com', None, None, 4)
+        assert not any('INSERT' in call[0][0] for call in cursor.execute.call_args_list)
+
+    def test_new_visitors_inserted_together(self):
+        cursor = cursor_with([], [(11, 'a@x.com'), (12, 'b@x.com')])
+        ids = resolve_visitors(cursor, 'Acme', [{'name': 'A', 'email': 'a@x.com'}, {'name': 'B', 'email': 'b@x.com'}])
+        assert ids == [11, 12]
+        sql, rows = cursor.executemany.call_args[0]
+        assert sql == visitor_identity.INSERT_SQL
+        assert [row[0] for row in rows] == ['Acme', 'Acme']
+        sql, params = cursor.execute.call_args[0]
+        assert 'company_name = %s' in sql and params[0] == 'Acme'
+
+    def test_candidates_come_from_the_checking_in_company(self):
+        cursor = cursor_with([])
+        cursor.lastrowid = 8
+        resolve_visitors(cursor, 'Globex', [{'name': 'Asha', 'phone': '98765 43210'}])
+        sql, params = cursor.execute.call_args_list[0][0]
+        assert 'WHERE company_name = %s AND (phone_normalized IN (%s))' in sql
+        assert params == ['Globex', '9876543210']
+
+    def test_mixed_batch_keeps_order(self):
+        cursor = cursor_with([{'id': 4, 'email_normalized': 'old@x.com', 'id_number_normalized': None,
+                               'phone_normalized': None}], [{'id': 20, 'email_normalized': 'new@x.com'}])
+        ids = resolve_visitors(cursor, 'Acme', [{'name': 'N', 'email': 'new@x.com'}, {'name': 'O', 'email': 'old@x.com'}])
+        assert ids == [20, 4]
+
+    def test_visitor_without_email_uses_lastrowid(self):
+        cursor = cursor_with([])
+        cursor.lastrowid = 33
+        assert resolve_visitors(cursor, 'Acme', [{'name': 'Walk-in', 'phone': '98765 43210'}]) == [33]
+
+class TestSnapshot:
+    def test_visit_keeps_its_own_capture(self):
+        visitor = {'photo': 'data:photo', 'idCardPhoto': '', 'idCardNumber': 'ID0001', 'address': '1 Main St'}
+        assert visitor_identity.snapshot(visitor) == ('data:photo', None, 'ID0001', '1 Main St')
+
+class TestGroupDuplicates:
+    def test_groups_keep_newest(self):
+        records = [
+            (1, 'a@x.com', None, None),
+            (2, 'b@x.com', '98765 43210', None),
+            (3, 'A@X.com', None, 'ID0001'),
+            (4, 'c@x.com', None, 'id-0001'),  # same ID card, new email
+            (5, 'd@x.com', '+91 98765 43210', None),  # shared phone, different email
+            (6, None, '9876543210', None),
+        ]
+        assert group_duplicates(records) == {4: [1, 3], 6: [2]}
+
+    def test_no_duplicates(self):
+        assert group_duplicates([(1, 'a@x.com', None, None), (2, 'b@x.com', None, None)]) == {}
@@ -0,0 +1,125 @@
+"""
+Tests for the visitor typeahead search and n-gram list filters
+"""
+
+import hashlib
+from datetime import datetime
+from unittest.mock import MagicMock
+import pytest
+
+from src.utils import visitor_search
+from src.utils.visitor_search import build_query, substring_filter, tenant_token, visitor_key
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    monkeypatch.setattr(visitor_search, '_table_ready', True)
+    monkeypatch.setattr(visitor_search, '_index_state', {})
+
+class TestVisitorKey:
+    def test_email_first_and_normalized(self):
+        assert visitor_key(' John.Smith@Acme.com ', '+91 98765 43210', 'John') == 'e:john.smith@acme.com'
+
+    def test_phone_digits_without_email(self):
+        assert visitor_key('', '+91 98765-43210', 'John') == 'p:919876543210'
+
+    def test_name_when_nothing_else(self):
+        assert visitor_key(None, '12', '  John   SMITH ') == 'n:john smith'
+
+class TestBuildQuery:
+    """FULLTEXT, prefix and phone paths"""
+
+    def test_word_prefixes_use_fulltext(self):
+        sql, params = build_query('Acme', 'John Smi', 5)
+        assert 'MATCH(tenant_token, name, email, phone, company) AGAINST' in sql
+        against = f'+{tenant_token("Acme")} +john* +smi*'
+        assert params == [against, against, 'Acme', 'john smi%', 5]
+
+    def test_fulltext_requires_the_tenant_token(self):
+        _, params = build_query('Acme', 'john', 5)
+        _, other = build_query('Globex', 'john', 5)
+        assert params[0].startswith('+t') and params[0] != other[0]
+        assert tenant_token('Acme') == tenant_token('ACME') == 't' + hashlib.sha256(b'acme').hexdigest()[:16]
+
+    def test_short_tokens_filter_fulltext_matches(self):
+        sql, params = build_query('Acme', 'john s', 5)
+        assert sql.count("name LIKE %s ESCAPE '\\\\' OR email LIKE %s ESCAPE '\\\\' OR company LIKE %s ESCAPE '\\\\'") == 1
+        against = f'+{tenant_token("Acme")} +john*'
+        assert params == [against, against, 'Acme', '%s%', '%s%', '%s%', 'john s%', 5]
+
+    def test_wildcards_are_escaped(self):
+        sql, params = build_query('Acme', 'a_', 10)
+        assert params[:3] == ['Acme', 'a\\_%', 'a\\_%']
+        assert sql.count('LIKE %s') == sql.count("LIKE %s ESCAPE '\\\\'") == 6
+
+    def test_short_query_uses_prefix_indexes(self):
+        sql, params = build_query('Acme', 'Jo', 10)
+        assert 'MATCH' not in sql
+        assert params[:3] == ['Acme', 'jo%', 'jo%']
+
+    def test_phone_number(self):
+        sql, params = build_query('Acme', '+91 98765', 10)
+        assert 'phone_digits LIKE %s' in sql
+        assert params == ['Acme', '9198765%', 10]
+
+    def test_operators_are_not_passed_through(self):
+        _, params = build_query('Acme', 'smith* -"jones" @3', 10)
+        assert params[0] == f'+{tenant_token("Acme")} +smith* +jones*'
+
+    def test_empty_query(self):
+        assert build_query('Acme', ' - ', 10) == (None, None)
+
+    def test_table_override(self):
+        sql, _ = build_query('Acme', 'priya', 10, table='bench_visitor_search')
+        assert 'FROM bench_visitor_search' in sql
+
+class TestSubstringFilter:
+    def test_phrase_per_piece_then_exact_like(self):
+        sql, params = substring_filter('v.visitor_email', 'john.smith@ac')
+        assert sql == ("(MATCH(v.visitor_email) AGAINST (%s IN BOOLEAN MODE) "
+                       "AND v.visitor_email LIKE %s ESCAPE '\\\\')")
+        assert params == ['+"john" +"smith" +"ac"', '%john.smith@ac%']
+
+    def test_single_character_falls_back_to_like(self):
+        assert substring_filter('v.visitor_name', 'j') == ("v.visitor_name LIKE %s ESCAPE '\\\\'", ['%j%'])
+
+    def test_wildcards_and_backslash_are_literal(self):
+        _, params = substring_filter('v.visitor_name', '100%_off\\')
+        assert params[-1] == '%100\\%\\_off\\\\%'
+
+class TestRecordVisits:
+    def test_upserts_one_row_per_visit(self):
+        cursor = MagicMock()
+        seen = datetime(2024, 5, 10, 9, 30)
+        visitor_search.record_visits(cursor, 'Acme', [(7, 'John Smith', '', '98765 43210', '', seen)])
+        sql, rows = cursor.executemany.call_args[0]
+        assert 'ON DUPLICATE KEY UPDATE' in sql
+        assert rows == [('Acme', 'p:9876543210', 7, 'John Smith', None, '98765 43210', '9876543210', None, 1, seen,
+                         tenant_token('Acme'))]
+
+    def test_nothing_to_record(self):
+        cursor = MagicMock()
+        visitor_search.record_visits(cursor, 'Acme', [])
+        cursor.executemany.assert_not_called()
+
+class TestNgramReady:
+    def connection(self, present):
+        conn = MagicMock()
+        conn.cursor.return_value.fetchall.return_value = [('visits', 'ft_visitor_name')] if present else []
+        return conn
+
+    def test_present_index_is_remembered(self):
+        conn = self.connection(True)
+        assert visitor_search.ngram_ready(conn, 'ft_visitor_name')
+        assert visitor_search.ngram_ready(conn, 'ft_visitor_name')
+        assert conn.cursor.call_count == 1
+
+    def test_missing_index_is_rechecked_later(self, monkeypatch):
+        clock = [100.0]
+        monkeypatch.setattr(visitor_search.time, 'monotonic', lambda: clock[0])
+        conn = self.connection(False)
+        assert not visitor_search.ngram_ready(conn, 'ft_visitor_name')
+        assert not visitor_search.ngram_ready(conn, 'ft_visitor_name')
+        assert conn.cursor.call_count == 1
+        clock[0] += visitor_search.INDEX_RECHECK_SECONDS + 1
+        visitor_search.ngram_ready(conn, 'ft_visitor_name')
+        assert conn.cursor.call_count == 2
@@ -118,6 +118,8 @@ const ScanCard1 = () => {
 
             const response = await fetch(OCR_API_URL, {
                 method: 'POST',
+                // Lets the OCR service apply its rate limit per company
+                headers: { 'Authorization': `Bearer ${localStorage.getItem('token')}` },
                 body: formData,
             });
 
@@ -164,6 +164,8 @@ const VisitorCheckInPage = () => {
 
             const response = await fetch(OCR_API_URL, {
                 method: 'POST',
+                // Lets the OCR service apply its rate limit per company
+                headers: { 'Authorization': `Bearer ${localStorage.getItem('token')}` },
                 body: formData
             });
             if (!response.ok) throw new Error('OCR API error');
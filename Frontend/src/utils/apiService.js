@@ -165,6 +165,16 @@ export const getHosts = () => {
   return request('/hosts');
 };
 
+// Columns each dashboard renders from the visit list (sent as `fields`); the
+// backend leaves photos and other heavy columns out unless they are asked for.
+const VISIT_LIST_FIELDS = {
+  admin: 'id,reason,itemsCarried,check_in_time,check_out_time,visitor_name,visitor_email,'
+    + 'visitor_phone,visitor_id,designation,visitor_company,visitorPhoto,idCardNumber,'
+    + 'companyTel,type_of_card,host_id,hostName',
+  host: 'id,reason,check_in_time,check_out_time,status,visitorName,visitorEmail,visitorPhone,'
+    + 'visitorPhoto,idCardPhoto,idCardNumber',
+};
+
 /**
  * Fetches visits based on the user's role.
  * - 'admin' role fetches from /visits and can use all filters.
@@ -176,6 +186,7 @@ export const getHosts = () => {
  */
 export const getVisits = (role, filters = {}, page = 1, limit = 10) => {
   const params = new URLSearchParams({
+    fields: VISIT_LIST_FIELDS[role === 'admin' ? 'admin' : 'host'],
     ...filters,
     page: page.toString(),
     limit: limit.toString()
@@ -0,0 +1,4 @@
+"""
+ML Benchmarks Package
+Latency and accuracy harnesses for the OCR pipeline
+"""
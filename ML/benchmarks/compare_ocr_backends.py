@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+OCR Backend Comparison Harness
+Runs the same images through the PyTorch, ONNX Runtime and int8 ONNX
+Runtime EasyOCR backends and reports latency against accuracy
+
+Usage (from the ML directory):
+    python -m benchmarks.compare_ocr_backends [image_dir] [--truth truth.json] [--repeat 3]
+
+Accuracy is the character error rate against ground truth when a
+filename -> expected text JSON map is given, otherwise against the
+PyTorch backend's output.
+"""
+
+import argparse
+import glob
+import json
+import os
+import statistics
+import sys
+import time
+
+ML_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ML_DIR, 'src'))
+
+import numpy as np
+from PIL import Image
+from models.easyocr_model import EasyOCRModel
+from utils.image_utils import preprocess_and_rotate
+
+BACKENDS = [
+    ('torch', dict(backend='torch')),
+    ('onnx', dict(backend='onnx', quantize=False)),
+    ('onnx-int8', dict(backend='onnx', quantize=True)),
+]
+
+def edit_distance(a, b):
+    """Levenshtein distance between two strings"""
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+def character_error_rate(predicted, expected):
+    if not expected:
+        return 0.0 if not predicted else 1.0
+    return edit_distance(predicted, expected) / len(expected)
+
+def load_images(image_dir):
+    paths = sorted(
+        path for pattern in ('*.png', '*.jpg', '*.jpeg')
+        for path in glob.glob(os.path.join(image_dir, '**', pattern), recursive=True)
+    )
+    images = {}
+    for path in paths:
+        with Image.open(path) as image:
+            images[os.path.relpath(path, image_dir)] = preprocess_and_rotate(image)[0]
+    return images
+
+def run_backend(model, images, repeat):
+    """Return (texts, per-image latencies in ms) for one backend"""
+    texts, latencies = {}, []
+    for name, image in images.items():
+        model.extract_text(image)  # untimed first call per shape
+        for _ in range(repeat):
+            started = time.perf_counter()
+            lines = model.extract_text(image)
+            latencies.append((time.perf_counter() - started) * 1000)
+        texts[name] = ' '.join(lines)
+    return texts, latencies
+
+def percentile(values, pct):
+    return float(np.percentile(values, pct)) if values else 0.0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('image_dir', nargs='?', default=os.path.join(ML_DIR, 'data'))
+    parser.add_argument('--truth', help='JSON map of image path (relative to image_dir) to expected text')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    images = load_images(args.image_dir)
+    if not images:
+        sys.exit(f"No images found under {args.image_dir}")
+    truth = json.load(open(args.truth)) if args.truth else None
+
+    results = {}
+    for label, options in BACKENDS:
+        started = time.perf_counter()
+        model = EasyOCRModel(**options)
+        load_seconds = time.perf_counter() - started
+        if model.backend != options['backend']:
+            print(f"⚠️ {label}: backend unavailable, skipping")
+            continue
+        texts, latencies = run_backend(model, images, args.repeat)
+        results[label] = dict(texts=texts, latencies=latencies, load_seconds=load_seconds)
+
+    reference = truth or results.get('torch', {}).get('texts', {})
+    print(f"\n{len(images)} image(s), {args.repeat} timed run(s) each; "
+          f"CER vs {'ground truth' if truth else 'torch backend'}\n")
+    print(f"{'backend':<10} {'load s':>7} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'CER':>7}")
+    for label, result in results.items():
+        latencies = result['latencies']
+        cer = statistics.mean(
+            character_error_rate(result['texts'][name], reference.get(name, '')) for name in images
+        )
+        print(f"{label:<10} {result['load_seconds']:>7.1f} {statistics.mean(latencies):>9.1f} "
+              f"{percentile(latencies, 50):>9.1f} {percentile(latencies, 95):>9.1f} {cer:>7.3f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Synthetic Card Corpus
+Renders business cards and Aadhaar/PAN-like ID cards with known contents,
+then degrades them with rotation, blur, noise and JPEG compression so the
+benchmark has ground truth to score extraction against
+
+Usage (from the ML directory):
+    python -m benchmarks.corpus out_dir [--count 50] [--seed 0]
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+import string
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+CARD_SIZE = (1050, 600)
+CARD_TYPES = ('business_card', 'id_card')
+
+FIRST_NAMES = ['Aarav', 'Priya', 'Rohan', 'Ananya', 'Vikram', 'Sneha', 'Karthik', 'Meera', 'Arjun', 'Divya']
+LAST_NAMES = ['Sharma', 'Reddy', 'Iyer', 'Patel', 'Gupta', 'Nair', 'Rao', 'Menon', 'Kapoor', 'Joshi']
+DESIGNATIONS = ['Software Engineer', 'Sales Manager', 'Product Designer', 'Operations Lead', 'Marketing Director']
+COMPANIES = ['Pranathi Software Services', 'Bluewave Technologies', 'Sunrise Logistics', 'Greenleaf Foods', 'Nimbus Analytics']
+STREETS = ['Road No 12, Banjara Hills', 'MG Road', 'Hitech City Main Road', 'Residency Road', 'Park Street']
+CITIES = ['Hyderabad, Telangana 500034', 'Bengaluru, Karnataka 560001', 'Chennai, Tamil Nadu 600002']
+
+# Verhoeff tables, as used for the Aadhaar check digit
+_VERHOEFF_D = [
+    [0, 1, 2, 3, 4, 5, 6, 7, 8, 9], [1, 2, 3, 4, 0, 6, 7, 8, 9, 5],
+    [2, 3, 4, 0, 1, 7, 8, 9, 5, 6], [3, 4, 0, 1, 2, 8, 9, 5, 6, 7],
+    [4, 0, 1, 2, 3, 9, 5, 6, 7, 8], [5, 9, 8, 7, 6, 0, 4, 3, 2, 1],
+    [6, 5, 9, 8, 7, 1, 0, 4, 3, 2], [7, 6, 5, 9, 8, 2, 1, 0, 4, 3],
+    [8, 7, 6, 5, 9, 3, 2, 1, 0, 4], [9, 8, 7, 6, 5, 4, 3, 2, 1, 0],
+]
+_VERHOEFF_P = [
+    [0, 1, 2, 3, 4, 5, 6, 7, 8, 9], [1, 5, 7, 6, 2, 8, 3, 0, 9, 4],
+    [5, 8, 0, 3, 7, 9, 6, 1, 4, 2], [8, 9, 1, 6, 0, 4, 3, 5, 2, 7],
+    [9, 4, 5, 3, 1, 2, 6, 8, 7, 0], [4, 2, 8, 6, 5, 7, 3, 9, 0, 1],
+    [2, 7, 9, 3, 8, 0, 6, 4, 1, 5], [7, 0, 4, 6, 9, 1, 3, 2, 5, 8],
+]
+_VERHOEFF_INV = [0, 4, 3, 2, 1, 5, 6, 7, 8, 9]
+
+def _font(size, bold=False):
+    name = 'DejaVuSans-Bold.ttf' if bold else 'DejaVuSans.ttf'
+    for path in (name, os.path.join('/usr/share/fonts/truetype/dejavu', name)):
+        try:
+            return ImageFont.truetype(path, size)
+        except OSError:
+            continue
+    return ImageFont.load_default(size=size)
+
+def aadhaar_number(rng):
+    """A random 12-digit number with a valid Verhoeff check digit and no leading 0/1"""
+    digits = [rng.randint(2, 9)] + [rng.randint(0, 9) for _ in range(10)]
+    check = 0
+    for i, digit in enumerate(reversed(digits)):
+        check = _VERHOEFF_D[check][_VERHOEFF_P[(i + 1) % 8][digit]]
+    return ''.join(map(str, digits)) + str(_VERHOEFF_INV[check])
+
+def pan_number(rng):
+    """A random PAN-shaped code for an individual holder (4th letter P)"""
+    letters = string.ascii_uppercase
+    return (''.join(rng.choice(letters) for _ in range(3)) + 'P' + rng.choice(letters)
+            + ''.join(rng.choice(string.digits) for _ in range(4)) + rng.choice(letters))
+
+def business_card_truth(rng):
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    company = rng.choice(COMPANIES)
+    domain = company.split()[0].lower() + '.com'
+    return {
+        "name": f"{first} {last}",
+        "designation": rng.choice(DESIGNATIONS),
+        "company": company,
+        "email": f"{first.lower()}.{last.lower()}@{domain}",
+        "personal_mobile_number": f"+91 {rng.randint(70000, 99999)} {rng.randint(10000, 99999)}",
+        "website": f"www.{domain}",
+        "address": f"{rng.randint(1, 999)}, {rng.choice(STREETS)}, {rng.choice(CITIES)}",
+    }
+
+def render_business_card(truth):
+    card = Image.new('RGB', CARD_SIZE, color=(250, 250, 246))
+    draw = ImageDraw.Draw(card)
+    draw.text((60, 50), truth["company"], fill=(20, 60, 120), font=_font(38, bold=True))
+    draw.text((60, 150), truth["name"], fill=(15, 15, 15), font=_font(46, bold=True))
+    draw.text((60, 215), truth["designation"], fill=(60, 60, 60), font=_font(32))
+    body = _font(28)
+    for row, key in enumerate(("personal_mobile_number", "email", "website", "address")):
+        draw.text((60, 320 + row * 60), truth[key], fill=(30, 30, 30), font=body)
+    return card
+
+def id_card_truth(rng):
+    if rng.random() < 0.5:
+        return {"kind": "aadhar", "number": aadhaar_number(rng), "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"}
+    return {"kind": "pan", "number": pan_number(rng), "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}".upper()}
+
+def render_id_card(truth):
+    card = Image.new('RGB', CARD_SIZE, color=(255, 255, 255))
+    draw = ImageDraw.Draw(card)
+    if truth["kind"] == "aadhar":
+        draw.rectangle([0, 0, CARD_SIZE[0], 90], fill=(255, 153, 51))
+        draw.text((60, 25), "GOVERNMENT OF INDIA", fill=(0, 0, 0), font=_font(34, bold=True))
+        draw.text((330, 170), truth["name"], fill=(0, 0, 0), font=_font(34))
+        draw.text((330, 230), "DOB: 01/01/1990", fill=(0, 0, 0), font=_font(30))
+        draw.text((330, 285), "Male", fill=(0, 0, 0), font=_font(30))
+        number = ' '.join(truth["number"][i:i + 4] for i in range(0, 12, 4))
+        draw.text((300, 440), number, fill=(0, 0, 0), font=_font(52, bold=True))
+        draw.line([(0, 530), (CARD_SIZE[0], 530)], fill=(200, 30, 30), width=6)
+        draw.text((330, 545), "Aadhaar - Aam Aadmi ka Adhikar", fill=(200, 30, 30), font=_font(26))
+    else:
+        draw.rectangle([0, 0, CARD_SIZE[0], 90], fill=(60, 110, 170))
+        draw.text((60, 20), "INCOME TAX DEPARTMENT", fill=(255, 255, 255), font=_font(34, bold=True))
+        draw.text((60, 130), "Permanent Account Number Card", fill=(0, 0, 0), font=_font(30))
+        draw.text((60, 190), truth["number"], fill=(0, 0, 0), font=_font(52, bold=True))
+        draw.text((60, 300), "Name", fill=(80, 80, 80), font=_font(24))
+        draw.text((60, 335), truth["name"], fill=(0, 0, 0), font=_font(34))
+        draw.text((60, 420), "Date of Birth 01/01/1990", fill=(0, 0, 0), font=_font(28))
+    # Photo placeholder
+    draw.rectangle([60, 160, 280, 420] if truth["kind"] == "aadhar" else [780, 150, 980, 400], outline=(90, 90, 90), width=4)
+    return card
+
+def degrade(card, rng, background=(1400, 1000)):
+    """Place the card on a noisy background, then rotate, blur, add sensor noise and JPEG-compress it"""
+    np_rng = np.random.default_rng(rng.randint(0, 2 ** 31))
+    canvas = Image.fromarray(np_rng.integers(50, 120, (background[1], background[0], 3), dtype=np.uint8), 'RGB')
+    angle = rng.uniform(-8, 8)
+    mask = Image.new('L', card.size, 255).rotate(angle, expand=True)
+    rotated = card.rotate(angle, expand=True, resample=Image.BICUBIC, fillcolor=(0, 0, 0))
+    offset = ((background[0] - rotated.width) // 2 + rng.randint(-40, 40),
+              (background[1] - rotated.height) // 2 + rng.randint(-40, 40))
+    canvas.paste(rotated, offset, mask)
+
+    canvas = canvas.filter(ImageFilter.GaussianBlur(radius=rng.uniform(0.0, 1.6)))
+    noisy = np.asarray(canvas, dtype=np.int16) + np_rng.normal(0, rng.uniform(2, 10), (background[1], background[0], 3))
+    canvas = Image.fromarray(np.clip(noisy, 0, 255).astype(np.uint8), 'RGB')
+
+    buffer = io.BytesIO()
+    canvas.save(buffer, format='JPEG', quality=rng.randint(55, 92))
+    return buffer.getvalue()
+
+def generate_corpus(count, seed=0, card_types=CARD_TYPES):
+    """Yield (filename, card_type, jpeg_bytes, truth) for a deterministic synthetic corpus"""
+    rng = random.Random(seed)
+    for index in range(count):
+        card_type = card_types[index % len(card_types)]
+        if card_type == 'business_card':
+            truth = business_card_truth(rng)
+            card = render_business_card(truth)
+        else:
+            truth = id_card_truth(rng)
+            card = render_id_card(truth)
+        yield f"{card_type}_{index:04d}.jpg", card_type, degrade(card, rng), truth
+
+def write_corpus(out_dir, count, seed=0, card_types=CARD_TYPES):
+    """Write the corpus images plus a manifest.json of filename -> card type and truth"""
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = {}
+    for filename, card_type, data, truth in generate_corpus(count, seed, card_types):
+        with open(os.path.join(out_dir, filename), 'wb') as f:
+            f.write(data)
+        manifest[filename] = {"card_type": card_type, "truth": truth}
+    with open(os.path.join(out_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+def load_corpus(corpus_dir):
+    """Read a corpus written by write_corpus as (filename, card_type, bytes, truth) tuples"""
+    with open(os.path.join(corpus_dir, 'manifest.json')) as f:
+        manifest = json.load(f)
+    items = []
+    for filename, entry in sorted(manifest.items()):
+        with open(os.path.join(corpus_dir, filename), 'rb') as f:
+            items.append((filename, entry["card_type"], f.read(), entry["truth"]))
+    return items
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('out_dir')
+    parser.add_argument('--count', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    manifest = write_corpus(args.out_dir, args.count, args.seed)
+    print(f"✅ Wrote {len(manifest)} synthetic cards to {args.out_dir}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Fake Gemini Model
+Local stand-in for GeminiModel with simulated latency and failures, so
+benchmarks never call the real API and stay reproducible
+"""
+
+import contextvars
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+# Ground truth for the card currently being processed; the Gemini client
+# copies the caller's context into its worker threads, so the fake sees it
+_expected = contextvars.ContextVar('benchmark_expected', default=None)
+
+@contextmanager
+def expected_answer(card_type, truth):
+    """Make the fake answer the enclosed extraction with this card's ground truth"""
+    token = _expected.set((card_type, truth))
+    try:
+        yield
+    finally:
+        _expected.reset(token)
+
+def set_expected_answer(card_type, truth):
+    """Non-scoped variant for request hooks; returns the token for reset"""
+    return _expected.set((card_type, truth))
+
+def gemini_response(card_type, truth):
+    """The response a perfect Gemini read of the card would produce"""
+    if card_type == 'id_card':
+        number = truth["number"]
+        return {
+            "Aadhar": [number] if truth["kind"] == "aadhar" else [],
+            "PAN": [number] if truth["kind"] == "pan" else [],
+            "General Numbers": [number],
+        }
+    return {
+        "name": truth["name"],
+        "designation": truth["designation"],
+        "company": truth["company"],
+        "email": truth["email"],
+        "personal_mobile_number": truth["personal_mobile_number"],
+        "company_number": "Not Found",
+        "website": truth["website"],
+        "address": truth["address"],
+    }
+
+class FakeGeminiModel:
+    """Drop-in for GeminiModel: answers with ground truth after a simulated network delay"""
+
+    def __init__(self, latency=1.0, jitter=0.3, failure_rate=0.0, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def is_available(self):
+        return True
+
+    def extract_data(self, image, prompt, extraction_type='business_card', timeout=None):
+        with self._lock:
+            delay = max(0.0, self._rng.gauss(self.latency, self.jitter))
+            fail = self._rng.random() < self.failure_rate
+
+        if timeout and delay > timeout:
+            time.sleep(timeout)
+            raise Exception("Gemini API error: simulated deadline exceeded")
+        time.sleep(delay)
+        if fail:
+            raise Exception("Gemini API error: simulated failure")
+
+        expected = _expected.get()
+        if expected is None:
+            raise Exception("Gemini API error: no expected answer set for this call")
+        return gemini_response(*expected)
+
+class DisabledGeminiModel:
+    """Drop-in for an unconfigured GeminiModel, forcing the local OCR path"""
+
+    def is_available(self):
+        return False
+
+    def extract_data(self, image, prompt, extraction_type='business_card', timeout=None):
+        raise ValueError("Gemini API not initialized")
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+ML Service Benchmark
+Drives the extraction pipeline with a synthetic card corpus at several
+concurrency levels and reports latency percentiles, throughput, peak RSS
+and extraction accuracy
+
+Usage (from the ML directory):
+    python -m benchmarks.run_benchmark [--mode inprocess|http] [--concurrency 1,2,4]
+                                       [--count 40] [--corpus dir] [--gemini off|fake|real]
+                                       [--url http://localhost:5000] [--json results.json]
+
+In-process mode calls the services directly. HTTP mode posts to --url, or
+when --url is omitted starts the Flask app in this process on a free port.
+Gemini is replaced by a local fake (--gemini fake) that answers with the
+card's ground truth after a simulated delay, or disabled (--gemini off) so
+every card goes through EasyOCR. Pass --gemini real to use the configured API.
+"""
+
+import argparse
+import json
+import os
+import resource
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ML_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ML_DIR, 'src'))
+
+import numpy as np
+
+from benchmarks.corpus import generate_corpus, load_corpus, CARD_TYPES
+from benchmarks.fake_gemini import FakeGeminiModel, DisabledGeminiModel, expected_answer, set_expected_answer
+
+BUSINESS_CARD_FIELDS = ("name", "designation", "company", "email", "personal_mobile_number", "website")
+ENDPOINTS = {'business_card': '/upload', 'id_card': '/extract-id-number'}
+
+def _normalize(field, value):
+    if not isinstance(value, str) or value == "Not Found":
+        return ""
+    if field == "personal_mobile_number":
+        return ''.join(c for c in value if c.isdigit())[-10:]
+    return ''.join(c for c in value.lower() if c.isalnum())
+
+def score(card_type, result, truth):
+    """Fraction of ground-truth fields the extraction got right"""
+    if not isinstance(result, dict):
+        return 0.0
+    if card_type == 'id_card':
+        key = 'Aadhar' if truth["kind"] == "aadhar" else 'PAN'
+        found = [''.join(str(number).split()).upper() for number in result.get(key) or []]
+        return 1.0 if truth["number"] in found else 0.0
+    matches = sum(_normalize(field, result.get(field)) == _normalize(field, truth[field]) for field in BUSINESS_CARD_FIELDS)
+    return matches / len(BUSINESS_CARD_FIELDS)
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def percentile(values, pct):
+    return float(np.percentile(values, pct)) if values else 0.0
+
+def build_gemini(mode, latency, failure_rate):
+    if mode == 'fake':
+        return FakeGeminiModel(latency=latency, jitter=latency * 0.3, failure_rate=failure_rate)
+    if mode == 'off':
+        return DisabledGeminiModel()
+    return None
+
+def patch_gemini(services, model):
+    """Point each service at the given Gemini stand-in, with a fresh circuit breaker"""
+    if model is None:
+        return
+    from models.gemini_client import GeminiClient, CircuitBreaker
+    breaker = CircuitBreaker()
+    for service in services:
+        service.gemini_model = model
+        service.gemini_client = GeminiClient(model, breaker=breaker)
+
+class InProcessTarget:
+    """Runs items through the services in this process, like the Flask views do"""
+
+    def __init__(self, gemini_model):
+        from services.id_card_service import IDCardService
+        from services.business_card_service import BusinessCardService
+        from utils.image_ingest import open_image_bytes
+
+        self.open_image_bytes = open_image_bytes
+        self.id_card_service = IDCardService()
+        self.business_card_service = BusinessCardService()
+        patch_gemini([self.id_card_service, self.business_card_service], gemini_model)
+
+    def __call__(self, filename, card_type, data, truth):
+        with expected_answer(card_type, truth):
+            image = self.open_image_bytes(data)
+            if card_type == 'id_card':
+                return self.id_card_service.extract_id_numbers(image)
+            return self.business_card_service.extract_business_card_data(image, '')
+
+    def rss_mb(self):
+        return peak_rss_mb()
+
+class HttpTarget:
+    """Posts items to a running ML service, one keep-alive session per worker thread"""
+
+    def __init__(self, url, measure_rss=False):
+        import requests
+
+        self.requests = requests
+        self.url = url.rstrip('/')
+        self.measure_rss = measure_rss
+        self._local = threading.local()
+
+    def __call__(self, filename, card_type, data, truth):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = self.requests.Session()
+        response = session.post(
+            self.url + ENDPOINTS[card_type],
+            files={'file': (filename, data, 'image/jpeg')}, data={'prompt': ''},
+            headers={'X-Benchmark-Expected': json.dumps({"card_type": card_type, "truth": truth})},
+            timeout=120,
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def rss_mb(self):
+        # Only meaningful when the server runs inside this process
+        return peak_rss_mb() if self.measure_rss else None
+
+def serve_in_process(gemini_model):
+    """Start the ML Flask app on a free local port and return its base URL once ready"""
+    from flask import request
+    from werkzeug.serving import make_server
+    import AI_Agent as agent
+
+    patch_gemini([agent.id_card_service, agent.business_card_service], gemini_model)
+
+    @agent.app.before_request
+    def _benchmark_expected_answer():
+        expected = request.headers.get('X-Benchmark-Expected')
+        if expected:
+            expected = json.loads(expected)
+            set_expected_answer(expected["card_type"], expected["truth"])
+
+    server = make_server('127.0.0.1', 0, agent.app, threaded=True)
+    threading.Thread(target=server.serve_forever, name='benchmark-server', daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}"
+
+    with agent.app.test_client() as client:
+        while client.get('/ready').status_code != 200:
+            if agent.startup_state.snapshot()["status"] == "failed":
+                sys.exit(f"❌ ML service failed to start: {agent.startup_state.snapshot().get('error')}")
+            time.sleep(0.5)
+    return url
+
+def run_level(target, items, concurrency):
+    """Process every item with the given number of concurrent workers"""
+    def run_item(item):
+        filename, card_type, data, truth = item
+        started = time.perf_counter()
+        try:
+            result = target(filename, card_type, data, truth)
+            return time.perf_counter() - started, score(card_type, result, truth), None
+        except Exception as e:
+            return time.perf_counter() - started, 0.0, str(e)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(run_item, items))
+    wall = time.perf_counter() - started
+
+    latencies = [latency * 1000 for latency, _, _ in outcomes]
+    errors = [error for _, _, error in outcomes if error]
+    return {
+        "concurrency": concurrency,
+        "images": len(items),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "images_per_second": len(items) / wall if wall else 0.0,
+        "accuracy": statistics.mean(accuracy for _, accuracy, _ in outcomes),
+        "peak_rss_mb": target.rss_mb(),
+    }
+
+def print_report(results):
+    print(f"\n{'conc':>4} {'images':>6} {'errors':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          f"{'img/s':>7} {'accuracy':>8} {'peak RSS MB':>11}")
+    for r in results:
+        rss = f"{r['peak_rss_mb']:.0f}" if r['peak_rss_mb'] is not None else '-'
+        print(f"{r['concurrency']:>4} {r['images']:>6} {r['errors']:>6} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} "
+              f"{r['p99_ms']:>9.1f} {r['images_per_second']:>7.2f} {r['accuracy']:>8.3f} {rss:>11}")
+    for r in results:
+        if r['first_error']:
+            print(f"⚠️ concurrency {r['concurrency']}: first error: {r['first_error']}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mode', choices=('inprocess', 'http'), default='inprocess')
+    parser.add_argument('--concurrency', default='1,2,4', help='Comma-separated worker counts')
+    parser.add_argument('--count', type=int, default=40, help='Synthetic cards to generate when --corpus is not given')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--corpus', help='Directory written by benchmarks.corpus')
+    parser.add_argument('--card-type', choices=CARD_TYPES, help='Only benchmark one card type')
+    parser.add_argument('--gemini', choices=('off', 'fake', 'real'), default='off')
+    parser.add_argument('--gemini-latency', type=float, default=1.5, help='Mean fake Gemini latency in seconds')
+    parser.add_argument('--gemini-failure-rate', type=float, default=0.0)
+    parser.add_argument('--url', help='Base URL of a running ML service (http mode)')
+    parser.add_argument('--json', help='Also write results to this JSON file')
+    args = parser.parse_args()
+
+    if args.corpus:
+        items = load_corpus(args.corpus)
+    else:
+        items = list(generate_corpus(args.count, args.seed))
+    if args.card_type:
+        items = [item for item in items if item[1] == args.card_type]
+    if not items:
+        sys.exit("No benchmark items")
+
+    gemini_model = build_gemini(args.gemini, args.gemini_latency, args.gemini_failure_rate)
+    if args.mode == 'inprocess':
+        target = InProcessTarget(gemini_model)
+    elif args.url:
+        if args.gemini != 'real':
+            print("⚠️ --url targets an external server; its own Gemini configuration is used")
+        target = HttpTarget(args.url)
+    else:
+        target = HttpTarget(serve_in_process(gemini_model), measure_rss=True)
+
+    # Untimed pass so model initialization does not land in the first level
+    for item in items[:2]:
+        try:
+            target(*item)
+        except Exception as e:
+            print(f"⚠️ Warm-up item {item[0]} failed: {e}")
+
+    results = []
+    for concurrency in (int(level) for level in args.concurrency.split(',')):
+        results.append(run_level(target, items, concurrency))
+        print(f"✅ concurrency {concurrency}: {results[-1]['images_per_second']:.2f} img/s")
+
+    print(f"\n{len(items)} image(s), mode={args.mode}, gemini={args.gemini}")
+    print_report(results)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({"mode": args.mode, "gemini": args.gemini, "results": results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Gunicorn Configuration - ML Service
+Production server: gunicorn --config gunicorn.conf.py "run:create_app()"
+
+Every setting can be overridden from the environment (GUNICORN_WORKERS,
+ML_INFERENCE_THREADS, ...). Send SIGHUP to the master for a graceful reload:
+workers finish in-flight requests and are replaced one by one. Because the
+app is preloaded, picking up new code needs a full restart (or USR2 + QUIT).
+"""
+
+import multiprocessing
+import os
+import sys
+
+cores = multiprocessing.cpu_count()
+
+# OCR is CPU bound and each worker runs it on its own intra-op thread pool, so
+# size the worker count so the pools together fill the cores without oversubscribing
+inference_threads = int(os.getenv('ML_INFERENCE_THREADS', min(cores, 2)))
+os.environ.setdefault('OMP_NUM_THREADS', str(inference_threads))
+os.environ.setdefault('ONNX_INTRA_OP_THREADS', str(inference_threads))
+
+bind = os.getenv('GUNICORN_BIND', f"0.0.0.0:{os.getenv('ML_PORT', '5000')}")
+workers = int(os.getenv('GUNICORN_WORKERS', max(1, cores // inference_threads)))
+# Threads overlap Gemini round-trips and uploads; OCR itself is bounded by the pool above
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+
+# Load the EasyOCR models once in the master so workers share the weights
+# copy-on-write; warm-up then runs in each worker after fork (post_fork)
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
+if preload_app:
+    os.environ.setdefault('WARMUP_DEFERRED', 'true')
+
+# Batch extraction streams for a long time; single cards can take several seconds
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 300))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 60))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+# Recycle workers periodically to bound native-memory growth, staggered
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+# Empty GUNICORN_ACCESS_LOG turns access logging off
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-') or None
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+worker_tmp_dir = os.getenv('GUNICORN_WORKER_TMP_DIR', '/dev/shm' if os.path.isdir('/dev/shm') else None)
+
+def post_fork(server, worker):
+    try:
+        import torch
+        torch.set_num_threads(inference_threads)
+    except ImportError:
+        pass
+    # Only set when the app was preloaded in the master
+    agent = sys.modules.get('src.AI_Agent')
+    if agent is not None:
+        agent.after_worker_fork()
+        server.log.info(f"🔥 Worker {worker.pid} warming up models")
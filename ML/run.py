@@ -18,43 +18,53 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+def create_app():
+    """Import the ML application and apply the service-level CORS configuration"""
+    # Import the modular Flask ML application
+    from src.AI_Agent import app
+    from flask_cors import CORS
+    logger.info("✅ Successfully imported modular ML application")
+    
+    # Configure CORS for the ML service
+    CORS(app, 
+         origins=['http://localhost:3000', 'http://visitors.pranathiss.com:3000', 'https://visitors.pranathiss.com:3000'],
+         methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'],
+         allow_headers=['Content-Type', 'Authorization', 'X-Requested-With', 'X-API-Key'],
+         supports_credentials=True,
+         expose_headers=['Content-Type', 'Authorization', 'Retry-After'])
+    
+    # Add explicit CORS headers for all responses
+    @app.after_request
+    def after_request(response):
+        response.headers.add('Access-Control-Allow-Origin', '*')
+        response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization,X-Requested-With,X-API-Key')
+        response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE,OPTIONS')
+        response.headers.add('Access-Control-Allow-Credentials', 'true')
+        return response
+    
+    # Handle preflight OPTIONS requests
+    @app.before_request
+    def handle_preflight():
+        if request.method == "OPTIONS":
+            response = jsonify()
+            response.headers.add("Access-Control-Allow-Origin", "*")
+            response.headers.add('Access-Control-Allow-Headers', "*")
+            response.headers.add('Access-Control-Allow-Methods', "*")
+            return response
+    
+    logger.info("✅ CORS configured for ML service")
+    
+    # Create upload directory if it doesn't exist
+    upload_dir = app.config['UPLOAD_FOLDER']
+    if not os.path.exists(upload_dir):
+        os.makedirs(upload_dir, exist_ok=True)
+        logger.info(f"Created upload directory: {upload_dir}")
+    return app
+
 def main():
-    """Main ML service entry point"""
+    """Main ML service entry point (development server; see gunicorn.conf.py for production)"""
     try:
-        # Import the modular Flask ML application
-        from src.AI_Agent import app
-        from flask_cors import CORS
-        logger.info("✅ Successfully imported modular ML application")
-        
-        # Configure CORS for the ML service
-        CORS(app, 
-             origins=['http://localhost:3000', 'http://visitors.pranathiss.com:3000', 'https://visitors.pranathiss.com:3000'],
-             methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'],
-             allow_headers=['Content-Type', 'Authorization', 'X-Requested-With'],
-             supports_credentials=True,
-             expose_headers=['Content-Type', 'Authorization'])
-        
-        # Add explicit CORS headers for all responses
-        @app.after_request
-        def after_request(response):
-            response.headers.add('Access-Control-Allow-Origin', '*')
-            response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization,X-Requested-With')
-            response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE,OPTIONS')
-            response.headers.add('Access-Control-Allow-Credentials', 'true')
-            return response
-        
-        # Handle preflight OPTIONS requests
-        @app.before_request
-        def handle_preflight():
-            from flask import request, jsonify
-            if request.method == "OPTIONS":
-                response = jsonify()
-                response.headers.add("Access-Control-Allow-Origin", "*")
-                response.headers.add('Access-Control-Allow-Headers', "*")
-                response.headers.add('Access-Control-Allow-Methods', "*")
-                return response
-        
-        logger.info("✅ CORS configured for ML service")
+        app = create_app()
         
         # Get configuration from environment variables
         host = os.getenv('ML_HOST', '0.0.0.0')
@@ -74,14 +84,9 @@ def main():
         print("🔍 Available endpoints:")
         print("  POST /extract-id-number - Extract Aadhar/PAN from ID cards")
         print("  POST /upload - Extract data from business cards")
+        print("  POST /batch - Extract data from many cards, streamed as NDJSON")
         print()
         
-        # Create upload directory if it doesn't exist
-        upload_dir = app.config['UPLOAD_FOLDER']
-        if not os.path.exists(upload_dir):
-            os.makedirs(upload_dir, exist_ok=True)
-            logger.info(f"Created upload directory: {upload_dir}")
-        
         # Run the Flask ML application
         app.run(
             host=host,
@@ -5,17 +5,35 @@ Modular AI-powered ID Card Detection and Business Card Processing
 
 import os
 import sys
+import json
+import time
 import logging
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g, Response, stream_with_context
 
 # Add src directory to Python path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from src.services.id_card_service import IDCardService
 from src.services.business_card_service import BusinessCardService
+from src.services.batch_service import BatchService, BatchError, read_zip_items
+from src.services.warmup_service import StartupState, start_warmup
 from src.utils.image_utils import allowed_file
-from src.utils.config import UPLOAD_FOLDER, CORS_ORIGINS, DEFAULT_HOST, DEFAULT_PORT
-from PIL import Image
+from src.utils.image_ingest import open_image, ImageRejectedError
+from src.utils.profiler import SamplingProfiler, profile_filename
+from src.utils.config import (
+    UPLOAD_FOLDER, CORS_ORIGINS, DEFAULT_HOST, DEFAULT_PORT, WARMUP_ENABLED, WARMUP_DEFERRED,
+    MAX_IMAGE_BYTES, MAX_BATCH_UPLOAD_BYTES, TIMING_HEADERS_ENABLED,
+    PROFILE_SLOW_REQUESTS, SLOW_REQUEST_SECONDS, PROFILER_INTERVAL_SECONDS, PROFILE_DIR,
+    RATE_LIMIT_ENABLED, RATE_LIMIT_STORAGE_URL, RATE_LIMIT_OCR_PER_MINUTE, RATE_LIMIT_OCR_BURST,
+    OCR_MAX_CONCURRENCY, OCR_ADMISSION_WAIT_SECONDS
+)
+from src.utils.rate_limit import (
+    RateLimiter, AdmissionControl, create_backend, client_identity, too_many_requests
+)
+# Same module object the services record into (they import it as utils.metrics)
+from utils.metrics import (
+    timed, render_metrics, start_request_timings, end_request_timings, REQUEST_SECONDS
+)
 
 # Configure logging
 logging.basicConfig(
@@ -30,16 +48,122 @@ app = Flask(__name__)
 
 # Configuration
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+app.config['MAX_CONTENT_LENGTH'] = MAX_BATCH_UPLOAD_BYTES
 
 # Initialize services
+startup_state = StartupState()
 try:
-    id_card_service = IDCardService()
-    business_card_service = BusinessCardService()
+    with startup_state.phase('service_init'):
+        id_card_service = IDCardService()
+        business_card_service = BusinessCardService()
+        batch_service = BatchService(id_card_service, business_card_service)
     logger.info("✅ ML services initialized successfully")
 except Exception as e:
     logger.error(f"❌ Failed to initialize ML services: {e}")
     id_card_service = None
     business_card_service = None
+    batch_service = None
+
+def start_startup_warmup():
+    """Warm up models in the background; /ready stays 503 until this finishes"""
+    if WARMUP_ENABLED:
+        start_warmup(startup_state, id_card_service, business_card_service)
+    elif id_card_service and business_card_service:
+        startup_state.mark_ready()
+    else:
+        startup_state.mark_failed("ML services failed to initialize")
+
+def after_worker_fork():
+    """Per-worker setup when a preloading server forks this app (see gunicorn.conf.py)"""
+    for service in (id_card_service, business_card_service):
+        if service:
+            service.easyocr_model.after_fork()
+    start_startup_warmup()
+
+# Under a preloading server, inference thread pools started in the master
+# would not survive the fork, so each worker warms up in after_worker_fork
+if not WARMUP_DEFERRED:
+    start_startup_warmup()
+
+# Per-request stage timings, request latency histogram and optional slow-request profiling
+@app.before_request
+def start_request_metrics():
+    g.request_started = time.perf_counter()
+    g.request_timings, g.request_timings_token = start_request_timings()
+    g.profiler = SamplingProfiler(PROFILER_INTERVAL_SECONDS).start() if PROFILE_SLOW_REQUESTS else None
+
+@app.after_request
+def record_request_metrics(response):
+    if 'request_started' not in g:
+        return response
+    elapsed = time.perf_counter() - g.request_started
+    REQUEST_SECONDS.observe(elapsed, endpoint=request.endpoint or 'unknown', status=response.status_code)
+
+    if g.profiler:
+        g.profiler.stop()
+        if elapsed >= SLOW_REQUEST_SECONDS:
+            path = g.profiler.write_collapsed(profile_filename(PROFILE_DIR, request.endpoint or 'unknown'))
+            top = ', '.join(f"{name} ({count})" for name, count in g.profiler.top_functions(5))
+            logger.warning(f"🐢 Slow request {request.path} took {elapsed:.2f}s; profile saved to {path}; top frames: {top}")
+
+    if TIMING_HEADERS_ENABLED:
+        timings = g.request_timings.server_timing()
+        response.headers['Server-Timing'] = f"{timings}, total;dur={elapsed * 1000:.1f}" if timings else f"total;dur={elapsed * 1000:.1f}"
+    return response
+
+@app.teardown_request
+def end_request_metrics(error=None):
+    if 'request_timings_token' in g:
+        end_request_timings(g.pop('request_timings_token'))
+
+# Reject oversized bodies from Content-Length before the multipart body is parsed
+@app.before_request
+def limit_upload_size():
+    limit = MAX_BATCH_UPLOAD_BYTES if request.endpoint == 'batch_extract' else MAX_IMAGE_BYTES
+    if request.content_length and request.content_length > limit:
+        return jsonify({"error": f"Request body is too large (max {limit} bytes)"}), 413
+
+@app.errorhandler(413)
+def request_too_large(error):
+    return jsonify({"error": "Request body is too large"}), 413
+
+# Per-caller token bucket and a per-worker cap on OCR requests in flight, so
+# one tenant's burst queues (then gets 429) instead of starving everyone else.
+# /batch is charged one token per image once its items are read, and each
+# image takes its own slot while it runs (see BatchService.process)
+OCR_ENDPOINTS = {'extract_id_number', 'upload_image'}
+ocr_rate_limiter = RateLimiter('ocr', RATE_LIMIT_OCR_PER_MINUTE, RATE_LIMIT_OCR_BURST,
+                               create_backend(RATE_LIMIT_STORAGE_URL)) if RATE_LIMIT_ENABLED else None
+ocr_admission = AdmissionControl(OCR_MAX_CONCURRENCY, OCR_ADMISSION_WAIT_SECONDS)
+
+def charge_ocr(cost=1):
+    """Take `cost` tokens from the caller's OCR bucket; a 429 response when it is empty"""
+    if not ocr_rate_limiter:
+        return None
+    owner = client_identity()
+    wait = ocr_rate_limiter.check(owner, cost)
+    if wait > 0:
+        logger.warning(f"⚠️ OCR rate limit exceeded by {owner}")
+        return too_many_requests(wait)
+    return None
+
+@app.before_request
+def admit_ocr_request():
+    if request.endpoint not in OCR_ENDPOINTS or request.method == 'OPTIONS':
+        return None
+    limited = charge_ocr()
+    if limited:
+        return limited
+    if not ocr_admission.acquire():
+        return too_many_requests(max(OCR_ADMISSION_WAIT_SECONDS, 1), 'OCR service is busy. Please try again shortly.')
+    g.ocr_admitted = ocr_admission
+    return None
+
+@app.teardown_request
+def release_ocr_slot(error=None):
+    admission = g.pop('ocr_admitted', None)
+    if admission is not None:
+        admission.release()
 
 # Additional CORS headers for compatibility
 @app.after_request
@@ -56,7 +180,8 @@ def after_request(response):
     else:
         response.headers['Access-Control-Allow-Origin'] = '*'
     
-    response.headers['Access-Control-Allow-Headers'] = 'Content-Type,Authorization,X-Requested-With'
+    response.headers['Access-Control-Allow-Headers'] = 'Content-Type,Authorization,X-Requested-With,X-API-Key'
+    response.headers['Access-Control-Expose-Headers'] = 'Retry-After'
     response.headers['Access-Control-Allow-Methods'] = 'GET,PUT,POST,DELETE,OPTIONS'
     response.headers['Access-Control-Allow-Credentials'] = 'true'
     return response
@@ -89,10 +214,14 @@ def extract_id_number():
         return jsonify({'error': 'ID card service not available'}), 503
 
     try:
-        image = Image.open(file.stream)
+        with timed('decode'):
+            image = open_image(file.stream)
         result = id_card_service.extract_id_numbers(image)
         return jsonify(result), 200
 
+    except ImageRejectedError as e:
+        return jsonify({'error': str(e)}), e.status_code
+
     except Exception as e:
         logger.error(f"❌ ID card extraction error: {e}")
         return jsonify({'error': f'Failed to process image: {str(e)}'}), 500
@@ -119,16 +248,64 @@ def upload_image():
         return jsonify({"error": "Business card service not available"}), 503
 
     try:
-        image = Image.open(file.stream)
+        with timed('decode'):
+            image = open_image(file.stream)
         prompt = request.form.get('prompt', '').strip()
         
         result = business_card_service.extract_business_card_data(image, prompt)
         return jsonify(result), 200
             
+    except ImageRejectedError as e:
+        return jsonify({"error": str(e)}), e.status_code
     except Exception as e:
         logger.error(f"❌ Business card extraction error: {e}")
         return jsonify({"error": f"An error occurred during processing: {e}"}), 500
 
+@app.route('/batch', methods=['POST', 'OPTIONS'])
+def batch_extract():
+    """Extract data from many card images, streaming NDJSON results as they complete"""
+    if request.method == 'OPTIONS':
+        # Handle preflight request
+        response = jsonify({'status': 'ok'})
+        return response
+
+    if not batch_service:
+        return jsonify({"error": "Batch service not available"}), 503
+
+    card_type = request.form.get('type', 'business_card').strip()
+    prompt = request.form.get('prompt', '').strip()
+
+    try:
+        # Accept either a zip archive or any number of 'files' parts
+        items = []
+        for file in request.files.getlist('archive'):
+            items.extend(read_zip_items(file.read()))
+        for file in request.files.getlist('files'):
+            if file.filename:
+                items.append((file.filename, file.read()))
+
+        batch_service.validate(items, card_type)
+        if ocr_rate_limiter and len(items) > ocr_rate_limiter.burst:
+            raise BatchError(f"Too many files in the batch (max {ocr_rate_limiter.burst} per request)")
+        limited = charge_ocr(len(items))
+        if limited:
+            return limited
+        results = batch_service.process(items, card_type, prompt, admission=ocr_admission)
+    except BatchError as e:
+        return jsonify({"error": str(e)}), 400
+
+    def generate():
+        succeeded = failed = 0
+        for item in results:
+            if item["status"] == "ok":
+                succeeded += 1
+            else:
+                failed += 1
+            yield json.dumps(item) + "\n"
+        yield json.dumps({"summary": {"total": len(items), "succeeded": succeeded, "failed": failed}}) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -143,9 +320,21 @@ def health_check():
     if id_card_service:
         status["services"]["easyocr"] = id_card_service.easyocr_model.is_available()
         status["services"]["gemini"] = id_card_service.gemini_model.is_available()
+        status["services"]["gemini_circuit"] = id_card_service.gemini_client.breaker.state
     
     return jsonify(status), 200
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus metrics: per-stage and per-endpoint latency histograms"""
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/ready', methods=['GET'])
+def readiness_check():
+    """Readiness endpoint: 200 only after models are warmed up"""
+    status = startup_state.snapshot()
+    return jsonify(status), 200 if status["status"] == "ready" else 503
+
 @app.route('/', methods=['GET'])
 def root():
     """Root endpoint with service information"""
@@ -155,7 +344,10 @@ def root():
         "endpoints": {
             "/extract-id-number": "POST - Extract Aadhar/PAN from ID cards",
             "/upload": "POST - Extract data from business cards",
-            "/health": "GET - Service health check"
+            "/batch": "POST - Extract data from many cards (multipart 'files' or zip 'archive'), streamed as NDJSON",
+            "/health": "GET - Service health check",
+            "/ready": "GET - Readiness check, ready once models are warmed up",
+            "/metrics": "GET - Prometheus metrics for pipeline stages and requests"
         },
         "status": "running"
     }), 200
@@ -11,7 +11,10 @@ import os
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from utils.config import EASYOCR_LANGUAGES, EASYOCR_GPU, EASYOCR_DOWNLOAD_ENABLED
+from utils.metrics import timed_function
+from utils.config import (
+    EASYOCR_LANGUAGES, EASYOCR_GPU, EASYOCR_DOWNLOAD_ENABLED, OCR_BACKEND, ONNX_MODEL_DIR, ONNX_QUANTIZE
+)
 
 # Suppress EasyOCR info logs to hide CPU warning
 logging.getLogger('easyocr').setLevel(logging.WARNING)
@@ -19,32 +22,54 @@ logging.getLogger('easyocr').setLevel(logging.WARNING)
 class EasyOCRModel:
     """Handler for EasyOCR operations"""
     
-    def __init__(self):
-        """Initialize EasyOCR reader"""
+    def __init__(self, backend=OCR_BACKEND, quantize=ONNX_QUANTIZE):
+        """Initialize EasyOCR reader on the configured backend ('torch' or 'onnx')"""
         self.reader = None
-        self._initialize_reader()
+        self.backend = backend
+        self._initialize_reader(quantize)
     
-    def _initialize_reader(self):
+    def _initialize_reader(self, quantize=ONNX_QUANTIZE):
         """Initialize the EasyOCR reader with configuration"""
         try:
             self.reader = easyocr.Reader(
                 EASYOCR_LANGUAGES, 
                 gpu=EASYOCR_GPU, 
                 model_storage_directory=None, 
-                download_enabled=EASYOCR_DOWNLOAD_ENABLED
+                download_enabled=EASYOCR_DOWNLOAD_ENABLED,
+                # torch-quantized modules cannot be exported, so ONNX starts from float weights
+                quantize=self.backend != 'onnx'
             )
             logging.info("✅ EasyOCR reader initialized successfully")
         except Exception as e:
             logging.error(f"❌ Failed to initialize EasyOCR: {e}")
             raise
+
+        if self.backend == 'onnx' and not EASYOCR_GPU:
+            try:
+                from models.onnx_backend import attach_onnx_backend
+                attach_onnx_backend(self.reader, ONNX_MODEL_DIR, quantize=quantize)
+            except Exception as e:
+                # Keep serving on the float torch models rather than failing startup
+                logging.warning(f"⚠️ ONNX Runtime backend unavailable, using PyTorch: {e}")
+                self.backend = 'torch'
+
+        # readtext calls detect then recognize; instance attributes shadow the methods
+        self.reader.detect = timed_function('ocr_detect', self.reader.detect)
+        self.reader.recognize = timed_function('ocr_recognize', self.reader.recognize)
+    
+    def after_fork(self):
+        """Rebuild per-process runtime state in a worker forked after the models were loaded"""
+        if self.backend == 'onnx' and self.reader is not None:
+            from models.onnx_backend import reopen_sessions
+            reopen_sessions(self.reader)
     
-    def extract_text(self, image_np, detail=False, paragraph=False):
-        """Extract text from image using EasyOCR"""
+    def extract_text(self, image_np, detail=False, paragraph=False, allowlist=None):
+        """Extract text from image using EasyOCR, optionally restricted to an allowlist of characters"""
         if self.reader is None:
             raise RuntimeError("EasyOCR reader not initialized")
         
         try:
-            results = self.reader.readtext(image_np, detail=detail, paragraph=paragraph)
+            results = self.reader.readtext(image_np, detail=detail, paragraph=paragraph, allowlist=allowlist)
             return results
         except Exception as e:
             logging.error(f"❌ EasyOCR text extraction failed: {e}")
@@ -0,0 +1,216 @@
+"""
+Gemini Client Layer
+Async, deadline-bounded access to GeminiModel with a global concurrency
+limit, a circuit breaker and hedged fallback to local OCR
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+import time
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.config import (
+    GEMINI_TIMEOUT_SECONDS, GEMINI_MAX_CONCURRENCY, GEMINI_BREAKER_FAILURES,
+    GEMINI_BREAKER_RESET_SECONDS, GEMINI_HEDGE_DELAY_SECONDS
+)
+
+class GeminiUnavailableError(Exception):
+    """Raised when Gemini is skipped because it is not configured or the circuit is open"""
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open trial call"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=GEMINI_BREAKER_FAILURES, reset_timeout=GEMINI_BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        """Current breaker state; an expired open circuit reports half-open"""
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow_request(self):
+        """Return True if a remote call may be attempted now"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                # Let exactly one trial call through
+                self._state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+
+    def release_trial(self):
+        """Give up a half-open trial that ended without a verdict, so the next request can retry"""
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._state = self.OPEN
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logging.warning(f"⚠️ Gemini circuit opened after {self._failures} failure(s)")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+# Shared across every client so the limits apply to the whole process
+_loop = None
+_loop_lock = threading.Lock()
+_shared_semaphore = asyncio.Semaphore(GEMINI_MAX_CONCURRENCY)
+_shared_breaker = CircuitBreaker()
+
+def _reset_after_fork():
+    # The loop thread does not exist in a forked child; start a fresh loop on first use
+    global _loop, _loop_lock
+    _loop = None
+    _loop_lock = threading.Lock()
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+def _run_in_executor(loop, fn):
+    """run_in_executor that keeps the caller's context, so per-request stage timings follow the work"""
+    return loop.run_in_executor(None, functools.partial(contextvars.copy_context().run, fn))
+
+def _get_loop():
+    """Return the background event loop that runs all client coroutines"""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name='gemini-client-loop', daemon=True).start()
+    return _loop
+
+class GeminiClient:
+    """Async wrapper around GeminiModel with deadline, concurrency limit, breaker and hedging"""
+
+    def __init__(self, model, timeout=GEMINI_TIMEOUT_SECONDS, hedge_delay=GEMINI_HEDGE_DELAY_SECONDS,
+                 semaphore=None, breaker=None):
+        self.model = model
+        self.timeout = timeout
+        self.hedge_delay = hedge_delay
+        self.semaphore = semaphore or _shared_semaphore
+        self.breaker = breaker or _shared_breaker
+
+    def is_available(self):
+        """Check if Gemini is configured and its circuit is not open"""
+        return self.model.is_available() and self.breaker.state != CircuitBreaker.OPEN
+
+    async def aextract(self, image, prompt, extraction_type='business_card'):
+        """Call Gemini under the concurrency limit, failing after the per-call deadline"""
+        if not self.model.is_available():
+            raise GeminiUnavailableError("Gemini API not initialized")
+        if not self.breaker.allow_request():
+            raise GeminiUnavailableError("Gemini circuit is open")
+        trial = self.breaker.state == CircuitBreaker.HALF_OPEN
+
+        loop = asyncio.get_running_loop()
+        call = functools.partial(self.model.extract_data, image, prompt, extraction_type, timeout=self.timeout)
+
+        async def _bounded_call():
+            await self.semaphore.acquire()
+            try:
+                future = _run_in_executor(loop, call)
+            except BaseException:
+                self.semaphore.release()
+                raise
+            # The executor thread keeps calling Gemini after a deadline or a
+            # cancelled hedge, so its slot is only freed once the thread is done
+            future.add_done_callback(lambda _: self.semaphore.release())
+            return await asyncio.shield(future)
+
+        try:
+            result = await asyncio.wait_for(_bounded_call(), self.timeout)
+        except asyncio.CancelledError:
+            # Local OCR won the hedge; a cancelled trial proves nothing either way
+            if trial:
+                self.breaker.release_trial()
+            raise
+        except asyncio.TimeoutError:
+            self.breaker.record_failure()
+            raise TimeoutError(f"Gemini call exceeded {self.timeout}s deadline")
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return result
+
+    async def aextract_with_fallback(self, image, prompt, extraction_type, local_fn, validate=None):
+        """Return (result, source) from Gemini or local_fn, whichever succeeds first.
+
+        local_fn starts immediately if Gemini is unavailable or fails, and in
+        parallel once hedge_delay has passed without a Gemini answer.
+        """
+        validate = validate or (lambda result: isinstance(result, dict))
+        loop = asyncio.get_running_loop()
+
+        async def _remote():
+            result = await self.aextract(image, prompt, extraction_type)
+            if not validate(result):
+                raise ValueError("Gemini returned an unexpected response shape")
+            return result
+
+        remote = asyncio.ensure_future(_remote())
+        try:
+            if self.hedge_delay is None or self.hedge_delay < 0:
+                return await remote, 'gemini'
+            return await asyncio.wait_for(asyncio.shield(remote), self.hedge_delay), 'gemini'
+        except asyncio.TimeoutError:
+            logging.info(f"⏱️ Gemini slower than {self.hedge_delay}s, hedging with local OCR")
+        except GeminiUnavailableError as e:
+            logging.info(f"🔄 Skipping Gemini: {e}")
+            return await _run_in_executor(loop, local_fn), 'easyocr'
+        except Exception as e:
+            logging.warning(f"⚠️ Gemini failed for {extraction_type} extraction: {e}")
+            return await _run_in_executor(loop, local_fn), 'easyocr'
+
+        local = asyncio.ensure_future(_run_in_executor(loop, local_fn))
+        pending = {remote, local}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    for other in pending:
+                        other.cancel()
+                    # Let the loser unwind (and release its breaker trial) before answering
+                    await asyncio.gather(*pending, return_exceptions=True)
+                    return task.result(), 'gemini' if task is remote else 'easyocr'
+                if task is remote:
+                    logging.warning(f"⚠️ Gemini failed for {extraction_type} extraction: {task.exception()}")
+        raise local.exception()
+
+    def extract(self, image, prompt, extraction_type='business_card'):
+        """Blocking wrapper around aextract for synchronous callers"""
+        return self._run(self.aextract(image, prompt, extraction_type))
+
+    def extract_with_fallback(self, image, prompt, extraction_type, local_fn, validate=None):
+        """Blocking wrapper around aextract_with_fallback for synchronous callers"""
+        return self._run(self.aextract_with_fallback(image, prompt, extraction_type, local_fn, validate))
+
+    @staticmethod
+    def _run(coro):
+        return asyncio.run_coroutine_threadsafe(coro, _get_loop()).result()
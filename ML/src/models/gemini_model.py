@@ -15,6 +15,7 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.config import GOOGLE_API_KEY, GEMINI_MODEL
+from utils.metrics import timed
 
 class GeminiModel:
     """Handler for Gemini AI operations"""
@@ -37,16 +38,17 @@ class GeminiModel:
             logging.warning(f"⚠️ Failed to initialize Gemini API: {e}")
             self.model = None
     
-    def extract_data(self, image, prompt, extraction_type='business_card'):
+    def extract_data(self, image, prompt, extraction_type='business_card', timeout=None):
         """Extract data using Gemini API based on the prompt or extraction type"""
         if not self.model:
             raise ValueError("Gemini API not initialized")
 
         try:
             # Convert PIL Image to base64 for Gemini
-            buffered = io.BytesIO()
-            image.save(buffered, format="PNG")
-            img_base64 = base64.b64encode(buffered.getvalue()).decode('utf-8')
+            with timed('gemini_encode'):
+                buffered = io.BytesIO()
+                image.save(buffered, format="PNG")
+                img_base64 = base64.b64encode(buffered.getvalue()).decode('utf-8')
 
             # Default prompt for business card or ID card if none provided
             if not prompt:
@@ -87,15 +89,16 @@ class GeminiModel:
                     """
 
             # Prepare the Gemini request
-            response = self.model.generate_content([
-                {"text": prompt},
-                {
-                    "inline_data": {
-                        "mime_type": "image/png",
-                        "data": img_base64
+            with timed('gemini_request'):
+                response = self.model.generate_content([
+                    {"text": prompt},
+                    {
+                        "inline_data": {
+                            "mime_type": "image/png",
+                            "data": img_base64
+                        }
                     }
-                }
-            ])
+                ], request_options={"timeout": timeout} if timeout else None)
 
             # Extract JSON from the response
             if not response or not response.text:
@@ -0,0 +1,151 @@
+"""
+ONNX Runtime OCR Backend
+Exports EasyOCR's detector and recognizer to ONNX and runs them with
+ONNX Runtime, keeping EasyOCR's own pre- and post-processing
+"""
+
+import logging
+import os
+import sys
+
+import numpy as np
+import torch
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.config import ONNX_INTRA_OP_THREADS
+
+DETECTOR_FILE = 'craft_detector.onnx'
+RECOGNIZER_FILE = 'recognizer.onnx'
+OPSET_VERSION = 17
+QUANTIZED_OP_TYPES = ['MatMul', 'Gemm', 'LSTM']
+
+class _RecognizerExportWrapper(torch.nn.Module):
+    """Exposes the CTC recognizer as a single-input graph; its text argument is unused"""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, image):
+        model = self.model
+        visual_feature = model.FeatureExtraction(image)
+        # AdaptiveAvgPool2d((None, 1)) has a dynamic output size ONNX cannot express;
+        # averaging over the pooled axis is the same operation
+        visual_feature = visual_feature.permute(0, 3, 1, 2).mean(dim=3)
+        contextual_feature = model.SequenceModeling(visual_feature)
+        return model.Prediction(contextual_feature.contiguous())
+
+def _quantized_path(path):
+    root, ext = os.path.splitext(path)
+    return f"{root}.int8{ext}"
+
+def export_detector(detector, path):
+    """Export the CRAFT detector with dynamic batch, height and width"""
+    dummy = torch.randn(1, 3, 320, 480)
+    torch.onnx.export(
+        detector.eval(), dummy, path, opset_version=OPSET_VERSION, dynamo=False,
+        input_names=['image'], output_names=['score_maps', 'feature'],
+        dynamic_axes={'image': {0: 'batch', 2: 'height', 3: 'width'},
+                      'score_maps': {0: 'batch', 1: 'map_height', 2: 'map_width'},
+                      'feature': {0: 'batch', 2: 'map_height', 3: 'map_width'}}
+    )
+
+def export_recognizer(recognizer, path, image_height=64):
+    """Export the recognizer with dynamic batch and line width"""
+    dummy = torch.randn(1, 1, image_height, 256)
+    torch.onnx.export(
+        _RecognizerExportWrapper(recognizer.eval()), dummy, path, opset_version=OPSET_VERSION, dynamo=False,
+        input_names=['image'], output_names=['logits'],
+        dynamic_axes={'image': {0: 'batch', 3: 'width'}, 'logits': {0: 'batch', 1: 'steps'}}
+    )
+
+def quantize_model(path):
+    """Write an int8 dynamically quantized copy of an ONNX model and return its path"""
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    output_path = _quantized_path(path)
+    # Like torch's dynamic quantization, leave convolutions in float: ConvInteger
+    # is slower than float Conv on CPUs without VNNI
+    quantize_dynamic(path, output_path, weight_type=QuantType.QInt8, op_types_to_quantize=QUANTIZED_OP_TYPES)
+    return output_path
+
+def _ensure_quantized(path):
+    quantized_path = _quantized_path(path)
+    return quantized_path if os.path.exists(quantized_path) else quantize_model(path)
+
+def create_session(path):
+    """Create a CPU ONNX Runtime inference session"""
+    import onnxruntime as ort
+
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if ONNX_INTRA_OP_THREADS:
+        options.intra_op_num_threads = ONNX_INTRA_OP_THREADS
+    return ort.InferenceSession(path, sess_options=options, providers=['CPUExecutionProvider'])
+
+class OnnxDetector:
+    """Drop-in for EasyOCR's CRAFT module: takes and returns torch tensors"""
+
+    def __init__(self, session, path=None):
+        self.session = session
+        self.path = path
+
+    def eval(self):
+        return self
+
+    def __call__(self, x):
+        score_maps, feature = self.session.run(None, {'image': x.cpu().numpy().astype(np.float32)})
+        return torch.from_numpy(score_maps), torch.from_numpy(feature)
+
+class OnnxRecognizer:
+    """Drop-in for EasyOCR's recognizer module: takes and returns torch tensors"""
+
+    def __init__(self, session, path=None):
+        self.session = session
+        self.path = path
+
+    def eval(self):
+        return self
+
+    def __call__(self, image, text=None):
+        (logits,) = self.session.run(None, {'image': image.cpu().numpy().astype(np.float32)})
+        return torch.from_numpy(logits)
+
+def attach_onnx_backend(reader, model_dir, quantize=False):
+    """Swap a Reader's torch detector and recognizer for ONNX Runtime sessions.
+
+    Models are exported on first use and reused from model_dir afterwards. The
+    reader must be built with quantize=False, since torch-quantized modules
+    cannot be exported.
+    """
+    os.makedirs(model_dir, exist_ok=True)
+    detector_path = os.path.join(model_dir, DETECTOR_FILE)
+    recognizer_path = os.path.join(model_dir, RECOGNIZER_FILE)
+
+    if not os.path.exists(detector_path):
+        logging.info(f"📦 Exporting EasyOCR detector to {detector_path}")
+        export_detector(reader.detector, detector_path)
+    if not os.path.exists(recognizer_path):
+        logging.info(f"📦 Exporting EasyOCR recognizer to {recognizer_path}")
+        export_recognizer(reader.recognizer, recognizer_path)
+
+    if quantize:
+        detector_path = _ensure_quantized(detector_path)
+        recognizer_path = _ensure_quantized(recognizer_path)
+
+    reader.detector = OnnxDetector(create_session(detector_path), detector_path)
+    reader.recognizer = OnnxRecognizer(create_session(recognizer_path), recognizer_path)
+    logging.info(f"✅ EasyOCR running on ONNX Runtime{' (int8)' if quantize else ''}")
+    return reader
+
+def reopen_sessions(reader):
+    """Recreate a reader's ONNX Runtime sessions.
+
+    Needed in workers forked from a preloading master: session thread pools
+    are created with the session and do not survive fork.
+    """
+    for module in (reader.detector, reader.recognizer):
+        if isinstance(module, (OnnxDetector, OnnxRecognizer)) and module.path:
+            module.session = create_session(module.path)
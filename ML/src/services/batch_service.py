@@ -0,0 +1,97 @@
+"""
+Batch Processing Service
+Runs many card images through the extraction services concurrently
+"""
+
+import io
+import logging
+import zipfile
+import sys
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.image_utils import allowed_file
+from utils.image_ingest import open_image_bytes
+from utils.config import BATCH_MAX_ITEMS, BATCH_MAX_WORKERS, BATCH_MAX_ARCHIVE_BYTES
+
+CARD_TYPES = ('business_card', 'id_card')
+
+class BatchError(ValueError):
+    """Raised when a batch request as a whole is invalid"""
+
+def read_zip_items(data):
+    """Read (filename, bytes) pairs for every image in a zip archive"""
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(data))
+    except zipfile.BadZipFile:
+        raise BatchError("Uploaded archive is not a valid zip file")
+
+    entries = [info for info in archive.infolist() if not info.is_dir()]
+    if sum(info.file_size for info in entries) > BATCH_MAX_ARCHIVE_BYTES:
+        raise BatchError("Uploaded archive is too large when uncompressed")
+
+    return [(info.filename, archive.read(info)) for info in entries]
+
+class BatchService:
+    """Service for extracting data from a batch of card images"""
+
+    def __init__(self, id_card_service, business_card_service, max_workers=BATCH_MAX_WORKERS):
+        """Initialize the batch service around the single-image services"""
+        self.id_card_service = id_card_service
+        self.business_card_service = business_card_service
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='batch-ocr')
+
+    def _process_item(self, filename, data, card_type, prompt, admission=None):
+        """Extract data from one image; raises on any per-item failure"""
+        if not allowed_file(filename):
+            raise ValueError("Invalid file type. Allowed types: jpg, jpeg, png")
+
+        image = open_image_bytes(data)
+        # Each image counts against the same in-flight cap as a single-image request
+        if admission is not None and not admission.acquire():
+            raise RuntimeError("OCR service is busy. Please try again shortly.")
+        try:
+            if card_type == 'id_card':
+                return self.id_card_service.extract_id_numbers(image)
+            return self.business_card_service.extract_business_card_data(image, prompt)
+        finally:
+            if admission is not None:
+                admission.release()
+
+    @staticmethod
+    def validate(items, card_type='business_card'):
+        """Raise BatchError when the batch as a whole cannot be processed"""
+        if card_type not in CARD_TYPES:
+            raise BatchError(f"Invalid type. Allowed types: {', '.join(CARD_TYPES)}")
+        if not items:
+            raise BatchError("No files in the batch")
+        if len(items) > BATCH_MAX_ITEMS:
+            raise BatchError(f"Too many files in the batch (max {BATCH_MAX_ITEMS})")
+
+    def process(self, items, card_type='business_card', prompt=None, admission=None):
+        """Validate the batch, start every item and return an iterator of results.
+
+        Results are yielded in completion order; a failing item yields an
+        error entry instead of aborting the batch. With `admission`, each item
+        holds one of its slots while it is extracted.
+        """
+        self.validate(items, card_type)
+
+        futures = {
+            self.executor.submit(self._process_item, filename, data, card_type, prompt, admission): (index, filename)
+            for index, (filename, data) in enumerate(items)
+        }
+        return self._iter_completed(futures)
+
+    @staticmethod
+    def _iter_completed(futures):
+        for future in as_completed(futures):
+            index, filename = futures[future]
+            try:
+                yield {"index": index, "filename": filename, "status": "ok", "result": future.result()}
+            except Exception as e:
+                logging.warning(f"⚠️ Batch item {index} ({filename}) failed: {e}")
+                yield {"index": index, "filename": filename, "status": "error", "error": str(e)}
@@ -12,12 +12,14 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from models.easyocr_model import EasyOCRModel
 from models.gemini_model import GeminiModel
+from models.gemini_client import GeminiClient
 from utils.image_utils import preprocess_and_rotate
 from utils.text_extraction import (
     extract_custom_data, extract_email, extract_mobile_number, 
     extract_company_number, extract_website, extract_name_and_designation,
     extract_company_name, extract_address
 )
+from utils.metrics import timed, EXTRACTIONS
 from utils.config import PLACEHOLDER_PHRASES, PUBLIC_EMAIL_DOMAINS
 
 class BusinessCardService:
@@ -27,44 +29,40 @@ class BusinessCardService:
         """Initialize the business card processing service"""
         self.easyocr_model = EasyOCRModel()
         self.gemini_model = GeminiModel()
+        self.gemini_client = GeminiClient(self.gemini_model)
     
     def extract_business_card_data(self, image, prompt=None):
         """Extract details from a business card image based on user prompt"""
         try:
-            processed_img, _, gemini_img = preprocess_and_rotate(image)
+            with timed('preprocess'):
+                processed_img, _, gemini_img = preprocess_and_rotate(image)
 
-            # Try Gemini first if available
-            if self.gemini_model.is_available():
-                try:
-                    gemini_result = self.gemini_model.extract_data(
-                        gemini_img, prompt, extraction_type='business_card'
-                    )
-                    # Validate Gemini response
-                    if isinstance(gemini_result, dict):
-                        logging.info("✅ Gemini successfully extracted business card data")
-                        return gemini_result
-                except Exception as e:
-                    logging.warning(f"⚠️ Gemini failed for business card extraction: {e}")
-
-            # Fallback to EasyOCR
-            logging.info("🔄 Falling back to EasyOCR for business card extraction")
-            results = self.easyocr_model.extract_text(processed_img, detail=False, paragraph=False)
-            filtered_results = [line for line in results if line.lower().strip() not in PLACEHOLDER_PHRASES]
-
-            if prompt:
-                # Use prompt-based extraction with EasyOCR
-                response_data = extract_custom_data(filtered_results, prompt)
-            else:
-                # Default behavior: extract business card details with EasyOCR
-                response_data = self._extract_default_business_card_data(filtered_results)
-
-            logging.info("✅ EasyOCR successfully extracted business card data")
-            return response_data
+            # Gemini first, with local OCR hedged in after a delay or on failure
+            result, source = self.gemini_client.extract_with_fallback(
+                gemini_img, prompt, 'business_card',
+                local_fn=lambda: self._extract_with_easyocr(processed_img, prompt)
+            )
+            EXTRACTIONS.inc(card_type='business_card', source=source)
+            logging.info(f"✅ {source} successfully extracted business card data")
+            return result
 
         except Exception as e:
             logging.error(f"❌ Failed to process business card: {e}")
             raise Exception(f"An error occurred during processing: {e}")
     
+    def _extract_with_easyocr(self, processed_img, prompt=None):
+        """Extract business card details locally with EasyOCR"""
+        logging.info("🔄 Falling back to EasyOCR for business card extraction")
+        results = self.easyocr_model.extract_text(processed_img, detail=False, paragraph=False)
+        filtered_results = [line for line in results if line.lower().strip() not in PLACEHOLDER_PHRASES]
+
+        with timed('extract_fields'):
+            if prompt:
+                # Use prompt-based extraction with EasyOCR
+                return extract_custom_data(filtered_results, prompt)
+            # Default behavior: extract business card details with EasyOCR
+            return self._extract_default_business_card_data(filtered_results)
+    
     def _extract_default_business_card_data(self, filtered_results):
         """Extract default business card fields using EasyOCR results"""
         full_text = ' '.join(filtered_results)
@@ -7,14 +7,20 @@ import re
 import logging
 import sys
 import os
+import cv2
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from models.easyocr_model import EasyOCRModel
 from models.gemini_model import GeminiModel
+from models.gemini_client import GeminiClient
 from utils.image_utils import preprocess_and_rotate
-from utils.text_extraction import extract_text_and_numbers
+from utils.text_extraction import (
+    extract_text_and_numbers, classify_id_card, is_valid_aadhar, is_valid_pan
+)
+from utils.metrics import timed, EXTRACTIONS
+from utils.config import ID_FAST_PATH_ENABLED, ID_CLASSIFY_MAX_WIDTH, ID_CARD_LAYOUTS
 
 class IDCardService:
     """Service for processing ID cards and extracting numbers"""
@@ -23,41 +29,87 @@ class IDCardService:
         """Initialize the ID card processing service"""
         self.easyocr_model = EasyOCRModel()
         self.gemini_model = GeminiModel()
+        self.gemini_client = GeminiClient(self.gemini_model)
     
     def extract_id_numbers(self, image):
         """Extract Aadhar, PAN, and general numbers from an uploaded image"""
         try:
-            processed_img, _, gemini_img = preprocess_and_rotate(image)
-
-            # Try Gemini first if available
-            if self.gemini_model.is_available():
-                try:
-                    gemini_result = self.gemini_model.extract_data(
-                        gemini_img, "", extraction_type='id_card'
-                    )
-                    # Validate Gemini response
-                    if isinstance(gemini_result, dict) and all(
-                        key in gemini_result for key in ['Aadhar', 'PAN', 'General Numbers']
-                    ):
-                        logging.info("✅ Gemini successfully extracted ID card data")
-                        return gemini_result
-                except Exception as e:
-                    logging.warning(f"⚠️ Gemini failed for ID extraction: {e}")
-
-            # Fallback to EasyOCR
-            logging.info("🔄 Falling back to EasyOCR for ID card extraction")
-            number_results, _ = extract_text_and_numbers(processed_img, self.easyocr_model.reader)
-            cleaned_numbers = [re.sub(r'\s+', '', num) for num in number_results]
+            with timed('preprocess'):
+                processed_img, _, gemini_img = preprocess_and_rotate(image)
 
-            response = {
-                'Aadhar': [num for num in cleaned_numbers if re.match(r'^\d{12}$', num)],
-                'PAN': [num for num in cleaned_numbers if re.match(r'^[A-Z]{5}\d{4}[A-Z]$', num)],
-                'General Numbers': cleaned_numbers
-            }
-            
-            logging.info("✅ EasyOCR successfully extracted ID card data")
-            return response
+            # Gemini first, with local OCR hedged in after a delay or on failure
+            result, source = self.gemini_client.extract_with_fallback(
+                gemini_img, "", 'id_card',
+                local_fn=lambda: self._extract_with_easyocr(processed_img),
+                validate=lambda r: isinstance(r, dict) and all(
+                    key in r for key in ['Aadhar', 'PAN', 'General Numbers']
+                )
+            )
+            EXTRACTIONS.inc(card_type='id_card', source=source)
+            logging.info(f"✅ {source} successfully extracted ID card data")
+            return result
 
         except Exception as e:
             logging.error(f"❌ Failed to process ID card: {e}")
             raise Exception(f'Failed to process image: {str(e)}')
+    
+    def _extract_with_easyocr(self, processed_img):
+        """Extract ID numbers locally, trying the known-layout fast path first"""
+        # Fast path: read only the number region of a known ID layout
+        if ID_FAST_PATH_ENABLED:
+            with timed('id_fast_path'):
+                fast_result = self._extract_from_known_layout(processed_img)
+            if fast_result:
+                return fast_result
+
+        logging.info("🔄 Falling back to EasyOCR for ID card extraction")
+        number_results, _ = extract_text_and_numbers(processed_img, self.easyocr_model.reader)
+        with timed('extract_fields'):
+            cleaned_numbers = [re.sub(r'\s+', '', num) for num in number_results]
+            return {
+                'Aadhar': [num for num in cleaned_numbers if is_valid_aadhar(num)],
+                'PAN': [num for num in cleaned_numbers if is_valid_pan(num)],
+                'General Numbers': cleaned_numbers
+            }
+
+    def _extract_from_known_layout(self, processed_img):
+        """Classify the card from a low-resolution pass, then OCR only its number regions.
+
+        Returns None when the card type is unknown or no number passes validation,
+        so the caller can fall back to a full-card read.
+        """
+        h, w = processed_img.shape[:2]
+        scale = min(1.0, ID_CLASSIFY_MAX_WIDTH / float(w))
+        preview = cv2.resize(processed_img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1.0 else processed_img
+
+        card_type = classify_id_card(self.easyocr_model.extract_text(preview, detail=False))
+        if card_type is None:
+            return None
+
+        layout = ID_CARD_LAYOUTS[card_type]
+        candidates = []
+        for x0, y0, x1, y1 in layout['regions']:
+            region = processed_img[int(y0 * h):int(y1 * h), int(x0 * w):int(x1 * w)]
+            if region.size == 0:
+                continue
+            lines = self.easyocr_model.extract_text(region, detail=False, allowlist=layout['allowlist'])
+            candidates.extend(self._number_candidates(' '.join(lines), card_type))
+
+        # Checksum/structure validation rejects misreads without another OCR pass
+        validator = is_valid_aadhar if card_type == 'aadhar' else is_valid_pan
+        numbers = list(dict.fromkeys(num for num in candidates if validator(num)))
+        if not numbers:
+            return None
+
+        return {
+            'Aadhar': numbers if card_type == 'aadhar' else [],
+            'PAN': numbers if card_type == 'pan' else [],
+            'General Numbers': numbers
+        }
+
+    @staticmethod
+    def _number_candidates(text, card_type):
+        """Find candidate ID numbers in allowlisted region text."""
+        if card_type == 'aadhar':
+            return [re.sub(r'\s+', '', num) for num in re.findall(r'\d{4}\s?\d{4}\s?\d{4}', text)]
+        return re.findall(r'[A-Z]{5}\d{4}[A-Z]', text.replace(' ', ''))
@@ -0,0 +1,93 @@
+"""
+Warm-up Service
+Pays model lazy-initialization cost at startup and tracks readiness
+"""
+
+import logging
+import threading
+import time
+import sys
+import os
+from contextlib import contextmanager
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+from utils.image_utils import preprocess_and_rotate
+from utils.config import WARMUP_SAMPLE_DIR, WARMUP_SAMPLES
+
+class StartupState:
+    """Startup phase timings and the readiness flag served by /ready"""
+
+    def __init__(self):
+        self.ready = False
+        self.error = None
+        self.phases = {}
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name):
+        """Time a startup phase and log its duration"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.phases[name] = round(elapsed, 3)
+            logging.info(f"⏱️ Startup phase '{name}' took {elapsed:.2f}s")
+
+    def mark_ready(self):
+        with self._lock:
+            self.ready = True
+        logging.info(f"✅ ML service ready {time.perf_counter() - self._started:.2f}s after startup")
+
+    def mark_failed(self, error):
+        with self._lock:
+            self.error = str(error)
+        logging.error(f"❌ ML service warm-up failed: {error}")
+
+    def snapshot(self):
+        """Readiness status as a JSON-serializable dict"""
+        with self._lock:
+            status = 'ready' if self.ready else ('failed' if self.error else 'warming_up')
+            result = {"status": status, "phases": dict(self.phases)}
+            if self.error:
+                result["error"] = self.error
+            return result
+
+def run_warmup(state, id_card_service, business_card_service, sample_dir=WARMUP_SAMPLE_DIR):
+    """Run local inference on the bundled samples, then mark the service ready.
+
+    Only the local EasyOCR path is exercised; Gemini is never called during warm-up.
+    """
+    try:
+        if not id_card_service or not business_card_service:
+            raise RuntimeError("ML services failed to initialize")
+
+        samples = {}
+        with state.phase('load_samples'):
+            for card_type, relative_path in WARMUP_SAMPLES.items():
+                with Image.open(os.path.join(sample_dir, relative_path)) as image:
+                    samples[card_type] = preprocess_and_rotate(image)[0]
+
+        # The first readtext call initializes the PyTorch detector and recognizer
+        with state.phase('warmup_business_card'):
+            business_card_service._extract_with_easyocr(samples['business_card'])
+        with state.phase('warmup_id_card'):
+            id_card_service._extract_with_easyocr(samples['id_card'])
+
+        state.mark_ready()
+    except Exception as e:
+        state.mark_failed(e)
+
+def start_warmup(state, id_card_service, business_card_service):
+    """Run warm-up on a background thread so the process can answer liveness checks"""
+    thread = threading.Thread(
+        target=run_warmup, args=(state, id_card_service, business_card_service),
+        name='ml-warmup', daemon=True
+    )
+    thread.start()
+    return thread
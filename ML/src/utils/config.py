@@ -15,10 +15,38 @@ DEFAULT_PORT = 5000
 UPLOAD_FOLDER = 'static/uploads'
 ALLOWED_EXTENSIONS = {'jpg', 'jpeg', 'png'}
 
+# Upload Ingestion Configuration
+MAX_IMAGE_BYTES = int(os.environ.get('MAX_IMAGE_BYTES', 15 * 1024 * 1024))  # Single-image request body
+MAX_BATCH_UPLOAD_BYTES = int(os.environ.get('MAX_BATCH_UPLOAD_BYTES', 100 * 1024 * 1024))  # Batch request body; also Flask's MAX_CONTENT_LENGTH
+MAX_IMAGE_PIXELS = int(os.environ.get('MAX_IMAGE_PIXELS', 40_000_000))  # Width x height read from the header, checked before decoding
+INGEST_TARGET_MAX_DIM = int(os.environ.get('INGEST_TARGET_MAX_DIM', 2560))  # JPEGs are decoded at the smallest 1/2, 1/4 or 1/8 scale at least this large; matches EasyOCR's canvas_size
+
+# Batch Extraction Configuration
+BATCH_MAX_ITEMS = int(os.environ.get('BATCH_MAX_ITEMS', 100))  # Images per batch request
+BATCH_MAX_WORKERS = int(os.environ.get('BATCH_MAX_WORKERS', 4))  # Images processed concurrently
+BATCH_MAX_ARCHIVE_BYTES = 200 * 1024 * 1024  # Total uncompressed size allowed from a zip upload
+
 # API Configuration
 GOOGLE_API_KEY = os.environ.get('GOOGLE_API_KEY')
 GEMINI_MODEL = 'gemini-1.5-flash'  # Use gemini-1.5-pro for better performance
 
+# Gemini Client Configuration
+GEMINI_TIMEOUT_SECONDS = float(os.environ.get('GEMINI_TIMEOUT_SECONDS', 10))  # Per-call deadline
+GEMINI_MAX_CONCURRENCY = int(os.environ.get('GEMINI_MAX_CONCURRENCY', 4))  # Global in-flight Gemini calls
+GEMINI_BREAKER_FAILURES = int(os.environ.get('GEMINI_BREAKER_FAILURES', 3))  # Consecutive failures to open the circuit
+GEMINI_BREAKER_RESET_SECONDS = float(os.environ.get('GEMINI_BREAKER_RESET_SECONDS', 30))  # Open time before a trial call
+GEMINI_HEDGE_DELAY_SECONDS = float(os.environ.get('GEMINI_HEDGE_DELAY_SECONDS', 3))  # Start local OCR after this delay; < 0 disables hedging
+
+# Rate Limiting and Admission Control (OCR endpoints: /extract-id-number, /upload, /batch)
+RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'True').lower() == 'true'
+RATE_LIMIT_STORAGE_URL = os.environ.get('RATE_LIMIT_STORAGE_URL', '')  # redis://... shares buckets across workers; empty = per process
+RATE_LIMIT_OCR_PER_MINUTE = int(os.environ.get('RATE_LIMIT_OCR_PER_MINUTE', 60))  # Sustained OCR requests per API key/company/address
+RATE_LIMIT_OCR_BURST = int(os.environ.get('RATE_LIMIT_OCR_BURST', 15))
+OCR_MAX_CONCURRENCY = int(os.environ.get('OCR_MAX_CONCURRENCY', 2))  # OCR requests in flight per worker
+OCR_ADMISSION_WAIT_SECONDS = float(os.environ.get('OCR_ADMISSION_WAIT_SECONDS', 2))  # Queueing allowed before a 429
+RATE_LIMIT_API_KEYS = {h.strip().lower() for h in os.environ.get('RATE_LIMIT_API_KEYS', '').split(',') if h.strip()}  # SHA-256 digests of issued API keys; only these get their own bucket
+JWT_SECRET = os.environ.get('JWT_SECRET')  # Backend's token secret; lets limits follow the caller's company
+
 # CORS Configuration
 CORS_ORIGINS = [
     "http://localhost:3000", 
@@ -30,6 +58,43 @@ EASYOCR_LANGUAGES = ['en']
 EASYOCR_GPU = False
 EASYOCR_DOWNLOAD_ENABLED = True
 
+# OCR Backend Configuration
+OCR_BACKEND = os.environ.get('OCR_BACKEND', 'torch').lower()  # 'torch' (EasyOCR default) or 'onnx'
+ONNX_MODEL_DIR = os.environ.get('ONNX_MODEL_DIR', os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'models', 'onnx'
+))
+ONNX_QUANTIZE = os.environ.get('ONNX_QUANTIZE', 'False').lower() == 'true'  # int8 dynamic quantization
+ONNX_INTRA_OP_THREADS = int(os.environ.get('ONNX_INTRA_OP_THREADS', 0))  # 0 lets ONNX Runtime decide
+
+# Warm-up Configuration
+WARMUP_ENABLED = os.environ.get('WARMUP_ENABLED', 'True').lower() == 'true'
+# Set by gunicorn.conf.py when preloading: each forked worker warms up instead of the master
+WARMUP_DEFERRED = os.environ.get('WARMUP_DEFERRED', 'False').lower() == 'true'
+WARMUP_SAMPLE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'data'
+)
+WARMUP_SAMPLES = {
+    'business_card': 'sample_business_cards/warmup_business_card.png',
+    'id_card': 'sample_id_cards/warmup_aadhaar.png',
+}
+
+# Metrics and Profiling Configuration
+TIMING_HEADERS_ENABLED = os.environ.get('TIMING_HEADERS_ENABLED', 'False').lower() == 'true'  # Add a Server-Timing header with per-stage durations
+PROFILE_SLOW_REQUESTS = os.environ.get('PROFILE_SLOW_REQUESTS', 'False').lower() == 'true'  # Sample stacks during every request, keep slow ones
+SLOW_REQUEST_SECONDS = float(os.environ.get('SLOW_REQUEST_SECONDS', 5))  # Requests slower than this get their profile saved
+PROFILER_INTERVAL_SECONDS = float(os.environ.get('PROFILER_INTERVAL_SECONDS', 0.01))
+PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'profiles'
+))
+
+# Card Localization Configuration
+CARD_DETECTION_ENABLED = os.environ.get('CARD_DETECTION_ENABLED', 'True').lower() == 'true'
+CARD_DETECTION_MAX_DIM = 800  # Longest side used for the contour search
+CARD_MIN_AREA_RATIO = 0.2  # Card must cover at least this fraction of the frame
+CARD_ASPECT_RATIO = 85.60 / 53.98  # ID-1 cards (Aadhaar, PAN, licences, badges)
+CARD_ASPECT_TOLERANCE = 0.25  # Allowed deviation of a detected quad's long/short side ratio
+CARD_FRAME_ASPECT_TOLERANCE = 0.08  # A frame this close to card-shaped is taken as the card itself
+
 # Placeholder phrases to ignore during text extraction
 PLACEHOLDER_PHRASES = {
     'your name here', 'your name', 'company name', 'your company name', 'job position',
@@ -61,6 +126,25 @@ PATTERNS = {
     'pincode': r'\b(\d{6})\b'
 }
 
+# ID Card Fast Path Configuration
+ID_FAST_PATH_ENABLED = os.environ.get('ID_FAST_PATH_ENABLED', 'True').lower() == 'true'
+ID_CLASSIFY_MAX_WIDTH = 480  # Width of the cheap first pass used to classify the card
+
+# Known ID layouts: classification keywords, number regions as (x0, y0, x1, y1)
+# fractions of the deskewed landscape card, and the recognition allowlist
+ID_CARD_LAYOUTS = {
+    'aadhar': {
+        'keywords': ['aadhaar', 'aadhar', 'unique identification', 'enrolment', 'vid'],
+        'regions': [(0.15, 0.68, 0.90, 0.95)],
+        'allowlist': '0123456789 ',
+    },
+    'pan': {
+        'keywords': ['income tax', 'permanent account', 'account number', 'pan'],
+        'regions': [(0.00, 0.30, 0.70, 0.75)],
+        'allowlist': 'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789',
+    },
+}
+
 # Keywords for data extraction
 KEYWORDS = {
     'company': [
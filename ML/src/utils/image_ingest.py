@@ -0,0 +1,84 @@
+"""
+Image Ingestion Utilities
+Validates uploaded images from their first bytes and header before
+decoding, and decodes JPEGs straight to OCR resolution
+"""
+
+import io
+import os
+from PIL import Image
+from .config import MAX_IMAGE_BYTES, MAX_IMAGE_PIXELS, INGEST_TARGET_MAX_DIM
+
+# Leading bytes of each accepted format, mapped to Pillow's format name
+MAGIC_NUMBERS = (
+    (b'\xff\xd8\xff', 'JPEG'),
+    (b'\x89PNG\r\n\x1a\n', 'PNG'),
+)
+SNIFF_BYTES = max(len(magic) for magic, _ in MAGIC_NUMBERS)
+
+class ImageRejectedError(ValueError):
+    """Raised when an upload is not an acceptable image; carries the HTTP status to return"""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+def sniff_format(header):
+    """Returns the Pillow format name for the given leading bytes, or None if unsupported."""
+    for magic, image_format in MAGIC_NUMBERS:
+        if header.startswith(magic):
+            return image_format
+    return None
+
+def _stream_size(stream):
+    position = stream.tell()
+    stream.seek(0, os.SEEK_END)
+    size = stream.tell()
+    stream.seek(position)
+    return size
+
+def open_image(stream, max_bytes=MAX_IMAGE_BYTES, max_pixels=MAX_IMAGE_PIXELS, target_max_dim=INGEST_TARGET_MAX_DIM):
+    """Validates and decodes an uploaded image from a seekable stream.
+
+    Size, format and pixel-count checks run on the byte count, magic bytes
+    and image header, so oversized files and decompression bombs are
+    rejected without decoding any pixel data. Large JPEGs are decoded at a
+    reduced DCT scale that is still at least target_max_dim on the longest side.
+    """
+    size = _stream_size(stream)
+    if size > max_bytes:
+        raise ImageRejectedError(f"Image is too large ({size} bytes, max {max_bytes})", 413)
+
+    stream.seek(0)
+    image_format = sniff_format(stream.read(SNIFF_BYTES))
+    stream.seek(0)
+    if image_format is None:
+        raise ImageRejectedError("Invalid file type. Allowed types: jpg, jpeg, png")
+
+    try:
+        # Only parses the header; pixel data is read by load() below
+        image = Image.open(stream, formats=[image_format])
+    except Image.DecompressionBombError:
+        raise ImageRejectedError(f"Image dimensions are too large (max {max_pixels} pixels)", 413)
+    except (OSError, SyntaxError):
+        raise ImageRejectedError("Uploaded file is not a readable image")
+
+    width, height = image.size
+    if width * height > max_pixels:
+        raise ImageRejectedError(
+            f"Image dimensions are too large ({width}x{height}, max {max_pixels} pixels)", 413
+        )
+
+    if image_format == 'JPEG' and target_max_dim and max(width, height) > target_max_dim:
+        scale = target_max_dim / float(max(width, height))
+        image.draft(image.mode, (max(1, int(width * scale)), max(1, int(height * scale))))
+
+    try:
+        image.load()
+    except (OSError, SyntaxError):
+        raise ImageRejectedError("Uploaded image is truncated or corrupt")
+    return image
+
+def open_image_bytes(data, **limits):
+    """open_image for an in-memory upload, e.g. a file read from a zip archive."""
+    return open_image(io.BytesIO(data), **limits)
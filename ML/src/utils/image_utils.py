@@ -7,33 +7,123 @@ import numpy as np
 import cv2
 import io
 from PIL import Image
-from .config import ALLOWED_EXTENSIONS
+from .metrics import timed
+from .config import (
+    ALLOWED_EXTENSIONS, CARD_ASPECT_RATIO, CARD_ASPECT_TOLERANCE, CARD_DETECTION_ENABLED,
+    CARD_DETECTION_MAX_DIM, CARD_FRAME_ASPECT_TOLERANCE, CARD_MIN_AREA_RATIO
+)
 
 def allowed_file(filename):
     """Checks if the uploaded file has an allowed extension."""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def _order_quad_points(points):
+    """Orders four corner points as top-left, top-right, bottom-right, bottom-left."""
+    rect = np.zeros((4, 2), dtype=np.float32)
+    sums = points.sum(axis=1)
+    diffs = np.diff(points, axis=1).ravel()
+    rect[0] = points[np.argmin(sums)]
+    rect[2] = points[np.argmax(sums)]
+    rect[1] = points[np.argmin(diffs)]
+    rect[3] = points[np.argmax(diffs)]
+    return rect
+
+def _is_card_shaped(width, height, tolerance):
+    """True if a width x height rectangle, in either orientation, has the card's aspect ratio."""
+    if min(width, height) <= 0:
+        return False
+    return abs(max(width, height) / min(width, height) - CARD_ASPECT_RATIO) <= tolerance
+
+def _quad_size(rect):
+    """Mean width and height of an ordered quad."""
+    tl, tr, br, bl = rect
+    width = (np.linalg.norm(tr - tl) + np.linalg.norm(br - bl)) / 2
+    height = (np.linalg.norm(bl - tl) + np.linalg.norm(br - tr)) / 2
+    return width, height
+
+def find_card_quad(img):
+    """Finds the four corners of the largest card-like quadrilateral in an RGB image.
+
+    The contour search runs on a downscaled copy; the returned corners are in
+    full-resolution coordinates, or None if no card-like shape was found. A
+    quad must cover CARD_MIN_AREA_RATIO of the frame and have the card's aspect
+    ratio, so a photo box or logo on a frame-filling card is not taken for it.
+    """
+    h, w = img.shape[:2]
+    scale = min(1.0, CARD_DETECTION_MAX_DIM / float(max(h, w)))
+    small = cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1.0 else img
+
+    gray = cv2.cvtColor(small, cv2.COLOR_RGB2GRAY)
+    blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+    edges = cv2.Canny(blurred, 50, 150)
+    edges = cv2.dilate(edges, np.ones((3, 3), np.uint8), iterations=1)
+
+    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    min_area = CARD_MIN_AREA_RATIO * small.shape[0] * small.shape[1]
+
+    for contour in sorted(contours, key=cv2.contourArea, reverse=True)[:5]:
+        if cv2.contourArea(contour) < min_area:
+            break
+        perimeter = cv2.arcLength(contour, True)
+        approx = cv2.approxPolyDP(contour, 0.02 * perimeter, True)
+        if len(approx) == 4 and cv2.isContourConvex(approx):
+            quad = approx.reshape(4, 2).astype(np.float32)
+            if _is_card_shaped(*_quad_size(_order_quad_points(quad)), CARD_ASPECT_TOLERANCE):
+                return quad / scale
+    return None
+
+def warp_card(img, quad):
+    """Crops and deskews the region bounded by quad into an upright rectangle."""
+    tl, tr, br, bl = rect = _order_quad_points(quad)
+    width = int(round(max(np.linalg.norm(br - bl), np.linalg.norm(tr - tl))))
+    height = int(round(max(np.linalg.norm(tr - br), np.linalg.norm(tl - bl))))
+    if width < 2 or height < 2:
+        return img
+
+    target = np.array([[0, 0], [width - 1, 0], [width - 1, height - 1], [0, height - 1]], dtype=np.float32)
+    matrix = cv2.getPerspectiveTransform(rect, target)
+    return cv2.warpPerspective(img, matrix, (width, height), flags=cv2.INTER_LINEAR)
+
+def localize_card(img):
+    """Crops the card out of its background, returning img unchanged if no card is found.
+
+    A frame that is already card-shaped is a close-up or scan of the card and
+    is passed through as is.
+    """
+    h, w = img.shape[:2]
+    if _is_card_shaped(w, h, CARD_FRAME_ASPECT_TOLERANCE):
+        return img
+    quad = find_card_quad(img)
+    if quad is None:
+        return img
+    return warp_card(img, quad)
+
 def preprocess_and_rotate(image):
     """Preprocesses the image for better OCR/Gemini results, including rotation."""
     img = np.array(image.convert("RGB"))
-    
+
+    # Crop and deskew the card so OCR and Gemini only see the card itself
+    if CARD_DETECTION_ENABLED:
+        with timed('localize'):
+            img = localize_card(img)
+
     # Rotate image if it's taller than it is wide
     h, w, _ = img.shape
     if h > w:
         img = cv2.rotate(img, cv2.ROTATE_90_COUNTERCLOCKWISE)
-        
+
     # Convert to grayscale and apply sharpening
     gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
     sharpen_kernel = np.array([[-1,-1,-1], [-1,9,-1], [-1,-1,-1]])
     sharp = cv2.filter2D(gray, -1, sharpen_kernel)
-    
+
     # Apply thresholding
     _, thresh = cv2.threshold(sharp, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-    
+
     # Save preprocessed image to a temporary file for Gemini
     _, buffer = cv2.imencode('.png', img)
     temp_image = Image.open(io.BytesIO(buffer))
-    
+
     return thresh, img, temp_image
 
 def image_to_base64(image):
@@ -0,0 +1,146 @@
+"""
+Metrics Utilities
+In-process stage timing histograms and counters rendered in the
+Prometheus text exposition format, plus per-request stage timings
+"""
+
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(pairs):
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by label values"""
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {'buckets': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0}
+            series['buckets'][index] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                pairs = list(zip(self.labelnames, key))
+                cumulative = 0
+                bounds = [repr(float(bound)) for bound in self.buckets] + ['+Inf']
+                for bound, count in zip(bounds, series['buckets']):
+                    cumulative += count
+                    lines.append(f"{self.name}_bucket{_format_labels(pairs + [('le', bound)])} {cumulative}")
+                labels = _format_labels(pairs)
+                lines.append(f"{self.name}_sum{labels} {_format_value(series['sum'])}")
+                lines.append(f"{self.name}_count{labels} {series['count']}")
+        return lines
+
+class Counter:
+    """Monotonic counter keyed by label values"""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(list(zip(self.labelnames, key)))} {_format_value(value)}")
+        return lines
+
+STAGE_SECONDS = Histogram(
+    'ml_stage_duration_seconds', 'Time spent in each stage of the extraction pipeline', ['stage']
+)
+REQUEST_SECONDS = Histogram(
+    'ml_request_duration_seconds', 'End-to-end HTTP request latency', ['endpoint', 'status']
+)
+EXTRACTIONS = Counter(
+    'ml_extractions_total', 'Completed extractions by card type and the source that answered', ['card_type', 'source']
+)
+REGISTRY = [STAGE_SECONDS, REQUEST_SECONDS, EXTRACTIONS]
+
+def render_metrics(registry=REGISTRY):
+    """All metrics in the Prometheus text exposition format (version 0.0.4)"""
+    return '\n'.join(line for metric in registry for line in metric.render()) + '\n'
+
+class RequestTimings:
+    """Stage durations accumulated for a single request, possibly from several threads"""
+
+    def __init__(self):
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds):
+        with self._lock:
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def server_timing(self):
+        """Value for a Server-Timing response header, durations in milliseconds"""
+        with self._lock:
+            return ', '.join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in self.stages.items())
+
+# Copied into executor threads by callers that hand work off (see gemini_client)
+_current_timings = contextvars.ContextVar('ml_request_timings', default=None)
+
+def start_request_timings():
+    """Begin collecting stage timings for the current request; returns (timings, reset token)"""
+    timings = RequestTimings()
+    return timings, _current_timings.set(timings)
+
+def end_request_timings(token):
+    _current_timings.reset(token)
+
+@contextmanager
+def timed(stage):
+    """Record the duration of the enclosed block under the given stage name"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(elapsed, stage=stage)
+        timings = _current_timings.get()
+        if timings is not None:
+            timings.add(stage, elapsed)
+
+def timed_function(stage, func):
+    """Wrap func so every call is recorded under the given stage name"""
+    def wrapper(*args, **kwargs):
+        with timed(stage):
+            return func(*args, **kwargs)
+    wrapper.__wrapped__ = func
+    return wrapper
@@ -0,0 +1,80 @@
+"""
+Sampling Profiler
+Periodically samples thread stacks while a request runs so slow
+requests can be explained without a tracing profiler's overhead
+"""
+
+import collections
+import os
+import sys
+import threading
+import time
+
+class SamplingProfiler:
+    """Samples the stacks of all other threads at a fixed interval.
+
+    Work for one request fans out to executor threads (hedged OCR, Gemini),
+    so every thread is sampled; under concurrent load the profile also
+    contains other requests' stacks.
+    """
+
+    def __init__(self, interval=0.01, max_depth=64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples = collections.Counter()
+        self.sample_count = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='ml-profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        return self
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_id:
+                    stack = self._collapse(frame)
+                    if stack:
+                        self.samples[stack] += 1
+            self.sample_count += 1
+
+    def _collapse(self, frame):
+        """Render a frame chain root-first as 'file:function;file:function'"""
+        names = []
+        while frame is not None and len(names) < self.max_depth:
+            code = frame.f_code
+            names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+        # Threads idling in the executor or event loop add nothing to the picture
+        if names and names[0].split(':')[1] in ('wait', 'select', 'poll', '_worker', 'run_forever'):
+            return None
+        return ';'.join(reversed(names))
+
+    def top_functions(self, limit=10):
+        """Most frequently sampled innermost frames as (function, samples)"""
+        leaves = collections.Counter()
+        for stack, count in self.samples.items():
+            leaves[stack.rsplit(';', 1)[-1]] += count
+        return leaves.most_common(limit)
+
+    def write_collapsed(self, path):
+        """Write samples in collapsed-stack format for flamegraph tools"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+def profile_filename(directory, label):
+    """A unique collapsed-stack file path for one profiled request"""
+    safe_label = ''.join(c if c.isalnum() or c in '-_' else '_' for c in label)
+    return os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{safe_label}-{os.getpid()}-{threading.get_ident()}.folded")
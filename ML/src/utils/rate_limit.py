@@ -0,0 +1,173 @@
+"""
+Rate Limiting and Admission Control
+Token buckets per API key, company or client address in front of the OCR
+endpoints, plus a cap on concurrent OCR requests per worker, so one tenant's
+burst cannot starve the others. Buckets live in this process by default;
+with RATE_LIMIT_STORAGE_URL pointing at a Redis-compatible server they are
+shared by every worker. Rejected requests get 429 with Retry-After.
+
+MemoryBackend, RedisBackend (and its script) are duplicated in
+Backend/src/utils/rate_limit.py: the two services are deployed separately
+and share no package. Keep both copies identical; they may use the same Redis.
+"""
+
+import hashlib
+import logging
+import math
+import threading
+import time
+import sys
+import os
+from flask import request, jsonify
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.config import JWT_SECRET, RATE_LIMIT_API_KEYS
+
+try:
+    import redis
+except ImportError:  # optional: only needed for RATE_LIMIT_STORAGE_URL
+    redis = None
+
+try:
+    import jwt
+except ImportError:  # optional: without it callers are told apart by API key or address only
+    jwt = None
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'vms:ratelimit:'
+
+class MemoryBackend:
+    """Buckets in a dict; limits apply per worker process"""
+
+    MAX_KEYS = 10000
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, burst, cost=1):
+        """Take `cost` tokens; seconds until they would be available (0 when taken)"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            wait = 0.0
+            if tokens >= cost:
+                tokens -= cost
+            else:
+                wait = (cost - tokens) / rate
+            if len(self._buckets) >= self.MAX_KEYS and key not in self._buckets:
+                self._prune(now)
+            self._buckets[key] = (tokens, now)
+        return wait
+
+    def _prune(self, now):
+        # Buckets idle long enough to be full again carry no state
+        stale = [k for k, (_, updated) in self._buckets.items() if now - updated > 3600]
+        for k in stale or list(self._buckets)[:self.MAX_KEYS // 10]:
+            del self._buckets[k]
+
+class RedisBackend:
+    """Buckets in a Redis-compatible server, updated atomically by a script"""
+
+    # tokens/ts per bucket; the server clock keeps every worker on one timeline
+    SCRIPT = """
+        local rate, burst, cost = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+        local clock = redis.call('TIME')
+        local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+        local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+        local tokens = tonumber(state[1]) or burst
+        local ts = tonumber(state[2]) or now
+        tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+        local wait = 0
+        if tokens >= cost then tokens = tokens - cost else wait = (cost - tokens) / rate end
+        redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+        redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+        return tostring(wait)
+    """
+
+    def __init__(self, client):
+        self._client = client
+        self._script = client.register_script(self.SCRIPT)
+
+    def take(self, key, rate, burst, cost=1):
+        return float(self._script(keys=[KEY_PREFIX + key], args=[rate, burst, cost]))
+
+def create_backend(url=''):
+    """Redis backend when `url` is set and reachable, else in memory"""
+    if url:
+        if redis is None:
+            logger.warning("⚠️ RATE_LIMIT_STORAGE_URL is set but the redis package is not installed; limiting per process")
+        else:
+            try:
+                client = redis.Redis.from_url(url, socket_timeout=0.5)
+                client.ping()
+                logger.info("✅ Rate limits shared through Redis")
+                return RedisBackend(client)
+            except Exception as e:
+                logger.warning(f"⚠️ Rate limit store unavailable ({e}); limiting per process")
+    return MemoryBackend()
+
+class RateLimiter:
+    """One named token bucket per caller: `per_minute` sustained, `burst` at once"""
+
+    def __init__(self, name, per_minute, burst, backend):
+        self.name = name
+        self.rate = per_minute / 60.0
+        self.burst = burst
+        self.backend = backend
+
+    def check(self, owner, cost=1):
+        """Seconds the caller must wait (0 when the request may proceed)"""
+        try:
+            return self.backend.take(f'{self.name}:{owner}', self.rate, self.burst, cost)
+        except Exception as e:
+            # A failing store must not take the endpoint down with it
+            logger.warning(f"⚠️ Rate limit check skipped: {e}")
+            return 0.0
+
+class AdmissionControl:
+    """Cap on requests in flight; a request waits up to `wait_seconds` for a slot"""
+
+    def __init__(self, max_concurrent, wait_seconds=0.0):
+        self.max_concurrent = max_concurrent
+        self.wait_seconds = wait_seconds
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+
+    def acquire(self):
+        return self._slots.acquire(timeout=self.wait_seconds) if self.wait_seconds > 0 else self._slots.acquire(blocking=False)
+
+    def release(self):
+        self._slots.release()
+
+def client_identity():
+    """Bucket owner: an issued API key (SHA-256 listed in RATE_LIMIT_API_KEYS;
+    other keys are ignored), else the company in a valid bearer token (issued
+    by the backend with the shared JWT_SECRET), else the client address (nginx
+    passes it as X-Real-IP)"""
+    api_key = request.headers.get('X-API-Key')
+    if api_key:
+        digest = hashlib.sha256(api_key.encode('utf-8')).hexdigest()
+        if digest in RATE_LIMIT_API_KEYS:
+            return 'key:' + digest[:16]
+    auth_header = request.headers.get('Authorization', '')
+    if jwt is not None and JWT_SECRET and auth_header.startswith('Bearer '):
+        try:
+            claims = jwt.decode(auth_header[7:], JWT_SECRET, algorithms=['HS256'])
+            company = claims.get('company_id') or claims.get('company_name')
+            if company:
+                return f'company:{company}'
+        except jwt.InvalidTokenError:
+            pass
+    return 'ip:' + (request.headers.get('X-Real-IP') or request.remote_addr or 'unknown')
+
+def too_many_requests(retry_after, message='Too many requests. Please slow down and try again.'):
+    """429 response with Retry-After in whole seconds"""
+    seconds = max(1, math.ceil(retry_after))
+    response = jsonify({'error': message, 'retry_after': seconds})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(seconds)
+    return response
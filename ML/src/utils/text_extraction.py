@@ -4,17 +4,98 @@ Contains functions for extracting various data types from text
 """
 
 import re
-from .config import PATTERNS, KEYWORDS, PUBLIC_EMAIL_DOMAINS
+from functools import lru_cache
+from .config import PATTERNS, KEYWORDS, PUBLIC_EMAIL_DOMAINS, ID_CARD_LAYOUTS
+
+# Verhoeff checksum tables (dihedral group D5 multiplication and position permutation)
+_VERHOEFF_D = (
+    (0, 1, 2, 3, 4, 5, 6, 7, 8, 9), (1, 2, 3, 4, 0, 6, 7, 8, 9, 5),
+    (2, 3, 4, 0, 1, 7, 8, 9, 5, 6), (3, 4, 0, 1, 2, 8, 9, 5, 6, 7),
+    (4, 0, 1, 2, 3, 9, 5, 6, 7, 8), (5, 9, 8, 7, 6, 0, 4, 3, 2, 1),
+    (6, 5, 9, 8, 7, 1, 0, 4, 3, 2), (7, 6, 5, 9, 8, 2, 1, 0, 4, 3),
+    (8, 7, 6, 5, 9, 3, 2, 1, 0, 4), (9, 8, 7, 6, 5, 4, 3, 2, 1, 0),
+)
+_VERHOEFF_P = (
+    (0, 1, 2, 3, 4, 5, 6, 7, 8, 9), (1, 5, 7, 6, 2, 8, 3, 0, 9, 4),
+    (5, 8, 0, 3, 7, 9, 6, 1, 4, 2), (8, 9, 1, 6, 0, 4, 3, 5, 2, 7),
+    (9, 4, 5, 3, 1, 2, 6, 8, 7, 0), (4, 2, 8, 6, 5, 7, 3, 9, 0, 1),
+    (2, 7, 9, 3, 8, 0, 6, 4, 1, 5), (7, 0, 4, 6, 9, 1, 3, 2, 5, 8),
+)
+
+_AADHAR_RE = re.compile(r'[2-9]\d{11}')
+_PAN_RE = re.compile(r'[A-Z]{3}[ABCFGHJLPT][A-Z]\d{4}[A-Z]')
+_ID_KEYWORD_RES = {
+    card_type: re.compile(r'\b(?:' + '|'.join(re.escape(kw) for kw in layout['keywords']) + r')\b')
+    for card_type, layout in ID_CARD_LAYOUTS.items()
+}
+
+# Field patterns, compiled once at import instead of on every call
+_EMAIL_RE = re.compile(PATTERNS['email'])
+_MOBILE_RES = [re.compile(pattern, re.IGNORECASE) for pattern in PATTERNS['mobile']]
+_COMPANY_NUMBER_RES = [re.compile(pattern, re.IGNORECASE) for pattern in PATTERNS['company_number']]
+_WEBSITE_RE = re.compile(PATTERNS['website'], re.IGNORECASE)
+_PINCODE_RE = re.compile(PATTERNS['pincode'])
+_ID_NUMBER_RE = re.compile(f"{PATTERNS['aadhar']}|{PATTERNS['pan']}")
+_NON_DIGIT_RE = re.compile(r'[^\d]')
+_WHITESPACE_RE = re.compile(r'\s+')
+_ROMAN_III_OCR_RE = re.compile(r'[Ii][Ii][lI](?=\s|,|$)', re.IGNORECASE)
+_COMMA_SPACING_RE = re.compile(r'\s*,\s*')
+_III_WORD_RE = re.compile(r'\bIii\b')
+_III_HYPHEN_RE = re.compile(r'([A-Za-z]+)\s*-\s*(III)')
+_TRAILING_PINCODE_RE = re.compile(r',\s*(\d{5,6})$')
+
+def _literal_matcher(keywords):
+    """One alternation equivalent to any(keyword in text for keyword in keywords)."""
+    return re.compile('|'.join(re.escape(keyword) for keyword in keywords))
+
+# One combined matcher per keyword group; each preserves the matching rules
+# the extractors have always used for that group (substring, word or regex)
+_KEYWORD_MATCHERS = {
+    'company': _literal_matcher(KEYWORDS['company']),
+    'designation': re.compile(r'\b(?:' + '|'.join(KEYWORDS['designation']) + r')\b'),
+    'address': re.compile('|'.join(KEYWORDS['address'])),
+    'address_end': re.compile('|'.join(['india', r'\b\d{5,6}\b'])),
+    'non_name': _literal_matcher(KEYWORDS['non_name']),
+    'non_address': re.compile('|'.join(KEYWORDS['non_address'])),
+    'items': _literal_matcher(['item', 'items', 'product', 'products']),
+}
+
+@lru_cache(maxsize=4096)
+def tag_line(line):
+    """Returns the keyword groups matching a line, computed once per distinct line."""
+    line_lower = line.lower()
+    return frozenset(group for group, matcher in _KEYWORD_MATCHERS.items() if matcher.search(line_lower))
+
+def is_valid_aadhar(number):
+    """Checks a 12-digit Aadhaar number against its Verhoeff check digit."""
+    digits = _WHITESPACE_RE.sub('', number)
+    if not _AADHAR_RE.fullmatch(digits):
+        return False
+    check = 0
+    for position, digit in enumerate(reversed(digits)):
+        check = _VERHOEFF_D[check][_VERHOEFF_P[position % 8][int(digit)]]
+    return check == 0
+
+def is_valid_pan(number):
+    """Checks a PAN's structure, including the holder-type letter in the fourth position."""
+    return bool(_PAN_RE.fullmatch(_WHITESPACE_RE.sub('', number)))
+
+def classify_id_card(lines):
+    """Classifies an ID card as one of ID_CARD_LAYOUTS from OCR lines, or None if unknown."""
+    text = ' '.join(lines).lower()
+    scores = {card_type: len(pattern.findall(text)) for card_type, pattern in _ID_KEYWORD_RES.items()}
+    best = max(scores, key=scores.get)
+    return best if scores[best] > 0 else None
 
 def extract_email(text):
     """Extracts email addresses using regex."""
-    match = re.search(PATTERNS['email'], text)
+    match = _EMAIL_RE.search(text)
     return match.group(0) if match else None
 
 def extract_mobile_number(text):
     """Extracts a 10-digit mobile number, optionally with a +91 prefix."""
-    for pattern in PATTERNS['mobile']:
-        matches = re.findall(pattern, text, re.IGNORECASE)
+    for pattern in _MOBILE_RES:
+        matches = pattern.findall(text)
         for match in matches:
             number = "".join(filter(None, match)).strip()
             if not re.search(r'(?:ext|extension|x|fax)\s*[:\s]*' + re.escape(number), text, re.IGNORECASE):
@@ -23,11 +104,11 @@ def extract_mobile_number(text):
 
 def extract_company_number(text):
     """Extracts a company landline number, potentially with context or an extension."""
-    for pattern in PATTERNS['company_number']:
-        match = re.search(pattern, text, re.IGNORECASE)
+    for pattern in _COMPANY_NUMBER_RES:
+        match = pattern.search(text)
         if match:
             full_number = "".join([g for g in match.groups() if g is not None]).strip()
-            clean_number = re.sub(r'[^\d]', '', full_number)
+            clean_number = _NON_DIGIT_RE.sub('', full_number)
             if len(clean_number) == 10 and clean_number.startswith(('6','7','8','9')):
                 continue
             return full_number
@@ -35,7 +116,7 @@ def extract_company_number(text):
 
 def extract_website(text):
     """Extracts a website URL, improved to not misidentify email addresses."""
-    match = re.search(PATTERNS['website'], text, re.IGNORECASE)
+    match = _WEBSITE_RE.search(text)
     if match:
         url = match.group(0)
         if '@' in url:
@@ -47,7 +128,7 @@ def extract_website(text):
 def extract_company_name(lines):
     """Extracts company name using a broader list of keywords."""
     for line in lines:
-        if any(keyword in line.lower() for keyword in KEYWORDS['company']):
+        if 'company' in tag_line(line):
             return line.strip().title()
     for line in lines:
         if line.isupper() and 2 < len(line.split()) < 5:
@@ -58,21 +139,18 @@ def extract_name_and_designation(lines):
     """Extracts name and designation using a more robust filtering approach."""
     name = None
     designation = None
-    
-    candidates = []
-    for line in lines:
-        line_lower = line.lower()
-        if not any(char.isdigit() for char in line) and not any(kw in line_lower for kw in KEYWORDS['non_name']):
-            if 0 < len(line.split()) < 5:
-                candidates.append(line.strip())
-
     remaining_candidates = []
-    for line in candidates:
-        if any(re.search(r'\b' + keyword + r'\b', line.lower()) for keyword in KEYWORDS['designation']):
+
+    # Single pass: filter name/designation candidates and split them by tag
+    for line in lines:
+        tags = tag_line(line)
+        if any(char.isdigit() for char in line) or 'non_name' in tags or not 0 < len(line.split()) < 5:
+            continue
+        if 'designation' in tags:
             if not designation:
-                designation = line.title()
+                designation = line.strip().title()
         else:
-            remaining_candidates.append(line)
+            remaining_candidates.append(line.strip())
 
     if remaining_candidates:
         name_candidates = [c for c in remaining_candidates if len(c.split()) in [2, 3]]
@@ -90,35 +168,35 @@ def extract_address(lines):
     cleaned_lines = []
     for line in lines:
         cleaned_line = line.strip()
-        cleaned_line = re.sub(r'[Ii][Ii][lI](?=\s|,|$)', 'III', cleaned_line, flags=re.IGNORECASE)
+        cleaned_line = _ROMAN_III_OCR_RE.sub('III', cleaned_line)
         cleaned_line = cleaned_line.replace(';', ',')
         if cleaned_line:
             cleaned_lines.append(cleaned_line)
     
     start_index = -1
     for i, line in enumerate(cleaned_lines):
-        if any(re.search(keyword, line.lower()) for keyword in KEYWORDS['address']):
-            if not any(re.search(keyword, line.lower()) for keyword in KEYWORDS['non_address']):
-                start_index = i
-                break
+        tags = tag_line(line)
+        if 'address' in tags and 'non_address' not in tags:
+            start_index = i
+            break
     
     if start_index != -1:
         for i in range(start_index, len(cleaned_lines)):
             line = cleaned_lines[i].strip()
-            line_lower = line.lower()
             if not line: continue
-            if any(re.search(keyword, line_lower) for keyword in KEYWORDS['non_address']): break
+            tags = tag_line(line)
+            if 'non_address' in tags: break
             words = line.split()
             if len(words) in [2, 3] and all(word.isalpha() for word in words):
-                if not any(re.search(keyword, line_lower) for keyword in KEYWORDS['address']):
+                if 'address' not in tags:
                     continue
             address_parts.append(line)
-            if len(address_parts) >= 2 and any(re.search(keyword, line_lower) for keyword in ['india', r'\b\d{5,6}\b']):
+            if len(address_parts) >= 2 and 'address_end' in tags:
                 break
     
     pincode = None
     for line in cleaned_lines:
-        pincode_match = re.search(PATTERNS['pincode'], line)
+        pincode_match = _PINCODE_RE.search(line)
         if pincode_match:
             pincode = pincode_match.group(1)
             break
@@ -128,20 +206,20 @@ def extract_address(lines):
         
     if address_parts:
         address = ', '.join(part for part in address_parts if part).strip()
-        address = re.sub(r'\s*,\s*', ', ', address).replace(" ,", ",")
+        address = _COMMA_SPACING_RE.sub(', ', address).replace(" ,", ",")
         
         address_parts_formatted = address.split(', ')
         final_parts = []
         for part in address_parts_formatted:
             formatted_part = part.title()
-            formatted_part = re.sub(r'\bIii\b', 'III', formatted_part)
+            formatted_part = _III_WORD_RE.sub('III', formatted_part)
             words = formatted_part.split(' ')
             corrected_words = [word.upper() if len(word) == 2 and word.isalpha() else word for word in words]
             final_parts.append(' '.join(corrected_words))
         
         address = ', '.join(final_parts)
-        address = re.sub(r'([A-Za-z]+)\s*-\s*(III)', r'\1-\2', address)
-        address = re.sub(r',\s*(\d{5,6})$', r' - \1', address)
+        address = _III_HYPHEN_RE.sub(r'\1-\2', address)
+        address = _TRAILING_PINCODE_RE.sub(r' - \1', address)
         return address
 
     return "Not Found"
@@ -152,9 +230,7 @@ def extract_text_and_numbers(image_np, reader):
     full_text = ' '.join(results)
     
     # Extract Aadhar (12 digits, with optional spaces) and PAN (10 alphanumeric characters)
-    aadhar_pattern = PATTERNS['aadhar']
-    pan_pattern = PATTERNS['pan']
-    numbers = re.findall(f'{aadhar_pattern}|{pan_pattern}', full_text)
+    numbers = _ID_NUMBER_RE.findall(full_text)
     return numbers, results
 
 def extract_custom_data(lines, prompt):
@@ -166,10 +242,17 @@ def extract_custom_data(lines, prompt):
     full_text = ' '.join(lines)
     result = {}
 
+    # Name and designation come from the same pass over the lines, so compute them once
+    name_and_designation = []
+    def _name_and_designation():
+        if not name_and_designation:
+            name_and_designation.extend(extract_name_and_designation(lines))
+        return name_and_designation
+
     # Define common fields and their extraction logic
     field_extractors = {
-        'name': lambda: extract_name_and_designation(lines)[0],
-        'designation': lambda: extract_name_and_designation(lines)[1],
+        'name': lambda: _name_and_designation()[0],
+        'designation': lambda: _name_and_designation()[1],
         'company': lambda: extract_company_name(lines),
         'email': lambda: extract_email(full_text),
         'mobile': lambda: extract_mobile_number(full_text),
@@ -178,7 +261,7 @@ def extract_custom_data(lines, prompt):
         'company tel': lambda: extract_company_number(full_text),  # Alias
         'website': lambda: extract_website(full_text),
         'address': lambda: extract_address(lines),
-        'items': lambda: ', '.join([line for line in lines if any(kw in line.lower() for kw in ['item', 'items', 'product', 'products'])])
+        'items': lambda: ', '.join([line for line in lines if 'items' in tag_line(line)])
     }
 
     # Parse prompt to identify requested fields
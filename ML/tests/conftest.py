@@ -46,3 +46,54 @@ def mock_image():
         return img_bytes
     except ImportError:
         pytest.skip("PIL not available for testing")
+
+def render_card_photo(angle=0, card_size=(856, 540), canvas_size=(1600, 1200), seed=0):
+    """Render a synthetic card photographed on a cluttered desk background."""
+    from PIL import Image, ImageDraw
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    noise = rng.integers(40, 110, (canvas_size[1], canvas_size[0], 3), dtype=np.uint8)
+    background = Image.fromarray(noise, 'RGB')
+
+    card = Image.new('RGB', card_size, color=(245, 245, 240))
+    draw = ImageDraw.Draw(card)
+    for row in range(6):
+        y = 60 + row * 70
+        draw.rectangle([60, y, 60 + int(rng.integers(250, 700)), y + 30], fill=(20, 20, 20))
+
+    mask = Image.new('L', card_size, 255)
+    card = card.rotate(angle, expand=True, fillcolor=(0, 0, 0))
+    mask = mask.rotate(angle, expand=True)
+    offset = ((canvas_size[0] - card.width) // 2, (canvas_size[1] - card.height) // 2)
+    background.paste(card, offset, mask)
+    return background
+
+def render_close_up(frame_size=(1000, 630)):
+    """Render a card filling the whole frame, with a bordered 382x262 photo box."""
+    from PIL import Image, ImageDraw
+
+    frame = Image.new('RGB', frame_size, color=(245, 245, 240))
+    draw = ImageDraw.Draw(frame)
+    for row in range(5):
+        y = 120 + row * 70
+        draw.rectangle([50, y, 450, y + 30], fill=(20, 20, 20))
+    left, top = frame_size[0] - 440, (frame_size[1] - 262) // 2
+    draw.rectangle([left, top, left + 382, top + 262], fill=(190, 170, 150), outline=(10, 10, 10), width=6)
+    return frame
+
+@pytest.fixture
+def close_up_photos():
+    """Frame-filling card close-ups: a card-shaped frame and a 4:3 one with the card's edges cut off."""
+    try:
+        return render_close_up(), render_close_up(frame_size=(900, 675))
+    except ImportError:
+        pytest.skip("PIL not available for testing")
+
+@pytest.fixture
+def card_photos():
+    """Fixture set of synthetic card photos at several skew angles."""
+    try:
+        return [render_card_photo(angle=angle, seed=i) for i, angle in enumerate((0, 4, -7, 12))]
+    except ImportError:
+        pytest.skip("PIL/numpy not available for testing")
@@ -0,0 +1,108 @@
+"""
+Tests for the batch extraction endpoint
+Covers multipart and zip uploads, NDJSON streaming and per-item errors
+"""
+import io
+import json
+import time
+import zipfile
+import pytest
+
+pytest.importorskip("PIL")
+
+from PIL import Image
+
+
+class FakeBusinessCardService:
+    def extract_business_card_data(self, image, prompt=None):
+        if image.width == 13:
+            raise Exception("An error occurred during processing: unreadable card")
+        # Wider images finish first so completion order differs from upload order
+        time.sleep(0.2 / image.width)
+        return {"name": f"Card {image.width}", "prompt": prompt}
+
+
+class FakeIDCardService:
+    def extract_id_numbers(self, image):
+        return {"Aadhar": ["234567890124"], "PAN": [], "General Numbers": ["234567890124"]}
+
+
+def png_bytes(width):
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, 10), color='white').save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def parse_ndjson(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+@pytest.fixture
+def batch_client(monkeypatch):
+    try:
+        import src.AI_Agent as agent
+        from src.services.batch_service import BatchService
+        from src.utils.rate_limit import AdmissionControl
+    except ImportError as e:
+        pytest.skip(f"ML app not importable: {e}")
+
+    service = BatchService(FakeIDCardService(), FakeBusinessCardService(), max_workers=4)
+    monkeypatch.setattr(agent, 'batch_service', service)
+    # Batch images take admission slots; leave room for every worker
+    monkeypatch.setattr(agent, 'ocr_admission', AdmissionControl(4))
+    agent.app.config['TESTING'] = True
+    return agent.app.test_client()
+
+
+class TestBatchEndpoint:
+    def test_multipart_batch_streams_all_items(self, batch_client):
+        data = {'files': [(io.BytesIO(png_bytes(w)), f'card{w}.png') for w in (10, 20, 40)], 'prompt': 'name'}
+        response = batch_client.post('/batch', data=data, content_type='multipart/form-data')
+
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        lines = parse_ndjson(response)
+        items, summary = lines[:-1], lines[-1]['summary']
+        assert sorted(item['index'] for item in items) == [0, 1, 2]
+        assert all(item['status'] == 'ok' and item['result']['prompt'] == 'name' for item in items)
+        assert summary == {'total': 3, 'succeeded': 3, 'failed': 0}
+        # Completion order, not upload order
+        assert items[0]['filename'] == 'card40.png'
+
+    def test_item_errors_do_not_fail_batch(self, batch_client):
+        data = {'files': [
+            (io.BytesIO(png_bytes(20)), 'good.png'),
+            (io.BytesIO(png_bytes(13)), 'unreadable.png'),
+            (io.BytesIO(b'not an image'), 'broken.jpg'),
+            (io.BytesIO(b'text'), 'notes.txt'),
+        ]}
+        response = batch_client.post('/batch', data=data, content_type='multipart/form-data')
+
+        lines = parse_ndjson(response)
+        by_name = {item['filename']: item for item in lines[:-1]}
+        assert by_name['good.png']['status'] == 'ok'
+        assert all(by_name[name]['status'] == 'error' for name in ('unreadable.png', 'broken.jpg', 'notes.txt'))
+        assert lines[-1]['summary'] == {'total': 4, 'succeeded': 1, 'failed': 3}
+
+    def test_zip_archive_id_cards(self, batch_client):
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, 'w') as zf:
+            zf.writestr('scans/', '')
+            zf.writestr('scans/a.png', png_bytes(10))
+            zf.writestr('scans/b.png', png_bytes(11))
+        archive.seek(0)
+
+        response = batch_client.post('/batch', data={'archive': (archive, 'scans.zip'), 'type': 'id_card'},
+                                     content_type='multipart/form-data')
+        lines = parse_ndjson(response)
+        assert {item['filename'] for item in lines[:-1]} == {'scans/a.png', 'scans/b.png'}
+        assert all(item['result']['Aadhar'] == ['234567890124'] for item in lines[:-1])
+
+    def test_rejects_invalid_batches(self, batch_client):
+        assert batch_client.post('/batch', data={}, content_type='multipart/form-data').status_code == 400
+
+        bad_type = {'files': [(io.BytesIO(png_bytes(10)), 'a.png')], 'type': 'passport'}
+        assert batch_client.post('/batch', data=bad_type, content_type='multipart/form-data').status_code == 400
+
+        bad_zip = {'archive': (io.BytesIO(b'not a zip'), 'cards.zip')}
+        assert batch_client.post('/batch', data=bad_zip, content_type='multipart/form-data').status_code == 400
@@ -0,0 +1,63 @@
+"""
+Tests for the benchmark corpus and scoring
+Keeps the synthetic ground truth valid under the service's own validators
+"""
+import io
+import pytest
+
+pytest.importorskip("PIL")
+pytest.importorskip("numpy")
+
+from PIL import Image
+from benchmarks.corpus import generate_corpus, write_corpus, load_corpus
+from benchmarks.fake_gemini import FakeGeminiModel, expected_answer, gemini_response
+from benchmarks.run_benchmark import score
+from src.utils.text_extraction import is_valid_aadhar, is_valid_pan
+
+
+@pytest.fixture(scope='module')
+def corpus():
+    return list(generate_corpus(8, seed=3))
+
+
+class TestCorpus:
+    def test_corpus_is_deterministic(self, corpus):
+        again = list(generate_corpus(8, seed=3))
+        assert [item[2] for item in again] == [item[2] for item in corpus]
+
+    def test_items_are_degraded_jpegs_of_both_types(self, corpus):
+        assert {card_type for _, card_type, _, _ in corpus} == {'business_card', 'id_card'}
+        for filename, _, data, _ in corpus:
+            assert filename.endswith('.jpg') and data[:3] == b'\xff\xd8\xff'
+            assert Image.open(io.BytesIO(data)).size == (1400, 1000)
+
+    def test_id_numbers_pass_service_validators(self, corpus):
+        for _, card_type, _, truth in corpus:
+            if card_type == 'id_card':
+                validator = is_valid_aadhar if truth['kind'] == 'aadhar' else is_valid_pan
+                assert validator(truth['number'])
+
+    def test_write_and_load_round_trip(self, tmp_path):
+        write_corpus(str(tmp_path), 4, seed=1)
+        loaded = load_corpus(str(tmp_path))
+        assert [item[0] for item in loaded] == sorted(item[0] for item in generate_corpus(4, seed=1))
+
+
+class TestScoring:
+    def test_perfect_answers_score_one(self, corpus):
+        for _, card_type, _, truth in corpus:
+            assert score(card_type, gemini_response(card_type, truth), truth) == 1.0
+
+    def test_business_card_partial_credit(self, corpus):
+        _, card_type, _, truth = next(item for item in corpus if item[1] == 'business_card')
+        result = dict(gemini_response(card_type, truth), email="Not Found")
+        result['personal_mobile_number'] = result['personal_mobile_number'].replace(' ', '-')
+        assert score(card_type, result, truth) == pytest.approx(5 / 6)
+
+    def test_fake_gemini_answers_with_scoped_truth(self, corpus):
+        _, card_type, _, truth = corpus[1]
+        fake = FakeGeminiModel(latency=0, jitter=0)
+        with expected_answer(card_type, truth):
+            assert fake.extract_data(None, '', card_type) == gemini_response(card_type, truth)
+        with pytest.raises(Exception):
+            fake.extract_data(None, '', card_type)
@@ -0,0 +1,70 @@
+"""
+Tests for card localization before OCR
+Covers contour-based card detection, perspective warp and its benchmark
+"""
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+
+from src.utils.image_utils import find_card_quad, localize_card, preprocess_and_rotate
+
+
+CARD_ASPECT = 856 / 540
+
+
+class TestCardLocalization:
+    """Test card detection and cropping."""
+
+    def test_finds_card_quad(self, card_photos):
+        """A card on a desk background is detected as a quadrilateral."""
+        for photo in card_photos:
+            quad = find_card_quad(np.array(photo))
+            assert quad is not None
+            assert quad.shape == (4, 2)
+
+    def test_crop_matches_card_geometry(self, card_photos):
+        """The warped crop is roughly the card's size and aspect ratio."""
+        for photo in card_photos:
+            cropped = localize_card(np.array(photo))
+            h, w = cropped.shape[:2]
+            assert abs(w / h - CARD_ASPECT) < 0.1
+            assert 0.9 < (w * h) / (856 * 540) < 1.15
+
+    def test_no_card_returns_original(self):
+        """Frames without a card-like shape are passed through unchanged."""
+        blank = np.full((300, 400, 3), 128, dtype=np.uint8)
+        assert localize_card(blank) is blank
+
+    def test_frame_filling_card_is_not_cropped(self, close_up_photos):
+        """A close-up that is already card-shaped is not cropped to its photo box."""
+        frame = np.array(close_up_photos[0])
+        assert localize_card(frame) is frame
+
+    def test_inner_element_is_not_a_card(self, close_up_photos):
+        """On a close-up with the card's edges cut off, the photo box is too small to be the card."""
+        frame = np.array(close_up_photos[1])
+        assert find_card_quad(frame) is None
+        assert localize_card(frame) is frame
+
+    def test_preprocess_processes_fewer_pixels(self, card_photos):
+        """Preprocessing hands the OCR stage only the card pixels."""
+        photo = card_photos[1]
+        thresh, img, gemini_img = preprocess_and_rotate(photo)
+        assert thresh.size < photo.width * photo.height / 2
+        assert gemini_img.size == (img.shape[1], img.shape[0])
+
+
+class TestCardLocalizationBenchmarks:
+    """Performance benchmarks for card localization."""
+
+    def test_localization_speed(self, benchmark, card_photos):
+        """Benchmark card localization on the fixture set."""
+        frames = [np.array(photo) for photo in card_photos]
+        results = benchmark(lambda: [localize_card(frame) for frame in frames])
+        assert all(result.size < frame.size for result, frame in zip(results, frames))
+
+    def test_preprocess_speed(self, benchmark, card_photos):
+        """Benchmark the full preprocessing stage including localization."""
+        result = benchmark(lambda: [preprocess_and_rotate(photo) for photo in card_photos])
+        assert len(result) == len(card_photos)
@@ -0,0 +1,186 @@
+"""
+Tests for the Gemini client layer
+Uses a local fake Gemini stand-in to exercise deadlines, concurrency
+limits, the circuit breaker and hedged local OCR
+"""
+import asyncio
+import os
+import threading
+import time
+import pytest
+
+try:
+    from src.models.gemini_client import GeminiClient, CircuitBreaker, GeminiUnavailableError
+except ImportError as e:
+    pytest.skip(f"Gemini client not importable: {e}", allow_module_level=True)
+
+
+class FakeGemini:
+    """Stand-in for GeminiModel with configurable latency and failures."""
+
+    def __init__(self, delay=0.0, fail=False, result=None, available=True):
+        self.delay = delay
+        self.fail = fail
+        self.result = result or {'name': 'Remote Result'}
+        self.available = available
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def is_available(self):
+        return self.available
+
+    def extract_data(self, image, prompt, extraction_type='business_card', timeout=None):
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delay)
+            if self.fail:
+                raise ValueError("Gemini API error: fake outage")
+            return self.result
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def make_client(fake, timeout=1.0, hedge_delay=-1, max_concurrency=4, breaker=None):
+    return GeminiClient(
+        fake, timeout=timeout, hedge_delay=hedge_delay,
+        semaphore=asyncio.Semaphore(max_concurrency),
+        breaker=breaker or CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    )
+
+
+def local_ocr(delay=0.0):
+    def _run():
+        time.sleep(delay)
+        return {'name': 'Local Result'}
+    return _run
+
+
+class TestDeadline:
+    def test_fast_remote_result(self):
+        client = make_client(FakeGemini())
+        assert client.extract(None, '') == {'name': 'Remote Result'}
+
+    def test_deadline_exceeded(self):
+        client = make_client(FakeGemini(delay=0.5), timeout=0.05)
+        with pytest.raises(TimeoutError):
+            client.extract(None, '')
+
+    def test_unconfigured_model(self):
+        client = make_client(FakeGemini(available=False))
+        with pytest.raises(GeminiUnavailableError):
+            client.extract(None, '')
+
+
+class TestConcurrencyLimit:
+    def test_semaphore_bounds_in_flight_calls(self):
+        fake = FakeGemini(delay=0.05)
+        client = make_client(fake, max_concurrency=2)
+        threads = [threading.Thread(target=client.extract, args=(None, '')) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert fake.calls == 6
+        assert fake.max_in_flight <= 2
+
+
+class TestCircuitBreaker:
+    def test_opens_after_consecutive_failures(self):
+        fake = FakeGemini(fail=True)
+        client = make_client(fake)
+        for _ in range(2):
+            result, source = client.extract_with_fallback(None, '', 'business_card', local_ocr())
+            assert source == 'easyocr'
+        assert client.breaker.state == CircuitBreaker.OPEN
+
+        # Open circuit goes straight to local OCR without touching the remote
+        result, source = client.extract_with_fallback(None, '', 'business_card', local_ocr())
+        assert (result, source) == ({'name': 'Local Result'}, 'easyocr')
+        assert fake.calls == 2
+        assert not client.is_available()
+
+    def test_half_open_trial_closes_circuit(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        fake = FakeGemini(fail=True)
+        client = make_client(fake, breaker=breaker)
+        client.extract_with_fallback(None, '', 'business_card', local_ocr())
+        assert breaker.state == CircuitBreaker.OPEN
+
+        time.sleep(0.06)
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        fake.fail = False
+        assert client.extract_with_fallback(None, '', 'business_card', local_ocr())[1] == 'gemini'
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_hedge_wins_during_half_open_trial(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        fake = FakeGemini(fail=True)
+        client = make_client(fake, timeout=2.0, hedge_delay=0.05, max_concurrency=1, breaker=breaker)
+        client.extract_with_fallback(None, '', 'business_card', local_ocr())
+        time.sleep(0.06)
+
+        # The trial call is cancelled when local OCR answers first
+        fake.fail, fake.delay = False, 0.3
+        assert client.extract_with_fallback(None, '', 'business_card', local_ocr(0.01))[1] == 'easyocr'
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.allow_request()
+        # The slot stays taken until the abandoned Gemini call returns
+        assert client.semaphore.locked()
+        time.sleep(0.35)
+        assert fake.in_flight == 0
+        assert not client.semaphore.locked()
+
+    def test_half_open_failure_reopens(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        breaker.record_failure()
+        time.sleep(0.06)
+        assert breaker.allow_request()
+        assert not breaker.allow_request()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+
+
+class TestHedging:
+    def test_local_wins_when_remote_stalls(self):
+        client = make_client(FakeGemini(delay=0.5), timeout=2.0, hedge_delay=0.05)
+        started = time.perf_counter()
+        result, source = client.extract_with_fallback(None, '', 'business_card', local_ocr(0.01))
+        assert source == 'easyocr'
+        assert time.perf_counter() - started < 0.4
+
+    def test_remote_wins_when_faster_than_local(self):
+        client = make_client(FakeGemini(delay=0.1), timeout=2.0, hedge_delay=0.05)
+        result, source = client.extract_with_fallback(None, '', 'business_card', local_ocr(0.5))
+        assert (result, source) == ({'name': 'Remote Result'}, 'gemini')
+
+    def test_invalid_remote_shape_uses_local(self):
+        client = make_client(FakeGemini(result={'unexpected': True}))
+        result, source = client.extract_with_fallback(
+            None, '', 'id_card', local_ocr(), validate=lambda r: 'Aadhar' in r
+        )
+        assert source == 'easyocr'
+
+
+class TestFork:
+    @pytest.mark.skipif(not hasattr(os, 'fork'), reason="requires os.fork")
+    def test_forked_worker_gets_a_fresh_loop(self):
+        from src.models import gemini_client
+        client = make_client(FakeGemini())
+        assert client.extract_with_fallback(None, '', 'business_card', local_ocr())[1] == 'gemini'
+        parent_loop = gemini_client._get_loop()
+
+        pid = os.fork()
+        if pid == 0:
+            # The parent's loop thread does not exist here; a call must not hang on it
+            ok = gemini_client._loop is None
+            ok = ok and client.extract_with_fallback(None, '', 'business_card', local_ocr())[1] == 'gemini'
+            ok = ok and gemini_client._get_loop() is not parent_loop
+            os._exit(0 if ok else 1)
+        _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 0
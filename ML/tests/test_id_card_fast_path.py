@@ -0,0 +1,94 @@
+"""
+Tests for the region-targeted ID card fast path
+Covers checksum validation, card classification and region OCR
+"""
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+
+from src.utils.text_extraction import is_valid_aadhar, is_valid_pan, classify_id_card
+
+
+class FakeOCRModel:
+    """Stand-in for EasyOCRModel that answers from canned text per call."""
+
+    def __init__(self, preview_lines, region_lines):
+        self.preview_lines = preview_lines
+        self.region_lines = region_lines
+        self.calls = []
+
+    def extract_text(self, image_np, detail=False, paragraph=False, allowlist=None):
+        self.calls.append({'shape': image_np.shape, 'allowlist': allowlist})
+        return self.preview_lines if allowlist is None else self.region_lines
+
+
+class FakeGeminiModel:
+    def is_available(self):
+        return False
+
+
+@pytest.fixture
+def make_service():
+    """Build an IDCardService around fake models."""
+    try:
+        from src.services.id_card_service import IDCardService
+    except ImportError as e:
+        pytest.skip(f"ID card service not importable: {e}")
+
+    def _make(preview_lines, region_lines):
+        service = IDCardService.__new__(IDCardService)
+        service.easyocr_model = FakeOCRModel(preview_lines, region_lines)
+        service.gemini_model = FakeGeminiModel()
+        return service
+    return _make
+
+
+class TestIDValidation:
+    """Test checksum and structure validation."""
+
+    def test_aadhar_verhoeff(self):
+        assert is_valid_aadhar('234567890124')
+        assert is_valid_aadhar('2345 6789 0124')
+        assert not is_valid_aadhar('234567890125')
+        assert not is_valid_aadhar('134567890124')
+        assert not is_valid_aadhar('23456789012')
+
+    def test_pan_structure(self):
+        assert is_valid_pan('ABCPE1234F')
+        assert not is_valid_pan('ABCXE1234F')
+        assert not is_valid_pan('ABCPE12345')
+
+    def test_classify_id_card(self):
+        assert classify_id_card(['Government of India', 'Aadhaar', 'DOB']) == 'aadhar'
+        assert classify_id_card(['INCOME TAX DEPARTMENT', 'Permanent Account Number']) == 'pan'
+        assert classify_id_card(['ACME Solutions', 'Company Pvt Ltd']) is None
+
+
+class TestIDCardFastPath:
+    """Test region-targeted extraction in IDCardService."""
+
+    def test_aadhar_region_read(self, make_service):
+        service = make_service(['Government of India', 'Aadhaar'], ['2345 6789 0124'])
+        result = service._extract_from_known_layout(np.zeros((540, 856), dtype=np.uint8))
+
+        assert result == {'Aadhar': ['234567890124'], 'PAN': [], 'General Numbers': ['234567890124']}
+        preview_call, region_call = service.easyocr_model.calls
+        assert preview_call['shape'][1] <= 480
+        assert region_call['allowlist'] == '0123456789 '
+        assert region_call['shape'][0] * region_call['shape'][1] < 540 * 856 / 4
+
+    def test_pan_region_read(self, make_service):
+        service = make_service(['INCOME TAX DEPARTMENT'], ['RAHUL KUMAR', 'ABCPE1234F'])
+        result = service._extract_from_known_layout(np.zeros((540, 856), dtype=np.uint8))
+        assert result['PAN'] == ['ABCPE1234F']
+        assert result['Aadhar'] == []
+
+    def test_misread_checksum_falls_back(self, make_service):
+        service = make_service(['Aadhaar'], ['2345 6789 0125'])
+        assert service._extract_from_known_layout(np.zeros((540, 856), dtype=np.uint8)) is None
+
+    def test_unknown_card_skips_region_pass(self, make_service):
+        service = make_service(['Some Business Card'], ['2345 6789 0124'])
+        assert service._extract_from_known_layout(np.zeros((540, 856), dtype=np.uint8)) is None
+        assert len(service.easyocr_model.calls) == 1
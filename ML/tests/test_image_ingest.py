@@ -0,0 +1,115 @@
+"""
+Tests for upload ingestion
+Covers magic-byte sniffing, header-only size checks and reduced JPEG decoding
+"""
+import io
+import struct
+import zlib
+import pytest
+
+pytest.importorskip("PIL")
+
+from PIL import Image
+from src.utils.image_ingest import open_image, open_image_bytes, sniff_format, ImageRejectedError
+
+
+def encoded(size, image_format='PNG'):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color='white').save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+def png_header_only(width, height):
+    """A PNG whose header claims the given size but carries almost no pixel data."""
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header) + chunk(b'IDAT', zlib.compress(b'\x00')) + chunk(b'IEND', b'')
+
+
+class TestOpenImage:
+    def test_sniffs_format_from_magic_bytes(self):
+        assert sniff_format(encoded((4, 4), 'PNG')) == 'PNG'
+        assert sniff_format(encoded((4, 4), 'JPEG')) == 'JPEG'
+        assert sniff_format(encoded((4, 4), 'GIF')) is None
+
+    def test_rejects_non_images_regardless_of_name(self):
+        for data in (b'%PDF-1.4 not an image', encoded((4, 4), 'GIF'), b''):
+            with pytest.raises(ImageRejectedError) as error:
+                open_image_bytes(data)
+            assert error.value.status_code == 400
+
+    def test_rejects_oversized_files_before_reading(self):
+        with pytest.raises(ImageRejectedError) as error:
+            open_image_bytes(encoded((64, 64)), max_bytes=100)
+        assert error.value.status_code == 413
+
+    def test_rejects_decompression_bombs_from_header(self):
+        with pytest.raises(ImageRejectedError) as error:
+            open_image_bytes(png_header_only(8000, 8000))
+        assert error.value.status_code == 413
+        assert '8000x8000' in str(error.value)
+
+        # Past Pillow's own hard limit, Image.open itself refuses
+        with pytest.raises(ImageRejectedError) as error:
+            open_image_bytes(png_header_only(30000, 30000))
+        assert error.value.status_code == 413
+
+    def test_rejects_truncated_images(self):
+        with pytest.raises(ImageRejectedError):
+            open_image_bytes(encoded((200, 200), 'JPEG')[:300])
+
+    def test_large_jpeg_decoded_at_reduced_scale(self):
+        image = open_image_bytes(encoded((4000, 2000), 'JPEG'), target_max_dim=1000)
+        assert image.size == (1000, 500)
+        assert image.mode == 'RGB'
+
+    def test_small_jpeg_and_png_keep_full_size(self):
+        assert open_image_bytes(encoded((800, 400), 'JPEG'), target_max_dim=1000).size == (800, 400)
+        assert open_image_bytes(encoded((4000, 2000), 'PNG'), target_max_dim=1000).size == (4000, 2000)
+
+    def test_reads_from_stream_start(self):
+        stream = io.BytesIO(encoded((10, 10)))
+        stream.seek(5)
+        assert open_image(stream).size == (10, 10)
+
+
+class FakeBusinessCardService:
+    def extract_business_card_data(self, image, prompt=None):
+        return {"size": list(image.size)}
+
+
+@pytest.fixture
+def upload_client(monkeypatch):
+    try:
+        import src.AI_Agent as agent
+    except ImportError as e:
+        pytest.skip(f"ML app not importable: {e}")
+
+    monkeypatch.setattr(agent, 'business_card_service', FakeBusinessCardService())
+    agent.app.config['TESTING'] = True
+    return agent.app.test_client()
+
+
+class TestUploadEndpoint:
+    def post(self, client, data, filename):
+        return client.post('/upload', data={'file': (io.BytesIO(data), filename)}, content_type='multipart/form-data')
+
+    def test_accepts_valid_image(self, upload_client):
+        response = self.post(upload_client, encoded((30, 20)), 'card.png')
+        assert response.status_code == 200
+        assert response.get_json() == {"size": [30, 20]}
+
+    def test_rejects_renamed_non_image(self, upload_client):
+        response = self.post(upload_client, b'MZ\x90\x00 executable', 'card.jpg')
+        assert response.status_code == 400
+
+    def test_rejects_decompression_bomb(self, upload_client):
+        response = self.post(upload_client, png_header_only(30000, 30000), 'card.png')
+        assert response.status_code == 413
+
+    def test_rejects_oversized_body_from_content_length(self, upload_client, monkeypatch):
+        import src.AI_Agent as agent
+        monkeypatch.setattr(agent, 'MAX_IMAGE_BYTES', 1000)
+        response = self.post(upload_client, encoded((400, 400), 'JPEG') + b'\x00' * 2000, 'card.jpg')
+        assert response.status_code == 413
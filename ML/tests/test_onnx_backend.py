@@ -0,0 +1,95 @@
+"""
+Tests for the ONNX Runtime OCR backend
+Uses small stand-ins with the same interfaces as EasyOCR's detector and
+recognizer so export and parity can be checked without model downloads
+"""
+import os
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("onnx")
+pytest.importorskip("onnxruntime")
+
+from src.models.onnx_backend import (
+    attach_onnx_backend, OnnxDetector, OnnxRecognizer, DETECTOR_FILE, RECOGNIZER_FILE
+)
+
+
+class TinyDetector(torch.nn.Module):
+    """CRAFT-shaped stand-in: image [N,3,H,W] -> (maps [N,H/2,W/2,2], feature)."""
+
+    def __init__(self):
+        super().__init__()
+        self.conv = torch.nn.Conv2d(3, 4, 3, stride=2, padding=1)
+        self.head = torch.nn.Conv2d(4, 2, 1)
+
+    def forward(self, x):
+        feature = torch.relu(self.conv(x))
+        return self.head(feature).permute(0, 2, 3, 1), feature
+
+
+class LSTMOutput(torch.nn.Module):
+    """Adapts nn.LSTM to EasyOCR's SequenceModeling call signature."""
+
+    def __init__(self, lstm):
+        super().__init__()
+        self.lstm = lstm
+
+    def forward(self, x):
+        return self.lstm(x)[0]
+
+
+class TinyRecognizer(torch.nn.Module):
+    """Recognizer-shaped stand-in using EasyOCR's attribute names and pooling."""
+
+    def __init__(self, num_class=12):
+        super().__init__()
+        self.FeatureExtraction = torch.nn.Conv2d(1, 8, 3, stride=(4, 2), padding=1)
+        self.AdaptiveAvgPool = torch.nn.AdaptiveAvgPool2d((None, 1))
+        self.SequenceModeling = LSTMOutput(torch.nn.LSTM(8, 8, batch_first=True))
+        self.Prediction = torch.nn.Linear(8, num_class)
+
+    def forward(self, input, text):
+        visual_feature = self.AdaptiveAvgPool(self.FeatureExtraction(input).permute(0, 3, 1, 2)).squeeze(3)
+        contextual_feature = self.SequenceModeling(visual_feature)
+        return self.Prediction(contextual_feature.contiguous())
+
+
+class FakeReader:
+    def __init__(self):
+        torch.manual_seed(0)
+        self.detector = TinyDetector().eval()
+        self.recognizer = TinyRecognizer().eval()
+
+
+@pytest.mark.parametrize('quantize', [False, True])
+def test_onnx_matches_torch(tmp_path, quantize):
+    reader = FakeReader()
+    detector, recognizer = reader.detector, reader.recognizer
+    attach_onnx_backend(reader, str(tmp_path), quantize=quantize)
+
+    assert isinstance(reader.detector, OnnxDetector)
+    assert isinstance(reader.recognizer, OnnxRecognizer)
+    assert os.path.exists(tmp_path / DETECTOR_FILE) and os.path.exists(tmp_path / RECOGNIZER_FILE)
+
+    tolerance = 0.05 if quantize else 1e-4
+    image = torch.randn(2, 3, 96, 160)  # dynamic batch and size
+    with torch.no_grad():
+        expected_maps, _ = detector(image)
+    maps, _ = reader.detector(image)
+    assert maps.shape == expected_maps.shape
+    assert torch.allclose(maps, expected_maps, atol=tolerance)
+
+    lines = torch.randn(3, 1, 64, 200)
+    with torch.no_grad():
+        expected_logits = recognizer(lines, None)
+    logits = reader.recognizer(lines, None)
+    assert logits.shape == expected_logits.shape
+    assert torch.allclose(logits, expected_logits, atol=tolerance)
+
+
+def test_exported_models_are_reused(tmp_path):
+    attach_onnx_backend(FakeReader(), str(tmp_path))
+    modified = os.path.getmtime(tmp_path / DETECTOR_FILE)
+    attach_onnx_backend(FakeReader(), str(tmp_path))
+    assert os.path.getmtime(tmp_path / DETECTOR_FILE) == modified
@@ -0,0 +1,147 @@
+"""
+Tests for OCR rate limiting and admission control
+Token buckets per caller, the in-flight cap and 429 responses with Retry-After
+"""
+import hashlib
+import io
+import threading
+import time
+import pytest
+
+from src.utils import rate_limit
+from src.utils.rate_limit import MemoryBackend, RateLimiter, AdmissionControl
+
+
+class TestMemoryBackend:
+    def test_burst_then_wait(self):
+        backend = MemoryBackend()
+        assert [backend.take('a', rate=1.0, burst=3) for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert backend.take('a', rate=1.0, burst=3) == pytest.approx(1.0, abs=0.05)
+        # Other callers have their own bucket
+        assert backend.take('b', rate=1.0, burst=3) == 0.0
+
+    def test_refills_over_time(self, monkeypatch):
+        import src.utils.rate_limit as rate_limit
+        clock = [100.0]
+        monkeypatch.setattr(rate_limit.time, 'monotonic', lambda: clock[0])
+        backend = MemoryBackend()
+        backend.take('a', rate=2.0, burst=1)
+        assert backend.take('a', rate=2.0, burst=1) == pytest.approx(0.5)
+        clock[0] += 0.5
+        assert backend.take('a', rate=2.0, burst=1) == 0.0
+
+
+class TestAdmissionControl:
+    def test_cap_without_waiting(self):
+        admission = AdmissionControl(2)
+        assert admission.acquire() and admission.acquire()
+        assert not admission.acquire()
+        admission.release()
+        assert admission.acquire()
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    try:
+        import src.AI_Agent as agent
+    except ImportError as e:
+        pytest.skip(f"ML app not importable: {e}")
+    agent.app.config['TESTING'] = True
+    monkeypatch.setattr(agent, 'ocr_rate_limiter', None)
+    return agent
+
+
+def post_without_file(client, **headers):
+    return client.post('/extract-id-number', data={}, content_type='multipart/form-data', headers=headers)
+
+
+class TestOCREndpoints:
+    def test_rate_limited_per_caller(self, agent, monkeypatch):
+        monkeypatch.setattr(agent, 'ocr_rate_limiter', RateLimiter('ocr', 6, 1, MemoryBackend()))
+        client = agent.app.test_client()
+
+        assert post_without_file(client).status_code == 400
+        response = post_without_file(client)
+        assert response.status_code == 429
+        assert response.headers['Retry-After'] == '10'
+        assert response.get_json()['retry_after'] == 10
+        # Made-up API keys share the caller's bucket; an issued one gets its own
+        assert post_without_file(client, **{'X-API-Key': 'kiosk-1'}).status_code == 429
+        monkeypatch.setattr(rate_limit, 'RATE_LIMIT_API_KEYS', {hashlib.sha256(b'kiosk-1').hexdigest()})
+        assert post_without_file(client, **{'X-API-Key': 'kiosk-1'}).status_code == 400
+
+    def test_busy_when_slots_taken(self, agent, monkeypatch):
+        admission = AdmissionControl(1)
+        monkeypatch.setattr(agent, 'ocr_admission', admission)
+        client = agent.app.test_client()
+
+        assert admission.acquire()
+        response = post_without_file(client)
+        assert response.status_code == 429
+        assert 'Retry-After' in response.headers
+
+        admission.release()
+        assert post_without_file(client).status_code == 400
+        # The slot was given back after the request
+        assert admission.acquire()
+
+    def test_other_endpoints_not_limited(self, agent, monkeypatch):
+        admission = AdmissionControl(1)
+        admission.acquire()
+        monkeypatch.setattr(agent, 'ocr_admission', admission)
+        assert agent.app.test_client().get('/health').status_code != 429
+
+
+class CountingBusinessCardService:
+    """Records how many extractions run at once"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = self.peak = 0
+
+    def extract_business_card_data(self, image, prompt=None):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(0.02)
+        with self.lock:
+            self.running -= 1
+        return {}
+
+
+@pytest.fixture
+def batch(agent, monkeypatch):
+    pytest.importorskip("PIL")
+    from PIL import Image
+    from src.services.batch_service import BatchService
+
+    cards = CountingBusinessCardService()
+    monkeypatch.setattr(agent, 'batch_service', BatchService(None, cards, max_workers=4))
+    buffer = io.BytesIO()
+    Image.new('RGB', (10, 10), color='white').save(buffer, format='PNG')
+    png = buffer.getvalue()
+
+    def post(count):
+        data = {'files': [(io.BytesIO(png), f'card{i}.png') for i in range(count)]}
+        return agent.app.test_client().post('/batch', data=data, content_type='multipart/form-data')
+    return post, cards
+
+
+class TestBatchLimits:
+    def test_charged_one_token_per_image(self, agent, batch, monkeypatch):
+        post, _ = batch
+        monkeypatch.setattr(agent, 'ocr_rate_limiter', RateLimiter('ocr', 6, 3, MemoryBackend()))
+
+        # More images than the bucket can ever hold is a bad request, not a wait
+        assert post(4).status_code == 400
+        assert post(3).status_code == 200
+        assert post(1).status_code == 429
+
+    def test_images_share_the_admission_cap(self, agent, batch, monkeypatch):
+        post, cards = batch
+        monkeypatch.setattr(agent, 'ocr_admission', AdmissionControl(1, wait_seconds=5))
+
+        response = post(4)
+        assert response.status_code == 200
+        assert '"failed": 0' in response.get_data(as_text=True)
+        assert cards.peak == 1
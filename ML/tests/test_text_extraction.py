@@ -0,0 +1,90 @@
+"""
+Tests for text extraction utilities
+Covers keyword tagging, field extractors and their micro-benchmark
+"""
+import pytest
+
+from src.utils.text_extraction import (
+    tag_line, extract_email, extract_mobile_number, extract_company_number,
+    extract_website, extract_company_name, extract_name_and_designation,
+    extract_address, extract_custom_data
+)
+
+# OCR line outputs as EasyOCR returns them for typical cards
+OCR_CORPUS = [
+    ['RAHUL SHARMA', 'Senior Software Engineer', 'Acme Technologies Pvt Ltd',
+     'rahul.sharma@acmetech.com', 'Mob: +91 98765 43210', 'Tel: 040-23456789',
+     'www.acmetech.com', 'Plot 12, Hitech City Road', 'Madhapur, Hyderabad', 'Telangana 500081'],
+    ['Priya Nair', 'Project Manager', 'BLUE OCEAN CONSULTING', 'priya@gmail.com',
+     '9876501234', 'Office: +91 80 41234567 ext 204', '3rd Floor, Prestige Building',
+     'MG Road, Bengaluru - 560001', 'India'],
+    ['Your Logo', 'John Smith', 'Chief Executive Officer', 'Global Solutions Inc',
+     'Email: john.smith@globalsolutions.in', 'Phone: (022) 2345 6789', 'Mobile +91-9123456789',
+     'https://globalsolutions.in', 'Sector 5, Salt Lake', 'Kolkata 700091'],
+    ['ANITA DESAI', 'Director - Strategy', 'Desai & Associates LLP', 'anita;desai@desaiassoc.co.in',
+     'Block B, Phase Iil, Okhla Industrial Area', 'New Delhi 110020', 'M: 8800112233'],
+    ['Mohammed Irfan', 'Lead Designer', 'Pixel Park Studio', 'irfan@pixelpark.io',
+     'Tel 0484 2345678', '45 Marine Drive Avenue', 'Kochi, Kerala 682031'],
+    ['Sales Team', 'Receipt', 'Item: Coffee 2', 'Products: Tea', 'Total 250'],
+]
+
+
+def extract_all(lines):
+    full_text = ' '.join(lines)
+    return (
+        extract_email(full_text), extract_mobile_number(full_text), extract_company_number(full_text),
+        extract_website(full_text), extract_company_name(lines), extract_name_and_designation(lines),
+        extract_address(lines)
+    )
+
+
+class TestKeywordTagging:
+    """Test the per-line keyword matcher."""
+
+    def test_tags_each_group(self):
+        assert {'company', 'non_name', 'non_address'} <= tag_line('Acme Technologies Pvt Ltd')
+        assert 'designation' in tag_line('Project Manager')
+        assert 'designation' not in tag_line('Leadership Summit')
+        assert {'address', 'address_end'} <= tag_line('Kochi, Kerala 682031')
+        assert tag_line('Priya Nair') == frozenset()
+
+
+class TestFieldExtraction:
+    """Test field extractors on the OCR corpus."""
+
+    def test_business_card_fields(self):
+        email, mobile, company_number, website, company, name_designation, address = extract_all(OCR_CORPUS[2])
+        assert email == 'john.smith@globalsolutions.in'
+        assert mobile == '+91-9123456789'
+        assert company == 'Global Solutions Inc'
+        assert name_designation == ('John Smith', 'Chief Executive Officer')
+        assert address == 'Sector 5, Salt Lake, Kolkata 700091'
+
+    def test_address_ocr_cleanup(self):
+        lines = OCR_CORPUS[3]
+        assert extract_address(lines) == 'Block B, Phase III, Okhla Industrial Area, New Delhi 110020'
+        assert extract_name_and_designation(lines) == ('Anita Desai', 'Director - Strategy')
+        assert extract_company_name(lines) == 'Desai & Associates Llp'
+
+    def test_landline_number(self):
+        assert extract_company_number(' '.join(OCR_CORPUS[4])) == '0484 2345678'
+        assert extract_website(' '.join(OCR_CORPUS[4])) == 'pixelpark.io'
+
+    def test_custom_prompt_fields(self):
+        result = extract_custom_data(OCR_CORPUS[2], 'name and designation')
+        assert result == {'name': 'John Smith', 'designation': 'Chief Executive Officer'}
+        receipt = extract_custom_data(OCR_CORPUS[5], 'receipt')
+        assert receipt['items'] == 'Item: Coffee 2, Products: Tea'
+        assert extract_custom_data(OCR_CORPUS[0], '') is None
+
+
+class TestTextExtractionBenchmarks:
+    """Micro-benchmarks for field extraction over the OCR corpus."""
+
+    def test_default_fields_speed(self, benchmark):
+        results = benchmark(lambda: [extract_all(lines) for lines in OCR_CORPUS])
+        assert len(results) == len(OCR_CORPUS)
+
+    def test_custom_prompt_speed(self, benchmark):
+        results = benchmark(lambda: [extract_custom_data(lines, 'business card') for lines in OCR_CORPUS])
+        assert all(isinstance(result, dict) for result in results)
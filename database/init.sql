@@ -8,6 +8,10 @@ COLLATE utf8mb4_unicode_ci;
 
 USE vms_db;
 
+-- Stopwords would drop name parts such as "de", "la" and "will" from the
+-- FULLTEXT indexes (and, with the ngram parser, every n-gram containing them)
+SET SESSION innodb_ft_enable_stopword = OFF;
+
 -- Companies table (extended with subscription fields)
 CREATE TABLE IF NOT EXISTS companies (
     id INT AUTO_INCREMENT PRIMARY KEY,
@@ -80,7 +84,7 @@ CREATE TABLE IF NOT EXISTS users (
     FOREIGN KEY (company_id) REFERENCES companies(id) ON DELETE SET NULL
 );
 
--- Visitors table (unchanged)
+-- Visitors table (one row per visitor, reused across visits)
 CREATE TABLE IF NOT EXISTS visitors (
     id INT AUTO_INCREMENT PRIMARY KEY,
     name VARCHAR(100) NOT NULL,
@@ -97,13 +101,22 @@ CREATE TABLE IF NOT EXISTS visitors (
     address TEXT NULL,
     is_blacklisted BOOLEAN DEFAULT FALSE,
     reason_for_blacklist TEXT NULL,
+    -- Identity keys, one row per person and company (Backend/src/utils/visitor_identity.py)
+    company_name VARCHAR(200) NULL,
+    email_normalized VARCHAR(100) NULL,
+    phone_normalized VARCHAR(20) NULL,
+    id_number_normalized VARCHAR(50) NULL,
+    merged_into INT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     
     INDEX idx_email (email),
     INDEX idx_phone (phone),
     INDEX idx_company (company),
-    INDEX idx_is_blacklisted (is_blacklisted)
+    INDEX idx_is_blacklisted (is_blacklisted),
+    UNIQUE KEY uq_company_email_normalized (company_name, email_normalized),
+    INDEX idx_company_phone_normalized (company_name, phone_normalized),
+    INDEX idx_company_id_number_normalized (company_name, id_number_normalized)
 );
 
 -- Pre-registrations table (unchanged)
@@ -135,11 +148,13 @@ CREATE TABLE IF NOT EXISTS pre_registrations (
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     check_in_time DATETIME NULL,
     checked_out_at DATETIME NULL,
+    occurrences_through DATE NULL COMMENT 'Recurring series materialized up to this date',
     
     INDEX idx_company_id (company_id),
     INDEX idx_host_id (host_id),
     INDEX idx_visitor_email (visitor_email),
     INDEX idx_visit_date (visit_date),
+    INDEX idx_company_visit_date (company_to_visit, visit_date),
     INDEX idx_status (status),
     INDEX idx_qr_code (qr_code),
     INDEX idx_created_at (created_at),
@@ -148,6 +163,27 @@ CREATE TABLE IF NOT EXISTS pre_registrations (
     FOREIGN KEY (host_id) REFERENCES users(id) ON DELETE SET NULL
 );
 
+-- Dated occurrences of recurring pre-registrations, materialized a rolling
+-- window ahead (Backend/src/utils/recurrence.py)
+CREATE TABLE IF NOT EXISTS recurring_occurrences (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    pre_registration_id INT NOT NULL,
+    company_id INT NULL,
+    company_to_visit VARCHAR(200) NULL,
+    occurrence_date DATE NOT NULL,
+    visit_time TIME NULL,
+    qr_code VARCHAR(200) NULL,
+    status ENUM('expected', 'checked-in', 'cancelled') NOT NULL DEFAULT 'expected',
+    visit_id INT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    
+    UNIQUE KEY uq_series_date (pre_registration_id, occurrence_date),
+    INDEX idx_qr_date (qr_code, occurrence_date),
+    INDEX idx_company_date (company_to_visit, occurrence_date),
+    
+    FOREIGN KEY (pre_registration_id) REFERENCES pre_registrations(id) ON DELETE CASCADE
+);
+
 -- Visits table (unchanged)
 CREATE TABLE IF NOT EXISTS visits (
     id INT AUTO_INCREMENT PRIMARY KEY,
@@ -161,6 +197,11 @@ CREATE TABLE IF NOT EXISTS visits (
     visitor_email VARCHAR(100) NULL,
     visitor_phone VARCHAR(20) NULL,
     visitor_company VARCHAR(200) NULL,
+    -- What was captured at this check-in; the visitors row only holds the latest
+    visitor_photo MEDIUMTEXT NULL,
+    visitor_id_card_photo MEDIUMTEXT NULL,
+    visitor_id_card_number VARCHAR(50) NULL,
+    visitor_address TEXT NULL,
     purpose_of_visit TEXT NOT NULL,
     host_name VARCHAR(100) NOT NULL,
     host_email VARCHAR(100) NOT NULL,
@@ -197,8 +238,12 @@ CREATE TABLE IF NOT EXISTS visits (
     INDEX idx_status (status),
     INDEX idx_qr_code (qr_code),
     INDEX idx_check_in_time (check_in_time),
+    INDEX idx_visitor_email_check_in (visitor_email, check_in_time),
     INDEX idx_check_out_time (check_out_time),
     INDEX idx_created_at (created_at),
+    -- Substring filters on the visit lists (visitorName, visitorEmail)
+    FULLTEXT INDEX ft_visitor_name (visitor_name) WITH PARSER ngram,
+    FULLTEXT INDEX ft_visitor_email (visitor_email) WITH PARSER ngram,
     
     FOREIGN KEY (visitor_id) REFERENCES visitors(id) ON DELETE SET NULL,
     FOREIGN KEY (host_id) REFERENCES users(id) ON DELETE SET NULL,
@@ -208,6 +253,30 @@ CREATE TABLE IF NOT EXISTS visits (
     FOREIGN KEY (updated_by) REFERENCES users(id) ON DELETE SET NULL
 );
 
+-- One row per returning visitor and company for the typeahead search
+-- (Backend/src/utils/visitor_search.py)
+CREATE TABLE IF NOT EXISTS visitor_search (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    company_name VARCHAR(200) NOT NULL,
+    visitor_key VARCHAR(255) NOT NULL,
+    visitor_id INT NULL,
+    name VARCHAR(100) NOT NULL,
+    email VARCHAR(100) NULL,
+    phone VARCHAR(20) NULL,
+    phone_digits VARCHAR(20) NULL,
+    company VARCHAR(200) NULL,
+    visit_count INT NOT NULL DEFAULT 0,
+    last_visit_at DATETIME NULL,
+    -- 't' + 16 hex digits of SHA-256(LOWER(company_name)): keeps FULLTEXT lookups within one tenant
+    tenant_token VARCHAR(20) NOT NULL,
+
+    UNIQUE KEY uq_company_visitor (company_name, visitor_key),
+    INDEX idx_company_name_prefix (company_name, name),
+    INDEX idx_company_email_prefix (company_name, email),
+    INDEX idx_company_phone_prefix (company_name, phone_digits),
+    FULLTEXT INDEX ft_visitor (tenant_token, name, email, phone, company)
+);
+
 -- Visit approvals table (unchanged)
 CREATE TABLE IF NOT EXISTS visit_approvals (
     id INT AUTO_INCREMENT PRIMARY KEY,
@@ -466,6 +535,25 @@ CREATE TABLE IF NOT EXISTS tickets (
     INDEX idx_updated_at (updated_at)
     );
 
+-- Precomputed admin dashboard KPIs ('platform' and 'company:<name>'), refreshed by the
+-- admin backend on a schedule and after payment/subscription writes mark them dirty
+CREATE TABLE IF NOT EXISTS kpi_snapshots (
+    snapshot_key VARCHAR(191) PRIMARY KEY,
+    payload LONGTEXT NOT NULL,
+    computed_at DATETIME NOT NULL,
+    compute_ms INT NOT NULL DEFAULT 0,
+    dirty_since DATETIME NULL,
+    INDEX idx_computed_at (computed_at)
+);
+
+-- Per-table write counters behind the backend's ETag/Last-Modified headers;
+-- writes to users, companies, system_settings and pricing tables bump them
+CREATE TABLE IF NOT EXISTS table_versions (
+    table_name VARCHAR(64) PRIMARY KEY,
+    version BIGINT UNSIGNED NOT NULL DEFAULT 0,
+    updated_at DATETIME NOT NULL
+);
+
 
 
 -- Insert sample monthly plans
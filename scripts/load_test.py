@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Load Test: development server vs gunicorn
+Starts a service under Flask's development server and under its
+gunicorn.conf.py, drives each with concurrent keep-alive clients and prints
+throughput, latency percentiles and error counts side by side.
+
+Usage (from the repository root):
+    python scripts/load_test.py --service backend [--path /health] [--concurrency 1,8,32] [--duration 10]
+    python scripts/load_test.py --service ml --path /upload --file card.jpg --concurrency 1,4
+    python scripts/load_test.py --url http://localhost:4000 --path /health    # an already running server
+
+Servers bind to 127.0.0.1 on a free port. Pass --servers dev or --servers gunicorn
+to run only one of them. The client runs in this process, so at very high
+concurrency it can become the bottleneck; compare the two servers at the same
+settings rather than reading absolute numbers.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from urllib.parse import urlparse
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVICES = {
+    'backend': {
+        'cwd': 'Backend',
+        'dev': ['run.py'],
+        'gunicorn': 'run:app',
+        'env': lambda port: {'FLASK_HOST': '127.0.0.1', 'FLASK_PORT': str(port)},
+        'ready': '/health',
+        'ready_status': None,
+        'path': '/health',
+    },
+    'admin': {
+        'cwd': os.path.join('Admin Portal', 'admin-backend'),
+        'dev': ['app.py'],
+        'gunicorn': 'app:app',
+        'env': lambda port: {'ADMIN_PORT': str(port)},
+        # /health reports database errors as 500; any answer means the server is up
+        'ready': '/health',
+        'ready_status': None,
+        'path': '/health',
+    },
+    'ml': {
+        'cwd': 'ML',
+        'dev': ['run.py'],
+        'gunicorn': 'run:create_app()',
+        'env': lambda port: {'ML_HOST': '127.0.0.1', 'ML_PORT': str(port)},
+        # 503 until the models are warmed up
+        'ready': '/ready',
+        'ready_status': 200,
+        'path': '/health',
+    },
+}
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def multipart_body(path):
+    """Encode a file as the 'file' field of a multipart/form-data body"""
+    boundary = uuid.uuid4().hex
+    with open(path, 'rb') as f:
+        data = f.read()
+    body = (f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{os.path.basename(path)}"\r\n'
+            f'Content-Type: application/octet-stream\r\n\r\n').encode() + data + f'\r\n--{boundary}--\r\n'.encode()
+    return body, f'multipart/form-data; boundary={boundary}'
+
+class Server:
+    """A service process started under the dev server or gunicorn"""
+
+    def __init__(self, service, kind, ready_timeout):
+        self.service = SERVICES[service]
+        self.kind = kind
+        self.port = free_port()
+        self.ready_timeout = ready_timeout
+        self.process = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def command(self):
+        if self.kind == 'dev':
+            return [sys.executable] + self.service['dev']
+        return [sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py', self.service['gunicorn']]
+
+    def __enter__(self):
+        env = dict(os.environ, **self.service['env'](self.port), GUNICORN_BIND=f"127.0.0.1:{self.port}",
+                   GUNICORN_ACCESS_LOG=os.getenv('GUNICORN_ACCESS_LOG', ''))
+        self.process = subprocess.Popen(self.command(), cwd=os.path.join(ROOT_DIR, self.service['cwd']), env=env,
+                                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.monotonic() + self.ready_timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"{self.kind} server exited with code {self.process.returncode}")
+            try:
+                conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=2)
+                conn.request('GET', self.service['ready'])
+                status = conn.getresponse().status
+                if self.service['ready_status'] in (None, status):
+                    return self
+            except OSError:
+                pass
+            time.sleep(0.5)
+        self.__exit__()
+        raise RuntimeError(f"{self.kind} server not ready after {self.ready_timeout}s")
+
+    def __exit__(self, *exc):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+def run_level(url, method, path, body, content_type, concurrency, duration):
+    """Send requests from `concurrency` keep-alive clients for `duration` seconds"""
+    target = urlparse(url)
+    headers = {'Content-Type': content_type} if content_type else {}
+    deadline = time.monotonic() + duration
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    def client():
+        conn = None
+        local_latencies, local_errors = [], []
+        while time.monotonic() < deadline:
+            if conn is None:
+                conn = http.client.HTTPConnection(target.hostname, target.port, timeout=120)
+            started = time.perf_counter()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                if response.status >= 400:
+                    local_errors.append(f"HTTP {response.status}")
+                else:
+                    local_latencies.append(time.perf_counter() - started)
+                if response.will_close:
+                    conn.close()
+                    conn = None
+            except (OSError, http.client.HTTPException) as e:
+                local_errors.append(type(e).__name__)
+                conn.close()
+                conn = None
+        if conn:
+            conn.close()
+        with lock:
+            latencies.extend(local_latencies)
+            errors.extend(local_errors)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    ms = sorted(latency * 1000 for latency in latencies)
+    pct = lambda p: ms[min(len(ms) - 1, int(len(ms) * p / 100))] if ms else 0.0
+    return {
+        'concurrency': concurrency,
+        'requests': len(ms),
+        'errors': len(errors),
+        'first_error': errors[0] if errors else None,
+        'rps': len(ms) / wall if wall else 0.0,
+        'p50_ms': statistics.median(ms) if ms else 0.0,
+        'p95_ms': pct(95),
+        'p99_ms': pct(99),
+    }
+
+def print_report(results):
+    print(f"\n{'server':<9} {'conc':>4} {'requests':>8} {'errors':>6} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for server, levels in results.items():
+        for r in levels:
+            print(f"{server:<9} {r['concurrency']:>4} {r['requests']:>8} {r['errors']:>6} {r['rps']:>9.1f} "
+                  f"{r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f}")
+    for server, levels in results.items():
+        for r in levels:
+            if r['first_error']:
+                print(f"⚠️ {server} concurrency {r['concurrency']}: first error: {r['first_error']}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--service', choices=sorted(SERVICES), default='backend')
+    parser.add_argument('--servers', default='dev,gunicorn', help='Comma-separated: dev, gunicorn')
+    parser.add_argument('--url', help='Load-test an already running server instead of starting one')
+    parser.add_argument('--path', help="Request path (default: the service's health check)")
+    parser.add_argument('--file', help='POST this file as multipart field "file" (e.g. a card image for the ML service)')
+    parser.add_argument('--concurrency', default='1,8,32', help='Comma-separated client counts')
+    parser.add_argument('--duration', type=float, default=10, help='Seconds per concurrency level')
+    parser.add_argument('--ready-timeout', type=float, default=300, help='Seconds to wait for a started server')
+    parser.add_argument('--json', help='Also write results to this JSON file')
+    args = parser.parse_args()
+
+    path = args.path or SERVICES[args.service]['path']
+    method, body, content_type = 'GET', None, None
+    if args.file:
+        method = 'POST'
+        body, content_type = multipart_body(args.file)
+    levels = [int(level) for level in args.concurrency.split(',')]
+
+    def run_all(url):
+        run_level(url, method, path, body, content_type, 1, 1)  # warm-up, untimed
+        return [run_level(url, method, path, body, content_type, level, args.duration) for level in levels]
+
+    results = {}
+    if args.url:
+        results['external'] = run_all(args.url)
+    else:
+        for kind in args.servers.split(','):
+            try:
+                with Server(args.service, kind, args.ready_timeout) as server:
+                    print(f"🚀 {kind} server ready on {server.url}")
+                    results[kind] = run_all(server.url)
+            except RuntimeError as e:
+                print(f"❌ {e}")
+
+    print(f"\n{method} {path} on {args.service}, {args.duration:.0f}s per level")
+    print_report(results)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'service': args.service, 'path': path, 'results': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()